@@ -21,7 +21,6 @@ import typing
 import uuid
 import warnings
 
-import case_utils.inherent_uuid
 import rdflib
 from case_utils.namespace import NS_RDF, NS_UCO_ACTION, NS_XSD
 from cdo_local_uuid import local_uuid
@@ -237,6 +236,8 @@ def infer_prov_instantaneous_influence_event(
             n_prov_related_thing, rdflib.URIRef
         ):
             if use_deterministic_uuids:
+                import case_utils.inherent_uuid
+
                 prov_thing_uuid_namespace = case_utils.inherent_uuid.inherence_uuid(
                     n_prov_thing
                 )
@@ -303,6 +304,43 @@ def infer_interval_terminus(
     """
     :returns: Returns a node N matching the pattern 'n_interval n_predicate N', as well as a supplemental set of triples.  If a node N is not found in the graph, and a node should exist (which is relevant when considering ends), a node is created and linked in the supplemental triples; hence the length of the supplemental triples being >0 can be used as an indicator that the node was created.  If the requested property indicates a search for an end, the graph is first reviewed to see if an end should exist.
     """
+    # See if we should even check for an end.
+    if n_predicate in {NS_PROV.qualifiedEnd, NS_TIME.hasEnd}:
+        if not interval_end_should_exist(in_graph, n_interval):
+            return (None, set())
+
+    for n_value in in_graph.objects(n_interval, n_predicate):
+        assert isinstance(n_value, rdflib.term.IdentifiedNode)
+        return (n_value, set())
+    return new_interval_terminus(
+        n_interval,
+        n_predicate,
+        rdf_namespace,
+        use_deterministic_uuids=use_deterministic_uuids,
+    )
+
+
+def new_interval_terminus(
+    n_interval: rdflib.term.IdentifiedNode,
+    n_predicate: rdflib.URIRef,
+    rdf_namespace: rdflib.Namespace,
+    *args: typing.Any,
+    use_deterministic_uuids: bool = False,
+    **kwargs: typing.Any,
+) -> typing.Tuple[rdflib.term.IdentifiedNode, TmpTriplesType]:
+    """
+    This function defines a new terminus node N for the requested interval, without reviewing any graph for an existing terminus.  Callers that have already determined a terminus is absent (e.g. from their own index of the graph) can use this to avoid graph lookups.  `infer_interval_terminus` uses this function to define its nodes.
+
+    :returns: Returns a node N, and the supplemental set of triples linking 'n_interval n_predicate N' and typing N.
+
+    >>> ns_kb = rdflib.Namespace("http://example.org/kb/")
+    >>> x = ns_kb["Action-1"]
+    >>> (n_start, triples) = new_interval_terminus(x, NS_PROV.qualifiedStart, ns_kb, use_deterministic_uuids=True)
+    >>> n_start
+    rdflib.term.URIRef('http://example.org/kb/Start-...')
+    >>> len(triples)
+    2
+    """
     slug = {
         NS_PROV.qualifiedEnd: "End-",
         NS_PROV.qualifiedStart: "Start-",
@@ -310,38 +348,30 @@ def infer_interval_terminus(
         NS_TIME.hasEnd: "Instant-",
     }[n_predicate]
 
-    # See if we should even check for an end.
-    if n_predicate in {NS_PROV.qualifiedEnd, NS_TIME.hasEnd}:
-        if not interval_end_should_exist(in_graph, n_interval):
-            return (None, set())
-
     ret_triples: TmpTriplesType = set()
-    n_terminus: typing.Optional[rdflib.IdentifiedNode] = None
-    for n_value in in_graph.objects(n_interval, n_predicate):
-        assert isinstance(n_value, rdflib.term.IdentifiedNode)
-        n_terminus = n_value
-        break
-    if n_terminus is None:
-        # Define instant node.
-        if isinstance(n_interval, rdflib.URIRef):
+    n_terminus: rdflib.term.IdentifiedNode
+    # Define instant node.
+    if isinstance(n_interval, rdflib.URIRef):
+        if use_deterministic_uuids:
+            import case_utils.inherent_uuid
+
             uuid_namespace = case_utils.inherent_uuid.inherence_uuid(n_interval)
-            if use_deterministic_uuids:
-                node_uuid = str(uuid.uuid5(uuid_namespace, str(n_predicate)))
-            else:
-                node_uuid = local_uuid()
-            n_terminus = rdf_namespace[slug + node_uuid]
+            node_uuid = str(uuid.uuid5(uuid_namespace, str(n_predicate)))
         else:
-            n_terminus = rdflib.BNode()
-        # Link instant node.
-        ret_triples.add((n_interval, n_predicate, n_terminus))
-        # Type instant node.
-        n_instant_type = {
-            NS_PROV.qualifiedEnd: NS_PROV.End,
-            NS_PROV.qualifiedStart: NS_PROV.Start,
-            NS_TIME.hasBeginning: NS_TIME.Instant,
-            NS_TIME.hasEnd: NS_TIME.Instant,
-        }[n_predicate]
-        ret_triples.add((n_terminus, NS_RDF.type, n_instant_type))
+            node_uuid = local_uuid()
+        n_terminus = rdf_namespace[slug + node_uuid]
+    else:
+        n_terminus = rdflib.BNode()
+    # Link instant node.
+    ret_triples.add((n_interval, n_predicate, n_terminus))
+    # Type instant node.
+    n_instant_type = {
+        NS_PROV.qualifiedEnd: NS_PROV.End,
+        NS_PROV.qualifiedStart: NS_PROV.Start,
+        NS_TIME.hasBeginning: NS_TIME.Instant,
+        NS_TIME.hasEnd: NS_TIME.Instant,
+    }[n_predicate]
+    ret_triples.add((n_terminus, NS_RDF.type, n_instant_type))
     return (n_terminus, ret_triples)
 
 
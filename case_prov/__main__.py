@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script dispatches the subcommands of the case_prov command.
+"""
+
+import argparse
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="case_prov")
+    parser.add_argument(
+        "command",
+        choices=(
+            "allen",
+            "batch",
+            "benchmark",
+            "diff",
+            "generate",
+            "normalize",
+            "pipeline",
+            "reachability",
+            "serve",
+            "snapshot",
+        ),
+        help="allen: Write the time:interval* relations entailed by graph files.  batch: Process the cases of a manifest with a pool of worker processes.  benchmark: Benchmark the case_prov tools on synthetic graphs, or compare benchmark results.  diff: Report the provenance changes from one graph to another.  generate: Generate a synthetic CASE graph.  normalize: Write graph files in a deterministic serialization.  pipeline: Run case_prov_rdf, case_prov_check, and case_prov_dot in one process.  reachability: Write reachability indexes of PROV derivation and communication chains.  serve: Serve lineage queries over a graph loaded once.  snapshot: Convert graph files into a graph snapshot.",
+    )
+    parser.add_argument(
+        "arguments",
+        nargs=argparse.REMAINDER,
+        help="Arguments of the subcommand.  Pass --help after the subcommand for its usage.",
+    )
+    args = parser.parse_args()
+
+    # Subcommand modules are imported only when run.
+    if args.command == "allen":
+        from . import allen
+
+        allen.main(args.arguments)
+    elif args.command == "batch":
+        from . import batch
+
+        batch.main(args.arguments)
+    elif args.command == "benchmark":
+        from . import benchmark
+
+        benchmark.main(args.arguments)
+    elif args.command == "diff":
+        from . import diff
+
+        diff.main(args.arguments)
+    elif args.command == "generate":
+        from . import synthetic
+
+        synthetic.main(args.arguments)
+    elif args.command == "normalize":
+        from . import serialization
+
+        serialization.main(args.arguments)
+    elif args.command == "pipeline":
+        from . import pipeline
+
+        pipeline.main(args.arguments)
+    elif args.command == "reachability":
+        from . import reachability
+
+        reachability.main(args.arguments)
+    elif args.command == "serve":
+        from . import lineage
+
+        lineage.main(args.arguments)
+    elif args.command == "snapshot":
+        from . import snapshot
+
+        snapshot.main(args.arguments)
+
+
+if __name__ == "__main__":
+    main()
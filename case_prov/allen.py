@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module reasons over the "Allen algebra" relations between time:ProperIntervals, as OWL-Time encodes them with the time:interval* properties.
+
+The possible relations from one interval to another are a 13-bit mask, one bit per relation of RELATION_PREDICATES.  Asserted relations, time:before and time:after between intervals, and boundary instants shared between intervals narrow the masks of a constraint network.  Path consistency then narrows each mask by the composition of the masks along every path of two steps, working through a queue of changed pairs, until no mask changes or one is emptied.  An emptied mask means the asserted relations are inconsistent.  Path consistency finds every inconsistency among masks of the ORD-Horn subclass, which includes the single relations and time:intervalIn, but can miss inconsistencies involving other masks, such as that of time:intervalDisjoint.
+
+Pairs without a constraint are not stored, as the composition of the unconstrained mask with any other is unconstrained.  The network is propagated one connected component at a time, so the work grows with the sizes of the components and the relations entailed within them, rather than with the number of intervals in the graph.
+
+This script writes the relations entailed by a graph, as the time:interval* triples for the pairs left with exactly one possible relation, and reports inconsistent components.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import collections
+import functools
+import logging
+import os
+import sys
+import typing
+
+import rdflib
+
+from . import serialization, snapshot
+from .digraph import EdgeSourcesType, TripleType
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+NS_RDF = rdflib.RDF
+NS_TIME = rdflib.TIME
+
+# The predicates of the thirteen relations, in mask bit order.  The
+# relation of bit i is the inverse of the relation of bit 12 - i.
+RELATION_PREDICATES: typing.List[rdflib.URIRef] = [
+    NS_TIME.intervalBefore,
+    NS_TIME.intervalMeets,
+    NS_TIME.intervalOverlaps,
+    NS_TIME.intervalStarts,
+    NS_TIME.intervalDuring,
+    NS_TIME.intervalFinishes,
+    NS_TIME.intervalEquals,
+    NS_TIME.intervalFinishedBy,
+    NS_TIME.intervalContains,
+    NS_TIME.intervalStartedBy,
+    NS_TIME.intervalOverlappedBy,
+    NS_TIME.intervalMetBy,
+    NS_TIME.intervalAfter,
+]
+
+ALL_RELATIONS = (1 << len(RELATION_PREDICATES)) - 1
+
+BEFORE = 1 << 0
+MEETS = 1 << 1
+OVERLAPS = 1 << 2
+STARTS = 1 << 3
+DURING = 1 << 4
+FINISHES = 1 << 5
+EQUALS = 1 << 6
+FINISHED_BY = 1 << 7
+CONTAINS = 1 << 8
+STARTED_BY = 1 << 9
+OVERLAPPED_BY = 1 << 10
+MET_BY = 1 << 11
+AFTER = 1 << 12
+
+# Predicate -> mask of the relations it states between two intervals.
+PREDICATE_MASKS: typing.Dict[rdflib.URIRef, int] = {
+    n_predicate: 1 << bit for (bit, n_predicate) in enumerate(RELATION_PREDICATES)
+}
+PREDICATE_MASKS[NS_TIME.intervalIn] = STARTS | DURING | FINISHES
+PREDICATE_MASKS[NS_TIME.intervalDisjoint] = BEFORE | AFTER
+PREDICATE_MASKS[NS_TIME.before] = BEFORE
+PREDICATE_MASKS[NS_TIME.after] = AFTER
+
+# Interval -> interval -> mask of the relations that can hold from the
+# first to the second.  Both directions of a constrained pair are
+# stored.  Unconstrained pairs are absent.
+NetworkType = typing.DefaultDict[
+    rdflib.term.IdentifiedNode, typing.Dict[rdflib.term.IdentifiedNode, int]
+]
+
+# (Pair left with no possible relation, triples constraining the pairs
+# of its component).
+InconsistencyType = typing.Tuple[
+    typing.Tuple[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode],
+    EdgeSourcesType,
+]
+
+
+def _get_endpoint_relation(
+    interval_1: typing.Tuple[int, int], interval_2: typing.Tuple[int, int]
+) -> int:
+    """
+    Get the mask of the relation between two intervals given as (beginning, end) integers.
+
+    >>> _get_endpoint_relation((0, 1), (1, 2)) == MEETS
+    True
+    >>> _get_endpoint_relation((1, 2), (0, 3)) == DURING
+    True
+    """
+    beginning_1, end_1 = interval_1
+    beginning_2, end_2 = interval_2
+    if end_1 < beginning_2:
+        return BEFORE
+    if end_1 == beginning_2:
+        return MEETS
+    if end_2 < beginning_1:
+        return AFTER
+    if end_2 == beginning_1:
+        return MET_BY
+    if beginning_1 == beginning_2:
+        if end_1 == end_2:
+            return EQUALS
+        return STARTS if end_1 < end_2 else STARTED_BY
+    if end_1 == end_2:
+        return FINISHES if beginning_1 > beginning_2 else FINISHED_BY
+    if beginning_1 > beginning_2:
+        return DURING if end_1 < end_2 else OVERLAPPED_BY
+    return CONTAINS if end_1 > end_2 else OVERLAPS
+
+
+def _make_composition_table() -> typing.List[typing.List[int]]:
+    """
+    Compute the composition of every pair of relations by enumerating the orderings of three intervals' endpoints.  Six endpoint values suffice for every ordering of six endpoints.
+    """
+    intervals = [(x, y) for x in range(6) for y in range(x + 1, 6)]
+    table = [[0] * len(RELATION_PREDICATES) for _ in RELATION_PREDICATES]
+    for interval_1 in intervals:
+        for interval_2 in intervals:
+            bit_12 = _get_endpoint_relation(interval_1, interval_2).bit_length() - 1
+            for interval_3 in intervals:
+                bit_23 = _get_endpoint_relation(interval_2, interval_3).bit_length() - 1
+                table[bit_12][bit_23] |= _get_endpoint_relation(interval_1, interval_3)
+    return table
+
+
+# Bit of relation r_12 -> bit of relation r_23 -> mask of the relations
+# r_13 possible when r_12 holds between intervals 1 and 2 and r_23
+# holds between intervals 2 and 3.
+COMPOSITION_TABLE = _make_composition_table()
+
+
+@functools.lru_cache(maxsize=None)
+def inverse(mask: int) -> int:
+    """
+    Get the mask of the relations from the second interval to the first.
+
+    >>> inverse(BEFORE | STARTS) == AFTER | STARTED_BY
+    True
+    >>> inverse(EQUALS) == EQUALS
+    True
+    """
+    inverse_mask = 0
+    for bit in range(len(RELATION_PREDICATES)):
+        if mask & (1 << bit):
+            inverse_mask |= 1 << (len(RELATION_PREDICATES) - 1 - bit)
+    return inverse_mask
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def compose(mask_12: int, mask_23: int) -> int:
+    """
+    Get the mask of the relations possible from interval 1 to interval 3, given the masks from interval 1 to 2 and from 2 to 3.  Results are cached, as networks use few distinct masks.
+
+    >>> compose(BEFORE, BEFORE) == BEFORE
+    True
+    >>> compose(MEETS, STARTS) == MEETS
+    True
+    >>> compose(DURING, DURING) == DURING
+    True
+    >>> compose(BEFORE, AFTER) == ALL_RELATIONS
+    True
+    """
+    mask_13 = 0
+    for bit_12 in range(len(RELATION_PREDICATES)):
+        if not mask_12 & (1 << bit_12):
+            continue
+        row = COMPOSITION_TABLE[bit_12]
+        for bit_23 in range(len(RELATION_PREDICATES)):
+            if mask_23 & (1 << bit_23):
+                mask_13 |= row[bit_23]
+        if mask_13 == ALL_RELATIONS:
+            break
+    return mask_13
+
+
+def get_interval_network(
+    graph: rdflib.Graph,
+) -> typing.Tuple[NetworkType, EdgeSourcesType]:
+    """
+    Build the constraint network of the intervals of a graph, from their time:interval* relations, time:before and time:after relations between intervals, and boundary instants shared between intervals.
+
+    :returns: The network, and the triples constraining each ordered pair.  A pair of an interval with itself is stored only if its constraints exclude equality, with an empty mask.
+    """
+    network: NetworkType = collections.defaultdict(dict)
+    sources: EdgeSourcesType = collections.defaultdict(set)
+
+    n_instants: typing.Set[rdflib.term.IdentifiedNode] = set()
+    for n_subject in graph.subjects(NS_RDF.type, NS_TIME.Instant):
+        assert isinstance(n_subject, rdflib.term.IdentifiedNode)
+        n_instants.add(n_subject)
+
+    def _constrain(
+        n_interval_1: rdflib.term.IdentifiedNode,
+        n_interval_2: rdflib.term.IdentifiedNode,
+        mask: int,
+        source_triples: typing.Set[TripleType],
+    ) -> None:
+        if n_interval_1 == n_interval_2:
+            if mask & EQUALS == 0:
+                network[n_interval_1][n_interval_1] = 0
+                sources[(n_interval_1, n_interval_1)] |= source_triples
+            return
+        mask &= network[n_interval_1].get(n_interval_2, ALL_RELATIONS)
+        network[n_interval_1][n_interval_2] = mask
+        network[n_interval_2][n_interval_1] = inverse(mask)
+        sources[(n_interval_1, n_interval_2)] |= source_triples
+
+    for n_predicate, mask in PREDICATE_MASKS.items():
+        for triple in graph.triples((None, n_predicate, None)):
+            if not isinstance(triple[0], rdflib.term.IdentifiedNode):
+                continue
+            if not isinstance(triple[2], rdflib.term.IdentifiedNode):
+                continue
+            # time:before and time:after also relate instants.
+            if triple[0] in n_instants or triple[2] in n_instants:
+                continue
+            _constrain(triple[0], triple[2], mask, {triple})
+
+    # Instant -> (interval, linking triple)s of the intervals with the
+    # instant as their beginning (0) or end (1).
+    n_boundary_intervals: typing.DefaultDict[
+        rdflib.term.IdentifiedNode,
+        typing.Tuple[
+            typing.List[typing.Tuple[rdflib.term.IdentifiedNode, TripleType]],
+            typing.List[typing.Tuple[rdflib.term.IdentifiedNode, TripleType]],
+        ],
+    ] = collections.defaultdict(lambda: ([], []))
+    for boundary_index, n_boundary_predicate in enumerate(
+        [NS_TIME.hasBeginning, NS_TIME.hasEnd]
+    ):
+        for triple in graph.triples((None, n_boundary_predicate, None)):
+            if not isinstance(triple[0], rdflib.term.IdentifiedNode):
+                continue
+            if not isinstance(triple[2], rdflib.term.IdentifiedNode):
+                continue
+            if triple[0] in n_instants:
+                continue
+            n_boundary_intervals[triple[2]][boundary_index].append((triple[0], triple))
+    for n_instant in sorted(n_boundary_intervals):
+        beginnings, ends = n_boundary_intervals[n_instant]
+        for n_interval_1, triple_1 in beginnings:
+            for n_interval_2, triple_2 in beginnings:
+                if n_interval_1 < n_interval_2:
+                    _constrain(
+                        n_interval_1,
+                        n_interval_2,
+                        STARTS | EQUALS | STARTED_BY,
+                        {triple_1, triple_2},
+                    )
+            for n_interval_2, triple_2 in ends:
+                _constrain(n_interval_2, n_interval_1, MEETS, {triple_1, triple_2})
+        for n_interval_1, triple_1 in ends:
+            for n_interval_2, triple_2 in ends:
+                if n_interval_1 < n_interval_2:
+                    _constrain(
+                        n_interval_1,
+                        n_interval_2,
+                        FINISHES | EQUALS | FINISHED_BY,
+                        {triple_1, triple_2},
+                    )
+
+    return network, sources
+
+
+def get_components(
+    network: NetworkType,
+) -> typing.List[typing.List[rdflib.term.IdentifiedNode]]:
+    """
+    Get the connected components of the constrained pairs of a network, each sorted, in sorted order.
+    """
+    n_visited: typing.Set[rdflib.term.IdentifiedNode] = set()
+    components: typing.List[typing.List[rdflib.term.IdentifiedNode]] = []
+    for n_root in sorted(network):
+        if n_root in n_visited:
+            continue
+        n_visited.add(n_root)
+        component = [n_root]
+        n_stack = [n_root]
+        while len(n_stack) > 0:
+            for n_neighbor in network[n_stack.pop()]:
+                if n_neighbor not in n_visited:
+                    n_visited.add(n_neighbor)
+                    component.append(n_neighbor)
+                    n_stack.append(n_neighbor)
+        components.append(sorted(component))
+    return components
+
+
+def propagate(
+    network: NetworkType,
+    n_component: typing.List[rdflib.term.IdentifiedNode],
+) -> typing.Optional[
+    typing.Tuple[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode]
+]:
+    """
+    Make a component of a network path consistent in place.  Each pair whose mask changes is queued, and each queued pair (i, j) narrows the masks of (i, k) and (k, j) for the intervals k constrained with j and i.
+
+    :returns: A pair left with no possible relation if the component is inconsistent, else None.
+
+    >>> a, b, c = (rdflib.URIRef("urn:example:%s" % x) for x in "abc")
+    >>> network: NetworkType = collections.defaultdict(dict)
+    >>> network[a][b], network[b][a] = MEETS, MET_BY
+    >>> network[b][c], network[c][b] = DURING, inverse(DURING)
+    >>> propagate(network, [a, b, c])
+    >>> network[a][c] == OVERLAPS | STARTS | DURING
+    True
+    >>> network[a][c] = network[c][a] = EQUALS
+    >>> propagate(network, [a, b, c])
+    (rdflib.term.URIRef('urn:example:a'), rdflib.term.URIRef('urn:example:c'))
+    """
+    # The propagation works on the component's positions in n_component,
+    # as comparing and hashing integers is much cheaper than for rdflib
+    # terms.
+    position = {n_interval: x for (x, n_interval) in enumerate(n_component)}
+    masks: typing.List[typing.Dict[int, int]] = [
+        {position[n_other]: mask for (n_other, mask) in network[n_interval].items()}
+        for n_interval in n_component
+    ]
+    queue: typing.Deque[typing.Tuple[int, int]] = collections.deque()
+    queued: typing.Set[typing.Tuple[int, int]] = set()
+    empty_pair: typing.Optional[typing.Tuple[int, int]] = None
+    for i, i_masks in enumerate(masks):
+        for j, mask in sorted(i_masks.items()):
+            if mask == 0:
+                return n_component[i], n_component[j]
+            if i < j:
+                queue.append((i, j))
+                queued.add((i, j))
+
+    def _narrow(x: int, y: int, mask: int) -> bool:
+        """
+        Narrow the mask of a pair, queueing it if it changed.  Returns False if the mask is emptied.
+        """
+        old_mask = masks[x].get(y, ALL_RELATIONS)
+        new_mask = old_mask & mask
+        if new_mask == old_mask:
+            return True
+        masks[x][y] = new_mask
+        masks[y][x] = inverse(new_mask)
+        if new_mask == 0:
+            return False
+        pair = (x, y) if x < y else (y, x)
+        if pair not in queued:
+            queue.append(pair)
+            queued.add(pair)
+        return True
+
+    while len(queue) > 0 and empty_pair is None:
+        i, j = queue.popleft()
+        queued.discard((i, j))
+        for k, mask_jk in list(masks[j].items()):
+            if k == i:
+                continue
+            if not _narrow(i, k, compose(masks[i][j], mask_jk)):
+                empty_pair = (i, k)
+                break
+        else:
+            for k in list(masks[i]):
+                if k == j:
+                    continue
+                if not _narrow(k, j, compose(masks[k][i], masks[i][j])):
+                    empty_pair = (k, j)
+                    break
+
+    for n_interval, i_masks in zip(n_component, masks):
+        network[n_interval] = {n_component[x]: mask for (x, mask) in i_masks.items()}
+    if empty_pair is None:
+        return None
+    return n_component[empty_pair[0]], n_component[empty_pair[1]]
+
+
+def entail_relations(
+    graph: rdflib.Graph,
+) -> typing.Tuple[rdflib.Graph, typing.List[InconsistencyType]]:
+    """
+    Compute the time:interval* relations entailed by a graph.  A relation is entailed for each pair of intervals left with exactly one possible relation, unless the graph already states it or its inverse.  The relation is stated in the direction of intervalBefore through intervalEquals.  Inconsistent components entail nothing.
+
+    :returns: The graph of entailed triples, and the inconsistent components.
+    """
+    out_graph = rdflib.Graph()
+    out_graph.bind("time", NS_TIME)
+    inconsistencies: typing.List[InconsistencyType] = []
+
+    network, sources = get_interval_network(graph)
+    components = get_components(network)
+    _logger.debug("len(network) = %d.", len(network))
+    _logger.debug("len(components) = %d.", len(components))
+
+    for n_component in components:
+        n_empty_pair = propagate(network, n_component)
+        if n_empty_pair is not None:
+            component_sources: EdgeSourcesType = collections.defaultdict(set)
+            for n_interval_1 in n_component:
+                for n_interval_2 in network[n_interval_1]:
+                    if (n_interval_1, n_interval_2) in sources:
+                        component_sources[(n_interval_1, n_interval_2)] = sources[
+                            (n_interval_1, n_interval_2)
+                        ]
+            inconsistencies.append((n_empty_pair, component_sources))
+            continue
+        for n_interval_i in n_component:
+            for n_interval_j, mask in network[n_interval_i].items():
+                if not n_interval_i < n_interval_j:
+                    continue
+                if mask & (mask - 1) != 0:
+                    continue
+                bit = mask.bit_length() - 1
+                if mask > EQUALS:
+                    n_subject, n_object = n_interval_j, n_interval_i
+                    bit = len(RELATION_PREDICATES) - 1 - bit
+                else:
+                    n_subject, n_object = n_interval_i, n_interval_j
+                n_predicate = RELATION_PREDICATES[bit]
+                n_inverse_predicate = RELATION_PREDICATES[-1 - bit]
+                if (n_subject, n_predicate, n_object) in graph:
+                    continue
+                if (n_object, n_inverse_predicate, n_subject) in graph:
+                    continue
+                out_graph.add((n_subject, n_predicate, n_object))
+
+    _logger.debug("len(out_graph) = %d.", len(out_graph))
+    return out_graph, inconsistencies
+
+
+def make_inconsistency_text(
+    inconsistency: InconsistencyType,
+    namespace_manager: rdflib.namespace.NamespaceManager,
+) -> str:
+    """
+    Describe an inconsistent component with the triples constraining its pairs.
+    """
+    (n_interval_1, n_interval_2), component_sources = inconsistency
+    inconsistency_text = "\tNo relation possible from %s to %s, given:\n" % (
+        n_interval_1.n3(namespace_manager),
+        n_interval_2.n3(namespace_manager),
+    )
+    source_triples: typing.Set[TripleType] = set()
+    for pair_source_triples in component_sources.values():
+        source_triples |= pair_source_triples
+    for triple in sorted(source_triples):
+        inconsistency_text += "\t\t%s .\n" % " ".join(
+            x.n3(namespace_manager) for x in triple
+        )
+    return inconsistency_text
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="case_prov allen",
+        description="Write the time:interval* relations entailed by graph files.  Exit status is 1 if the relations are inconsistent.",
+    )
+    parser.add_argument("-d", "--debug", action="store_true")
+    parser.add_argument(
+        "--output-format",
+        choices=serialization.OUTPUT_FORMATS,
+        default="turtle",
+        help="(Default: %(default)s.)",
+    )
+    parser.add_argument("out_file")
+    parser.add_argument("in_graph", nargs="+")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    graph = rdflib.Graph()
+    for in_graph_filename in args.in_graph:
+        snapshot.parse_graph_file(graph, in_graph_filename)
+
+    out_graph, inconsistencies = entail_relations(graph)
+    for prefix, namespace in graph.namespace_manager.namespaces():
+        out_graph.namespace_manager.bind(prefix, namespace, override=False)
+    serialization.write_graph_file(
+        out_graph,
+        args.out_file,
+        args.output_format,
+        serialization.DEFAULT_SORT_MEMORY_BUDGET,
+    )
+
+    for inconsistency in inconsistencies:
+        _logger.error(
+            "Inconsistent time: relations:\n%s",
+            make_inconsistency_text(inconsistency, graph.namespace_manager),
+        )
+    sys.exit(0 if len(inconsistencies) == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,786 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script processes many cases with a pool of worker processes, as example.mk does for one case with a Make recipe per step.
+
+The cases are listed in a JSON manifest.  Each case is processed by two kinds of jobs:
+
+* "prov" - case_prov_rdf on the case's input graph files, then case_prov_check on the PROV-O graph, if the case is checked.
+* "view" - case_prov_dot on the PROV-O graph, then `dot -T svg` if requested.  View jobs read a graph snapshot the case's prov job writes, and run in parallel with each other.
+
+Jobs run in worker processes that stay warm between jobs, so the case_prov modules, query texts and parsed shapes are loaded once per worker.  Jobs are started while the memory estimated for the running jobs stays within a memory budget, and the pool is sized by the number of cores and the budget.
+
+Each job's outputs are cached by a hash of the job's input file contents, options, the contents of files its options name, and the case_prov sources.  A job whose outputs are cached is not run again; its outputs are copied from the cache.
+
+A tab-separated report of each job's status and timing is written after the batch.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+import cdo_local_uuid
+import rdflib
+
+from . import (
+    case_prov_check,
+    case_prov_dot,
+    case_prov_rdf,
+    pipeline,
+    serialization,
+    snapshot,
+)
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+# Version of the cache entries written by run_batch.  Entries of other
+# versions are not read.
+BATCH_CACHE_VERSION = 1
+
+# Estimated memory of a worker process with the case_prov modules
+# loaded, in bytes.
+WORKER_BASE_MEMORY = 256 << 20
+
+# Estimated memory of a job per byte of the graph file it loads.
+GRAPH_MEMORY_FACTOR = 40
+
+# File extension of each case_prov_check --format.
+CHECK_FORMAT_EXTENSIONS: typing.Dict[str, str] = {
+    "human": ".txt",
+    "json-ld": ".jsonld",
+    "n3": ".n3",
+    "nt": ".nt",
+    "turtle": ".ttl",
+    "xml": ".xml",
+}
+
+# case_prov_check options that name input files.  Relative paths are
+# resolved from the manifest's directory, and the files' contents are
+# hashed into cache keys.
+CHECK_FILE_OPTIONS = ["--ontology-graph"]
+
+# case_prov_dot options that name input files, as CHECK_FILE_OPTIONS.
+VIEW_FILE_OPTIONS = ["--query-ancestry", "--query-descendants", "--reachability-index"]
+
+# Dictionary of one case, read from the manifest.  Keys:
+# * "name" - Name of the case, used as its output directory and the
+#   prefix of its output files.
+# * "inputs" - Input graph file paths.
+# * "rdf_arguments" - case_prov_rdf options.
+# * "rdf_format" - One of `serialization.OUTPUT_FORMATS`.
+# * "check_arguments" - case_prov_check options, or None to skip
+#   validation.
+# * "views" - List of dictionaries with keys "name", "arguments"
+#   (case_prov_dot options), and "svg" (bool).
+CaseType = typing.Dict[str, typing.Any]
+
+# Dictionary of one job.  Keys:
+# * "name" - Name of the job, the case name for a prov job and the case
+#   and view names for a view job.
+# * "kind" - "prov" or "view".
+# * "key" - Cache key.
+# * "outputs" - Dictionary of output file paths, keyed by the name of
+#   the file in the job's work directory.
+# * "depends" - Name of the job this job reads the PROV-O graph of, or
+#   None.
+# * "estimated_memory" - Estimated memory in bytes, or None if it is
+#   estimated from the prov job's graph snapshot.
+# Prov jobs also have keys "inputs", "rdf_arguments", "rdf_format" and
+# "check_arguments", and view jobs "arguments" and "svg", as in
+# CaseType.  Before it runs, a job is given "work_dir", and a view job
+# "prov_snapshot".
+JobType = typing.Dict[str, typing.Any]
+
+# Dictionary of the result of one job.  Keys:
+# * "name" - Job name.
+# * "kind" - Job kind.
+# * "status" - "ran", "cached", "failed", or "skipped" if the job's prov
+#   job failed.
+# * "conforms" - case_prov_check result of a prov job, or None.
+# * "worker" - Process ID of the worker that ran the job, or None.
+# * "estimated_memory" - Estimated memory in bytes.
+# * "queued_seconds" - Seconds from the job being ready to its start.
+# * "run_seconds" - Seconds the job ran.
+# * "error" - Error message of a failed job, or None.
+JobResultType = typing.Dict[str, typing.Any]
+
+# Name of the file of a job's result in its work directory and cache
+# entry.
+RESULT_FILENAME = "result.json"
+
+# Name of the graph snapshot in a prov job's work directory.
+PROV_SNAPSHOT_FILENAME = "prov.snap"
+
+
+def _get_string_list(value: typing.Any, description: str) -> typing.List[str]:
+    if not isinstance(value, list) or not all(isinstance(x, str) for x in value):
+        raise ValueError("%s must be a list of strings." % description)
+    return value
+
+
+def _resolve_file_arguments(
+    arguments: typing.List[str], file_options: typing.List[str], manifest_dir: str
+) -> typing.List[str]:
+    """
+    Resolve the relative paths given to file options from the manifest's directory.  Options may be given as "--option value" or "--option=value", or abbreviated as argparse allows.
+
+    >>> _resolve_file_arguments(
+    ...     ["--query-ancestry", "q.sparql", "--reach=index.bin", "--since", "x"],
+    ...     VIEW_FILE_OPTIONS,
+    ...     "/cases",
+    ... )
+    ['--query-ancestry', '/cases/q.sparql', '--reach=/cases/index.bin', '--since', 'x']
+    """
+
+    def _is_file_option(argument: str) -> bool:
+        return len(argument) > 2 and any(x.startswith(argument) for x in file_options)
+
+    resolved_arguments: typing.List[str] = []
+    resolve_next = False
+    for argument in arguments:
+        if resolve_next:
+            resolved_arguments.append(os.path.join(manifest_dir, argument))
+            resolve_next = False
+        elif argument.startswith("--") and "=" in argument:
+            option, value = argument.split("=", 1)
+            if _is_file_option(option):
+                argument = option + "=" + os.path.join(manifest_dir, value)
+            resolved_arguments.append(argument)
+        else:
+            resolve_next = argument.startswith("--") and _is_file_option(argument)
+            resolved_arguments.append(argument)
+    return resolved_arguments
+
+
+def read_manifest(path: str) -> typing.List[CaseType]:
+    """
+    Read the cases of a batch manifest.  The manifest is a JSON object with a "cases" list and optional "defaults", e.g.::
+
+        {
+          "defaults": {
+            "rdf_arguments": ["--use-deterministic-uuids"],
+            "check_arguments": ["--format", "turtle"],
+            "views": [
+              {"name": "prov-all", "arguments": ["--use-deterministic-uuids"], "svg": true}
+            ]
+          },
+          "cases": [
+            {"name": "asgard", "inputs": ["asgard/asgard.json"]}
+          ]
+        }
+
+    A case's "rdf_arguments", "rdf_format", "check_arguments" and "views" default to the "defaults" member's.  A null "check_arguments" skips validation.  Relative input paths, and relative paths given to the options in CHECK_FILE_OPTIONS and VIEW_FILE_OPTIONS, are resolved from the manifest's directory.
+    """
+    with open(path) as in_fh:
+        manifest = json.load(in_fh)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("cases"), list):
+        raise ValueError("Manifest %r must be a JSON object with a cases list." % path)
+    defaults = manifest.get("defaults", dict())
+    if not isinstance(defaults, dict):
+        raise ValueError("Manifest defaults must be a JSON object.")
+    manifest_dir = os.path.dirname(os.path.abspath(path))
+
+    cases: typing.List[CaseType] = []
+    case_names: typing.Set[str] = set()
+    for case_object in manifest["cases"]:
+        if not isinstance(case_object, dict):
+            raise ValueError("Manifest cases must be JSON objects.")
+        settings = dict(defaults, **case_object)
+        name = settings.get("name")
+        if not isinstance(name, str) or name in ("", ".", "..") or "/" in name:
+            raise ValueError("Case name %r is not a file name." % name)
+        if name in case_names:
+            raise ValueError("Case name %r is repeated." % name)
+        case_names.add(name)
+
+        inputs = _get_string_list(settings.get("inputs"), "Inputs of case %r" % name)
+        if len(inputs) == 0:
+            raise ValueError("Case %r has no inputs." % name)
+        check_arguments = settings.get("check_arguments", [])
+        if check_arguments is not None:
+            check_arguments = _resolve_file_arguments(
+                _get_string_list(check_arguments, "check_arguments of case %r" % name),
+                CHECK_FILE_OPTIONS,
+                manifest_dir,
+            )
+        rdf_format = settings.get("rdf_format", "turtle")
+        if rdf_format not in serialization.OUTPUT_FORMATS:
+            raise ValueError(
+                "rdf_format of case %r must be one of %r."
+                % (name, serialization.OUTPUT_FORMATS)
+            )
+
+        views: typing.List[typing.Dict[str, typing.Any]] = []
+        view_names: typing.Set[str] = set()
+        for view_object in settings.get("views", []):
+            if not isinstance(view_object, dict):
+                raise ValueError("Views of case %r must be JSON objects." % name)
+            view_name = view_object.get("name")
+            if not isinstance(view_name, str) or view_name == "" or "/" in view_name:
+                raise ValueError(
+                    "View name %r of case %r is not a file name." % (view_name, name)
+                )
+            if view_name in view_names:
+                raise ValueError(
+                    "View name %r of case %r is repeated." % (view_name, name)
+                )
+            view_names.add(view_name)
+            views.append(
+                {
+                    "name": view_name,
+                    "arguments": _resolve_file_arguments(
+                        _get_string_list(
+                            view_object.get("arguments", []),
+                            "Arguments of view %r of case %r" % (view_name, name),
+                        ),
+                        VIEW_FILE_OPTIONS,
+                        manifest_dir,
+                    ),
+                    "svg": bool(view_object.get("svg", False)),
+                }
+            )
+
+        cases.append(
+            {
+                "name": name,
+                "inputs": [os.path.join(manifest_dir, x) for x in inputs],
+                "rdf_arguments": _get_string_list(
+                    settings.get("rdf_arguments", []),
+                    "rdf_arguments of case %r" % name,
+                ),
+                "rdf_format": rdf_format,
+                "check_arguments": check_arguments,
+                "views": views,
+            }
+        )
+    return cases
+
+
+def get_code_digest() -> str:
+    """
+    Hash the sources of the case_prov package, including its queries and shapes, with the rdflib version.  Cached outputs of other sources are not reused.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(
+        ("%d\n%s\n" % (BATCH_CACHE_VERSION, rdflib.__version__)).encode("utf-8")
+    )
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    source_paths: typing.List[str] = []
+    for dirpath, dirnames, filenames in os.walk(package_dir):
+        dirnames[:] = sorted(x for x in dirnames if x != "__pycache__")
+        for filename in filenames:
+            if os.path.splitext(filename)[1] in (".py", ".sparql", ".ttl"):
+                source_paths.append(os.path.join(dirpath, filename))
+    for source_path in sorted(source_paths):
+        hasher.update(os.path.relpath(source_path, package_dir).encode("utf-8"))
+        with open(source_path, "rb") as in_fh:
+            hasher.update(hashlib.sha256(in_fh.read()).digest())
+    return hasher.hexdigest()
+
+
+def _get_key(*parts: typing.Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _get_file_digest(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as in_fh:
+        for chunk in iter(lambda: in_fh.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def make_jobs(
+    cases: typing.Sequence[CaseType], output_dir: str, code_digest: str
+) -> typing.List[JobType]:
+    """
+    Make the jobs of the cases, each prov job followed by its view jobs.  The step options are parsed here, so an option error stops the batch before any job runs.
+    """
+    jobs: typing.List[JobType] = []
+    for case in cases:
+        pipeline.parse_step_arguments(
+            case_prov_rdf.add_arguments, case["rdf_arguments"], "case_prov_rdf"
+        )
+        check_extension = None
+        check_file_digests: typing.List[str] = []
+        if case["check_arguments"] is not None:
+            check_args = pipeline.parse_step_arguments(
+                case_prov_check.add_arguments,
+                case["check_arguments"],
+                "case_prov_check",
+            )
+            if check_args.output is not sys.stdout:
+                raise ValueError(
+                    "case_prov_check --output is set by the batch, for case %r."
+                    % case["name"]
+                )
+            check_extension = CHECK_FORMAT_EXTENSIONS[check_args.format]
+            check_file_digests = [
+                _get_file_digest(x) for x in check_args.ontology_graph or []
+            ]
+
+        case_dir = os.path.join(output_dir, case["name"])
+        rdf_extension = ".nt" if case["rdf_format"] == "sorted-ntriples" else ".ttl"
+        outputs = {
+            "prov"
+            + rdf_extension: os.path.join(
+                case_dir, case["name"] + "-prov" + rdf_extension
+            )
+        }
+        if check_extension is not None:
+            outputs["check" + check_extension] = os.path.join(
+                case_dir, case["name"] + "-check" + check_extension
+            )
+        prov_key = _get_key(
+            code_digest,
+            "prov",
+            [_get_file_digest(x) for x in case["inputs"]],
+            case["rdf_arguments"],
+            case["rdf_format"],
+            case["check_arguments"],
+            check_file_digests,
+        )
+        jobs.append(
+            {
+                "name": case["name"],
+                "kind": "prov",
+                "key": prov_key,
+                "outputs": outputs,
+                "depends": None,
+                "estimated_memory": WORKER_BASE_MEMORY
+                + GRAPH_MEMORY_FACTOR * sum(os.path.getsize(x) for x in case["inputs"]),
+                "inputs": case["inputs"],
+                "rdf_arguments": case["rdf_arguments"],
+                "rdf_format": case["rdf_format"],
+                "check_arguments": case["check_arguments"],
+            }
+        )
+
+        for view in case["views"]:
+            dot_args = pipeline.parse_step_arguments(
+                case_prov_dot.add_arguments, view["arguments"], "case_prov_dot"
+            )
+            view_file_digests = [
+                _get_file_digest(x)
+                for x in [
+                    dot_args.query_ancestry,
+                    dot_args.query_descendants,
+                    dot_args.reachability_index,
+                ]
+                if x is not None
+            ]
+            view_prefix = os.path.join(case_dir, case["name"] + "-" + view["name"])
+            outputs = {"view.dot": view_prefix + ".dot"}
+            if view["svg"]:
+                outputs["view.svg"] = view_prefix + ".svg"
+            jobs.append(
+                {
+                    "name": case["name"] + "-" + view["name"],
+                    "kind": "view",
+                    "key": _get_key(
+                        code_digest,
+                        "view",
+                        prov_key,
+                        view["arguments"],
+                        view_file_digests,
+                        view["svg"],
+                    ),
+                    "outputs": outputs,
+                    "depends": case["name"],
+                    "estimated_memory": None,
+                    "arguments": view["arguments"],
+                    "svg": view["svg"],
+                }
+            )
+    return jobs
+
+
+def get_available_memory() -> typing.Optional[int]:
+    """
+    Get the memory available to start new processes, in bytes, or None if the platform does not report it.
+    """
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def get_worker_count(
+    cores: int, memory_budget: typing.Optional[int], n_jobs: int
+) -> int:
+    """
+    Size the worker pool by the number of cores and the number of warm workers the memory budget holds.
+
+    >>> get_worker_count(8, None, 20)
+    8
+    >>> get_worker_count(8, 3 * WORKER_BASE_MEMORY, 20)
+    3
+    >>> get_worker_count(8, 1, 20)
+    1
+    >>> get_worker_count(8, None, 2)
+    2
+    """
+    worker_count = min(cores, n_jobs)
+    if memory_budget is not None:
+        worker_count = min(worker_count, memory_budget // WORKER_BASE_MEMORY)
+    return max(1, worker_count)
+
+
+def _initialize_worker(debug: bool) -> None:
+    logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
+    cdo_local_uuid.configure()
+
+
+def run_job(job: JobType) -> JobResultType:
+    """
+    Run a job in a worker process, writing its outputs and result into its work directory.
+    """
+    start_time = time.time()
+    start_counter = time.perf_counter()
+    conforms: typing.Optional[bool] = None
+    work_dir = job["work_dir"]
+    if job["kind"] == "prov":
+        rdf_args = pipeline.parse_step_arguments(
+            case_prov_rdf.add_arguments, job["rdf_arguments"], "case_prov_rdf"
+        )
+        in_graph = rdflib.Graph()
+        for in_graph_filename in job["inputs"]:
+            snapshot.parse_graph_file(in_graph, in_graph_filename)
+        prov_graph = case_prov_rdf.augment_graph(in_graph, rdf_args)
+        with open(os.path.join(work_dir, PROV_SNAPSHOT_FILENAME), "wb") as out_fh:
+            snapshot.write_snapshot(prov_graph, out_fh)
+        for output_name in job["outputs"]:
+            output_path = os.path.join(work_dir, output_name)
+            if output_name.startswith("prov"):
+                serialization.write_graph_file(
+                    prov_graph, output_path, job["rdf_format"]
+                )
+                continue
+            check_args = pipeline.parse_step_arguments(
+                case_prov_check.add_arguments,
+                job["check_arguments"],
+                "case_prov_check",
+            )
+            with open(output_path, "w") as out_fh:
+                check_args.output = out_fh
+                validate_result = case_prov_check.check_graph(
+                    check_args, data_graph=prov_graph
+                )
+                case_prov_check.write_report(check_args, validate_result)
+            conforms = validate_result[0]
+    else:
+        dot_args = pipeline.parse_step_arguments(
+            case_prov_dot.add_arguments, job["arguments"], "case_prov_dot"
+        )
+        prov_graph = rdflib.Graph()
+        snapshot.parse_graph_file(prov_graph, job["prov_snapshot"])
+        dot_graph = case_prov_dot.render_dot(prov_graph, dot_args)
+        dot_path = os.path.join(work_dir, "view.dot")
+        case_prov_dot.write_dot(dot_graph, dot_path)
+        if job["svg"]:
+            subprocess.run(
+                [
+                    "dot",
+                    "-T",
+                    "svg",
+                    "-o",
+                    os.path.join(work_dir, "view.svg"),
+                    dot_path,
+                ],
+                check=True,
+            )
+
+    with open(os.path.join(work_dir, RESULT_FILENAME), "w") as out_fh:
+        json.dump({"conforms": conforms}, out_fh)
+    return {
+        "conforms": conforms,
+        "worker": os.getpid(),
+        "start_time": start_time,
+        "run_seconds": time.perf_counter() - start_counter,
+    }
+
+
+def _make_result(job: JobType, status: str) -> JobResultType:
+    return {
+        "name": job["name"],
+        "kind": job["kind"],
+        "status": status,
+        "conforms": None,
+        "worker": None,
+        "estimated_memory": job["estimated_memory"],
+        "queued_seconds": 0.0,
+        "run_seconds": 0.0,
+        "error": None,
+    }
+
+
+def _restore_outputs(job: JobType, entry_dir: str) -> None:
+    for output_name, output_path in job["outputs"].items():
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        shutil.copyfile(os.path.join(entry_dir, output_name), output_path)
+
+
+def run_batch(
+    cases: typing.Sequence[CaseType],
+    output_dir: str,
+    *,
+    cores: typing.Optional[int] = None,
+    memory_budget: typing.Optional[int] = None,
+    cache_dir: typing.Optional[str] = None,
+    debug: bool = False,
+) -> typing.List[JobResultType]:
+    """
+    Run the jobs of the cases, returning their results in job order.
+
+    :param cores: Most workers to run.  Default is the number of cores.
+    :param memory_budget: Memory in bytes the running jobs' estimates may total.  A job estimated beyond the budget runs alone.  None does not limit the jobs by memory.
+    :param cache_dir: Directory of cached job outputs.  None runs every job without caching.
+    """
+    jobs = make_jobs(cases, output_dir, get_code_digest())
+    results: typing.Dict[str, JobResultType] = dict()
+    # Directory holding each finished job's outputs and result.
+    entry_dirs: typing.Dict[str, str] = dict()
+
+    worker_count = get_worker_count(
+        cores or os.cpu_count() or 1, memory_budget, len(jobs)
+    )
+    _logger.debug("Running %d jobs with %d workers.", len(jobs), worker_count)
+
+    with tempfile.TemporaryDirectory(prefix="case_prov_batch_") as temporary_dir:
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        def _finish_job(job: JobType, result: JobResultType) -> None:
+            results[job["name"]] = result
+            if result["status"] not in ("ran", "cached"):
+                return
+            if result["status"] == "ran" and cache_dir is not None:
+                entry_dir = os.path.join(cache_dir, job["key"])
+                try:
+                    os.rename(job["work_dir"], entry_dir)
+                except OSError:
+                    # Another batch cached the same job first.
+                    shutil.rmtree(job["work_dir"])
+                entry_dirs[job["name"]] = entry_dir
+            elif result["status"] == "ran":
+                entry_dirs[job["name"]] = job["work_dir"]
+            _restore_outputs(job, entry_dirs[job["name"]])
+
+        pending = list(jobs)
+        ready_times: typing.Dict[str, float] = dict()
+        running: typing.Dict["concurrent.futures.Future[JobResultType]", JobType] = (
+            dict()
+        )
+        running_memory = 0
+        with concurrent.futures.ProcessPoolExecutor(
+            worker_count, initializer=_initialize_worker, initargs=(debug,)
+        ) as executor:
+            while len(pending) > 0 or len(running) > 0:
+                for job in list(pending):
+                    depends = job["depends"]
+                    if depends is not None and depends not in results:
+                        continue
+                    if depends is not None and depends not in entry_dirs:
+                        pending.remove(job)
+                        _finish_job(job, _make_result(job, "skipped"))
+                        continue
+                    if cache_dir is not None:
+                        entry_dir = os.path.join(cache_dir, job["key"])
+                        result_path = os.path.join(entry_dir, RESULT_FILENAME)
+                        if os.path.exists(result_path):
+                            with open(result_path) as in_fh:
+                                conforms = json.load(in_fh)["conforms"]
+                            pending.remove(job)
+                            entry_dirs[job["name"]] = entry_dir
+                            result = _make_result(job, "cached")
+                            result["conforms"] = conforms
+                            _finish_job(job, result)
+                            continue
+                    if depends is not None:
+                        job["prov_snapshot"] = os.path.join(
+                            entry_dirs[depends], PROV_SNAPSHOT_FILENAME
+                        )
+                        job["estimated_memory"] = (
+                            WORKER_BASE_MEMORY
+                            + GRAPH_MEMORY_FACTOR
+                            * os.path.getsize(job["prov_snapshot"])
+                        )
+                    ready_times.setdefault(job["name"], time.time())
+                    if len(running) > 0 and (
+                        len(running) >= worker_count
+                        or (
+                            memory_budget is not None
+                            and running_memory + job["estimated_memory"] > memory_budget
+                        )
+                    ):
+                        continue
+                    pending.remove(job)
+                    job["work_dir"] = tempfile.mkdtemp(
+                        prefix=".tmp-",
+                        dir=temporary_dir if cache_dir is None else cache_dir,
+                    )
+                    running[executor.submit(run_job, job)] = job
+                    running_memory += job["estimated_memory"]
+
+                if len(running) == 0:
+                    continue
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    job = running.pop(future)
+                    running_memory -= job["estimated_memory"]
+                    result = _make_result(job, "ran")
+                    try:
+                        job_result = future.result()
+                    except Exception as e:
+                        _logger.error("Job %r failed: %s", job["name"], e)
+                        shutil.rmtree(job["work_dir"], ignore_errors=True)
+                        result["status"] = "failed"
+                        result["error"] = str(e)
+                    else:
+                        result["conforms"] = job_result["conforms"]
+                        result["worker"] = job_result["worker"]
+                        result["queued_seconds"] = max(
+                            0.0, job_result["start_time"] - ready_times[job["name"]]
+                        )
+                        result["run_seconds"] = job_result["run_seconds"]
+                    _finish_job(job, result)
+
+    return [results[job["name"]] for job in jobs]
+
+
+def write_timing_report(
+    results: typing.Sequence[JobResultType], out_fh: typing.TextIO
+) -> None:
+    """
+    Write a tab-separated line of each job's status and timing, and the totals.
+    """
+    out_fh.write(
+        "Job\tKind\tStatus\tConforms\tWorker\tEstimated MiB\tQueued seconds\tRun seconds\n"
+    )
+    for result in results:
+        out_fh.write(
+            "%s\t%s\t%s\t%s\t%s\t%d\t%.6f\t%.6f\n"
+            % (
+                result["name"],
+                result["kind"],
+                result["status"],
+                "" if result["conforms"] is None else str(result["conforms"]).lower(),
+                "" if result["worker"] is None else result["worker"],
+                (result["estimated_memory"] or 0) >> 20,
+                result["queued_seconds"],
+                result["run_seconds"],
+            )
+        )
+    out_fh.write(
+        "Total\t\t\t\t\t\t%.6f\t%.6f\n"
+        % (
+            sum(x["queued_seconds"] for x in results),
+            sum(x["run_seconds"] for x in results),
+        )
+    )
+    out_fh.flush()
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="case_prov batch",
+        description="Process the cases of a manifest with a pool of worker processes, caching outputs by the contents of their inputs.",
+    )
+    parser.add_argument("-d", "--debug", action="store_true")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Most worker processes to run.  Default is the number of cores.",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        metavar="MIB",
+        help="Memory, in MiB, that the estimates of the running jobs may total.  Default is the memory available when the batch starts.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for caching job outputs, keyed by the contents of their inputs.  Default is case_prov/batch under $XDG_CACHE_HOME (or ~/.cache).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Run every job without reading or writing the cache.",
+    )
+    parser.add_argument(
+        "--report",
+        help="Write the report of each job's status and timing to this file.  If absent, the report is written to stderr.",
+    )
+    parser.add_argument("manifest")
+    parser.add_argument("output_dir")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    cdo_local_uuid.configure()
+
+    memory_budget = (
+        get_available_memory()
+        if args.memory_budget is None
+        else args.memory_budget << 20
+    )
+    cache_dir: typing.Optional[str] = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir or os.path.join(
+            case_prov_check.get_default_cache_dir(), "batch"
+        )
+
+    results = run_batch(
+        read_manifest(args.manifest),
+        args.output_dir,
+        cores=args.jobs,
+        memory_budget=memory_budget,
+        cache_dir=cache_dir,
+        debug=args.debug,
+    )
+
+    if args.report is None:
+        write_timing_report(results, sys.stderr)
+    else:
+        with open(args.report, "w") as out_fh:
+            write_timing_report(results, out_fh)
+
+    sys.exit(
+        0
+        if all(
+            x["status"] in ("ran", "cached") and x["conforms"] is not False
+            for x in results
+        )
+        else 1
+    )
+
+
+if __name__ == "__main__":
+    main()
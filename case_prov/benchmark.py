@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script benchmarks the case_prov tools on synthetic graphs of a ladder of sizes, and compares benchmark results against a baseline.
+
+For each size, a graph is generated with case_prov.synthetic, and these stages are run on it, each in its own process:
+
+* "generate" - Writing the synthetic graph.
+* "case_prov_rdf" - The case_prov_rdf script, on the synthetic graph.
+* "library" - The functions of the case_prov package, called for each applicable node of the PROV-O graph.  Only the function calls are timed, not the parsing of the graph.
+* "case_prov_check" - The case_prov_check script, on the PROV-O graph.
+* "case_prov_dot" - The case_prov_dot script, on the PROV-O graph.
+
+Each stage's wall time, peak resident set size, and throughput in input triples per second are written as JSON.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+import rdflib
+
+import case_prov
+
+from . import synthetic
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+# Version of the JSON written by run_benchmarks.  compare_results
+# refuses results of other versions.
+BENCHMARK_FORMAT_VERSION = 1
+
+# Numbers of InvestigativeActions in the synthetic graphs.
+DEFAULT_SIZES: typing.Tuple[int, ...] = (10, 100, 1000)
+
+STAGES: typing.Tuple[str, ...] = (
+    "generate",
+    "case_prov_rdf",
+    "library",
+    "case_prov_check",
+    "case_prov_dot",
+)
+
+# case_prov_check exits 1 for a nonconformant graph, which is a result,
+# not a failure.
+ALLOWED_RETURN_CODES: typing.Dict[str, typing.Set[int]] = {
+    "case_prov_check": {0, 1},
+}
+
+# (Wall seconds, peak resident set size in bytes) of a stage process.
+StageMeasurementType = typing.Tuple[float, int]
+
+# Dictionary written as JSON by run_benchmarks.  Keys:
+# * "version" - BENCHMARK_FORMAT_VERSION.
+# * "environment" - Python, platform, and case_prov versions.
+# * "parameters" - Generator and stage options.
+# * "results" - List of dictionaries with keys "actions", "stage",
+#   "input_triples", "wall_seconds", "peak_rss_bytes", and
+#   "triples_per_second".
+BenchmarkResultsType = typing.Dict[str, typing.Any]
+
+# (Label, metric, baseline value, current value, is regression.)
+ComparisonType = typing.Tuple[str, str, float, float, bool]
+
+
+def run_stage(command: typing.Sequence[str], label: str) -> StageMeasurementType:
+    """
+    Run a command, returning its wall time and peak resident set size.  The command's own resource usage is read with os.wait4, so earlier stages do not count toward its peak.
+    """
+    _logger.debug("Running %s: %s", label, shlex.join(command))
+    with tempfile.TemporaryFile() as stderr_fh:
+        start_time = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=stderr_fh)
+        _, status, rusage = os.wait4(process.pid, 0)
+        wall_seconds = time.perf_counter() - start_time
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode not in ALLOWED_RETURN_CODES.get(label, {0}):
+            stderr_fh.seek(0)
+            raise subprocess.CalledProcessError(
+                process.returncode, command, stderr=stderr_fh.read()
+            )
+    # ru_maxrss is in kilobytes on Linux, and bytes on macOS.
+    peak_rss_bytes = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return wall_seconds, peak_rss_bytes
+
+
+def generate_stage(out_file: str, tally_file: str, kwargs_json: str) -> None:
+    """
+    Write a synthetic graph, recording its number of triples in tally_file as JSON.  This is run in its own process by run_benchmarks.
+    """
+    with open(out_file, "w") as out_fh:
+        triple_tally = synthetic.write_graph(
+            out_fh, "turtle", **json.loads(kwargs_json)
+        )
+    with open(tally_file, "w") as tally_fh:
+        json.dump({"input_triples": triple_tally}, tally_fh)
+
+
+def library_stage(prov_file: str, tally_file: str) -> None:
+    """
+    Call the case_prov package's functions for each applicable node of a PROV-O graph, recording the graph's number of triples and the time spent in the calls in tally_file as JSON.  This is run in its own process by run_benchmarks.
+    """
+    graph = rdflib.Graph()
+    graph.parse(prov_file)
+    ns_kb = rdflib.Namespace("http://example.org/kb/")
+
+    n_activities = sorted(
+        x
+        for x in graph.subjects(rdflib.RDF.type, rdflib.PROV.Activity)
+        if isinstance(x, rdflib.URIRef)
+    )
+    usages = sorted(
+        (x, y)
+        for (x, y) in graph.subject_objects(rdflib.PROV.used)
+        if isinstance(x, rdflib.URIRef) and isinstance(y, rdflib.URIRef)
+    )
+    l_datetimes = [
+        x
+        for x in graph.objects(None, rdflib.PROV.startedAtTime)
+        if isinstance(x, rdflib.Literal)
+    ]
+
+    start_time = time.perf_counter()
+    for n_activity in n_activities:
+        case_prov.interval_end_should_exist(graph, n_activity)
+        case_prov.infer_interval_terminus(
+            graph,
+            n_activity,
+            rdflib.PROV.qualifiedStart,
+            ns_kb,
+            use_deterministic_uuids=True,
+        )
+    for n_activity, n_entity in usages:
+        case_prov.infer_prov_instantaneous_influence_event(
+            graph,
+            n_activity,
+            rdflib.PROV.qualifiedUsage,
+            n_entity,
+            ns_kb,
+            use_deterministic_uuids=True,
+        )
+    for l_datetime in l_datetimes:
+        case_prov.xsd_datetime_to_xsd_datetimestamp(l_datetime)
+    seconds = time.perf_counter() - start_time
+
+    with open(tally_file, "w") as tally_fh:
+        json.dump({"input_triples": len(graph), "seconds": seconds}, tally_fh)
+
+
+def _python_stage_command(function_name: str, *args: str) -> typing.List[str]:
+    return [
+        sys.executable,
+        "-c",
+        "import sys; import case_prov.benchmark; case_prov.benchmark.%s(*sys.argv[1:])"
+        % function_name,
+    ] + list(args)
+
+
+def run_benchmarks(
+    work_dir: str,
+    *,
+    sizes: typing.Sequence[int] = DEFAULT_SIZES,
+    repeat: int = 1,
+    generator_kwargs: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    rdf_arguments: typing.Sequence[str] = (
+        "--allow-empty-results",
+        "--use-deterministic-uuids",
+    ),
+    check_arguments: typing.Sequence[str] = ("--no-cache",),
+    dot_arguments: typing.Sequence[str] = ("--use-deterministic-uuids",),
+) -> BenchmarkResultsType:
+    """
+    Run every stage at every size, returning the results in the form written as JSON.  Intermediate graphs are written to work_dir.  With repeat > 1, each stage's fastest time and largest peak are kept.
+
+    :param generator_kwargs: Arguments of `case_prov.synthetic.iter_nodes` other than actions.
+    """
+    _generator_kwargs = dict(generator_kwargs or dict())
+    results: typing.List[typing.Dict[str, typing.Any]] = []
+    for size in sizes:
+        synthetic_file = os.path.join(work_dir, "synthetic-%d.ttl" % size)
+        prov_file = os.path.join(work_dir, "synthetic-%d-prov.ttl" % size)
+        dot_file = os.path.join(work_dir, "synthetic-%d.dot" % size)
+        tally_file = os.path.join(work_dir, "tally.json")
+        kwargs_json = json.dumps(dict(_generator_kwargs, actions=size))
+
+        stage_commands: typing.Dict[str, typing.List[str]] = {
+            "generate": _python_stage_command(
+                "generate_stage", synthetic_file, tally_file, kwargs_json
+            ),
+            "case_prov_rdf": [sys.executable, "-m", "case_prov.case_prov_rdf"]
+            + list(rdf_arguments)
+            + [prov_file, synthetic_file],
+            "library": _python_stage_command("library_stage", prov_file, tally_file),
+            "case_prov_check": [sys.executable, "-m", "case_prov.case_prov_check"]
+            + list(check_arguments)
+            + [prov_file],
+            "case_prov_dot": [sys.executable, "-m", "case_prov.case_prov_dot"]
+            + list(dot_arguments)
+            + [dot_file, prov_file],
+        }
+
+        synthetic_triples = 0
+        prov_triples = 0
+        for stage in STAGES:
+            wall_seconds: typing.Optional[float] = None
+            peak_rss_bytes = 0
+            for _ in range(repeat):
+                measurement = run_stage(stage_commands[stage], stage)
+                if stage == "library":
+                    with open(tally_file, "r") as tally_fh:
+                        measurement = (json.load(tally_fh)["seconds"], measurement[1])
+                if wall_seconds is None or measurement[0] < wall_seconds:
+                    wall_seconds = measurement[0]
+                peak_rss_bytes = max(peak_rss_bytes, measurement[1])
+            assert wall_seconds is not None
+
+            if stage == "generate":
+                with open(tally_file, "r") as tally_fh:
+                    synthetic_triples = json.load(tally_fh)["input_triples"]
+            elif stage == "library":
+                with open(tally_file, "r") as tally_fh:
+                    prov_triples = json.load(tally_fh)["input_triples"]
+            input_triples = (
+                synthetic_triples
+                if stage in ("generate", "case_prov_rdf")
+                else prov_triples
+            )
+
+            result = {
+                "actions": size,
+                "stage": stage,
+                "input_triples": input_triples,
+                "wall_seconds": wall_seconds,
+                "peak_rss_bytes": peak_rss_bytes,
+                "triples_per_second": (
+                    input_triples / wall_seconds if wall_seconds > 0 else None
+                ),
+            }
+            _logger.info(
+                "actions=%d stage=%s wall_seconds=%.3f peak_rss_bytes=%d",
+                size,
+                stage,
+                wall_seconds,
+                peak_rss_bytes,
+            )
+            results.append(result)
+
+    return {
+        "version": BENCHMARK_FORMAT_VERSION,
+        "environment": {
+            "case_prov": case_prov.__version__,
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+        },
+        "parameters": {
+            "check_arguments": list(check_arguments),
+            "dot_arguments": list(dot_arguments),
+            "generator_kwargs": _generator_kwargs,
+            "rdf_arguments": list(rdf_arguments),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: BenchmarkResultsType,
+    current: BenchmarkResultsType,
+    *,
+    time_tolerance: float = 0.25,
+    memory_tolerance: float = 0.25,
+    min_seconds: float = 0.1,
+) -> typing.List[ComparisonType]:
+    """
+    Compare the wall time and peak memory of each (size, stage) measured in both results.  A measurement regresses if it exceeds the baseline by more than the tolerance, a fraction of the baseline.  Time differences under min_seconds are not regressions, as they are within the noise of process startup.
+
+    >>> baseline = {"version": 1, "results": [{"actions": 10, "stage": "case_prov_rdf", "wall_seconds": 1.0, "peak_rss_bytes": 100}]}
+    >>> current = {"version": 1, "results": [{"actions": 10, "stage": "case_prov_rdf", "wall_seconds": 2.0, "peak_rss_bytes": 110}]}
+    >>> for comparison in compare_results(baseline, current):
+    ...     print(comparison)
+    ('actions=10 case_prov_rdf', 'wall_seconds', 1.0, 2.0, True)
+    ('actions=10 case_prov_rdf', 'peak_rss_bytes', 100, 110, False)
+    """
+    for results in (baseline, current):
+        if results.get("version") != BENCHMARK_FORMAT_VERSION:
+            raise ValueError(
+                "Unsupported benchmark results version: %r." % results.get("version")
+            )
+
+    baseline_records = {(x["actions"], x["stage"]): x for x in baseline["results"]}
+    comparisons: typing.List[ComparisonType] = []
+    for record in current["results"]:
+        baseline_record = baseline_records.get((record["actions"], record["stage"]))
+        if baseline_record is None:
+            continue
+        label = "actions=%d %s" % (record["actions"], record["stage"])
+        comparisons.append(
+            (
+                label,
+                "wall_seconds",
+                baseline_record["wall_seconds"],
+                record["wall_seconds"],
+                record["wall_seconds"]
+                > baseline_record["wall_seconds"] * (1 + time_tolerance)
+                and record["wall_seconds"] - baseline_record["wall_seconds"]
+                >= min_seconds,
+            )
+        )
+        comparisons.append(
+            (
+                label,
+                "peak_rss_bytes",
+                baseline_record["peak_rss_bytes"],
+                record["peak_rss_bytes"],
+                record["peak_rss_bytes"]
+                > baseline_record["peak_rss_bytes"] * (1 + memory_tolerance),
+            )
+        )
+    return comparisons
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="case_prov benchmark",
+        description="Benchmark the case_prov tools on synthetic graphs, or compare benchmark results.",
+    )
+    parser.add_argument("-d", "--debug", action="store_true")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser(
+        "run", help="Run the benchmarks, writing results as JSON."
+    )
+    run_parser.add_argument(
+        "--sizes",
+        default=",".join(str(x) for x in DEFAULT_SIZES),
+        help="Comma-separated numbers of InvestigativeActions in the synthetic graphs.  Default is %(default)s.",
+    )
+    run_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Number of runs of each stage.  The fastest time and largest peak memory are kept.  Default is 1.",
+    )
+    run_parser.add_argument(
+        "--work-dir",
+        help="Directory for the intermediate graphs.  If absent, a temporary directory is used and removed.",
+    )
+    run_parser.add_argument(
+        "--generator-arguments",
+        default="",
+        help='case_prov generate options other than --actions, as one shell-quoted string.  Use the --generator-arguments=... form, e.g. --generator-arguments="--fan-in 2 --seed 1".',
+    )
+    run_parser.add_argument(
+        "--rdf-arguments",
+        default="--allow-empty-results --use-deterministic-uuids",
+        help="case_prov_rdf options, as one shell-quoted string.  Use the --rdf-arguments=... form if the string starts with a hyphen.  Default is %(default)r.",
+    )
+    run_parser.add_argument(
+        "--check-arguments",
+        default="--no-cache",
+        help="case_prov_check options, as one shell-quoted string.  Use the --check-arguments=... form if the string starts with a hyphen.  Default is %(default)r.",
+    )
+    run_parser.add_argument(
+        "--dot-arguments",
+        default="--use-deterministic-uuids",
+        help="case_prov_dot options, as one shell-quoted string.  Use the --dot-arguments=... form if the string starts with a hyphen.  Default is %(default)r.",
+    )
+    run_parser.add_argument("out_json")
+
+    compare_parser = subparsers.add_parser(
+        "compare",
+        help="Compare results against a baseline.  Exits 1 if any measurement regressed.",
+    )
+    compare_parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.25,
+        help="Fraction of the baseline wall time a measurement may exceed it by.  Default is %(default)s.",
+    )
+    compare_parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.25,
+        help="Fraction of the baseline peak memory a measurement may exceed it by.  Default is %(default)s.",
+    )
+    compare_parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.1,
+        help="Wall time differences under this many seconds are not regressions.  Default is %(default)s.",
+    )
+    compare_parser.add_argument("baseline_json")
+    compare_parser.add_argument("current_json")
+
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    if args.command == "run":
+        # Generator options are parsed with the generator's own parser.
+        generator_parser = argparse.ArgumentParser(prog="case_prov generate")
+        synthetic.add_arguments(generator_parser)
+        generator_kwargs = synthetic.get_generator_kwargs(
+            generator_parser.parse_args(shlex.split(args.generator_arguments))
+        )
+        # The sizes give the number of actions.
+        del generator_kwargs["actions"]
+
+        run_kwargs: typing.Dict[str, typing.Any] = {
+            "sizes": [int(x) for x in args.sizes.split(",")],
+            "repeat": args.repeat,
+            "generator_kwargs": generator_kwargs,
+            "rdf_arguments": shlex.split(args.rdf_arguments),
+            "check_arguments": shlex.split(args.check_arguments),
+            "dot_arguments": shlex.split(args.dot_arguments),
+        }
+        if args.work_dir is None:
+            with tempfile.TemporaryDirectory() as work_dir:
+                results = run_benchmarks(work_dir, **run_kwargs)
+        else:
+            os.makedirs(args.work_dir, exist_ok=True)
+            results = run_benchmarks(args.work_dir, **run_kwargs)
+        with open(args.out_json, "w") as out_fh:
+            json.dump(results, out_fh, indent=4, sort_keys=True)
+            out_fh.write("\n")
+    else:
+        with open(args.baseline_json, "r") as in_fh:
+            baseline = json.load(in_fh)
+        with open(args.current_json, "r") as in_fh:
+            current = json.load(in_fh)
+        comparisons = compare_results(
+            baseline,
+            current,
+            time_tolerance=args.time_tolerance,
+            memory_tolerance=args.memory_tolerance,
+            min_seconds=args.min_seconds,
+        )
+        regression_tally = 0
+        for label, metric, baseline_value, current_value, regressed in comparisons:
+            if regressed:
+                regression_tally += 1
+            print(
+                "%s\t%s\t%s\t%s\t%s"
+                % (
+                    "REGRESSION" if regressed else "ok",
+                    label,
+                    metric,
+                    baseline_value,
+                    current_value,
+                )
+            )
+        print("Regressions: %d" % regression_tally)
+        sys.exit(1 if regression_tally > 0 else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -31,35 +31,1666 @@ The pySHACL command line interface is further adapted since its adaptations in `
 __version__ = "0.2.0"
 
 import argparse
+import collections
+import hashlib
 import importlib.resources
 import logging
+import multiprocessing
 import os
+import pickle
+import re
 import sys
+import tempfile
 import typing
 
-import pyshacl
+import rdflib.collection
+import rdflib.paths
 import rdflib.util
 
-from . import shapes
+from . import compressed_io, jsonld, shapes, snapshot
+from .digraph import (
+    AdjacencyType,
+    get_cycles,
+    get_strongly_connected_components,
+    make_cycle_text,
+)
 
 _logger = logging.getLogger(os.path.basename(__file__))
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="CASE provenance reviewer")
+NS_CASE_PROV = rdflib.Namespace("http://example.org/ontology/case-prov/")
+NS_PROV = rdflib.PROV
+NS_PROV_SHAPES = rdflib.Namespace("http://example.org/ontology/prov-shapes/")
+NS_RDF = rdflib.RDF
+NS_RDFS = rdflib.RDFS
+NS_SH = rdflib.SH
+NS_TIME = rdflib.TIME
 
-    # Configure debug logging before running parse_args, because there
-    # could be an error raised before the construction of the argument
-    # parser.
-    logging.basicConfig(
-        level=(
-            logging.DEBUG
-            if ("--debug" in sys.argv or "-d" in sys.argv)
-            else logging.INFO
+# Shapes from the case_prov.shapes package that the native engine
+# implements.  Each constraint's SPARQL query is replaced with set
+# operations in get_native_focus_nodes.
+NATIVE_SHAPES: typing.Set[rdflib.URIRef] = {
+    NS_CASE_PROV["chain-of-communication-shape"],
+    NS_CASE_PROV["chain-of-derivation-shape"],
+    NS_CASE_PROV["derivation-empty-nonempty-shape"],
+    NS_PROV_SHAPES["activity-entity-disjointedness"],
+    NS_PROV_SHAPES["entity-instantaneous-event-disjointedness"],
+}
+
+# (Label, content, rdflib parser format) of a graph source.  A format of
+# None indicates the label is a file path to be parsed with rdflib's
+# format guessing.
+GraphSourceType = typing.Tuple[str, bytes, typing.Optional[str]]
+
+# (Conforms, report graph, report text), following the return value of
+# `pyshacl.validate` without serialization.
+ValidationReportType = typing.Tuple[bool, rdflib.Graph, str]
+
+# (Result description text, result node, severity), following the form
+# pySHACL uses for its validation results.
+ValidationResultType = typing.Tuple[str, rdflib.BNode, rdflib.term.Node]
+
+# (Depth, predicates) of the data a shape reads around each of its focus
+# nodes.  A focus node's results depend only on triples with a predicate
+# in predicates, and a subject or object within depth - 1 such triples of
+# the focus node.  Predicates of None means any predicate.
+ShapeDependencyType = typing.Tuple[int, typing.Optional[typing.Set[rdflib.URIRef]]]
+
+# Predicates the NATIVE_SHAPES constraints read.  Each reads only the
+# focus node's own triples.
+NATIVE_SHAPE_PREDICATES: typing.Set[rdflib.URIRef] = {
+    NS_PROV.used,
+    NS_PROV.wasDerivedFrom,
+    NS_PROV.wasInformedBy,
+    NS_RDF.type,
+}
+
+# Predicates of class and property hierarchy axioms.
+HIERARCHY_PREDICATES: typing.Set[rdflib.URIRef] = {
+    rdflib.OWL.equivalentClass,
+    rdflib.OWL.equivalentProperty,
+    NS_RDFS.subClassOf,
+    NS_RDFS.subPropertyOf,
+}
+
+# Hierarchy axioms that --inference targeted applies in addition to the
+# axioms of the loaded graphs.  The OWL-Time axioms are those
+# case_prov_rdf entails by hand, and the prov:InstantaneousEvent
+# subclasses are from PROV-O.
+TARGETED_INFERENCE_AXIOMS: typing.Set[
+    typing.Tuple[rdflib.URIRef, rdflib.URIRef, rdflib.URIRef]
+] = {
+    (NS_PROV.Activity, NS_RDFS.subClassOf, NS_TIME.Interval),
+    (NS_PROV.End, NS_RDFS.subClassOf, NS_PROV.InstantaneousEvent),
+    (NS_PROV.Generation, NS_RDFS.subClassOf, NS_PROV.InstantaneousEvent),
+    (NS_PROV.InstantaneousEvent, NS_RDFS.subClassOf, NS_TIME.Instant),
+    (NS_PROV.Invalidation, NS_RDFS.subClassOf, NS_PROV.InstantaneousEvent),
+    (NS_PROV.Start, NS_RDFS.subClassOf, NS_PROV.InstantaneousEvent),
+    (NS_PROV.Usage, NS_RDFS.subClassOf, NS_PROV.InstantaneousEvent),
+    (NS_PROV.qualifiedEnd, NS_RDFS.subPropertyOf, NS_TIME.hasEnd),
+    (NS_PROV.qualifiedStart, NS_RDFS.subPropertyOf, NS_TIME.hasBeginning),
+    (NS_TIME.ProperInterval, NS_RDFS.subClassOf, NS_TIME.Interval),
+}
+
+# SHACL parameters whose values are SPARQL query strings.
+SPARQL_QUERY_PARAMETERS: typing.Set[rdflib.URIRef] = {
+    NS_SH.ask,
+    NS_SH.construct,
+    NS_SH.select,
+    NS_SH.update,
+}
+
+# SHACL Core parameters whose values are shapes, applied to the value
+# nodes of the shape using them.
+SHAPE_VALUED_PARAMETERS: typing.Set[rdflib.URIRef] = {
+    NS_SH.node,
+    NS_SH._NS["not"],
+    NS_SH.property,
+    NS_SH.qualifiedValueShape,
+}
+
+# SHACL Core parameters whose values are lists of shapes, applied to the
+# value nodes of the shape using them.
+SHAPE_LIST_VALUED_PARAMETERS: typing.Set[rdflib.URIRef] = {
+    NS_SH._NS["and"],
+    NS_SH._NS["or"],
+    NS_SH.xone,
+}
+
+# SHACL Core parameters comparing value nodes with the values of another
+# predicate of the focus node.
+PROPERTY_PAIR_PARAMETERS: typing.Set[rdflib.URIRef] = {
+    NS_SH.disjoint,
+    NS_SH.equals,
+    NS_SH.lessThan,
+    NS_SH.lessThanOrEquals,
+}
+
+# (Focus node -> validation report of only that focus node's results,
+# with each report text in the form of pySHACL's report text.)
+FocusNodeReportsType = typing.Dict[rdflib.URIRef, ValidationReportType]
+
+# Dictionary pickled by --incremental-state.  Keys:
+# * "data_digest" - get_sources_digest of the data graph files.
+# * "data_graph" - The data graph.
+# * "focus_node_reports" - FocusNodeReportsType of the data graph.
+# * "settings_digest" - get_sources_digest of the shapes and ontology
+#   files, and the validation settings.
+IncrementalStateType = typing.Dict[str, typing.Any]
+
+
+def get_default_cache_dir() -> str:
+    """
+    Get the directory in which parsed shapes and ontology graphs are cached, following the XDG Base Directory convention.
+    """
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(xdg_cache_home, "case_prov")
+
+
+def get_sources_digest(
+    sources: typing.Sequence[GraphSourceType],
+    *args: str,
+) -> str:
+    """
+    Hash the contents and formats of graph sources, with the versions of this module and rdflib, and any further strings given.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(("%s\n%s\n" % (__version__, rdflib.__version__)).encode())
+    for source in sources:
+        # The format is part of the digest, as the parsed graph depends
+        # on it.
+        if source[2] is None:
+            hasher.update(("%s\n" % os.path.splitext(source[0])[1]).encode())
+        else:
+            hasher.update(("%s\n" % source[2]).encode())
+        hasher.update(hashlib.sha256(source[1]).digest())
+    for arg in args:
+        hasher.update(("%s\n" % arg).encode())
+    return hasher.hexdigest()
+
+
+def write_pickle(path: str, obj: typing.Any) -> None:
+    """
+    Pickle an object to a temporary file and rename it into place, so a concurrent run never reads a partially written file.
+    """
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp", delete=False
+    ) as out_fh:
+        pickle.dump(obj, out_fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(out_fh.name, path)
+
+
+def load_graph(
+    sources: typing.Sequence[GraphSourceType],
+    cache_dir: typing.Optional[str] = None,
+) -> rdflib.Graph:
+    """
+    Parse the sources into one graph.  If cache_dir is given, the parsed graph is stored there as a pickle keyed by a hash of the contents of every source, and later calls with the same contents load the pickle instead of parsing.  Pickles are trusted, so the cache directory should only be writable by its user.
+    """
+    cache_path: typing.Optional[str] = None
+    if cache_dir is not None:
+        cache_path = os.path.join(
+            cache_dir, "graph-%s.pickle" % get_sources_digest(sources)
+        )
+        if os.path.exists(cache_path):
+            _logger.debug("Loading cached graph %r.", cache_path)
+            try:
+                with open(cache_path, "rb") as in_fh:
+                    cached_graph = pickle.load(in_fh)
+                if isinstance(cached_graph, rdflib.Graph):
+                    return cached_graph
+                _logger.warning("Ignoring unexpected cache file %r.", cache_path)
+            except (EOFError, OSError, pickle.UnpicklingError) as e:
+                _logger.warning("Ignoring unreadable cache file %r: %s", cache_path, e)
+
+    graph = rdflib.Graph()
+    for source in sources:
+        _logger.debug("Loading graph from %r.", source[0])
+        if source[2] is None:
+            if snapshot.is_snapshot(source[1]):
+                snapshot.parse_snapshot(graph, source[1])
+            elif (
+                rdflib.util.guess_format(
+                    compressed_io.strip_compression_extension(source[0])
+                )
+                == "json-ld"
+            ):
+                jsonld.parse_json_ld(graph, source[0], source[1])
+            elif compressed_io.get_compression(source[0]) is not None:
+                graph.parse(
+                    data=source[1],
+                    format=rdflib.util.guess_format(
+                        compressed_io.strip_compression_extension(source[0])
+                    ),
+                )
+            else:
+                graph.parse(source[0])
+        else:
+            graph.parse(data=source[1], format=source[2])
+
+    if cache_path is not None:
+        assert cache_dir is not None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            write_pickle(cache_path, graph)
+        except OSError as e:
+            _logger.warning("Unable to write cache file %r: %s", cache_path, e)
+    return graph
+
+
+def get_instances(
+    data_graph: rdflib.Graph,
+    ontology_graph: rdflib.Graph,
+    n_class: rdflib.URIRef,
+) -> typing.Set[rdflib.term.Node]:
+    """
+    Get all nodes typed as the requested class, or as any of its subclasses.  The class hierarchy is read from both graphs, as pySHACL mixes the ontology's class hierarchy into the data graph.  Instance data is read from the data graph.
+
+    >>> data_graph = rdflib.Graph()
+    >>> ontology_graph = rdflib.Graph()
+    >>> x = rdflib.URIRef("urn:example:kb:x")
+    >>> ontology_graph.add((NS_PROV.Collection, NS_RDFS.subClassOf, NS_PROV.Entity))  # doctest: +ELLIPSIS
+    <Graph ...>
+    >>> data_graph.add((x, NS_RDF.type, NS_PROV.Collection))  # doctest: +ELLIPSIS
+    <Graph ...>
+    >>> get_instances(data_graph, ontology_graph, NS_PROV.Entity)
+    {rdflib.term.URIRef('urn:example:kb:x')}
+    """
+    n_classes: typing.Set[rdflib.term.Node] = {n_class}
+    n_frontier: typing.List[rdflib.term.Node] = [n_class]
+    while len(n_frontier) > 0:
+        n_next_frontier: typing.List[rdflib.term.Node] = []
+        for n_superclass in n_frontier:
+            for graph in (data_graph, ontology_graph):
+                for n_subclass in graph.subjects(NS_RDFS.subClassOf, n_superclass):
+                    if n_subclass in n_classes:
+                        continue
+                    n_classes.add(n_subclass)
+                    n_next_frontier.append(n_subclass)
+        n_frontier = n_next_frontier
+    n_instances: typing.Set[rdflib.term.Node] = set()
+    for n_instance, n_type in data_graph.subject_objects(NS_RDF.type):
+        if n_type in n_classes:
+            n_instances.add(n_instance)
+    return n_instances
+
+
+def get_native_focus_nodes(
+    data_graph: rdflib.Graph,
+    ontology_graph: rdflib.Graph,
+) -> typing.Dict[rdflib.URIRef, typing.Set[rdflib.term.Node]]:
+    """
+    Get the focus nodes that fail each shape in NATIVE_SHAPES.  Each shape's target and constraint reduce to set operations over one pass of each of the predicates involved.
+    """
+    n_activities = get_instances(data_graph, ontology_graph, NS_PROV.Activity)
+    n_entities = get_instances(data_graph, ontology_graph, NS_PROV.Entity)
+    n_instantaneous_events = get_instances(
+        data_graph, ontology_graph, NS_PROV.InstantaneousEvent
+    )
+
+    n_users_of_empty_collection = set(
+        data_graph.subjects(NS_PROV.used, NS_PROV.EmptyCollection)
+    )
+    n_informed = set(data_graph.subjects(NS_PROV.wasInformedBy, None))
+    n_derived: typing.Set[rdflib.term.Node] = set()
+    n_derived_from_empty_collection: typing.Set[rdflib.term.Node] = set()
+    n_derived_from_other: typing.Set[rdflib.term.Node] = set()
+    for n_derived_thing, n_source in data_graph.subject_objects(NS_PROV.wasDerivedFrom):
+        n_derived.add(n_derived_thing)
+        if n_source == NS_PROV.EmptyCollection:
+            n_derived_from_empty_collection.add(n_derived_thing)
+        else:
+            n_derived_from_other.add(n_derived_thing)
+
+    return {
+        NS_CASE_PROV["chain-of-communication-shape"]: (
+            n_activities - n_users_of_empty_collection - n_informed
+        ),
+        NS_CASE_PROV["chain-of-derivation-shape"]: (
+            n_entities - n_derived - {NS_PROV.EmptyCollection}
+        ),
+        NS_CASE_PROV["derivation-empty-nonempty-shape"]: (
+            n_entities & n_derived_from_empty_collection & n_derived_from_other
+        ),
+        NS_PROV_SHAPES["activity-entity-disjointedness"]: n_activities & n_entities,
+        NS_PROV_SHAPES["entity-instantaneous-event-disjointedness"]: (
+            n_entities & n_instantaneous_events
+        ),
+    }
+
+
+def make_native_results(
+    data_graph: rdflib.Graph,
+    shacl_graph: rdflib.Graph,
+    report_graph: rdflib.Graph,
+    n_shape_to_focus_nodes: typing.Dict[rdflib.URIRef, typing.Set[rdflib.term.Node]],
+) -> typing.List[ValidationResultType]:
+    """
+    Add a sh:ValidationResult to the report graph for each failing focus node, with the same description text and triples pySHACL produces for a SPARQL-based constraint with a `SELECT $this` query.
+    """
+    import pyshacl.rdfutil.clone
+    import pyshacl.rdfutil.stringify
+
+    # Focus nodes are rendered with the data graph's prefixes,
+    # supplemented by the shapes graph's, as in pySHACL's mixing of the
+    # ontology into the data graph.
+    namespace_graph = rdflib.Graph(bind_namespaces="core")
+    for prefix, namespace in data_graph.namespace_manager.namespaces():
+        namespace_graph.namespace_manager.bind(
+            prefix, namespace, override=True, replace=True
+        )
+    data_graph_prefixes = {x[0] for x in data_graph.namespace_manager.namespaces()}
+    for prefix, namespace in shacl_graph.namespace_manager.namespaces():
+        if prefix not in data_graph_prefixes:
+            namespace_graph.namespace_manager.bind(prefix, namespace)
+
+    # Blank focus nodes are copied into the report graph, once each.
+    n_cloned_focus_nodes: typing.Dict[rdflib.BNode, rdflib.BNode] = dict()
+
+    results: typing.List[ValidationResultType] = []
+    for n_shape in sorted(n_shape_to_focus_nodes.keys()):
+        if (n_shape, NS_SH.deactivated, rdflib.Literal(True)) in shacl_graph:
+            continue
+        n_severity = shacl_graph.value(n_shape, NS_SH.severity, default=NS_SH.Violation)
+        assert n_severity is not None
+        severity_description = (
+            "Constraint Violation"
+            if n_severity == NS_SH.Violation
+            else "Validation Result"
+        )
+        for n_constraint in shacl_graph.objects(n_shape, NS_SH.sparql):
+            assert isinstance(n_constraint, rdflib.BNode)
+            if (n_constraint, NS_SH.deactivated, rdflib.Literal(True)) in shacl_graph:
+                continue
+            l_messages = sorted(
+                shacl_graph.objects(n_constraint, NS_SH.message), key=str
+            )
+            source_constraint_text = pyshacl.rdfutil.stringify.stringify_node(
+                shacl_graph, n_constraint
+            )
+            if len(n_shape_to_focus_nodes[n_shape]) == 0:
+                continue
+            n_source_constraint = pyshacl.rdfutil.clone.clone_blank_node(
+                shacl_graph, n_constraint, report_graph, keepid=True
+            )
+            for n_focus_node in n_shape_to_focus_nodes[n_shape]:
+                focus_node_text = pyshacl.rdfutil.stringify.stringify_node(
+                    data_graph, n_focus_node, namespace_graph.namespace_manager
+                )
+                messages = [
+                    re.sub(r"{[?$](this|value)}", str(n_focus_node), str(x))
+                    for x in l_messages
+                ]
+                description = "%s in SPARQLConstraintComponent (%s):\n" % (
+                    severity_description,
+                    NS_SH.SPARQLConstraintComponent,
+                )
+                description += (
+                    "\tSeverity: %s\n"
+                    % pyshacl.rdfutil.stringify.stringify_node(shacl_graph, n_severity)
+                )
+                description += (
+                    "\tSource Shape: %s\n"
+                    % pyshacl.rdfutil.stringify.stringify_node(shacl_graph, n_shape)
+                )
+                description += "\tFocus Node: %s\n" % focus_node_text
+                description += "\tValue Node: %s\n" % focus_node_text
+                description += "\tSource Constraint: %s\n" % source_constraint_text
+                for message in messages:
+                    description += "\tMessage: %s\n" % message
+
+                n_result = rdflib.BNode()
+                report_graph.add((n_result, NS_RDF.type, NS_SH.ValidationResult))
+                report_graph.add(
+                    (
+                        n_result,
+                        NS_SH.sourceConstraintComponent,
+                        NS_SH.SPARQLConstraintComponent,
+                    )
+                )
+                report_graph.add((n_result, NS_SH.sourceShape, n_shape))
+                report_graph.add((n_result, NS_SH.resultSeverity, n_severity))
+                n_reported_focus_node = n_focus_node
+                if isinstance(n_focus_node, rdflib.BNode):
+                    if n_focus_node not in n_cloned_focus_nodes:
+                        n_cloned_focus_nodes[n_focus_node] = (
+                            pyshacl.rdfutil.clone.clone_blank_node(
+                                data_graph, n_focus_node, report_graph, keepid=True
+                            )
+                        )
+                    n_reported_focus_node = n_cloned_focus_nodes[n_focus_node]
+                report_graph.add((n_result, NS_SH.focusNode, n_reported_focus_node))
+                report_graph.add((n_result, NS_SH.value, n_reported_focus_node))
+                report_graph.add(
+                    (n_result, NS_SH.sourceConstraint, n_source_constraint)
+                )
+                for message in messages:
+                    report_graph.add(
+                        (n_result, NS_SH.resultMessage, rdflib.Literal(message))
+                    )
+                results.append((description, n_result, n_severity))
+    return results
+
+
+def make_report_text(conforms: bool, descriptions: typing.Sequence[str]) -> str:
+    """
+    Assemble a report text from result descriptions, in the form of pySHACL's report text.
+
+    >>> make_report_text(True, [])
+    'Validation Report\\nConforms: True\\n'
+    """
+    report_text = "Validation Report\nConforms: %s\n" % conforms
+    if len(descriptions) > 0:
+        report_text += "Results (%d):\n" % len(descriptions)
+    report_text += "".join(sorted(descriptions))
+    return report_text
+
+
+def split_report_text(report_text: str) -> typing.List[str]:
+    """
+    Split a pySHACL report text into its result descriptions.
+
+    >>> split_report_text("Validation Report\\nConforms: True\\n")
+    []
+    >>> split_report_text(make_report_text(False, ["Validation Result in X:\\n", "Constraint Violation in Y:\\n"]))
+    ['Constraint Violation in Y:\\n', 'Validation Result in X:\\n']
+    """
+    report_text_parts = re.split(r"(?m)^Results \(\d+\):\n", report_text, maxsplit=1)
+    if len(report_text_parts) < 2:
+        return []
+    return [
+        x
+        for x in re.split(
+            r"(?m)^(?=(?:Constraint Violation|Validation Result) in )",
+            report_text_parts[1],
+        )
+        if x != ""
+    ]
+
+
+def finish_validation_report(
+    report_graph: rdflib.Graph,
+    conforms: bool,
+    n_results: typing.Sequence[rdflib.term.Node],
+    descriptions: typing.Sequence[str],
+) -> ValidationReportType:
+    """
+    Add the sh:ValidationReport node for the results to the report graph, and assemble the report text.
+    """
+    n_report = rdflib.BNode()
+    report_graph.add((n_report, NS_RDF.type, NS_SH.ValidationReport))
+    report_graph.add((n_report, NS_SH.conforms, rdflib.Literal(conforms)))
+    for n_result in n_results:
+        report_graph.add((n_report, NS_SH.result, n_result))
+    return conforms, report_graph, make_report_text(conforms, descriptions)
+
+
+def merge_validation_reports(
+    validation_reports: typing.Sequence[ValidationReportType],
+    shacl_graph: rdflib.Graph,
+) -> ValidationReportType:
+    """
+    Merge validation reports into one report, as though their results had come from one validation run.  The data graph conforms if it conforms in every report.
+    """
+    report_graph = rdflib.Graph(bind_namespaces="core")
+    for prefix, namespace in shacl_graph.namespace_manager.namespaces():
+        report_graph.namespace_manager.bind(prefix, namespace)
+    conforms = True
+    n_results: typing.List[rdflib.term.Node] = []
+    descriptions: typing.List[str] = []
+    for validation_report in validation_reports:
+        conforms = conforms and validation_report[0]
+        n_reports = set(
+            validation_report[1].subjects(NS_RDF.type, NS_SH.ValidationReport)
+        )
+        for triple in validation_report[1].triples((None, None, None)):
+            if triple[0] in n_reports:
+                if triple[1] == NS_SH.result:
+                    n_results.append(triple[2])
+            else:
+                report_graph.add(triple)
+        descriptions += split_report_text(validation_report[2])
+    return finish_validation_report(report_graph, conforms, n_results, descriptions)
+
+
+def serialize_validation_report(
+    validation_report: ValidationReportType,
+    serialize_report_graph: typing.Union[bool, str] = False,
+) -> typing.Tuple[bool, typing.Union[bytes, rdflib.Graph], str]:
+    """
+    Serialize the report graph if requested, as `pyshacl.validate` does with its serialize_report_graph parameter.
+    """
+    if not serialize_report_graph:
+        return validation_report
+    return (
+        validation_report[0],
+        validation_report[1].serialize(
+            None,
+            encoding="utf-8",
+            format=(
+                serialize_report_graph
+                if isinstance(serialize_report_graph, str)
+                else "turtle"
+            ),
+        ),
+        validation_report[2],
+    )
+
+
+def validate_natively(
+    data_graph: rdflib.Graph,
+    *args: typing.Any,
+    shacl_graph: rdflib.Graph,
+    supplemental_shacl_graph: typing.Optional[rdflib.Graph] = None,
+    allow_warnings: bool = False,
+    debug: bool = False,
+    jobs: int = 1,
+    serialize_report_graph: typing.Union[bool, str] = False,
+    **kwargs: typing.Any,
+) -> typing.Tuple[bool, typing.Union[bytes, rdflib.Graph], str]:
+    """
+    This function validates the data graph against the shapes in NATIVE_SHAPES without evaluating their SPARQL queries, returning the same (conforms, report graph, report text) tuple as `pyshacl.validate`.
+
+    :param shacl_graph: The combined ontology and shapes graph, providing the NATIVE_SHAPES definitions.
+    :param supplemental_shacl_graph: Shapes not implemented natively.  These are validated with pySHACL, using shacl_graph as the ontology graph, and their results are merged into the returned report.
+    :param jobs: Number of processes for validating supplemental shapes.  See `validate_in_parallel`.
+    """
+    report_graph = rdflib.Graph(bind_namespaces="core")
+    for prefix, namespace in shacl_graph.namespace_manager.namespaces():
+        report_graph.namespace_manager.bind(prefix, namespace)
+
+    results = make_native_results(
+        data_graph,
+        shacl_graph,
+        report_graph,
+        get_native_focus_nodes(data_graph, shacl_graph),
+    )
+    allowed_severities = {NS_SH.Info, NS_SH.Warning} if allow_warnings else set()
+    validation_report = finish_validation_report(
+        report_graph,
+        all(x[2] in allowed_severities for x in results),
+        [x[1] for x in results],
+        [x[0] for x in results],
+    )
+
+    if supplemental_shacl_graph is not None:
+        _logger.debug("Validating supplemental shapes with pySHACL.")
+        supplemental_validation_report = validate_in_parallel(
+            data_graph,
+            shacl_graph=supplemental_shacl_graph,
+            ont_graph=shacl_graph,
+            allow_warnings=allow_warnings,
+            debug=debug,
+            jobs=jobs,
+        )
+        assert isinstance(supplemental_validation_report[1], rdflib.Graph)
+        validation_report = merge_validation_reports(
+            [
+                validation_report,
+                (
+                    supplemental_validation_report[0],
+                    supplemental_validation_report[1],
+                    supplemental_validation_report[2],
+                ),
+            ],
+            shacl_graph,
+        )
+
+    return serialize_validation_report(validation_report, serialize_report_graph)
+
+
+def get_focus_nodes(
+    data_graph: rdflib.Graph,
+    shacl_graph: rdflib.Graph,
+    ont_graph: rdflib.Graph,
+) -> typing.Set[rdflib.term.Node]:
+    """
+    Get the focus nodes of every shape in the shapes graph, using pySHACL's target resolution against the data graph mixed with the ontology graph, as in `pyshacl.validate`.
+    """
+    import pyshacl
+    import pyshacl.rdfutil.inoculate
+
+    mixed_graph = rdflib.Graph()
+    for prefix, namespace in data_graph.namespace_manager.namespaces():
+        mixed_graph.namespace_manager.bind(prefix, namespace)
+    mixed_graph += data_graph
+    # pySHACL duck-types its DataGraph parameter as an rdflib Graph.
+    pyshacl.rdfutil.inoculate.inoculate(typing.cast(typing.Any, mixed_graph), ont_graph)
+    n_focus_nodes: typing.Set[rdflib.term.Node] = set()
+    for shape in pyshacl.ShapesGraph(shacl_graph).shapes:
+        n_focus_nodes |= set(shape.focus_nodes(mixed_graph))
+    return n_focus_nodes
+
+
+# State shared with forked worker processes of validate_in_parallel.
+# Workers inherit the parent's graphs through copy-on-write memory
+# rather than through pickling.
+_parallel_validation_state: typing.Dict[str, typing.Any] = dict()
+
+
+def _validate_focus_nodes(
+    n_focus_nodes: typing.List[typing.Union[str, rdflib.URIRef]],
+) -> ValidationReportType:
+    import pyshacl
+
+    validate_result = pyshacl.validate(
+        _parallel_validation_state["data_graph"],
+        shacl_graph=_parallel_validation_state["shacl_graph"],
+        ont_graph=_parallel_validation_state["ont_graph"],
+        allow_warnings=_parallel_validation_state["allow_warnings"],
+        debug=_parallel_validation_state["debug"],
+        focus_nodes=n_focus_nodes,
+    )
+    assert isinstance(validate_result[1], rdflib.Graph)
+    return validate_result[0], validate_result[1], validate_result[2]
+
+
+def can_select_focus_nodes(
+    n_focus_nodes: typing.Iterable[rdflib.term.Node],
+    graphs: typing.Iterable[rdflib.Graph],
+) -> bool:
+    """
+    Determine whether `pyshacl.validate` can restrict validation to the focus nodes with its focus_nodes parameter.  pySHACL only selects IRIs, and expands any focus node that looks like a compacted IRI, so an IRI whose scheme is also a prefix bound in one of the graphs would not be found.
+
+    >>> graph = rdflib.Graph(bind_namespaces="core")
+    >>> graph.bind("kb", "http://example.org/kb/")
+    >>> can_select_focus_nodes([rdflib.URIRef("urn:example:x")], [graph])
+    True
+    >>> can_select_focus_nodes([rdflib.URIRef("kb:x")], [graph])
+    False
+    >>> can_select_focus_nodes([rdflib.BNode()], [graph])
+    False
+    """
+    prefixes = {
+        x[0] for graph in graphs for x in graph.namespace_manager.namespaces()
+    } - {"file", "http", "https", "urn"}
+    for n_focus_node in n_focus_nodes:
+        if not isinstance(n_focus_node, rdflib.URIRef):
+            return False
+        if str(n_focus_node).split(":", 1)[0] in prefixes:
+            return False
+    return True
+
+
+def validate_in_parallel(
+    data_graph: rdflib.Graph,
+    *args: typing.Any,
+    shacl_graph: rdflib.Graph,
+    ont_graph: rdflib.Graph,
+    allow_warnings: bool = False,
+    debug: bool = False,
+    jobs: int = 1,
+    focus_nodes: typing.Optional[typing.Iterable[rdflib.term.Node]] = None,
+    serialize_report_graph: typing.Union[bool, str] = False,
+    **kwargs: typing.Any,
+) -> typing.Tuple[bool, typing.Union[bytes, rdflib.Graph], str]:
+    """
+    This function validates with pySHACL in several forked processes, each validating a contiguous share of the sorted focus nodes, and merges their reports.  The merged report is the same as that of a single `pyshacl.validate` call.
+
+    pySHACL can only restrict validation to focus nodes that are IRIs.  If any focus node is a blank node or literal, or if the platform cannot fork, validation runs in one process.
+
+    :param focus_nodes: If given, only these nodes are validated, against the shapes that target them.  They must satisfy `can_select_focus_nodes`.
+    """
+    import pyshacl
+
+    n_focus_nodes: typing.Set[rdflib.term.Node] = set()
+    use_parallel = jobs > 1 and "fork" in multiprocessing.get_all_start_methods()
+    if use_parallel or focus_nodes is not None:
+        n_focus_nodes = get_focus_nodes(data_graph, shacl_graph, ont_graph)
+        if focus_nodes is not None:
+            n_focus_nodes &= set(focus_nodes)
+            if not can_select_focus_nodes(
+                n_focus_nodes, (data_graph, shacl_graph, ont_graph)
+            ):
+                raise ValueError("pySHACL cannot select all requested focus nodes.")
+            if len(n_focus_nodes) == 0:
+                # pySHACL would read an empty focus_nodes list as all
+                # focus nodes.
+                return serialize_validation_report(
+                    merge_validation_reports([], shacl_graph), serialize_report_graph
+                )
+        _logger.debug("len(n_focus_nodes) = %d.", len(n_focus_nodes))
+    if use_parallel:
+        if len(n_focus_nodes) < 2:
+            use_parallel = False
+        elif not can_select_focus_nodes(
+            n_focus_nodes, (data_graph, shacl_graph, ont_graph)
+        ):
+            _logger.info(
+                "Some focus nodes cannot be selected for pySHACL, so validation will run in one process."
+            )
+            use_parallel = False
+
+    n_sorted_focus_nodes: typing.List[typing.Union[str, rdflib.URIRef]] = sorted(
+        typing.cast(typing.Set[rdflib.URIRef], n_focus_nodes)
+    )
+
+    if not use_parallel:
+        validate_result = pyshacl.validate(
+            data_graph,
+            shacl_graph=shacl_graph,
+            ont_graph=ont_graph,
+            allow_warnings=allow_warnings,
+            debug=debug,
+            focus_nodes=None if focus_nodes is None else n_sorted_focus_nodes,
+            serialize_report_graph=serialize_report_graph,
+        )
+        assert not isinstance(validate_result[1], (Exception, str))
+        return validate_result[0], validate_result[1], validate_result[2]
+
+    jobs = min(jobs, len(n_sorted_focus_nodes))
+    share_size = -(-len(n_sorted_focus_nodes) // jobs)
+    shares = [
+        n_sorted_focus_nodes[x : x + share_size]
+        for x in range(0, len(n_sorted_focus_nodes), share_size)
+    ]
+
+    _parallel_validation_state.update(
+        {
+            "allow_warnings": allow_warnings,
+            "data_graph": data_graph,
+            "debug": debug,
+            "ont_graph": ont_graph,
+            "shacl_graph": shacl_graph,
+        }
+    )
+    try:
+        with multiprocessing.get_context("fork").Pool(len(shares)) as pool:
+            validation_reports = pool.map(_validate_focus_nodes, shares)
+    finally:
+        _parallel_validation_state.clear()
+
+    return serialize_validation_report(
+        merge_validation_reports(validation_reports, shacl_graph),
+        serialize_report_graph,
+    )
+
+
+def get_path_dependency(
+    shacl_graph: rdflib.Graph,
+    n_path: rdflib.term.Node,
+) -> typing.Optional[ShapeDependencyType]:
+    """
+    Get the number of triples a SHACL property path traverses from a focus node, and the predicates it traverses.  Returns None for paths of unbounded length.
+
+    >>> graph = rdflib.Graph()
+    >>> get_path_dependency(graph, NS_PROV.used)
+    (1, {rdflib.term.URIRef('http://www.w3.org/ns/prov#used')})
+    >>> n_path = rdflib.BNode()
+    >>> graph.add((n_path, NS_SH.oneOrMorePath, NS_PROV.wasInformedBy))  # doctest: +ELLIPSIS
+    <Graph ...>
+    >>> get_path_dependency(graph, n_path) is None
+    True
+    """
+    if isinstance(n_path, rdflib.URIRef):
+        return 1, {n_path}
+    if (n_path, NS_RDF.first, None) in shacl_graph:
+        # Sequence path.
+        depth = 0
+        n_predicates: typing.Set[rdflib.URIRef] = set()
+        for n_member in rdflib.collection.Collection(shacl_graph, n_path):
+            member_dependency = get_path_dependency(shacl_graph, n_member)
+            if member_dependency is None:
+                return None
+            depth += member_dependency[0]
+            assert member_dependency[1] is not None
+            n_predicates |= member_dependency[1]
+        return depth, n_predicates
+    n_alternatives = shacl_graph.value(n_path, NS_SH.alternativePath)
+    if n_alternatives is not None:
+        depth = 0
+        n_predicates = set()
+        for n_member in rdflib.collection.Collection(shacl_graph, n_alternatives):
+            member_dependency = get_path_dependency(shacl_graph, n_member)
+            if member_dependency is None:
+                return None
+            depth = max(depth, member_dependency[0])
+            assert member_dependency[1] is not None
+            n_predicates |= member_dependency[1]
+        return depth, n_predicates
+    for n_predicate in (NS_SH.inversePath, NS_SH.zeroOrOnePath):
+        n_inner_path = shacl_graph.value(n_path, n_predicate)
+        if n_inner_path is not None:
+            return get_path_dependency(shacl_graph, n_inner_path)
+    return None
+
+
+def get_shape_dependency(
+    shacl_graph: rdflib.Graph,
+    n_shape: rdflib.term.Node,
+    _n_visited_shapes: typing.Optional[typing.Set[rdflib.term.Node]] = None,
+) -> typing.Optional[ShapeDependencyType]:
+    """
+    Get the data a shape reads around each of its focus nodes, following the paths of the shape and of the shapes it uses for its value nodes.  Returns None if the dependency cannot be bounded, such as for recursive shapes, unbounded paths, and SPARQL-based constraints other than those of NATIVE_SHAPES.
+    """
+    if n_shape in NATIVE_SHAPES:
+        return 1, set(NATIVE_SHAPE_PREDICATES)
+    n_visited_shapes = set() if _n_visited_shapes is None else _n_visited_shapes
+    if n_shape in n_visited_shapes:
+        return None
+    n_visited_shapes = n_visited_shapes | {n_shape}
+
+    # Parameters of constraint components defined in the shapes graph.
+    n_custom_parameters = {
+        n_parameter_path
+        for n_parameter in shacl_graph.objects(None, NS_SH.parameter)
+        for n_parameter_path in shacl_graph.objects(n_parameter, NS_SH.path)
+    }
+
+    # Targets read the focus node's types and own triples.
+    depth = 1
+    n_predicates: typing.Optional[typing.Set[rdflib.URIRef]] = {NS_RDF.type}
+    for n_target_predicate in (NS_SH.targetSubjectsOf, NS_SH.targetObjectsOf):
+        for n_target in shacl_graph.objects(n_shape, n_target_predicate):
+            if isinstance(n_target, rdflib.URIRef) and n_predicates is not None:
+                n_predicates.add(n_target)
+
+    # Depth of the value nodes of the shape.
+    value_depth = 0
+    n_path = shacl_graph.value(n_shape, NS_SH.path)
+    if n_path is not None:
+        path_dependency = get_path_dependency(shacl_graph, n_path)
+        if path_dependency is None:
+            return None
+        value_depth = path_dependency[0]
+        depth = max(depth, value_depth)
+        assert path_dependency[1] is not None
+        if n_predicates is not None:
+            n_predicates |= path_dependency[1]
+
+    for n_parameter, n_value in shacl_graph.predicate_objects(n_shape):
+        if (
+            n_parameter in (NS_SH.sparql, NS_SH.js)
+            or n_parameter in n_custom_parameters
+        ):
+            return None
+        n_nested_shapes: typing.List[rdflib.term.Node] = []
+        if n_parameter in SHAPE_VALUED_PARAMETERS:
+            n_nested_shapes = [n_value]
+        elif n_parameter in SHAPE_LIST_VALUED_PARAMETERS:
+            n_nested_shapes = list(rdflib.collection.Collection(shacl_graph, n_value))
+        elif n_parameter == NS_SH._NS["class"]:
+            # The value nodes' types are read.
+            depth = max(depth, value_depth + 1)
+        elif n_parameter == NS_SH.closed:
+            # Every predicate of the value nodes is read.
+            depth = max(depth, value_depth + 1)
+            n_predicates = None
+        elif n_parameter in PROPERTY_PAIR_PARAMETERS:
+            if isinstance(n_value, rdflib.URIRef) and n_predicates is not None:
+                n_predicates.add(n_value)
+        for n_nested_shape in n_nested_shapes:
+            nested_dependency = get_shape_dependency(
+                shacl_graph, n_nested_shape, n_visited_shapes
+            )
+            if nested_dependency is None:
+                return None
+            depth = max(depth, value_depth + nested_dependency[0])
+            if nested_dependency[1] is None:
+                n_predicates = None
+            elif n_predicates is not None:
+                n_predicates |= nested_dependency[1]
+
+    return depth, n_predicates
+
+
+def get_affected_focus_nodes(
+    previous_data_graph: rdflib.Graph,
+    data_graph: rdflib.Graph,
+    shacl_graph: rdflib.Graph,
+) -> typing.Optional[typing.Set[rdflib.term.Node]]:
+    """
+    Get the nodes whose validation results could differ between the previous and current data graph, given each shape's dependency from `get_shape_dependency`.  Returns None if the affected nodes cannot be bounded, in which case the whole graph should be revalidated.
+    """
+    import pyshacl
+
+    changed_triples = list(data_graph - previous_data_graph) + list(
+        previous_data_graph - data_graph
+    )
+    _logger.debug("len(changed_triples) = %d.", len(changed_triples))
+    if len(changed_triples) == 0:
+        return set()
+
+    for changed_triple in changed_triples:
+        # Blank nodes are renamed on each parse, so changes cannot be
+        # matched to them.
+        if any(isinstance(x, rdflib.BNode) for x in changed_triple):
+            _logger.info("Changes involve blank nodes.")
+            return None
+        # Class and property hierarchy changes can change the targets of
+        # any shape.
+        if changed_triple[1] in HIERARCHY_PREDICATES:
+            _logger.info("Changes involve the class or property hierarchy.")
+            return None
+        # Literals are only focus nodes as objects of a targeted predicate.
+        if isinstance(changed_triple[2], rdflib.Literal) and (
+            (None, NS_SH.targetObjectsOf, changed_triple[1]) in shacl_graph
+        ):
+            _logger.info("Changes involve literal focus nodes.")
+            return None
+
+    n_affected_nodes: typing.Set[rdflib.term.Node] = set()
+    for shape in pyshacl.ShapesGraph(shacl_graph).shapes:
+        shape_dependency = get_shape_dependency(shacl_graph, shape.node)
+        if shape_dependency is None:
+            _logger.info(
+                "Cannot bound the data read by shape %s.",
+                shape.node.n3(shacl_graph.namespace_manager),
+            )
+            return None
+        depth, n_predicates = shape_dependency
+
+        n_frontier: typing.Set[rdflib.term.Node] = set()
+        for changed_triple in changed_triples:
+            if n_predicates is None or changed_triple[1] in n_predicates:
+                n_frontier.add(changed_triple[0])
+                if not isinstance(changed_triple[2], rdflib.Literal):
+                    n_frontier.add(changed_triple[2])
+        n_shape_affected_nodes = set(n_frontier)
+        # Walk back from the changed triples to the focus nodes that can
+        # reach them, in either graph.
+        for _ in range(depth - 1):
+            n_next_frontier: typing.Set[rdflib.term.Node] = set()
+            for graph in (previous_data_graph, data_graph):
+                for n_node in n_frontier:
+                    for triple in graph.triples((n_node, None, None)):
+                        if n_predicates is None or triple[1] in n_predicates:
+                            n_next_frontier.add(triple[2])
+                    for triple in graph.triples((None, None, n_node)):
+                        if n_predicates is None or triple[1] in n_predicates:
+                            n_next_frontier.add(triple[0])
+            n_frontier = n_next_frontier - n_shape_affected_nodes
+            n_shape_affected_nodes |= n_frontier
+        n_affected_nodes |= n_shape_affected_nodes
+
+    return {x for x in n_affected_nodes if not isinstance(x, rdflib.Literal)}
+
+
+def split_validation_report(
+    validation_report: ValidationReportType,
+    namespace_managers: typing.Iterable[rdflib.namespace.NamespaceManager],
+    allow_warnings: bool = False,
+) -> typing.Optional[FocusNodeReportsType]:
+    """
+    Split a validation report into one report per focus node.  Merging the split reports with `merge_validation_reports` gives the original report.
+
+    Each description in the report text is matched to its focus node by the rendering of the focus node in the description, which pySHACL produces with the namespace manager of the data graph mixed with the ontology graph.  namespace_managers should cover the prefixes of both.  Returns None if any focus node is not an IRI, or any description cannot be matched.
+    """
+    report_graph = validation_report[1]
+    n_results_by_focus_node: typing.Dict[
+        rdflib.URIRef, typing.List[rdflib.term.Node]
+    ] = dict()
+    for n_result in report_graph.subjects(NS_RDF.type, NS_SH.ValidationResult):
+        n_focus_node = report_graph.value(n_result, NS_SH.focusNode)
+        if not isinstance(n_focus_node, rdflib.URIRef):
+            return None
+        n_results_by_focus_node.setdefault(n_focus_node, []).append(n_result)
+
+    namespace_managers = list(namespace_managers)
+    focus_node_texts: typing.Dict[str, typing.Set[rdflib.URIRef]] = dict()
+    for n_focus_node in n_results_by_focus_node:
+        for focus_node_text in {n_focus_node.n3()} | {
+            n_focus_node.n3(namespace_manager=x) for x in namespace_managers
+        }:
+            focus_node_texts.setdefault(focus_node_text, set()).add(n_focus_node)
+
+    descriptions_by_focus_node: typing.Dict[rdflib.URIRef, typing.List[str]] = dict()
+    for description in split_report_text(validation_report[2]):
+        match = re.search(r"(?m)^\tFocus Node: (.*)$", description)
+        if match is None or len(focus_node_texts.get(match.group(1), set())) != 1:
+            return None
+        (n_focus_node,) = focus_node_texts[match.group(1)]
+        descriptions_by_focus_node.setdefault(n_focus_node, []).append(description)
+
+    allowed_severities = {NS_SH.Info, NS_SH.Warning} if allow_warnings else set()
+    focus_node_reports: FocusNodeReportsType = dict()
+    for n_focus_node, n_results in n_results_by_focus_node.items():
+        descriptions = descriptions_by_focus_node.get(n_focus_node, [])
+        if len(descriptions) != len(n_results):
+            return None
+        focus_node_report_graph = rdflib.Graph(bind_namespaces="core")
+        # Copy each result and the blank nodes it uses.
+        n_pending_nodes: typing.List[rdflib.term.Node] = list(n_results)
+        n_copied_nodes: typing.Set[rdflib.term.Node] = set()
+        while len(n_pending_nodes) > 0:
+            n_node = n_pending_nodes.pop()
+            if n_node in n_copied_nodes:
+                continue
+            n_copied_nodes.add(n_node)
+            for triple in report_graph.triples((n_node, None, None)):
+                focus_node_report_graph.add(triple)
+                if isinstance(triple[2], rdflib.BNode):
+                    n_pending_nodes.append(triple[2])
+        focus_node_reports[n_focus_node] = finish_validation_report(
+            focus_node_report_graph,
+            all(
+                report_graph.value(x, NS_SH.resultSeverity) in allowed_severities
+                for x in n_results
+            ),
+            n_results,
+            descriptions,
+        )
+    if sum(len(x) for x in descriptions_by_focus_node.values()) != sum(
+        len(x) for x in n_results_by_focus_node.values()
+    ):
+        return None
+    return focus_node_reports
+
+
+def rebase_focus_node_reports(
+    focus_node_reports: FocusNodeReportsType,
+    shacl_graph: rdflib.Graph,
+) -> typing.Optional[FocusNodeReportsType]:
+    """
+    Point results recorded against an earlier parse of the shapes graph at the shapes graph nodes of the current parse.  pySHACL copies blank-node shapes, constraints and paths into its reports with their blank node identifiers, which differ between parses.  Each recorded blank node is matched by its non-blank-node values.  Returns None if a recorded blank node does not match exactly one blank node of the shapes graph.
+    """
+    import pyshacl.rdfutil.clone
+
+    def _get_signature(
+        graph: rdflib.Graph, n_node: rdflib.term.Node
+    ) -> typing.FrozenSet[typing.Tuple[rdflib.term.Node, rdflib.term.Node]]:
+        return frozenset(
+            x
+            for x in graph.predicate_objects(n_node)
+            if not isinstance(x[1], rdflib.BNode)
+        )
+
+    # Built on the first stale blank node.
+    n_shapes_graph_nodes_by_signature: typing.Optional[
+        typing.Dict[
+            typing.FrozenSet[typing.Tuple[rdflib.term.Node, rdflib.term.Node]],
+            typing.List[rdflib.BNode],
+        ]
+    ] = None
+    n_node_map: typing.Dict[rdflib.term.Node, rdflib.BNode] = dict()
+    rebased_focus_node_reports: FocusNodeReportsType = dict()
+    for n_focus_node, focus_node_report in focus_node_reports.items():
+        report_graph = focus_node_report[1]
+        n_stale_nodes: typing.Set[rdflib.term.Node] = set()
+        for n_predicate in (
+            NS_SH.resultPath,
+            NS_SH.sourceConstraint,
+            NS_SH.sourceShape,
+        ):
+            for n_object in report_graph.objects(None, n_predicate):
+                if not isinstance(n_object, rdflib.BNode):
+                    continue
+                if (n_object, None, None) in shacl_graph:
+                    continue
+                n_stale_nodes.add(n_object)
+                if n_object in n_node_map:
+                    continue
+                if n_shapes_graph_nodes_by_signature is None:
+                    n_shapes_graph_nodes_by_signature = dict()
+                    for n_subject in set(shacl_graph.subjects()):
+                        if isinstance(n_subject, rdflib.BNode):
+                            n_shapes_graph_nodes_by_signature.setdefault(
+                                _get_signature(shacl_graph, n_subject), []
+                            ).append(n_subject)
+                n_candidates = n_shapes_graph_nodes_by_signature.get(
+                    _get_signature(report_graph, n_object), []
+                )
+                if len(n_candidates) != 1:
+                    return None
+                n_node_map[n_object] = n_candidates[0]
+        if len(n_stale_nodes) == 0:
+            rebased_focus_node_reports[n_focus_node] = focus_node_report
+            continue
+
+        # Drop the stale copies, and copy in the current nodes.
+        n_stale_closure: typing.Set[rdflib.term.Node] = set()
+        n_pending_nodes = list(n_stale_nodes)
+        while len(n_pending_nodes) > 0:
+            n_node = n_pending_nodes.pop()
+            if n_node in n_stale_closure:
+                continue
+            n_stale_closure.add(n_node)
+            for n_object in report_graph.objects(n_node):
+                if isinstance(n_object, rdflib.BNode):
+                    n_pending_nodes.append(n_object)
+        rebased_report_graph = rdflib.Graph(bind_namespaces="core")
+        for triple in report_graph.triples((None, None, None)):
+            if triple[0] in n_stale_closure:
+                continue
+            if triple[2] in n_stale_nodes:
+                rebased_report_graph.add((triple[0], triple[1], n_node_map[triple[2]]))
+            else:
+                rebased_report_graph.add(triple)
+        for n_stale_node in n_stale_nodes:
+            pyshacl.rdfutil.clone.clone_blank_node(
+                shacl_graph, n_node_map[n_stale_node], rebased_report_graph, keepid=True
+            )
+        rebased_focus_node_reports[n_focus_node] = (
+            focus_node_report[0],
+            rebased_report_graph,
+            focus_node_report[2],
+        )
+    return rebased_focus_node_reports
+
+
+def validate_incrementally(
+    previous_data_graph: rdflib.Graph,
+    previous_focus_node_reports: FocusNodeReportsType,
+    data_graph: rdflib.Graph,
+    *args: typing.Any,
+    shacl_graph: rdflib.Graph,
+    allow_warnings: bool = False,
+    debug: bool = False,
+    jobs: int = 1,
+    **kwargs: typing.Any,
+) -> typing.Optional[FocusNodeReportsType]:
+    """
+    Revalidate only the focus nodes that the changes from the previous data graph could affect, and patch the previous per-focus-node reports with their new results.  shacl_graph is also used as the ontology graph.  Returns None if the affected focus nodes cannot be determined, in which case the whole graph should be revalidated.
+    """
+    n_affected_nodes = get_affected_focus_nodes(
+        previous_data_graph, data_graph, shacl_graph
+    )
+    if n_affected_nodes is None:
+        return None
+    _logger.debug("len(n_affected_nodes) = %d.", len(n_affected_nodes))
+    if not can_select_focus_nodes(n_affected_nodes, (data_graph, shacl_graph)):
+        _logger.info("Some affected nodes cannot be selected for pySHACL.")
+        return None
+
+    focus_node_reports = {
+        k: v
+        for (k, v) in previous_focus_node_reports.items()
+        if k not in n_affected_nodes
+    }
+    if len(n_affected_nodes) == 0:
+        return focus_node_reports
+
+    validate_result = validate_in_parallel(
+        data_graph,
+        shacl_graph=shacl_graph,
+        ont_graph=shacl_graph,
+        allow_warnings=allow_warnings,
+        debug=debug,
+        jobs=jobs,
+        focus_nodes=n_affected_nodes,
+    )
+    assert isinstance(validate_result[1], rdflib.Graph)
+    affected_focus_node_reports = split_validation_report(
+        (validate_result[0], validate_result[1], validate_result[2]),
+        (data_graph.namespace_manager, shacl_graph.namespace_manager),
+        allow_warnings,
+    )
+    if affected_focus_node_reports is None:
+        return None
+    focus_node_reports.update(affected_focus_node_reports)
+    return focus_node_reports
+
+
+def read_incremental_state(
+    path: str,
+    settings_digest: str,
+    shacl_graph: rdflib.Graph,
+) -> typing.Optional[IncrementalStateType]:
+    """
+    Load the state recorded by --incremental-state, if it exists and was recorded with the same shapes, ontology graphs and settings.  The recorded reports are rebased onto shacl_graph with `rebase_focus_node_reports`.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as in_fh:
+            state = pickle.load(in_fh)
+    except (EOFError, OSError, pickle.UnpicklingError) as e:
+        _logger.warning("Ignoring unreadable incremental state file %r: %s", path, e)
+        return None
+    if not isinstance(state, dict) or state.get("settings_digest") != settings_digest:
+        _logger.info(
+            "Incremental state file %r was recorded with other shapes or settings.",
+            path,
+        )
+        return None
+    focus_node_reports = rebase_focus_node_reports(
+        state["focus_node_reports"], shacl_graph
+    )
+    if focus_node_reports is None:
+        _logger.info(
+            "Incremental state file %r does not match the current shapes.", path
+        )
+        return None
+    state["focus_node_reports"] = focus_node_reports
+    return state
+
+
+def make_time_cycle_report_text(
+    data_graph: rdflib.Graph,
+) -> typing.Tuple[bool, str]:
+    """
+    Report the cycles in the temporal ordering that case_prov_dot computes for the graph, which indicate contradictory timestamps or time: relations.
+
+    :returns: Whether the ordering is acyclic, and the report text.
+    """
+    # case_prov_dot is only imported where it is needed.
+    from . import case_prov_dot
+
+    # Instants inferred for the ordering are only named in the report, so
+    # they are given deterministic IRIs in the default knowledge base
+    # namespace of case_prov_dot.
+    time_graph = rdflib.Graph()
+    time_graph += data_graph
+    for prefix, namespace in data_graph.namespace_manager.namespaces():
+        time_graph.namespace_manager.bind(prefix, namespace)
+    time_edges = case_prov_dot.get_graph_time_edges(
+        time_graph, rdflib.Namespace("http://example.org/kb/"), True
+    )
+    n_cycles = get_cycles(time_edges.keys())
+    report_text = "Temporal Cycle Report\n"
+    report_text += "Ordering edges: %d\n" % len(time_edges)
+    report_text += "Cycles: %d\n" % len(n_cycles)
+    for n_cycle in n_cycles:
+        report_text += make_cycle_text(
+            n_cycle, time_edges, time_graph.namespace_manager
         )
+    return len(n_cycles) == 0, report_text
+
+
+def get_chain_breaks(
+    data_graph: rdflib.Graph,
+    ontology_graph: rdflib.Graph,
+) -> typing.Tuple[
+    typing.Set[rdflib.term.IdentifiedNode],
+    typing.Set[rdflib.term.IdentifiedNode],
+    typing.List[typing.Tuple[typing.List[rdflib.term.IdentifiedNode], int]],
+]:
+    """
+    Find where provenance chains fail to link back to prov:EmptyCollection.
+
+    One breadth-first search from prov:EmptyCollection, following prov:used, prov:wasInformedBy and prov:wasDerivedFrom from object to subject, finds the grounded nodes.  Every other activity, entity, or node in those relations is stranded.  The break points are the stranded nodes, or cycles of stranded nodes, with no stranded node upstream of them.  Linking each break point to a grounded node grounds every stranded node, and no smaller set of links does.
+
+    The stranded nodes downstream of each break point are counted in one pass over the stranded nodes in topological order, carrying the set of upstream break points as a bit set.
+
+    :returns: The grounded nodes, the stranded nodes, and for each break point its member nodes and the number of stranded nodes downstream of it, including its members.  Break points are sorted by descending count.
+    """
+    # Edges run downstream, from the object to the subject of each
+    # relation.
+    downstream_adjacency: AdjacencyType = collections.defaultdict(set)
+    upstream_adjacency: AdjacencyType = collections.defaultdict(set)
+    n_linked_nodes: typing.Set[rdflib.term.IdentifiedNode] = set()
+    for n_predicate in (NS_PROV.used, NS_PROV.wasDerivedFrom, NS_PROV.wasInformedBy):
+        for n_subject, n_object in data_graph.subject_objects(n_predicate):
+            if not isinstance(n_subject, rdflib.term.IdentifiedNode):
+                continue
+            if not isinstance(n_object, rdflib.term.IdentifiedNode):
+                continue
+            downstream_adjacency[n_object].add(n_subject)
+            upstream_adjacency[n_subject].add(n_object)
+            n_linked_nodes.add(n_subject)
+            n_linked_nodes.add(n_object)
+
+    n_grounded: typing.Set[rdflib.term.IdentifiedNode] = {NS_PROV.EmptyCollection}
+    n_frontier: typing.Deque[rdflib.term.IdentifiedNode] = collections.deque(
+        [NS_PROV.EmptyCollection]
     )
+    while len(n_frontier) > 0:
+        n_node = n_frontier.popleft()
+        for n_next in downstream_adjacency.get(n_node, set()):
+            if n_next not in n_grounded:
+                n_grounded.add(n_next)
+                n_frontier.append(n_next)
 
-    # Add arguments specific to case_prov_check.
+    n_stranded = {
+        x
+        for x in (
+            get_instances(data_graph, ontology_graph, NS_PROV.Activity)
+            | get_instances(data_graph, ontology_graph, NS_PROV.Entity)
+        )
+        if isinstance(x, rdflib.term.IdentifiedNode)
+    }
+    n_stranded |= n_linked_nodes
+    n_stranded -= n_grounded
+
+    # Components are in reverse topological order.
+    components = get_strongly_connected_components(n_stranded, downstream_adjacency)
+    component_index: typing.Dict[rdflib.term.IdentifiedNode, int] = dict()
+    for x, component in enumerate(components):
+        for n_member in component:
+            component_index[n_member] = x
+
+    break_points: typing.List[typing.List[rdflib.term.IdentifiedNode]] = []
+    # Bit set of the break points upstream of each component.
+    upstream_break_points: typing.List[int] = [0] * len(components)
+    counts: typing.List[int] = []
+    for x in reversed(range(len(components))):
+        component = components[x]
+        if not any(
+            component_index.get(n_upstream) != x
+            for n_member in component
+            for n_upstream in upstream_adjacency.get(n_member, set())
+        ):
+            upstream_break_points[x] |= 1 << len(break_points)
+            break_points.append(component)
+            counts.append(0)
+        bits = upstream_break_points[x]
+        remaining_bits = bits
+        while remaining_bits:
+            lowest_bit = remaining_bits & -remaining_bits
+            counts[lowest_bit.bit_length() - 1] += len(component)
+            remaining_bits ^= lowest_bit
+        for n_member in component:
+            for n_downstream in downstream_adjacency.get(n_member, set()):
+                # Downstream nodes can also be grounded through another
+                # chain.
+                y = component_index.get(n_downstream)
+                if y is not None and y != x:
+                    upstream_break_points[y] |= bits
+
+    return (
+        n_grounded - {NS_PROV.EmptyCollection},
+        n_stranded,
+        sorted(zip(break_points, counts), key=lambda x: (-x[1], x[0])),
+    )
+
+
+def make_chain_report_text(
+    data_graph: rdflib.Graph,
+    ontology_graph: rdflib.Graph,
+) -> typing.Tuple[bool, str]:
+    """
+    Report the break points of provenance chains found by `get_chain_breaks`.
+
+    :returns: Whether every chain links back to prov:EmptyCollection, and the report text.
+    """
+    n_grounded, n_stranded, chain_breaks = get_chain_breaks(data_graph, ontology_graph)
+    report_text = "Chain Report\n"
+    report_text += "Grounded nodes: %d\n" % len(n_grounded)
+    report_text += "Stranded nodes: %d\n" % len(n_stranded)
+    if len(chain_breaks) > 0:
+        report_text += "Break points (%d):\n" % len(chain_breaks)
+    for n_members, count in chain_breaks:
+        report_text += "\t%s: %d stranded\n" % (
+            ", ".join(x.n3(data_graph.namespace_manager) for x in n_members),
+            count,
+        )
+    return len(n_stranded) == 0, report_text
+
+
+def get_hierarchy_closure(
+    n_edges: typing.Iterable[
+        typing.Tuple[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode]
+    ],
+) -> typing.Dict[rdflib.term.IdentifiedNode, typing.Set[rdflib.term.IdentifiedNode]]:
+    """
+    Get the reflexive, transitive closure of (subclass, superclass) or (subproperty, superproperty) edges.  Cycles, such as from equivalence axioms, are collapsed with `get_strongly_connected_components`, so each component's closure is computed once, from the closures of the components it reaches.
+
+    >>> a, b, c = (rdflib.URIRef("urn:example:%s" % x) for x in "abc")
+    >>> closure = get_hierarchy_closure([(a, b), (b, c), (c, b)])
+    >>> sorted(closure[a])
+    [rdflib.term.URIRef('urn:example:a'), rdflib.term.URIRef('urn:example:b'), rdflib.term.URIRef('urn:example:c')]
+    >>> sorted(closure[c])
+    [rdflib.term.URIRef('urn:example:b'), rdflib.term.URIRef('urn:example:c')]
+    """
+    adjacency: AdjacencyType = collections.defaultdict(set)
+    n_nodes: typing.Set[rdflib.term.IdentifiedNode] = set()
+    for n_subclass, n_superclass in n_edges:
+        adjacency[n_subclass].add(n_superclass)
+        n_nodes |= {n_subclass, n_superclass}
+
+    closure: typing.Dict[
+        rdflib.term.IdentifiedNode, typing.Set[rdflib.term.IdentifiedNode]
+    ] = dict()
+    for component in get_strongly_connected_components(n_nodes, adjacency):
+        component_closure = set(component)
+        for n_member in component:
+            for n_successor in adjacency.get(n_member, set()):
+                if n_successor not in component_closure:
+                    component_closure |= closure[n_successor]
+        for n_member in component:
+            closure[n_member] = component_closure
+    return closure
+
+
+def get_hierarchy_edges(
+    graphs: typing.Iterable[rdflib.Graph],
+    n_subsumption_predicate: rdflib.URIRef,
+    n_equivalence_predicate: rdflib.URIRef,
+) -> typing.Set[typing.Tuple[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode]]:
+    """
+    Get the (subclass, superclass) or (subproperty, superproperty) edges asserted in the graphs and in TARGETED_INFERENCE_AXIOMS.  Equivalence axioms give edges in both directions.
+    """
+    n_edges: typing.Set[
+        typing.Tuple[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode]
+    ] = set()
+    for graph in graphs:
+        for n_predicate in (n_subsumption_predicate, n_equivalence_predicate):
+            for n_subject, n_object in graph.subject_objects(n_predicate):
+                if not isinstance(n_subject, rdflib.term.IdentifiedNode):
+                    continue
+                if not isinstance(n_object, rdflib.term.IdentifiedNode):
+                    continue
+                n_edges.add((n_subject, n_object))
+                if n_predicate == n_equivalence_predicate:
+                    n_edges.add((n_object, n_subject))
+    for axiom in TARGETED_INFERENCE_AXIOMS:
+        if axiom[1] == n_subsumption_predicate:
+            n_edges.add((axiom[0], axiom[2]))
+    return n_edges
+
+
+def get_sparql_iris(
+    query_text: str,
+    namespace_manager: rdflib.namespace.NamespaceManager,
+) -> typing.Optional[typing.Set[rdflib.URIRef]]:
+    """
+    Get the IRIs a SPARQL query mentions, including those within property paths.  Prefixes not declared in the query are read from the namespace manager, as pySHACL does with the shapes graph's prefixes.  Returns None if the query cannot be parsed, such as for queries with pre-bound variables like $PATH substituted by pySHACL.
+
+    >>> nsm = rdflib.Graph().namespace_manager
+    >>> nsm.bind("prov", NS_PROV)
+    >>> sorted(get_sparql_iris("SELECT $this WHERE { $this a/rdfs:subClassOf* prov:Entity . }", nsm))
+    [rdflib.term.URIRef('http://www.w3.org/1999/02/22-rdf-syntax-ns#type'), rdflib.term.URIRef('http://www.w3.org/2000/01/rdf-schema#subClassOf'), rdflib.term.URIRef('http://www.w3.org/ns/prov#Entity')]
+    """
+    import rdflib.plugins.sparql
+
+    try:
+        query = rdflib.plugins.sparql.prepareQuery(
+            query_text,
+            initNs={
+                prefix: namespace
+                for prefix, namespace in namespace_manager.namespaces()
+            },
+        )
+    except Exception as e:
+        _logger.debug("Unable to parse SPARQL query: %s", e)
+        return None
+
+    n_iris: typing.Set[rdflib.URIRef] = set()
+    visited_ids: typing.Set[int] = set()
+    stack: typing.List[typing.Any] = [query.algebra]
+    while len(stack) > 0:
+        value = stack.pop()
+        if isinstance(value, rdflib.URIRef):
+            n_iris.add(value)
+        elif isinstance(value, (str, rdflib.term.Node)) or id(value) in visited_ids:
+            continue
+        elif isinstance(value, dict):
+            visited_ids.add(id(value))
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            visited_ids.add(id(value))
+            stack.extend(value)
+        elif isinstance(value, rdflib.paths.Path):
+            visited_ids.add(id(value))
+            stack.extend(vars(value).values())
+    return n_iris
+
+
+def get_observed_iris(
+    shacl_graph: rdflib.Graph,
+) -> typing.Optional[typing.Set[rdflib.URIRef]]:
+    """
+    Get the classes and predicates the shapes can observe in the data graph: those of targets, property paths, sh:class and property pair constraints, and those mentioned in SPARQL queries.  Returns None if the shapes can observe any class or predicate, such as with closed shapes, JavaScript constraints, or SPARQL queries that cannot be parsed.
+    """
+    n_observed_iris: typing.Set[rdflib.URIRef] = {NS_RDF.type}
+
+    n_iri_parameters = {
+        NS_SH._NS["class"],
+        NS_SH.targetClass,
+        NS_SH.targetObjectsOf,
+        NS_SH.targetSubjectsOf,
+    } | PROPERTY_PAIR_PARAMETERS
+    for n_parameter in n_iri_parameters:
+        for n_object in shacl_graph.objects(None, n_parameter):
+            if isinstance(n_object, rdflib.URIRef):
+                n_observed_iris.add(n_object)
+
+    # Shapes that are also classes target their instances.
+    for n_shape_class in (NS_SH.NodeShape, NS_SH.PropertyShape):
+        for n_shape in shacl_graph.subjects(NS_RDF.type, n_shape_class):
+            if not isinstance(n_shape, rdflib.URIRef):
+                continue
+            for n_class_class in (NS_RDFS.Class, rdflib.OWL.Class):
+                if (n_shape, NS_RDF.type, n_class_class) in shacl_graph:
+                    n_observed_iris.add(n_shape)
+
+    # Property paths are walked through their blank node structure.
+    n_frontier: typing.List[rdflib.term.Node] = list(
+        shacl_graph.objects(None, NS_SH.path)
+    )
+    n_visited_paths: typing.Set[rdflib.term.Node] = set()
+    while len(n_frontier) > 0:
+        n_path = n_frontier.pop()
+        if isinstance(n_path, rdflib.URIRef):
+            if n_path != NS_RDF.nil:
+                n_observed_iris.add(n_path)
+        elif isinstance(n_path, rdflib.BNode) and n_path not in n_visited_paths:
+            n_visited_paths.add(n_path)
+            n_frontier.extend(shacl_graph.objects(n_path, None))
+
+    if (None, NS_SH.closed, rdflib.Literal(True)) in shacl_graph:
+        _logger.debug("Closed shapes can observe any predicate.")
+        return None
+    if (None, NS_SH.js, None) in shacl_graph:
+        _logger.debug("JavaScript constraints can observe any class or predicate.")
+        return None
+    for n_parameter in SPARQL_QUERY_PARAMETERS:
+        for l_query in shacl_graph.objects(None, n_parameter):
+            n_query_iris = get_sparql_iris(str(l_query), shacl_graph.namespace_manager)
+            if n_query_iris is None:
+                return None
+            n_observed_iris |= n_query_iris
+
+    return n_observed_iris
+
+
+def get_targeted_entailments(
+    data_graph: rdflib.Graph,
+    shacl_graph: rdflib.Graph,
+    ont_graph: rdflib.Graph,
+) -> typing.Set[typing.Tuple[rdflib.term.Node, rdflib.term.Node, rdflib.term.Node]]:
+    """
+    Get the RDFS entailments of the data graph that the shapes can observe, for --inference targeted.  Types are entailed from subclass, domain, and range axioms, and triples from subproperty axioms, but only for the classes and predicates `get_observed_iris` finds in the shapes.  The hierarchy is read from all graphs and TARGETED_INFERENCE_AXIOMS, and closed once with `get_hierarchy_closure`, so each data triple is visited once.
+    """
+    graphs: typing.List[rdflib.Graph] = []
+    for graph in (data_graph, shacl_graph, ont_graph):
+        if not any(graph is x for x in graphs):
+            graphs.append(graph)
+
+    class_closure = get_hierarchy_closure(
+        get_hierarchy_edges(graphs, NS_RDFS.subClassOf, rdflib.OWL.equivalentClass)
+    )
+    property_closure = get_hierarchy_closure(
+        get_hierarchy_edges(
+            graphs, NS_RDFS.subPropertyOf, rdflib.OWL.equivalentProperty
+        )
+    )
+    n_domains: typing.DefaultDict[rdflib.term.Node, typing.Set[rdflib.term.Node]] = (
+        collections.defaultdict(set)
+    )
+    n_ranges: typing.DefaultDict[rdflib.term.Node, typing.Set[rdflib.term.Node]] = (
+        collections.defaultdict(set)
+    )
+    for graph in graphs:
+        for n_property, n_class in graph.subject_objects(NS_RDFS.domain):
+            n_domains[n_property].add(n_class)
+        for n_property, n_class in graph.subject_objects(NS_RDFS.range):
+            n_ranges[n_property].add(n_class)
+
+    n_observed_iris = get_observed_iris(shacl_graph)
+
+    def _observed_superclasses(
+        n_classes: typing.Iterable[rdflib.term.Node],
+    ) -> typing.Set[rdflib.term.Node]:
+        n_superclasses: typing.Set[rdflib.term.Node] = set()
+        for n_class in n_classes:
+            if isinstance(n_class, rdflib.term.IdentifiedNode):
+                n_superclasses |= class_closure.get(n_class, {n_class})
+        if n_observed_iris is None:
+            return n_superclasses
+        return {x for x in n_superclasses if x in n_observed_iris}
+
+    # Class -> observed superclasses.
+    n_class_entailments: typing.Dict[rdflib.term.Node, typing.Set[rdflib.term.Node]] = (
+        dict()
+    )
+    # Predicate -> (observed superproperties, observed subject types,
+    # observed object types).
+    n_predicate_entailments: typing.Dict[
+        rdflib.term.Node,
+        typing.Tuple[
+            typing.Set[rdflib.term.Node],
+            typing.Set[rdflib.term.Node],
+            typing.Set[rdflib.term.Node],
+        ],
+    ] = dict()
+
+    entailments: typing.Set[
+        typing.Tuple[rdflib.term.Node, rdflib.term.Node, rdflib.term.Node]
+    ] = set()
+    n_rdf_type = NS_RDF.type
+    for n_subject, n_predicate, n_object in data_graph:
+        if n_predicate == n_rdf_type:
+            if n_object not in n_class_entailments:
+                n_class_entailments[n_object] = _observed_superclasses([n_object]) - {
+                    n_object
+                }
+            for n_superclass in n_class_entailments[n_object]:
+                entailments.add((n_subject, n_rdf_type, n_superclass))
+            continue
+
+        if n_predicate not in n_predicate_entailments:
+            n_superproperties: typing.Set[rdflib.term.Node] = set()
+            if isinstance(n_predicate, rdflib.term.IdentifiedNode):
+                n_superproperties = set(
+                    property_closure.get(n_predicate, {n_predicate})
+                )
+            n_predicate_entailments[n_predicate] = (
+                {
+                    x
+                    for x in n_superproperties
+                    if x != n_predicate
+                    and (n_observed_iris is None or x in n_observed_iris)
+                },
+                _observed_superclasses(
+                    y for x in n_superproperties for y in n_domains.get(x, set())
+                ),
+                _observed_superclasses(
+                    y for x in n_superproperties for y in n_ranges.get(x, set())
+                ),
+            )
+        (
+            n_superproperties,
+            n_subject_classes,
+            n_object_classes,
+        ) = n_predicate_entailments[n_predicate]
+        for n_superproperty in n_superproperties:
+            entailments.add((n_subject, n_superproperty, n_object))
+        for n_class in n_subject_classes:
+            entailments.add((n_subject, n_rdf_type, n_class))
+        if not isinstance(n_object, rdflib.Literal):
+            for n_class in n_object_classes:
+                entailments.add((n_object, n_rdf_type, n_class))
+
+    return {x for x in entailments if x not in data_graph}
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the options of case_prov_check, without its positional arguments, to an argument parser.
+    """
     parser.add_argument("-d", "--debug", action="store_true")
     parser.add_argument(
         "--ontology-graph",
@@ -67,6 +1698,44 @@ def main() -> None:
         help="Combined ontology (i.e. subclass hierarchy) and shapes (SHACL) file, in any format accepted by rdflib recognized by file extension (e.g. .ttl).  Will supplement ontology selected by --built-version.  Can be given multiple times.",
     )
 
+    parser.add_argument(
+        "--engine",
+        choices=("native", "pyshacl"),
+        default="pyshacl",
+        help='Choose the validation engine.  "native" computes the results of the case_prov shapes with set operations instead of SPARQL queries, and validates any --ontology-graph shapes with pyshacl.  "native" does not implement --abort, --imports, or --inference other than targeted, and will use pyshacl if any of those are requested.  Default is "pyshacl".',
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for caching the parsed shapes and --ontology-graph files, keyed by their contents.  Default is case_prov under $XDG_CACHE_HOME (or ~/.cache).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse the shapes and --ontology-graph files without reading or writing the cache.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes to validate with pyshacl.  The focus nodes are divided among forked processes sharing the data graph, and their reports are merged into the report a single process would produce.  Validation runs in one process if --abort, --imports, or --inference other than targeted is requested, or if any focus node is a blank node.  Default is 1.",
+    )
+
+    parser.add_argument(
+        "--chain-report",
+        action="store_true",
+        help="Instead of validating, report the break points where chains of prov:used, prov:wasInformedBy, and prov:wasDerivedFrom fail to link back to prov:EmptyCollection, with the number of nodes stranded downstream of each.  The report is computed in one traversal of the graph.  Exit status is 1 if any node is stranded.",
+    )
+    parser.add_argument(
+        "--time-cycle-report",
+        action="store_true",
+        help="Instead of validating, report the cycles in the temporal ordering that case_prov_dot derives from timestamps and time: relations, which indicate contradictory data.  Each cycle is reported with its ordering edges and the triples that produced them.  Exit status is 1 if any cycle is found.",
+    )
+    parser.add_argument(
+        "--incremental-state",
+        help="File recording the data graph and the results of each focus node from the last run.  If the file was recorded with the same shapes, ontology graphs and settings, only the focus nodes that the data graph's changes could affect are revalidated, and the recorded results are patched with theirs.  The file is rewritten after validation.  Not available with --abort, --imports, or --inference other than targeted.  The file is a pickle, so it should only be writable by its user.",
+    )
+
     # Inherit arguments from pyshacl.  (Sorted by '--' form.)
     parser.add_argument(
         "--abort",
@@ -95,9 +1764,9 @@ def main() -> None:
     parser.add_argument(
         "-i",
         "--inference",
-        choices=("none", "rdfs", "owlrl", "both"),
+        choices=("none", "rdfs", "owlrl", "both", "targeted"),
         default="none",
-        help='(As with pyshacl CLI) Choose a type of inferencing to run against the Data Graph before validating. Default is "none".',
+        help='(ALMOST as with pyshacl CLI) Choose a type of inferencing to run against the Data Graph before validating. Default is "none".  Difference: "targeted" adds only the RDFS type and subproperty entailments of classes and predicates the shapes can observe, reading the class and property hierarchy from the data and ontology graphs and the OWL-Time alignments case_prov_rdf applies.  Unlike the other inferencing types, "targeted" is available with the native engine, --jobs and --incremental-state.',
     )
     parser.add_argument(
         "-o",
@@ -109,15 +1778,11 @@ def main() -> None:
         default=sys.stdout,
     )
 
-    parser.add_argument("in_graph", nargs="+")
-
-    args = parser.parse_args()
-
-    data_graph = rdflib.Graph()
-    for in_graph in args.in_graph:
-        _logger.debug("in_graph = %r.", in_graph)
-        data_graph.parse(in_graph)
 
+def get_shapes_sources() -> typing.List[GraphSourceType]:
+    """
+    Get the sources of the shapes in the case_prov.shapes package.
+    """
     # Resource file loading c/o https://stackoverflow.com/a/20885799
     shape_filenames = []
     for resource_filename in importlib.resources.contents(shapes):
@@ -125,38 +1790,235 @@ def main() -> None:
             shape_filenames.append(resource_filename)
     assert len(shape_filenames) > 0, "Failed to load list of shapes files."
 
-    # Do initial ontology_graph load from any supplementally requested ontology-graph files.
-    # Such graphs may be an influence in OWL or RDFS inferencing.
-    ontology_graph = rdflib.Graph()
-    if args.ontology_graph:
-        for arg_ontology_graph in args.ontology_graph:
-            _logger.debug("arg_ontology_graph = %r.", arg_ontology_graph)
-            ontology_graph.parse(arg_ontology_graph)
-    # Load case_prov shapes into ontology_graph.
+    shapes_sources: typing.List[GraphSourceType] = []
     for shape_filename in shape_filenames:
         _logger.debug("Loading shapes in %r." % shape_filename)
         shapes_text = importlib.resources.read_text(shapes, shape_filename)
-        ontology_graph.parse(data=shapes_text, format="turtle")
+        shapes_sources.append((shape_filename, shapes_text.encode(), "turtle"))
+    return shapes_sources
+
+
+def get_ontology_graph_sources(
+    ontology_graph_files: typing.Optional[typing.Sequence[str]],
+) -> typing.List[GraphSourceType]:
+    """
+    Get the sources of the files given with --ontology-graph.  Such graphs may be an influence in OWL or RDFS inferencing.
+    """
+    ontology_graph_sources: typing.List[GraphSourceType] = []
+    for ontology_graph_file in ontology_graph_files or []:
+        _logger.debug("ontology_graph_file = %r.", ontology_graph_file)
+        with open(ontology_graph_file, "rb") as in_fh:
+            ontology_graph_sources.append((ontology_graph_file, in_fh.read(), None))
+    return ontology_graph_sources
+
+
+def get_cache_dir(args: argparse.Namespace) -> typing.Optional[str]:
+    """
+    Get the cache directory requested by --cache-dir and --no-cache.
+    """
+    if args.no_cache:
+        return None
+    return str(args.cache_dir or get_default_cache_dir())
+
+
+def check_graph(
+    args: argparse.Namespace,
+    data_sources: typing.Sequence[GraphSourceType] = (),
+    data_graph: typing.Optional[rdflib.Graph] = None,
+) -> typing.Tuple[bool, typing.Union[Exception, bytes, str, rdflib.Graph], str]:
+    """
+    Validate the data as case_prov_check does, returning the same (conforms, report graph, report text) tuple as `pyshacl.validate`.  args is a namespace of the options added by `add_arguments`.
+
+    :param data_sources: The data graph files.  Ignored if data_graph is given.
+    :param data_graph: An already loaded data graph.  --incremental-state then revalidates from the changes since the recorded graph, as no file digest is available.
+    """
+    import pyshacl
+
+    # Inferencing that only pySHACL implements.
+    full_inference = args.inference not in ("none", "targeted")
+
+    engine = args.engine
+    if engine == "native" and (args.abort or args.imports or full_inference):
+        _logger.info(
+            "Native engine does not implement --abort, --imports, or --inference other than targeted.  Using pyshacl."
+        )
+        engine = "pyshacl"
+
+    ontology_graph_sources = get_ontology_graph_sources(args.ontology_graph)
+    shapes_sources = get_shapes_sources()
+    cache_dir = get_cache_dir(args)
+    ontology_graph = load_graph(ontology_graph_sources + shapes_sources, cache_dir)
+    # The supplemental graph is kept separately for the native engine.
+    supplemental_ontology_graph: typing.Optional[rdflib.Graph] = None
+    if engine == "native" and len(ontology_graph_sources) > 0:
+        supplemental_ontology_graph = load_graph(ontology_graph_sources, cache_dir)
+
+    incremental_state_path: typing.Optional[str] = args.incremental_state
+    if incremental_state_path is not None and (
+        args.abort or args.imports or full_inference
+    ):
+        _logger.info(
+            "Incremental validation is not available with --abort, --imports, or --inference other than targeted."
+        )
+        incremental_state_path = None
+
+    serialize_report_graph = args.format if args.format != "human" else False
+
+    # Results of each focus node, when validating incrementally.
+    focus_node_reports: typing.Optional[FocusNodeReportsType] = None
+    # The digest is only known for data files.
+    data_digest: typing.Optional[str] = None
+    if data_graph is None:
+        data_digest = get_sources_digest(data_sources)
+    settings_digest = get_sources_digest(
+        ontology_graph_sources + shapes_sources,
+        "allow_warnings=%s" % bool(args.allow_warnings),
+        "inference=%s" % args.inference,
+    )
+    incremental_state: typing.Optional[IncrementalStateType] = None
+    if incremental_state_path is not None:
+        incremental_state = read_incremental_state(
+            incremental_state_path, settings_digest, ontology_graph
+        )
+    data_unchanged = (
+        incremental_state is not None
+        and data_digest is not None
+        and incremental_state["data_digest"] == data_digest
+    )
+    if data_unchanged:
+        assert incremental_state is not None
+        _logger.debug("Data graph is unchanged since the incremental state.")
+        data_graph = incremental_state["data_graph"]
+        focus_node_reports = incremental_state["focus_node_reports"]
+    else:
+        if data_graph is None:
+            data_graph = load_graph(data_sources)
+        elif args.inference == "targeted":
+            # Entailments are added to a copy, leaving the caller's graph
+            # as it was.
+            copied_data_graph = rdflib.Graph()
+            for prefix, namespace in data_graph.namespace_manager.namespaces():
+                copied_data_graph.namespace_manager.bind(
+                    prefix, namespace, override=True
+                )
+            copied_data_graph += data_graph
+            data_graph = copied_data_graph
+        if args.inference == "targeted":
+            entailments = get_targeted_entailments(
+                data_graph, ontology_graph, ontology_graph
+            )
+            _logger.debug("len(entailments) = %d.", len(entailments))
+            for entailment in entailments:
+                data_graph.add(entailment)
+        if incremental_state is not None:
+            focus_node_reports = validate_incrementally(
+                incremental_state["data_graph"],
+                incremental_state["focus_node_reports"],
+                data_graph,
+                shacl_graph=ontology_graph,
+                allow_warnings=True if args.allow_warnings else False,
+                debug=True if args.debug else False,
+                jobs=args.jobs,
+            )
+            if focus_node_reports is None:
+                _logger.info("Revalidating the whole data graph.")
 
     validate_result: typing.Tuple[
         bool, typing.Union[Exception, bytes, str, rdflib.Graph], str
     ]
-    validate_result = pyshacl.validate(
-        data_graph,
-        shacl_graph=ontology_graph,
-        ont_graph=ontology_graph,
-        inference=args.inference,
-        abort_on_first=args.abort,
-        allow_warnings=True if args.allow_warnings else False,
-        debug=True if args.debug else False,
-        do_owl_imports=True if args.imports else False,
-        serialize_report_graph=args.format if args.format != "human" else False,
-    )
+    if focus_node_reports is not None:
+        validate_result = merge_validation_reports(
+            [focus_node_reports[x] for x in sorted(focus_node_reports)],
+            ontology_graph,
+        )
+    elif engine == "native":
+        validate_result = validate_natively(
+            data_graph,
+            shacl_graph=ontology_graph,
+            supplemental_shacl_graph=supplemental_ontology_graph,
+            allow_warnings=True if args.allow_warnings else False,
+            debug=True if args.debug else False,
+            jobs=args.jobs,
+            serialize_report_graph=(
+                False if incremental_state_path is not None else serialize_report_graph
+            ),
+        )
+    elif args.jobs > 1 and not (args.abort or args.imports or full_inference):
+        validate_result = validate_in_parallel(
+            data_graph,
+            shacl_graph=ontology_graph,
+            ont_graph=ontology_graph,
+            allow_warnings=True if args.allow_warnings else False,
+            debug=True if args.debug else False,
+            jobs=args.jobs,
+            serialize_report_graph=(
+                False if incremental_state_path is not None else serialize_report_graph
+            ),
+        )
+    else:
+        validate_result = pyshacl.validate(
+            data_graph,
+            shacl_graph=ontology_graph,
+            ont_graph=ontology_graph,
+            inference=args.inference if full_inference else "none",
+            abort_on_first=args.abort,
+            allow_warnings=True if args.allow_warnings else False,
+            debug=True if args.debug else False,
+            do_owl_imports=True if args.imports else False,
+            serialize_report_graph=(
+                False if incremental_state_path is not None else serialize_report_graph
+            ),
+        )
+
+    if incremental_state_path is not None:
+        assert isinstance(validate_result[1], rdflib.Graph)
+        report: ValidationReportType = (
+            validate_result[0],
+            validate_result[1],
+            validate_result[2],
+        )
+        if not data_unchanged:
+            if focus_node_reports is None:
+                focus_node_reports = split_validation_report(
+                    report,
+                    (data_graph.namespace_manager, ontology_graph.namespace_manager),
+                    True if args.allow_warnings else False,
+                )
+            if focus_node_reports is None:
+                _logger.info(
+                    "Unable to record the results of each focus node.  Incremental state not written."
+                )
+            else:
+                try:
+                    write_pickle(
+                        incremental_state_path,
+                        {
+                            "data_digest": data_digest,
+                            "data_graph": data_graph,
+                            "focus_node_reports": focus_node_reports,
+                            "settings_digest": settings_digest,
+                        },
+                    )
+                except OSError as e:
+                    _logger.warning(
+                        "Unable to write incremental state file %r: %s",
+                        incremental_state_path,
+                        e,
+                    )
+        validate_result = serialize_validation_report(report, serialize_report_graph)
+
+    return validate_result
 
-    # Relieve RAM of the data graph after validation has run.
-    del data_graph
 
-    conforms = validate_result[0]
+def write_report(
+    args: argparse.Namespace,
+    validate_result: typing.Tuple[
+        bool, typing.Union[Exception, bytes, str, rdflib.Graph], str
+    ],
+) -> None:
+    """
+    Write a validation report to --output in the --format requested.
+    """
     validation_graph = validate_result[1]
     validation_text = validate_result[2]
 
@@ -179,8 +2041,56 @@ def main() -> None:
                 "Unexpected result type returned from validate: %r."
                 % type(validation_graph)
             )
+    args.output.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CASE provenance reviewer")
+
+    # Configure debug logging before running parse_args, because there
+    # could be an error raised before the construction of the argument
+    # parser.
+    logging.basicConfig(
+        level=(
+            logging.DEBUG
+            if ("--debug" in sys.argv or "-d" in sys.argv)
+            else logging.INFO
+        )
+    )
+
+    add_arguments(parser)
+    parser.add_argument("in_graph", nargs="+")
+
+    args = parser.parse_args()
+
+    data_sources: typing.List[GraphSourceType] = []
+    for in_graph in args.in_graph:
+        _logger.debug("in_graph = %r.", in_graph)
+        with compressed_io.open_input(in_graph) as in_fh:
+            data_sources.append((in_graph, in_fh.read(), None))
+
+    if args.chain_report:
+        ontology_graph = load_graph(
+            get_ontology_graph_sources(args.ontology_graph) + get_shapes_sources(),
+            get_cache_dir(args),
+        )
+        chains_complete, chain_report_text = make_chain_report_text(
+            load_graph(data_sources), ontology_graph
+        )
+        args.output.write(chain_report_text)
+        sys.exit(0 if chains_complete else 1)
+
+    if args.time_cycle_report:
+        time_acyclic, time_cycle_report_text = make_time_cycle_report_text(
+            load_graph(data_sources)
+        )
+        args.output.write(time_cycle_report_text)
+        sys.exit(0 if time_acyclic else 1)
+
+    validate_result = check_graph(args, data_sources)
+    write_report(args, validate_result)
 
-    sys.exit(0 if conforms else 1)
+    sys.exit(0 if validate_result[0] else 1)
 
 
 if __name__ == "__main__":
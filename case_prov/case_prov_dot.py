@@ -33,27 +33,48 @@ prov:Activities and uco-action:Actions are further assumed to be time:Intervals.
 __version__ = "0.6.0"
 
 import argparse
+import bisect
 import collections
+import contextlib
 import copy
+import datetime
 import hashlib
 import logging
 import os
+import sys
 import textwrap
 import typing
 import uuid
 
-import case_utils.inherent_uuid
 import cdo_local_uuid
-import prov.constants  # type: ignore
-import prov.dot  # type: ignore
-import prov.identifier  # type: ignore
-import pydot
-import rdflib.plugins.sparql
-from case_utils.namespace import NS_CASE_INVESTIGATION, NS_RDF, NS_RDFS, NS_UCO_CORE
+import rdflib
+from case_utils.namespace import (
+    NS_CASE_INVESTIGATION,
+    NS_RDF,
+    NS_RDFS,
+    NS_UCO_ACTION,
+    NS_UCO_CORE,
+)
 from cdo_local_uuid import local_uuid
 
 import case_prov
 
+from . import compressed_io, query_execution, reachability, snapshot
+from .digraph import (
+    AdjacencyType,
+    EdgeSourcesType,
+    TripleType,
+    get_cycles,
+    make_cycle_text,
+)
+
+# prov.dot, which imports networkx, pydot, and case_utils.inherent_uuid
+# are imported only on the code paths that use them, to keep start-up
+# fast for --help and small graphs.
+if typing.TYPE_CHECKING:
+    import prov.identifier  # type: ignore
+    import pydot
+
 _logger = logging.getLogger(os.path.basename(__file__))
 
 NS_EPHEMERAL = rdflib.Namespace("urn:example:ephemeral:")
@@ -62,8 +83,12 @@ NS_TIME = rdflib.TIME
 
 
 def clone_style(
-    prov_constant: typing.Union[prov.identifier.QualifiedName, rdflib.URIRef],
+    prov_constant: typing.Union["prov.identifier.QualifiedName", rdflib.URIRef],
 ) -> typing.Dict[str, str]:
+    import prov.constants  # type: ignore
+    import prov.dot  # type: ignore
+    import prov.identifier
+
     retval: typing.Dict[str, str]
     if prov_constant == NS_PROV.Collection:
         retval = copy.deepcopy(prov.dot.DOT_PROV_STYLE[prov.constants.PROV_ENTITY])
@@ -177,6 +202,48 @@ def linked_temporal_entities(
     return linked_temporal_entities
 
 
+def define_witnesses(
+    n_terminus_instant: rdflib.term.IdentifiedNode,
+    n_wrapping_interval: rdflib.term.IdentifiedNode,
+    n_relating_predicate: rdflib.term.URIRef,
+    ns_kb: rdflib.Namespace,
+    use_deterministic_uuids: bool,
+) -> case_prov.TmpTriplesType:
+    """
+    Define a "witness" time:Instant inside n_wrapping_interval known to follow n_terminus_instant.  See the discussion of witnesses in `expand_prov_activities_with_owl_time`.
+    """
+    tmp_triples: case_prov.TmpTriplesType = set()
+    n_witness: rdflib.term.IdentifiedNode
+    if isinstance(n_terminus_instant, rdflib.URIRef) and isinstance(
+        n_wrapping_interval, rdflib.URIRef
+    ):
+        if use_deterministic_uuids:
+            import case_utils.inherent_uuid
+
+            base_uuid_namespace = case_utils.inherent_uuid.inherence_uuid(
+                n_wrapping_interval
+            )
+            uuid_namespace = base_uuid_namespace
+            for n_thing in [
+                n_relating_predicate,
+                n_terminus_instant,
+                NS_TIME.after,
+            ]:
+                uuid_namespace = uuid.uuid5(uuid_namespace, n_thing)
+            node_uuid = str(uuid_namespace)
+        else:
+            node_uuid = local_uuid()
+        n_witness = ns_kb["Instant-" + node_uuid]
+    else:
+        n_witness = rdflib.BNode()
+    tmp_triples.add((n_witness, NS_RDF.type, NS_TIME.Instant))
+    tmp_triples.add((n_witness, NS_RDF.type, NS_EPHEMERAL.WitnessInstant))
+    tmp_triples.add((n_wrapping_interval, NS_TIME.inside, n_witness))
+    tmp_triples.add((n_witness, NS_TIME.after, n_terminus_instant))
+    tmp_triples.add((n_witness, NS_EPHEMERAL.witnesses, n_terminus_instant))
+    return tmp_triples
+
+
 def expand_prov_activities_with_owl_time(
     graph: rdflib.Graph,
     ns_kb: rdflib.Namespace,
@@ -191,7 +258,10 @@ def expand_prov_activities_with_owl_time(
     While most of this is done with SPARQL CONSTRUCT queries, there is a step in converting from xsd:dateTime to xsd:dateTimeStamp that, at this time, appears to require data validation that is more difficult to perform in SPARQL than in Python.
     """
 
-    debug_graph = rdflib.Graph()
+    # The debug graph is only built if it will be written.
+    debug_graph: typing.Optional[rdflib.Graph] = (
+        None if debug_graph_fh is None else rdflib.Graph()
+    )
 
     def _dump_augments(
         tmp_triples: typing.Union[rdflib.Graph, case_prov.TmpTriplesType],
@@ -203,24 +273,29 @@ def expand_prov_activities_with_owl_time(
         if isinstance(tmp_triples, rdflib.Graph):
             for triple in tmp_triples.triples((None, None, None)):
                 graph.add(triple)
-                debug_graph.add(triple)
+                if debug_graph is not None:
+                    debug_graph.add(triple)
         else:
             for triple in tmp_triples:
                 # _logger.debug("triple = %r.", triple)
                 graph.add(triple)
-                debug_graph.add(triple)
+                if debug_graph is not None:
+                    debug_graph.add(triple)
 
     def _build_augments_from_query(query: str) -> None:
         # _logger.debug("query = %r.", query)
         tmp_triples: case_prov.TmpTriplesType = set()
-        for result in graph.query(query):
-            # _logger.debug(result)
-            assert isinstance(result, tuple)
-            assert isinstance(result[0], rdflib.term.IdentifiedNode)
-            assert isinstance(result[1], rdflib.URIRef)
-            assert isinstance(result[2], rdflib.term.Node)
-            tmp_triples.add((result[0], result[1], result[2]))
-        _dump_augments(tmp_triples)
+        with query_execution.execute_query(
+            graph, query, target_graph=graph, stacklevel=2
+        ) as results:
+            for result in results:
+                # _logger.debug(result)
+                assert isinstance(result, tuple)
+                assert isinstance(result[0], rdflib.term.IdentifiedNode)
+                assert isinstance(result[1], rdflib.URIRef)
+                assert isinstance(result[2], rdflib.term.Node)
+                tmp_triples.add((result[0], result[1], result[2]))
+            _dump_augments(tmp_triples)
 
     # Do some manual domain inference.  (This subroutine depends on
     # prov:Activity types being explicit for some queries binding new
@@ -305,10 +380,11 @@ WHERE {
             del end_graph
 
     def _fail_on_find(query: str) -> None:
-        for result in graph.query(query):
-            _logger.debug(query)
-            _logger.debug(result)
-            raise ValueError("Found result indicating process failure.")
+        with query_execution.execute_query(graph, query, stacklevel=2) as results:
+            for result in results:
+                _logger.debug(query)
+                _logger.debug(result)
+                raise ValueError("Found result indicating process failure.")
 
     query = """\
 SELECT ?nActivity
@@ -396,20 +472,23 @@ WHERE {
     def _build_datetimestamp_augments_from_query(query: str) -> None:
         _logger.debug("query = %r.", query)
         tmp_triples: case_prov.TmpTriplesType = set()
-        for result in graph.query(query):
-            assert isinstance(result, rdflib.query.ResultRow)
-            assert isinstance(result[0], rdflib.term.IdentifiedNode)
-            assert isinstance(result[1], rdflib.term.Literal)
-            l_datetimestamp = case_prov.xsd_datetime_to_xsd_datetimestamp(result[1])
-            if l_datetimestamp is not None:
-                tmp_triples.add(
-                    (
-                        result[0],
-                        NS_TIME.inXSDDateTimeStamp,
-                        l_datetimestamp,
+        with query_execution.execute_query(
+            graph, query, target_graph=graph, stacklevel=2
+        ) as results:
+            for result in results:
+                assert isinstance(result, rdflib.query.ResultRow)
+                assert isinstance(result[0], rdflib.term.IdentifiedNode)
+                assert isinstance(result[1], rdflib.term.Literal)
+                l_datetimestamp = case_prov.xsd_datetime_to_xsd_datetimestamp(result[1])
+                if l_datetimestamp is not None:
+                    tmp_triples.add(
+                        (
+                            result[0],
+                            NS_TIME.inXSDDateTimeStamp,
+                            l_datetimestamp,
+                        )
                     )
-                )
-        _dump_augments(tmp_triples)
+            _dump_augments(tmp_triples)
 
     # Find from prov literal values in Event.
     query = """\
@@ -548,40 +627,6 @@ WHERE {
     # "witness" instant somewhere in j is known to exist and follow i_e,
     # somewhere in the region illustrated above with 'x's.
 
-    def _define_witnesses(
-        n_terminus_instant: rdflib.term.IdentifiedNode,
-        n_wrapping_interval: rdflib.term.IdentifiedNode,
-        n_relating_predicate: rdflib.term.URIRef,
-    ) -> case_prov.TmpTriplesType:
-        tmp_triples: case_prov.TmpTriplesType = set()
-        n_witness: rdflib.term.IdentifiedNode
-        if isinstance(n_terminus_instant, rdflib.URIRef) and isinstance(
-            n_wrapping_interval, rdflib.URIRef
-        ):
-            if use_deterministic_uuids:
-                base_uuid_namespace = case_utils.inherent_uuid.inherence_uuid(
-                    n_wrapping_interval
-                )
-                uuid_namespace = base_uuid_namespace
-                for n_thing in [
-                    n_relating_predicate,
-                    n_terminus_instant,
-                    NS_TIME.after,
-                ]:
-                    uuid_namespace = uuid.uuid5(uuid_namespace, n_thing)
-                node_uuid = str(uuid_namespace)
-            else:
-                node_uuid = local_uuid()
-            n_witness = ns_kb["Instant-" + node_uuid]
-        else:
-            n_witness = rdflib.BNode()
-        tmp_triples.add((n_witness, NS_RDF.type, NS_TIME.Instant))
-        tmp_triples.add((n_witness, NS_RDF.type, NS_EPHEMERAL.WitnessInstant))
-        tmp_triples.add((n_wrapping_interval, NS_TIME.inside, n_witness))
-        tmp_triples.add((n_witness, NS_TIME.after, n_terminus_instant))
-        tmp_triples.add((n_witness, NS_EPHEMERAL.witnesses, n_terminus_instant))
-        return tmp_triples
-
     witness_tmp_triples: case_prov.TmpTriplesType = set()
     for n_predicate, n_inverse_predicate in [
         (NS_TIME.intervalOverlaps, NS_TIME.intervalOverlappedBy),
@@ -597,16 +642,765 @@ WHERE {
                 # follows the end(s) of i.
                 n_instant_i_es = get_ends(graph, n_interval_i)
                 for n_instant_i_e in sorted(n_instant_i_es):
-                    predicate_tmp_triples = _define_witnesses(
-                        n_instant_i_e, n_interval_j, n_predicate
+                    predicate_tmp_triples = define_witnesses(
+                        n_instant_i_e,
+                        n_interval_j,
+                        n_predicate,
+                        ns_kb,
+                        use_deterministic_uuids,
                     )
                     witness_tmp_triples |= predicate_tmp_triples
     _dump_augments(witness_tmp_triples)
 
     if debug_graph_fh is not None:
+        assert debug_graph is not None
+        debug_graph_fh.write(debug_graph.serialize(format="longturtle"))
+
+
+def expand_prov_activities_with_owl_time_indexed(
+    graph: rdflib.Graph,
+    ns_kb: rdflib.Namespace,
+    use_deterministic_uuids: bool,
+    *args: typing.Any,
+    debug_graph_fh: typing.Optional[typing.TextIO] = None,
+    **kwargs: typing.Any,
+) -> None:
+    """
+    This procedure performs the same entailments as `expand_prov_activities_with_owl_time`, in the same order.  Instead of running a SPARQL query per entailment step, it retrieves each pertinent predicate and class from the graph once, into in-memory indexes that are kept current as augmenting triples are devised.  The augmenting triples are written to the graph with one bulk `addN` call at the end, and the debug graph is only built if debug_graph_fh is provided.
+
+    New nodes are defined in the same sequence as in `expand_prov_activities_with_owl_time`, so the two procedures produce the same graph (up to blank node identifiers), whether or not deterministic UUIDs are used.
+    """
+
+    NodeIndexType = typing.DefaultDict[
+        rdflib.term.IdentifiedNode, typing.Set[rdflib.term.IdentifiedNode]
+    ]
+    LiteralIndexType = typing.DefaultDict[
+        rdflib.term.IdentifiedNode, typing.Set[rdflib.term.Node]
+    ]
+
+    def _index_objects(n_predicate: rdflib.URIRef) -> NodeIndexType:
+        index: NodeIndexType = collections.defaultdict(set)
+        for n_subject, n_object in graph.subject_objects(n_predicate):
+            assert isinstance(n_subject, rdflib.term.IdentifiedNode)
+            assert isinstance(n_object, rdflib.term.IdentifiedNode)
+            index[n_subject].add(n_object)
+        return index
+
+    def _index_values(n_predicate: rdflib.URIRef) -> LiteralIndexType:
+        index: LiteralIndexType = collections.defaultdict(set)
+        for n_subject, n_object in graph.subject_objects(n_predicate):
+            assert isinstance(n_subject, rdflib.term.IdentifiedNode)
+            index[n_subject].add(n_object)
+        return index
+
+    def _index_instances(
+        n_class: rdflib.URIRef,
+    ) -> typing.Set[rdflib.term.IdentifiedNode]:
+        instances: typing.Set[rdflib.term.IdentifiedNode] = set()
+        for n_subject in graph.subjects(NS_RDF.type, n_class):
+            assert isinstance(n_subject, rdflib.term.IdentifiedNode)
+            instances.add(n_subject)
+        return instances
+
+    # These indexes are kept current with the augmenting triples.
+    object_indexes: typing.Dict[rdflib.URIRef, NodeIndexType] = {
+        n_predicate: _index_objects(n_predicate)
+        for n_predicate in [
+            NS_PROV.activity,
+            NS_PROV.qualifiedEnd,
+            NS_PROV.qualifiedStart,
+            NS_PROV.qualifiedUsage,
+            NS_TIME.hasBeginning,
+            NS_TIME.hasEnd,
+        ]
+    }
+    instance_indexes: typing.Dict[
+        rdflib.URIRef, typing.Set[rdflib.term.IdentifiedNode]
+    ] = {
+        n_class: _index_instances(n_class)
+        for n_class in [
+            NS_PROV.Activity,
+            NS_PROV.End,
+            NS_PROV.Generation,
+            NS_PROV.InstantaneousEvent,
+            NS_PROV.Invalidation,
+            NS_PROV.Start,
+            NS_PROV.Usage,
+            NS_TIME.Instant,
+            NS_TIME.Interval,
+            NS_TIME.ProperInterval,
+        ]
+    }
+    n_timestamped_instants: typing.Set[rdflib.term.IdentifiedNode] = set(
+        x
+        for x in graph.subjects(NS_TIME.inXSDDateTimeStamp, None, unique=True)
+        if isinstance(x, rdflib.term.IdentifiedNode)
+    )
+
+    # These indexes are only read.
+    n_at_time = _index_values(NS_PROV.atTime)
+    n_started_at_time = _index_values(NS_PROV.startedAtTime)
+    n_ended_at_time = _index_values(NS_PROV.endedAtTime)
+
+    # This is the index form of case_prov.interval_end_should_exist.
+    # None of the predicates it reviews are augmented by this procedure
+    # until the witness step, which does not depend on this set.
+    n_things_with_ends: typing.Set[rdflib.term.Node] = set()
+    for n_predicate in {
+        NS_PROV.endedAtTime,
+        NS_TIME.before,
+        NS_TIME.intervalBefore,
+        NS_TIME.intervalDisjoint,
+        NS_TIME.intervalDuring,
+        NS_TIME.intervalEquals,
+        NS_TIME.intervalFinishedBy,
+        NS_TIME.intervalFinishes,
+        NS_TIME.intervalIn,
+        NS_TIME.intervalMeets,
+        NS_TIME.intervalOverlaps,
+        NS_TIME.intervalStarts,
+        NS_UCO_ACTION.endTime,
+    }:
+        n_things_with_ends.update(graph.subjects(n_predicate, None, unique=True))
+    for n_predicate in {
+        NS_TIME.after,
+        NS_TIME.intervalAfter,
+        NS_TIME.intervalContains,
+        NS_TIME.intervalEquals,
+        NS_TIME.intervalFinishedBy,
+        NS_TIME.intervalFinishes,
+        NS_TIME.intervalMetBy,
+        NS_TIME.intervalOverlappedBy,
+        NS_TIME.intervalStartedBy,
+    }:
+        n_things_with_ends.update(graph.objects(None, n_predicate, unique=True))
+
+    augments: case_prov.TmpTriplesType = set()
+
+    def _augment(tmp_triples: case_prov.TmpTriplesType) -> None:
+        """
+        Macro: Record tmp_triples for the final bulk load, and update indexes.
+        """
+        _logger.debug("len(tmp_triples) = %d.", len(tmp_triples))
+        augments.update(tmp_triples)
+        for triple in tmp_triples:
+            if triple[1] == NS_RDF.type:
+                if triple[2] in instance_indexes:
+                    assert isinstance(triple[2], rdflib.URIRef)
+                    instance_indexes[triple[2]].add(triple[0])
+            elif triple[1] in object_indexes:
+                assert isinstance(triple[2], rdflib.term.IdentifiedNode)
+                object_indexes[triple[1]][triple[0]].add(triple[2])
+            elif triple[1] == NS_TIME.inXSDDateTimeStamp:
+                n_timestamped_instants.add(triple[0])
+
+    n_qualified_starts = object_indexes[NS_PROV.qualifiedStart]
+    n_qualified_ends = object_indexes[NS_PROV.qualifiedEnd]
+    n_beginnings = object_indexes[NS_TIME.hasBeginning]
+    n_ends = object_indexes[NS_TIME.hasEnd]
+
+    tmp_triples: case_prov.TmpTriplesType
+
+    # Do some manual domain inference.
+    tmp_triples = set()
+    for n_predicate in [
+        NS_PROV.endedAtTime,
+        NS_PROV.qualifiedEnd,
+        NS_PROV.qualifiedStart,
+        NS_PROV.startedAtTime,
+    ]:
+        for n_subject in graph.subjects(n_predicate, None, unique=True):
+            assert isinstance(n_subject, rdflib.term.IdentifiedNode)
+            tmp_triples.add((n_subject, NS_RDF.type, NS_PROV.Activity))
+    _augment(tmp_triples)
+
+    n_activities = set(instance_indexes[NS_PROV.Activity])
+
+    # Extend existing TIME individuals into PROV qualified Starts and
+    # Ends.
+    for n_time_index, n_prov_index, n_prov_predicate, n_prov_class in [
+        (n_beginnings, n_qualified_starts, NS_PROV.qualifiedStart, NS_PROV.Start),
+        (n_ends, n_qualified_ends, NS_PROV.qualifiedEnd, NS_PROV.End),
+    ]:
+        tmp_triples = set()
+        for n_interval, n_instants in n_time_index.items():
+            if n_prov_index.get(n_interval):
+                continue
+            for n_instant in n_instants:
+                tmp_triples.add((n_interval, n_prov_predicate, n_instant))
+                tmp_triples.add((n_instant, NS_RDF.type, n_prov_class))
+        _augment(tmp_triples)
+
+    # Guarantee all prov:Activities have a qualified Start node, and if
+    # there is an indicator they end, an End node.
+    for n_activity in sorted(n_activities):
+        if not n_qualified_starts.get(n_activity):
+            (_, tmp_triples) = case_prov.new_interval_terminus(
+                n_activity,
+                NS_PROV.qualifiedStart,
+                ns_kb,
+                use_deterministic_uuids=use_deterministic_uuids,
+            )
+            _augment(tmp_triples)
+        if n_activity in n_things_with_ends and not n_qualified_ends.get(n_activity):
+            (_, tmp_triples) = case_prov.new_interval_terminus(
+                n_activity,
+                NS_PROV.qualifiedEnd,
+                ns_kb,
+                use_deterministic_uuids=use_deterministic_uuids,
+            )
+            _augment(tmp_triples)
+
+    for n_activity in instance_indexes[NS_PROV.Activity]:
+        if not n_qualified_starts.get(n_activity):
+            _logger.debug("n_activity = %r.", n_activity)
+            raise ValueError("Found result indicating process failure.")
+
+    # Do TIME-PROV entailments.  See expand_prov_activities_with_owl_time
+    # for the RDFS axioms these follow.
+    tmp_triples = set()
+    for n_activity in instance_indexes[NS_PROV.Activity]:
+        tmp_triples.add((n_activity, NS_RDF.type, NS_TIME.Interval))
+    for n_instantaneous_event_class in [
+        NS_PROV.InstantaneousEvent,
+        NS_PROV.End,
+        NS_PROV.Generation,
+        NS_PROV.Invalidation,
+        NS_PROV.Start,
+        NS_PROV.Usage,
+    ]:
+        for n_instantaneous_event in instance_indexes[n_instantaneous_event_class]:
+            tmp_triples.add((n_instantaneous_event, NS_RDF.type, NS_TIME.Instant))
+    _augment(tmp_triples)
+
+    tmp_triples = set()
+    for n_activity, n_starts in n_qualified_starts.items():
+        for n_start in n_starts:
+            tmp_triples.add((n_activity, NS_TIME.hasBeginning, n_start))
+        for n_end in n_qualified_ends.get(n_activity, set()):
+            tmp_triples.add((n_activity, NS_TIME.hasEnd, n_end))
+    _augment(tmp_triples)
+
+    # Find all time:Instants without inXSDDateTimeStamp populated, and
+    # assign values based on available data.  Each step only reviews
+    # the Instants left untimestamped by the prior step.
+
+    def _datetimestamp_augments(
+        instant_values: typing.Iterable[
+            typing.Tuple[rdflib.term.IdentifiedNode, rdflib.term.Node]
+        ],
+    ) -> case_prov.TmpTriplesType:
+        tmp_triples: case_prov.TmpTriplesType = set()
+        for n_instant, l_value in instant_values:
+            assert isinstance(l_value, rdflib.term.Literal)
+            l_datetimestamp = case_prov.xsd_datetime_to_xsd_datetimestamp(l_value)
+            if l_datetimestamp is not None:
+                tmp_triples.add(
+                    (n_instant, NS_TIME.inXSDDateTimeStamp, l_datetimestamp)
+                )
+        return tmp_triples
+
+    # Find from prov literal values in Event.
+    _augment(
+        _datetimestamp_augments(
+            [
+                (n_instant, l_value)
+                for (n_instant, l_values) in n_at_time.items()
+                if n_instant not in n_timestamped_instants
+                for l_value in l_values
+            ]
+        )
+    )
+
+    # Find from prov literal values on Activity.
+    for n_value_index, n_terminus_index in [
+        (n_started_at_time, n_beginnings),
+        (n_ended_at_time, n_ends),
+    ]:
+        _augment(
+            _datetimestamp_augments(
+                [
+                    (n_instant, l_value)
+                    for (n_activity, l_values) in n_value_index.items()
+                    for n_instant in n_terminus_index.get(n_activity, set())
+                    if n_instant not in n_timestamped_instants
+                    for l_value in l_values
+                ]
+            )
+        )
+
+    # For remaining time:Intervals, guarantee they have beginning
+    # and, if appropriate, ending nodes.
+    n_intervals = (
+        instance_indexes[NS_TIME.Interval] | instance_indexes[NS_TIME.ProperInterval]
+    )
+    for n_interval in sorted(n_intervals):
+        if not n_beginnings.get(n_interval):
+            (_, tmp_triples) = case_prov.new_interval_terminus(
+                n_interval,
+                NS_TIME.hasBeginning,
+                ns_kb,
+                use_deterministic_uuids=use_deterministic_uuids,
+            )
+            _augment(tmp_triples)
+        if n_interval in n_things_with_ends and not n_ends.get(n_interval):
+            (_, tmp_triples) = case_prov.new_interval_terminus(
+                n_interval,
+                NS_TIME.hasEnd,
+                ns_kb,
+                use_deterministic_uuids=use_deterministic_uuids,
+            )
+            _augment(tmp_triples)
+
+    # Infer time:inside relationships for Entities' InstantaneousEvents.
+    tmp_triples = set()
+    for n_instantaneous_event_class in [NS_PROV.Generation, NS_PROV.Invalidation]:
+        for n_instantaneous_event in instance_indexes[n_instantaneous_event_class]:
+            for n_activity in object_indexes[NS_PROV.activity].get(
+                n_instantaneous_event, set()
+            ):
+                tmp_triples.add((n_activity, NS_TIME.inside, n_instantaneous_event))
+    for n_activity, n_usages in object_indexes[NS_PROV.qualifiedUsage].items():
+        for n_usage in n_usages:
+            tmp_triples.add((n_activity, NS_TIME.inside, n_usage))
+    _augment(tmp_triples)
+
+    # Infer "Witness" Instants.
+    tmp_triples = set()
+    for n_predicate, n_inverse_predicate in [
+        (NS_TIME.intervalOverlaps, NS_TIME.intervalOverlappedBy),
+        (NS_TIME.intervalStarts, NS_TIME.intervalStartedBy),
+        (NS_TIME.intervalDuring, NS_TIME.intervalContains),
+    ]:
+        for n_interval_i, n_interval_j in sorted(
+            linked_temporal_entities(graph, n_predicate, n_inverse_predicate)
+        ):
+            if n_ends.get(n_interval_j):
+                continue
+            for n_instant_i_e in sorted(n_ends.get(n_interval_i, set())):
+                tmp_triples |= define_witnesses(
+                    n_instant_i_e,
+                    n_interval_j,
+                    n_predicate,
+                    ns_kb,
+                    use_deterministic_uuids,
+                )
+    _augment(tmp_triples)
+
+    _logger.debug("len(augments) = %d.", len(augments))
+    graph.addN((s, p, o, graph) for (s, p, o) in augments)
+
+    if debug_graph_fh is not None:
+        debug_graph = rdflib.Graph()
+        debug_graph.addN((s, p, o, debug_graph) for (s, p, o) in augments)
         debug_graph_fh.write(debug_graph.serialize(format="longturtle"))
 
 
+# Epoch timestamps (seconds since 1970-01-01T00:00:00Z) in ascending
+# order, and the nodes bearing them, aligned by list index.
+InstantEpochIndexType = typing.Tuple[
+    typing.List[float], typing.List[rdflib.term.IdentifiedNode]
+]
+
+# Two orderings of the same interval spans, each as three lists aligned
+# by list index:
+# * Beginning epoch timestamps in ascending order, and the ending epoch
+#   timestamps and nodes of the intervals bearing them.
+# * Ending epoch timestamps in ascending order, and the beginning epoch
+#   timestamps and nodes of the intervals bearing them.
+# Unknown beginnings and endings are negative and positive infinity,
+# respectively.
+IntervalEpochIndexType = typing.Tuple[
+    typing.List[float],
+    typing.List[float],
+    typing.List[rdflib.term.IdentifiedNode],
+    typing.List[float],
+    typing.List[float],
+    typing.List[rdflib.term.IdentifiedNode],
+]
+
+
+def datetime_argument(value: str) -> datetime.datetime:
+    """
+    This function converts an ISO 8601 string into a timezone-aware datetime, for use as an argparse type.  A trailing "Z" is accepted as UTC, and a timestamp without a timezone is interpreted as UTC.
+
+    >>> datetime_argument("2020-01-02T03:04:05Z")
+    datetime.datetime(2020, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+    >>> datetime_argument("2020-01-02")
+    datetime.datetime(2020, 1, 2, 0, 0, tzinfo=datetime.timezone.utc)
+    """
+    try:
+        retval = datetime.datetime.fromisoformat(
+            value[:-1] + "+00:00" if value.endswith("Z") else value
+        )
+    except ValueError:
+        raise argparse.ArgumentTypeError("Not an ISO 8601 timestamp: %r." % value)
+    if retval.tzinfo is None:
+        retval = retval.replace(tzinfo=datetime.timezone.utc)
+    return retval
+
+
+def build_instant_epoch_index(
+    graph: rdflib.Graph,
+    n_instants: typing.Set[rdflib.term.IdentifiedNode],
+) -> InstantEpochIndexType:
+    """
+    This function builds a sorted index of the epoch timestamps of the requested instants, from one pass over each OWL-Time and PROV-O timestamp property.  Instants without a timezone-bearing timestamp are not indexed.
+    """
+    n_instant_to_epoch: typing.Dict[rdflib.term.IdentifiedNode, float] = dict()
+    # Note: inXSDDateTime is deprecated.  The properties are reviewed in
+    # the same precedence as get_instantaneous_perdurant_timestamp.
+    for n_predicate in [
+        NS_TIME.inXSDDateTime,
+        NS_TIME.inXSDDateTimeStamp,
+        NS_PROV.atTime,
+    ]:
+        for n_instant, l_value in graph.subject_objects(n_predicate):
+            if n_instant not in n_instants:
+                continue
+            assert isinstance(n_instant, rdflib.term.IdentifiedNode)
+            assert isinstance(l_value, rdflib.Literal)
+            _datetime = l_value.toPython()
+            if not isinstance(_datetime, datetime.datetime):
+                continue
+            if _datetime.tzinfo is None:
+                continue
+            n_instant_to_epoch[n_instant] = _datetime.timestamp()
+    pairs = sorted(
+        (epoch, n_instant) for (n_instant, epoch) in n_instant_to_epoch.items()
+    )
+    return ([x[0] for x in pairs], [x[1] for x in pairs])
+
+
+def build_interval_epoch_index(
+    graph: rdflib.Graph,
+    n_intervals: typing.Set[rdflib.term.IdentifiedNode],
+    instant_epoch_index: InstantEpochIndexType,
+) -> IntervalEpochIndexType:
+    """
+    This function builds an index of the spans of the requested intervals, sorted by beginning and by ending, using the epoch timestamps of the intervals' beginning and ending instants.  Intervals with neither a timestamped beginning nor a timestamped ending are not indexed.  An interval with only one of these is indexed as unbounded on its other side.
+    """
+    n_instant_to_epoch = dict(zip(instant_epoch_index[1], instant_epoch_index[0]))
+    n_interval_to_span: typing.Dict[
+        rdflib.term.IdentifiedNode, typing.Tuple[float, float]
+    ] = dict()
+    for n_interval in n_intervals:
+        beginning_epochs = [
+            n_instant_to_epoch[x]
+            for x in get_beginnings(graph, n_interval)
+            if x in n_instant_to_epoch
+        ]
+        ending_epochs = [
+            n_instant_to_epoch[x]
+            for x in get_ends(graph, n_interval)
+            if x in n_instant_to_epoch
+        ]
+        if len(beginning_epochs) == 0 and len(ending_epochs) == 0:
+            continue
+        n_interval_to_span[n_interval] = (
+            min(beginning_epochs) if len(beginning_epochs) > 0 else -float("inf"),
+            max(ending_epochs) if len(ending_epochs) > 0 else float("inf"),
+        )
+    by_beginning = sorted(
+        (span[0], span[1], n_interval)
+        for (n_interval, span) in n_interval_to_span.items()
+    )
+    by_ending = sorted(
+        (span[1], span[0], n_interval)
+        for (n_interval, span) in n_interval_to_span.items()
+    )
+    return (
+        [x[0] for x in by_beginning],
+        [x[1] for x in by_beginning],
+        [x[2] for x in by_beginning],
+        [x[0] for x in by_ending],
+        [x[1] for x in by_ending],
+        [x[2] for x in by_ending],
+    )
+
+
+def query_instant_epoch_index(
+    instant_epoch_index: InstantEpochIndexType,
+    since: typing.Optional[float] = None,
+    until: typing.Optional[float] = None,
+) -> typing.List[rdflib.term.IdentifiedNode]:
+    """
+    Get the indexed instants with timestamps within the closed window [since, until].  An absent bound leaves that side of the window unbounded.
+
+    >>> x = rdflib.URIRef("urn:example:kb:x")
+    >>> y = rdflib.URIRef("urn:example:kb:y")
+    >>> z = rdflib.URIRef("urn:example:kb:z")
+    >>> index = ([10.0, 20.0, 30.0], [x, y, z])
+    >>> query_instant_epoch_index(index, 20.0, 30.0)
+    [rdflib.term.URIRef('urn:example:kb:y'), rdflib.term.URIRef('urn:example:kb:z')]
+    >>> query_instant_epoch_index(index, until=15.0)
+    [rdflib.term.URIRef('urn:example:kb:x')]
+    """
+    epochs = instant_epoch_index[0]
+    lower = 0 if since is None else bisect.bisect_left(epochs, since)
+    upper = len(epochs) if until is None else bisect.bisect_right(epochs, until)
+    return instant_epoch_index[1][lower:upper]
+
+
+def query_interval_epoch_index(
+    interval_epoch_index: IntervalEpochIndexType,
+    since: typing.Optional[float] = None,
+    until: typing.Optional[float] = None,
+) -> typing.List[rdflib.term.IdentifiedNode]:
+    """
+    Get the indexed intervals with spans overlapping the closed window [since, until].  An absent bound leaves that side of the window unbounded.  Each bound is found by a binary search over the ordering it constrains.  When both are given, the smaller of the two candidate runs is reviewed for the other bound.
+
+    >>> x = rdflib.URIRef("urn:example:kb:x")
+    >>> y = rdflib.URIRef("urn:example:kb:y")
+    >>> z = rdflib.URIRef("urn:example:kb:z")
+    >>> index = (
+    ...     [-float("inf"), 10.0, 40.0], [15.0, float("inf"), 50.0], [x, y, z],
+    ...     [15.0, 50.0, float("inf")], [-float("inf"), 40.0, 10.0], [x, z, y],
+    ... )
+    >>> query_interval_epoch_index(index, 20.0, 30.0)
+    [rdflib.term.URIRef('urn:example:kb:y')]
+    >>> query_interval_epoch_index(index, since=45.0)
+    [rdflib.term.URIRef('urn:example:kb:z'), rdflib.term.URIRef('urn:example:kb:y')]
+    >>> query_interval_epoch_index(index, until=5.0)
+    [rdflib.term.URIRef('urn:example:kb:x')]
+    """
+    (
+        beginning_epochs,
+        beginning_order_ending_epochs,
+        beginning_order_nodes,
+        ending_epochs,
+        ending_order_beginning_epochs,
+        ending_order_nodes,
+    ) = interval_epoch_index
+    # Intervals beginning by the window's end are a prefix of the
+    # beginning order, and intervals ending from the window's start are a
+    # suffix of the ending order.
+    beginning_upper = (
+        len(beginning_epochs)
+        if until is None
+        else bisect.bisect_right(beginning_epochs, until)
+    )
+    ending_lower = 0 if since is None else bisect.bisect_left(ending_epochs, since)
+    if beginning_upper <= len(ending_epochs) - ending_lower:
+        return [
+            beginning_order_nodes[i]
+            for i in range(beginning_upper)
+            if since is None or beginning_order_ending_epochs[i] >= since
+        ]
+    return [
+        ending_order_nodes[i]
+        for i in range(ending_lower, len(ending_epochs))
+        if until is None or ending_order_beginning_epochs[i] <= until
+    ]
+
+
+def build_adjacency(
+    graph: rdflib.Graph,
+    n_predicate: rdflib.URIRef,
+    *args: typing.Any,
+    inverse: bool = False,
+    **kwargs: typing.Any,
+) -> AdjacencyType:
+    """
+    Build an adjacency index from one pass over the requested predicate's triples.  If inverse is True, the index is from objects to subjects.
+
+    >>> graph = rdflib.Graph()
+    >>> x = rdflib.URIRef("urn:example:kb:x")
+    >>> y = rdflib.URIRef("urn:example:kb:y")
+    >>> graph.add((y, NS_PROV.wasDerivedFrom, x))  # doctest: +ELLIPSIS
+    <Graph ...>
+    >>> dict(build_adjacency(graph, NS_PROV.wasDerivedFrom, inverse=True))
+    {rdflib.term.URIRef('urn:example:kb:x'): {rdflib.term.URIRef('urn:example:kb:y')}}
+    """
+    adjacency: AdjacencyType = collections.defaultdict(set)
+    for n_subject, n_object in graph.subject_objects(n_predicate):
+        assert isinstance(n_subject, rdflib.term.IdentifiedNode)
+        if not isinstance(n_object, rdflib.term.IdentifiedNode):
+            continue
+        if inverse:
+            adjacency[n_object].add(n_subject)
+        else:
+            adjacency[n_subject].add(n_object)
+    return adjacency
+
+
+def get_query_file_iris(
+    graph: rdflib.Graph,
+    query_path: str,
+    init_ns: typing.Mapping[str, typing.Any],
+) -> typing.Set[rdflib.term.IdentifiedNode]:
+    """
+    Run the SPARQL SELECT query in a file, as given to --query-ancestry or --query-descendants, and get every IRI it returns.
+
+    :raises ValueError: If the query returns a member that is not an IRI.
+    """
+    query_text: typing.Optional[str] = None
+    with open(query_path, "r") as in_fh:
+        query_text = in_fh.read(2**22)  # 4MiB
+    assert query_text is not None
+    _logger.debug("query_text = %r.", query_text)
+    n_iris: typing.Set[rdflib.term.IdentifiedNode] = set()
+    with query_execution.execute_query(
+        graph,
+        query_text,
+        label=os.path.basename(query_path),
+        init_ns=init_ns,
+    ) as results:
+        for result in results:
+            assert isinstance(result, rdflib.query.ResultRow)
+            for result_member in result:
+                if not isinstance(result_member, rdflib.URIRef):
+                    raise ValueError(
+                        "Query in file %r must return URIRefs." % query_path
+                    )
+                n_iris.add(result_member)
+    return n_iris
+
+
+def get_closure(
+    adjacency: AdjacencyType,
+    n_seeds: typing.Iterable[rdflib.term.IdentifiedNode],
+    max_depth: typing.Optional[int] = None,
+) -> typing.Set[rdflib.term.IdentifiedNode]:
+    """
+    Get the seeds and all nodes reachable from them in the adjacency index, within max_depth steps if given.  This is one breadth-first search from all seeds at once, so each node is visited once regardless of the number of seeds.
+
+    >>> x = rdflib.URIRef("urn:example:kb:x")
+    >>> y = rdflib.URIRef("urn:example:kb:y")
+    >>> z = rdflib.URIRef("urn:example:kb:z")
+    >>> adjacency: AdjacencyType = collections.defaultdict(set)
+    >>> adjacency[x].add(y)
+    >>> adjacency[y].add(z)
+    >>> sorted(get_closure(adjacency, {x}))
+    [rdflib.term.URIRef('urn:example:kb:x'), rdflib.term.URIRef('urn:example:kb:y'), rdflib.term.URIRef('urn:example:kb:z')]
+    >>> sorted(get_closure(adjacency, {x}, 1))
+    [rdflib.term.URIRef('urn:example:kb:x'), rdflib.term.URIRef('urn:example:kb:y')]
+    """
+    n_visited: typing.Set[rdflib.term.IdentifiedNode] = set(n_seeds)
+    n_frontier = list(n_visited)
+    depth = 0
+    while len(n_frontier) > 0:
+        if max_depth is not None and depth >= max_depth:
+            break
+        n_next_frontier: typing.List[rdflib.term.IdentifiedNode] = []
+        for n_node in n_frontier:
+            if n_node not in adjacency:
+                continue
+            for n_neighbor in adjacency[n_node]:
+                if n_neighbor in n_visited:
+                    continue
+                n_visited.add(n_neighbor)
+                n_next_frontier.append(n_neighbor)
+        n_frontier = n_next_frontier
+        depth += 1
+    return n_visited
+
+
+# IdentifiedNode (subject) -> URIRef (predicate) -> sorted objects.
+NodeTextsType = typing.Dict[
+    rdflib.term.IdentifiedNode,
+    typing.Dict[rdflib.URIRef, typing.List[rdflib.term.Identifier]],
+]
+
+
+def prefetch_node_texts(
+    graph: rdflib.Graph,
+    n_things: typing.Set[rdflib.term.IdentifiedNode],
+    n_predicates: typing.Iterable[rdflib.URIRef],
+) -> NodeTextsType:
+    """
+    This function retrieves, with one pass over each requested predicate, the objects of statements about the requested things.
+
+    >>> g = rdflib.Graph()
+    >>> x = rdflib.URIRef("urn:example:kb:x")
+    >>> y = rdflib.URIRef("urn:example:kb:y")
+    >>> _ = g.add((x, NS_RDFS.label, rdflib.Literal("b")))
+    >>> _ = g.add((x, NS_RDFS.label, rdflib.Literal("a")))
+    >>> _ = g.add((y, NS_RDFS.label, rdflib.Literal("c")))
+    >>> prefetch_node_texts(g, {x}, [NS_RDFS.label, NS_RDFS.comment])
+    {rdflib.term.URIRef('urn:example:kb:x'): {rdflib.term.URIRef('http://www.w3.org/2000/01/rdf-schema#label'): [rdflib.term.Literal('a'), rdflib.term.Literal('b')]}}
+    """
+    node_texts: NodeTextsType = dict()
+    for n_predicate in n_predicates:
+        for n_subject, n_object in graph.subject_objects(n_predicate):
+            if n_subject not in n_things:
+                continue
+            assert isinstance(n_subject, rdflib.term.IdentifiedNode)
+            assert isinstance(n_object, rdflib.term.Identifier)
+            if n_subject not in node_texts:
+                node_texts[n_subject] = dict()
+            if n_predicate not in node_texts[n_subject]:
+                node_texts[n_subject][n_predicate] = []
+            node_texts[n_subject][n_predicate].append(n_object)
+    for predicate_texts in node_texts.values():
+        for n_objects in predicate_texts.values():
+            n_objects.sort()
+    return node_texts
+
+
+def prefetch_display_texts(
+    graph: rdflib.Graph,
+    n_things: typing.Set[rdflib.term.IdentifiedNode],
+) -> NodeTextsType:
+    """
+    This function retrieves all of the graph data used to render the text of the requested things' Dot nodes: Names, labels, descriptions, comments, exhibit numbers, and timestamps, including the timestamps of the things' boundary instants.  The result can be passed as the node_texts argument of the rendering functions in this module, so rendering reviews a dictionary instead of the graph.
+    """
+    n_boundary_predicates = [
+        NS_PROV.qualifiedEnd,
+        NS_PROV.qualifiedStart,
+        NS_TIME.hasBeginning,
+        NS_TIME.hasEnd,
+    ]
+    n_timestamp_predicates = [
+        NS_PROV.atTime,
+        NS_TIME.inXSDDateTime,
+        NS_TIME.inXSDDateTimeStamp,
+    ]
+    node_texts = prefetch_node_texts(
+        graph,
+        n_things,
+        [
+            NS_CASE_INVESTIGATION.exhibitNumber,
+            NS_PROV.endedAtTime,
+            NS_PROV.startedAtTime,
+            NS_RDFS.comment,
+            NS_RDFS.label,
+            NS_UCO_CORE.description,
+            NS_UCO_CORE.name,
+        ]
+        + n_boundary_predicates
+        + n_timestamp_predicates,
+    )
+
+    # Boundary instants that are not themselves displayed still
+    # provide timestamps for their intervals' labels.
+    n_boundary_instants: typing.Set[rdflib.term.IdentifiedNode] = set()
+    for predicate_texts in node_texts.values():
+        for n_predicate in n_boundary_predicates:
+            for n_object in predicate_texts.get(n_predicate, []):
+                assert isinstance(n_object, rdflib.term.IdentifiedNode)
+                if n_object not in n_things:
+                    n_boundary_instants.add(n_object)
+    node_texts.update(
+        prefetch_node_texts(graph, n_boundary_instants, n_timestamp_predicates)
+    )
+    return node_texts
+
+
+def get_objects(
+    graph: rdflib.Graph,
+    n_thing: rdflib.term.IdentifiedNode,
+    n_predicate: rdflib.URIRef,
+    node_texts: typing.Optional[NodeTextsType] = None,
+) -> typing.Sequence[rdflib.term.Node]:
+    """
+    Get the objects of n_thing's n_predicate statements.  If node_texts is provided, it is used instead of the graph, and is expected to be the prefetched data for n_thing (e.g. from prefetch_display_texts).
+    """
+    if node_texts is None:
+        return list(graph.objects(n_thing, n_predicate))
+    return node_texts.get(n_thing, dict()).get(n_predicate, [])
+
+
 def qname(graph: rdflib.Graph, n_thing: rdflib.term.IdentifiedNode) -> str:
     """
     This function provides, when a namespace is available, the prefixed form of the input node.  Blank nodes are rendered solely with str().
@@ -622,11 +1416,15 @@ def qname(graph: rdflib.Graph, n_thing: rdflib.term.IdentifiedNode) -> str:
 def get_instantaneous_perdurant_timestamp(
     n_instantaneous_perdurant: rdflib.term.IdentifiedNode,
     graph: rdflib.Graph,
+    node_texts: typing.Optional[NodeTextsType] = None,
 ) -> typing.Optional[rdflib.Literal]:
     """
     :param n_instantaneous_perdurant: A graph node that bears in the graph a `rdf:type` of `prov:InstantaneousEvent`, `time:Instant`, and/or some subclass of those.
+    :param node_texts: If provided, prefetched data used instead of the graph.
     """
-    for l_value in graph.objects(n_instantaneous_perdurant, NS_PROV.atTime):
+    for l_value in get_objects(
+        graph, n_instantaneous_perdurant, NS_PROV.atTime, node_texts
+    ):
         assert isinstance(l_value, rdflib.Literal)
         return l_value
     # Note: inXSDDateTime is deprecated.
@@ -634,7 +1432,9 @@ def get_instantaneous_perdurant_timestamp(
         NS_TIME.inXSDDateTimeStamp,
         NS_TIME.inXSDDateTime,
     ]:
-        for l_value in graph.objects(n_instantaneous_perdurant, n_time_direct_property):
+        for l_value in get_objects(
+            graph, n_instantaneous_perdurant, n_time_direct_property, node_texts
+        ):
             assert isinstance(l_value, rdflib.Literal)
             return l_value
     return None
@@ -644,6 +1444,7 @@ def get_intervalic_perdurant_boundary_timestamp(
     n_intervalic_perdurant: rdflib.term.IdentifiedNode,
     graph: rdflib.Graph,
     initial: bool,
+    node_texts: typing.Optional[NodeTextsType] = None,
 ) -> typing.Optional[rdflib.Literal]:
     """
     This function retrieves the boundary timestamp-literal from either:
@@ -652,6 +1453,7 @@ def get_intervalic_perdurant_boundary_timestamp(
     Vocabulary for PROV-O and OWL-Time are used.
 
     :param initial: If True, the starting timestamp; if False, the ending.
+    :param node_texts: If provided, prefetched data used instead of the graph.
     """
     if initial:
         n_prov_direct_property = NS_PROV.startedAtTime
@@ -663,23 +1465,27 @@ def get_intervalic_perdurant_boundary_timestamp(
         n_time_qualified_node_property = NS_TIME.hasEnd
 
     # Try unqualified PROV-O form.
-    for l_value in graph.objects(n_intervalic_perdurant, n_prov_direct_property):
+    for l_value in get_objects(
+        graph, n_intervalic_perdurant, n_prov_direct_property, node_texts
+    ):
         assert isinstance(l_value, rdflib.Literal)
         return l_value
 
     # Try qualified PROV-O form.
-    for n_instantaneous_event in graph.objects(
-        n_intervalic_perdurant, n_prov_qualified_node_property
+    for n_instantaneous_event in get_objects(
+        graph, n_intervalic_perdurant, n_prov_qualified_node_property, node_texts
     ):
         assert isinstance(n_instantaneous_event, rdflib.term.IdentifiedNode)
-        return get_instantaneous_perdurant_timestamp(n_instantaneous_event, graph)
+        return get_instantaneous_perdurant_timestamp(
+            n_instantaneous_event, graph, node_texts
+        )
 
     # Try qualified OWL-Time form.
-    for n_instant in graph.objects(
-        n_intervalic_perdurant, n_time_qualified_node_property
+    for n_instant in get_objects(
+        graph, n_intervalic_perdurant, n_time_qualified_node_property, node_texts
     ):
         assert isinstance(n_instant, rdflib.term.IdentifiedNode)
-        return get_instantaneous_perdurant_timestamp(n_instant, graph)
+        return get_instantaneous_perdurant_timestamp(n_instant, graph, node_texts)
 
     return None
 
@@ -687,12 +1493,14 @@ def get_intervalic_perdurant_boundary_timestamp(
 def n_instantaneous_perdurant_to_timestamp_string(
     n_instantaneous_perdurant: rdflib.term.IdentifiedNode,
     graph: rdflib.Graph,
+    node_texts: typing.Optional[NodeTextsType] = None,
 ) -> typing.Optional[str]:
     """
     :param n_instantaneous_perdurant: A graph node that bears in the graph a `rdf:type` of `prov:InstantaneousEvent`, `time:Instant`, and/or some subclass of those.
+    :param node_texts: If provided, prefetched data used instead of the graph.
     """
     l_timestamp = get_instantaneous_perdurant_timestamp(
-        n_instantaneous_perdurant, graph
+        n_instantaneous_perdurant, graph, node_texts
     )
     if l_timestamp is None:
         return None
@@ -703,18 +1511,21 @@ def n_instantaneous_perdurant_to_timestamp_string(
 def n_intervalic_perdurant_to_interval_string(
     n_intervalic_perdurant: rdflib.term.IdentifiedNode,
     graph: rdflib.Graph,
+    node_texts: typing.Optional[NodeTextsType] = None,
 ) -> typing.Optional[str]:
     """
     This function renders the start and end times from either:
     * The unqualified forms (directly-attached timestamp Literals)
     * The qualified forms (timestamp Literals attached to reified instantaneous perdurants)
     Vocabulary for PROV-O and OWL-Time are used.
+
+    :param node_texts: If provided, prefetched data used instead of the graph.
     """
     l_start_time = get_intervalic_perdurant_boundary_timestamp(
-        n_intervalic_perdurant, graph, True
+        n_intervalic_perdurant, graph, True, node_texts
     )
     l_end_time = get_intervalic_perdurant_boundary_timestamp(
-        n_intervalic_perdurant, graph, False
+        n_intervalic_perdurant, graph, False, node_texts
     )
 
     if l_start_time is None and l_end_time is None:
@@ -736,16 +1547,19 @@ def n_intervalic_perdurant_to_interval_string(
 def n_thing_to_pydot_node_kwargs(
     n_thing: rdflib.term.IdentifiedNode,
     graph: rdflib.Graph,
-    n_class_for_style: typing.Union[prov.identifier.QualifiedName, rdflib.URIRef],
+    n_class_for_style: typing.Union["prov.identifier.QualifiedName", rdflib.URIRef],
     wrapper: textwrap.TextWrapper,
     *args: typing.Any,
     early_label_parts: list[str] = [],
+    node_texts: typing.Optional[NodeTextsType] = None,
     style: typing.Optional[str] = None,
     tooltip_parts: list[str] = [],
     **kwargs: typing.Any,
 ) -> typing.Dict[str, str]:
     """
     Pull in general object descriptive strings: Name, labels, descriptions, and comments.
+
+    :param node_texts: If provided, prefetched data used instead of the graph.
     """
     kwargs = clone_style(n_class_for_style)
 
@@ -769,9 +1583,9 @@ def n_thing_to_pydot_node_kwargs(
     # Render `uco-core:name`.
     # SHACL constraints on UCO will mean there will be only one name.
     l_uco_names: typing.Set[rdflib.Literal] = set()
-    for triple in graph.triples((n_thing, NS_UCO_CORE.name, None)):
-        assert isinstance(triple[2], rdflib.Literal)
-        l_uco_names.add(triple[2])
+    for l_value in get_objects(graph, n_thing, NS_UCO_CORE.name, node_texts):
+        assert isinstance(l_value, rdflib.Literal)
+        l_uco_names.add(l_value)
     if len(l_uco_names) > 0:
         for l_uco_name in l_uco_names:
             label_part = "\n".join(wrapper.wrap(str(l_uco_name)))
@@ -782,9 +1596,9 @@ def n_thing_to_pydot_node_kwargs(
     # have a blank line separating them.  This is just a design choice
     # to keep what might be shorter string annotations together.
     l_labels: typing.Set[rdflib.Literal] = set()
-    for triple in graph.triples((n_thing, NS_RDFS.label, None)):
-        assert isinstance(triple[2], rdflib.Literal)
-        l_labels.add(triple[2])
+    for l_value in get_objects(graph, n_thing, NS_RDFS.label, node_texts):
+        assert isinstance(l_value, rdflib.Literal)
+        l_labels.add(l_value)
     if len(l_labels) > 0:
         _parts_list.append("")
         for l_label in sorted(l_labels):
@@ -793,9 +1607,9 @@ def n_thing_to_pydot_node_kwargs(
 
     # Render `uco-core:description`s.
     l_uco_descriptions: typing.Set[rdflib.Literal] = set()
-    for triple in graph.triples((n_thing, NS_UCO_CORE.description, None)):
-        assert isinstance(triple[2], rdflib.Literal)
-        l_uco_descriptions.add(triple[2])
+    for l_value in get_objects(graph, n_thing, NS_UCO_CORE.description, node_texts):
+        assert isinstance(l_value, rdflib.Literal)
+        l_uco_descriptions.add(l_value)
     # logging.debug("len(l_uco_descriptions) = %d.", len(l_uco_descriptions))
     for l_uco_description in sorted(l_uco_descriptions):
         _parts_list.append("")
@@ -804,9 +1618,9 @@ def n_thing_to_pydot_node_kwargs(
 
     # Render `rdfs:comment`s.
     l_comments: typing.Set[rdflib.Literal] = set()
-    for triple in graph.triples((n_thing, NS_RDFS.comment, None)):
-        assert isinstance(triple[2], rdflib.Literal)
-        l_comments.add(triple[2])
+    for l_value in get_objects(graph, n_thing, NS_RDFS.comment, node_texts):
+        assert isinstance(l_value, rdflib.Literal)
+        l_comments.add(l_value)
     for l_comment in sorted(l_comments):
         _parts_list.append("")
         label_part = "\n".join(wrapper.wrap(str(l_comment)))
@@ -818,9 +1632,552 @@ def n_thing_to_pydot_node_kwargs(
     return kwargs
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--debug", action="store_true")
+def get_time_edges(
+    graph: rdflib.Graph,
+    n_intervals: typing.Set[rdflib.term.IdentifiedNode],
+    n_activities: typing.Set[rdflib.term.IdentifiedNode],
+    n_things_outside_window: typing.Set[rdflib.term.IdentifiedNode],
+) -> EdgeSourcesType:
+    """
+    Get the temporal ordering edges among the time:TemporalEntitys of a graph already expanded with expand_prov_activities_with_owl_time, each mapped to the graph triples that imply it.  Edges with an endpoint in n_things_outside_window are omitted.
+    """
+    # The dictionary time_edges is keyed by ordered pairs of
+    # `time:TemporalEntity`s that precede each other in logical sequence.
+    # I.e. (X,Y) being a key means X sequentiallyPrecedes Y.  Here
+    # is how Instants and Intervals work with sequentiallyPrecedes:
+    # * An Instant sequentiallyPrecedes all Instants inside an Interval
+    #   after the Interval's beginning Instant.
+    # * All Instants inside an interval before the Interval's ending
+    #   Instant sequentiallyPrecede an Instant.
+    # * An Interval X sequentiallyPrecedes an Interval Y if and only if
+    #   one of the "Allen algebra" relations Before(X,Y), Meets(X,Y),
+    #   After(Y,X), or MetBy(Y,X) are true.
+    # This definition is similar to `time:before`, except for the
+    # boundary condition: Before(T_1,T_2) states "the end of T_1 is
+    # before the beginning of T_2".  SequentiallyPrecedes(T_1,T_2) (with
+    # T_1 and Instant, T_2 an Interval) lets T_1 potentially be equal to
+    # the beginning of T_2.
+    time_edges: EdgeSourcesType = collections.defaultdict(set)
+
+    def _add_time_edge(
+        n_earlier: rdflib.term.IdentifiedNode,
+        n_later: rdflib.term.IdentifiedNode,
+        source_triples: typing.Set[TripleType],
+    ) -> None:
+        """
+        Record an edge, attributing it to the interval boundary triple it restates if there is one, else to source_triples.
+        """
+        if (n_later, NS_TIME.hasBeginning, n_earlier) in graph:
+            source_triples = {(n_later, NS_TIME.hasBeginning, n_earlier)}
+        elif (n_earlier, NS_TIME.hasEnd, n_later) in graph:
+            source_triples = {(n_earlier, NS_TIME.hasEnd, n_later)}
+        time_edges[(n_earlier, n_later)] |= source_triples
+
+    # These variables are "subscripted" i and j in keeping with Figure 2
+    # on the OWL-Time documentation page:
+    # https://www.w3.org/TR/2022/CRD-owl-time-20221115/#fig-thirteen-elementary-possible-relations-between-time-periods-af-97
+    # The further "subscripts" b and e are interval beginnings and
+    # endings.
+    n_instant_i_b: typing.Optional[rdflib.term.IdentifiedNode]
+    n_instant_i_e: typing.Optional[rdflib.term.IdentifiedNode]
+    n_instant_j_b: typing.Optional[rdflib.term.IdentifiedNode]
+    n_instant_j_e: typing.Optional[rdflib.term.IdentifiedNode]
+    n_interval_i: rdflib.term.IdentifiedNode
+    n_interval_j: rdflib.term.IdentifiedNode
+
+    def _linked_temporal_entities(
+        n_predicate: rdflib.URIRef,
+        n_inverse_predicate: typing.Optional[rdflib.URIRef] = None,
+    ) -> typing.Iterator[
+        typing.Tuple[
+            rdflib.term.IdentifiedNode,
+            rdflib.term.IdentifiedNode,
+            typing.Set[TripleType],
+        ]
+    ]:
+        """
+        Get the linked temporal entities that are not outside the requested time window, with the triples linking them.
+        """
+        for n_entity_i, n_entity_j in linked_temporal_entities(
+            graph, n_predicate, n_inverse_predicate
+        ):
+            if n_entity_i in n_things_outside_window:
+                continue
+            if n_entity_j in n_things_outside_window:
+                continue
+            relation_triples: typing.Set[TripleType] = set()
+            if (n_entity_i, n_predicate, n_entity_j) in graph:
+                relation_triples.add((n_entity_i, n_predicate, n_entity_j))
+            if n_inverse_predicate is not None:
+                if (n_entity_j, n_inverse_predicate, n_entity_i) in graph:
+                    relation_triples.add((n_entity_j, n_inverse_predicate, n_entity_i))
+            yield n_entity_i, n_entity_j, relation_triples
+
+    # Sequence all Intervals with their boundary Instants.
+    for n_interval in n_intervals:
+        for n_object in graph.objects(n_interval, NS_TIME.hasBeginning):
+            assert isinstance(n_object, rdflib.term.IdentifiedNode)
+            _add_time_edge(n_object, n_interval, set())
+        for n_object in graph.objects(n_interval, NS_TIME.hasEnd):
+            assert isinstance(n_object, rdflib.term.IdentifiedNode)
+            _add_time_edge(n_interval, n_object, set())
+
+    # Loop through the thirteen Allen Algebra relations.  Using
+    # relationship-inverses, they break down into seven logic blocks.
+
+    for n_interval_i, n_interval_j, relation_triples in _linked_temporal_entities(
+        NS_TIME.intervalBefore, NS_TIME.intervalAfter
+    ):
+        n_instant_i_bs = get_beginnings(graph, n_interval_i)
+        n_instant_i_es = get_ends(graph, n_interval_i)
+        n_instant_j_bs = get_beginnings(graph, n_interval_j)
+        n_instant_j_es = get_ends(graph, n_interval_j)
+        for n_instant_i_b in n_instant_i_bs:
+            _add_time_edge(n_instant_i_b, n_interval_i, relation_triples)
+        for n_instant_i_e in n_instant_i_es:
+            _add_time_edge(n_interval_i, n_instant_i_e, relation_triples)
+        for n_instant_j_b in n_instant_j_bs:
+            _add_time_edge(n_instant_j_b, n_interval_j, relation_triples)
+        for n_instant_j_e in n_instant_j_es:
+            _add_time_edge(n_interval_j, n_instant_j_e, relation_triples)
+        for n_instant_i_e in n_instant_i_es:
+            for n_instant_j_b in n_instant_j_bs:
+                _add_time_edge(n_instant_i_e, n_instant_j_b, relation_triples)
+
+    for n_interval_i, n_interval_j, relation_triples in _linked_temporal_entities(
+        NS_TIME.intervalMeets, NS_TIME.intervalMetBy
+    ):
+        n_instant_i_bs = get_beginnings(graph, n_interval_i)
+        n_instant_i_es = get_ends(graph, n_interval_i)
+        n_instant_j_bs = get_beginnings(graph, n_interval_j)
+        n_instant_j_es = get_ends(graph, n_interval_j)
+        for n_instant_i_b in n_instant_i_bs:
+            _add_time_edge(n_instant_i_b, n_interval_i, relation_triples)
+        for n_instant_j_e in n_instant_j_es:
+            _add_time_edge(n_interval_j, n_instant_j_e, relation_triples)
+        for n_instant_joint in n_instant_i_es | n_instant_j_bs:
+            _add_time_edge(n_interval_i, n_instant_joint, relation_triples)
+            _add_time_edge(n_instant_joint, n_interval_j, relation_triples)
+
+    for n_interval_i, n_interval_j, relation_triples in _linked_temporal_entities(
+        NS_TIME.intervalOverlaps, NS_TIME.intervalOverlappedBy
+    ):
+        n_instant_i_bs = get_beginnings(graph, n_interval_i)
+        n_instant_i_es = get_ends(graph, n_interval_i)
+        n_instant_j_bs = get_beginnings(graph, n_interval_j)
+        n_instant_j_es = get_ends(graph, n_interval_j)
+        for n_instant_i_b in n_instant_i_bs:
+            _add_time_edge(n_instant_i_b, n_interval_i, relation_triples)
+        for n_instant_i_e in n_instant_i_es:
+            _add_time_edge(n_interval_i, n_instant_i_e, relation_triples)
+        for n_instant_j_b in n_instant_j_bs:
+            _add_time_edge(n_instant_j_b, n_interval_j, relation_triples)
+        for n_instant_j_e in n_instant_j_es:
+            _add_time_edge(n_interval_j, n_instant_j_e, relation_triples)
+        for n_instant_j_b in n_instant_j_bs:
+            for n_instant_i_e in n_instant_i_es:
+                _add_time_edge(n_instant_j_b, n_instant_i_e, relation_triples)
+
+    for n_interval_i, n_interval_j, relation_triples in _linked_temporal_entities(
+        NS_TIME.intervalStarts, NS_TIME.intervalStartedBy
+    ):
+        n_instant_i_bs = get_beginnings(graph, n_interval_i)
+        n_instant_i_es = get_ends(graph, n_interval_i)
+        n_instant_j_bs = get_beginnings(graph, n_interval_j)
+        n_instant_j_es = get_ends(graph, n_interval_j)
+        for n_instant_joint in n_instant_i_bs | n_instant_j_bs:
+            _add_time_edge(n_instant_joint, n_interval_i, relation_triples)
+            _add_time_edge(n_instant_joint, n_interval_j, relation_triples)
+        for n_instant_i_e in n_instant_i_es:
+            _add_time_edge(n_interval_i, n_instant_i_e, relation_triples)
+        for n_instant_j_e in n_instant_j_es:
+            _add_time_edge(n_interval_j, n_instant_j_e, relation_triples)
+        for n_instant_i_e in n_instant_i_es:
+            for n_instant_j_e in n_instant_j_es:
+                _add_time_edge(n_instant_i_e, n_instant_j_e, relation_triples)
+
+    for n_interval_i, n_interval_j, relation_triples in _linked_temporal_entities(
+        NS_TIME.intervalDuring, NS_TIME.intervalContains
+    ):
+        n_instant_i_bs = get_beginnings(graph, n_interval_i)
+        n_instant_i_es = get_ends(graph, n_interval_i)
+        n_instant_j_bs = get_beginnings(graph, n_interval_j)
+        n_instant_j_es = get_ends(graph, n_interval_j)
+        for n_instant_i_b in n_instant_i_bs:
+            _add_time_edge(n_instant_i_b, n_interval_i, relation_triples)
+        for n_instant_i_e in n_instant_i_es:
+            _add_time_edge(n_interval_i, n_instant_i_e, relation_triples)
+        for n_instant_j_b in n_instant_j_bs:
+            _add_time_edge(n_instant_j_b, n_interval_j, relation_triples)
+        for n_instant_j_e in n_instant_j_es:
+            _add_time_edge(n_interval_j, n_instant_j_e, relation_triples)
+        for n_instant_j_b in n_instant_j_bs:
+            for n_instant_i_b in n_instant_i_bs:
+                _add_time_edge(n_instant_j_b, n_instant_i_b, relation_triples)
+        for n_instant_i_e in n_instant_i_es:
+            for n_instant_j_e in n_instant_j_es:
+                _add_time_edge(n_instant_i_e, n_instant_j_e, relation_triples)
+
+    for n_interval_i, n_interval_j, relation_triples in _linked_temporal_entities(
+        NS_TIME.intervalFinishes, NS_TIME.intervalFinishedBy
+    ):
+        n_instant_i_bs = get_beginnings(graph, n_interval_i)
+        n_instant_i_es = get_ends(graph, n_interval_i)
+        n_instant_j_bs = get_beginnings(graph, n_interval_j)
+        n_instant_j_es = get_ends(graph, n_interval_j)
+        for n_instant_i_b in n_instant_i_bs:
+            _add_time_edge(n_instant_i_b, n_interval_i, relation_triples)
+        for n_instant_j_b in n_instant_j_bs:
+            _add_time_edge(n_instant_j_b, n_interval_j, relation_triples)
+        for n_instant_joint in n_instant_i_es | n_instant_j_es:
+            _add_time_edge(n_interval_i, n_instant_joint, relation_triples)
+            _add_time_edge(n_interval_j, n_instant_joint, relation_triples)
+        for n_instant_j_b in n_instant_j_bs:
+            for n_instant_i_b in n_instant_i_bs:
+                _add_time_edge(n_instant_j_b, n_instant_i_b, relation_triples)
+
+    for n_interval_i, n_interval_j, relation_triples in _linked_temporal_entities(
+        NS_TIME.intervalEquals
+    ):
+        n_instant_i_bs = get_beginnings(graph, n_interval_i)
+        n_instant_i_es = get_ends(graph, n_interval_i)
+        n_instant_j_bs = get_beginnings(graph, n_interval_j)
+        n_instant_j_es = get_ends(graph, n_interval_j)
+        for n_instant_joint in n_instant_i_bs | n_instant_j_bs:
+            _add_time_edge(n_instant_joint, n_interval_i, relation_triples)
+            _add_time_edge(n_instant_joint, n_interval_j, relation_triples)
+        for n_instant_joint in n_instant_i_es | n_instant_j_es:
+            _add_time_edge(n_interval_i, n_instant_joint, relation_triples)
+            _add_time_edge(n_interval_j, n_instant_joint, relation_triples)
+
+    # Consider PROV Entities to have a temporal sequencing related to
+    # their Generation and Invalidation events.
+    # Entities' Usages can also be related to their Generation and
+    # Invalidation events.
+
+    query = """\
+SELECT ?nEntity ?nGeneration ?nUsage
+WHERE {
+  ?nEntity
+    prov:qualifiedGeneration ?nGeneration ;
+    .
+  OPTIONAL {
+    ?nActivity
+      prov:qualifiedUsage ?nUsage ;
+      .
+    ?nUsage
+      prov:entity ?nEntity ;
+      .
+  }
+}
+"""
+    with query_execution.execute_query(graph, query) as results:
+        for result in results:
+            assert isinstance(result, rdflib.query.ResultRow)
+            assert isinstance(result[0], rdflib.term.IdentifiedNode)
+            assert isinstance(result[1], rdflib.term.IdentifiedNode)
+            n_entity = result[0]
+            n_generation = result[1]
+            relation_triples = {(n_entity, NS_PROV.qualifiedGeneration, n_generation)}
+            _add_time_edge(n_generation, n_entity, relation_triples)
+            if result[2] is not None:
+                assert isinstance(result[2], rdflib.term.IdentifiedNode)
+                n_usage = result[2]
+                _add_time_edge(
+                    n_generation,
+                    n_usage,
+                    relation_triples | {(n_usage, NS_PROV.entity, n_entity)},
+                )
+
+    query = """\
+SELECT ?nEntity ?nInvalidation ?nUsage
+WHERE {
+  ?nEntity
+    prov:qualifiedInvalidation ?nInvalidation ;
+    .
+  OPTIONAL {
+    ?nActivity
+      prov:qualifiedUsage ?nUsage ;
+      .
+    ?nUsage
+      prov:entity ?nEntity ;
+      .
+  }
+}
+"""
+    with query_execution.execute_query(graph, query) as results:
+        for result in results:
+            assert isinstance(result, rdflib.query.ResultRow)
+            assert isinstance(result[0], rdflib.term.IdentifiedNode)
+            assert isinstance(result[1], rdflib.term.IdentifiedNode)
+            n_entity = result[0]
+            n_invalidation = result[1]
+            relation_triples = {
+                (n_entity, NS_PROV.qualifiedInvalidation, n_invalidation)
+            }
+            _add_time_edge(n_entity, n_invalidation, relation_triples)
+            if result[2] is not None:
+                assert isinstance(result[2], rdflib.term.IdentifiedNode)
+                n_usage = result[2]
+                _add_time_edge(
+                    n_usage,
+                    n_invalidation,
+                    relation_triples | {(n_usage, NS_PROV.entity, n_entity)},
+                )
+
+    # time:inside relates Intervals to Instants within them.  Note that
+    # Instant inside an Interval is defined in TIME as 'not
+    # intended to include beginnings and ends of intervals.'  If an
+    # Interval is already asserted to be a ProperInterval, this will
+    # induce a discrete order between the Interval's starting and ending
+    # Instants and the Instant inside the interval, if the Interval is
+    # also a PROV Activity:
+    #
+    # * The definition of `prov:Start` includes "Any usage, generation,
+    #   or invalidation involving an activity follows the activity's
+    #   start."  (And likewise for `prov:End`: those
+    #   `prov:InstantaneousEvent`s precede the `prov:End` Instant.)
+    for triple in graph.triples((None, NS_TIME.inside, None)):
+        assert isinstance(triple[0], rdflib.term.IdentifiedNode)
+        assert isinstance(triple[2], rdflib.term.IdentifiedNode)
+        n_interval = triple[0]
+        if n_interval not in n_activities:
+            continue
+        n_interval_bs = get_beginnings(graph, n_interval)
+        n_interval_es = get_ends(graph, n_interval)
+
+        n_instant = triple[2]
+        relation_triples = {triple}
+
+        for n_interval_b in n_interval_bs:
+            _add_time_edge(n_interval_b, n_instant, relation_triples)
+            _add_time_edge(n_interval_b, n_interval, relation_triples)
+        for n_interval_e in n_interval_es:
+            _add_time_edge(n_instant, n_interval_e, relation_triples)
+            _add_time_edge(n_interval, n_interval_e, relation_triples)
+
+    # Sequence time:before and time:after, which will mean handling the
+    # mixes of `time:Instant`s and `time:Interval`s.
+    # _logger.debug(
+    #     "len(_linked_temporal_entities(NS_TIME.before, NS_TIME.after)) = %d.",
+    #     len(_linked_temporal_entities(NS_TIME.before, NS_TIME.after)),
+    # )
+    for n_entity_i, n_entity_j, relation_triples in _linked_temporal_entities(
+        NS_TIME.before, NS_TIME.after
+    ):
+        n_type_i: rdflib.URIRef
+        n_type_j: rdflib.URIRef
+
+        if (n_entity_i, NS_RDF.type, NS_TIME.Instant) in graph:
+            n_type_i = NS_TIME.Instant
+        elif (n_entity_i, NS_RDF.type, NS_TIME.ProperInterval) in graph:
+            n_type_i = NS_TIME.ProperInterval
+        elif (n_entity_i, NS_RDF.type, NS_TIME.Interval) in graph:
+            # Fall back to Interval after ProperInterval not found.
+            n_type_i = NS_TIME.Interval
+        else:
+            continue
+
+        if (n_entity_j, NS_RDF.type, NS_TIME.Instant) in graph:
+            n_type_j = NS_TIME.Instant
+        elif (n_entity_j, NS_RDF.type, NS_TIME.ProperInterval) in graph:
+            n_type_j = NS_TIME.ProperInterval
+        elif (n_entity_j, NS_RDF.type, NS_TIME.Interval) in graph:
+            # Fall back to Interval after ProperInterval not found.
+            n_type_j = NS_TIME.Interval
+        else:
+            continue
+
+        if n_type_i == NS_TIME.Instant and n_type_j == NS_TIME.Instant:
+            _add_time_edge(n_entity_i, n_entity_j, relation_triples)
+        elif n_type_i == NS_TIME.Instant and n_type_j in (
+            NS_TIME.Interval,
+            NS_TIME.ProperInterval,
+        ):
+            n_instant = n_entity_i
+            n_interval = n_entity_j
+            n_interval_bs = get_beginnings(graph, n_interval)
+            for n_interval_b in n_interval_bs:
+                _add_time_edge(n_instant, n_interval_b, relation_triples)
+                _add_time_edge(n_interval_b, n_interval, relation_triples)
+        elif (
+            n_type_i in (NS_TIME.Interval, NS_TIME.ProperInterval)
+            and n_type_j == NS_TIME.Instant
+        ):
+            n_instant = n_entity_j
+            n_interval = n_entity_i
+            n_interval_es = get_ends(graph, n_interval)
+            for n_interval_e in n_interval_es:
+                _add_time_edge(n_interval_e, n_instant, relation_triples)
+                _add_time_edge(n_interval, n_interval_e, relation_triples)
+        elif n_type_i in (NS_TIME.Interval, NS_TIME.ProperInterval) and n_type_j in (
+            NS_TIME.Interval,
+            NS_TIME.ProperInterval,
+        ):
+            n_instant_i_bs = get_beginnings(graph, n_entity_i)
+            n_instant_i_es = get_ends(graph, n_entity_i)
+            n_instant_j_bs = get_beginnings(graph, n_entity_j)
+            n_instant_j_es = get_ends(graph, n_entity_j)
+            for n_instant_i_b in n_instant_i_bs:
+                _add_time_edge(n_instant_i_b, n_entity_i, relation_triples)
+            for n_instant_i_e in n_instant_i_es:
+                _add_time_edge(n_entity_i, n_instant_i_e, relation_triples)
+            for n_instant_j_b in n_instant_j_bs:
+                _add_time_edge(n_instant_j_b, n_entity_j, relation_triples)
+            for n_instant_j_e in n_instant_j_es:
+                _add_time_edge(n_entity_j, n_instant_j_e, relation_triples)
+            for n_instant_i_e in n_instant_i_es:
+                for n_instant_j_b in n_instant_j_bs:
+                    _add_time_edge(n_instant_i_e, n_instant_j_b, relation_triples)
+        else:
+            _logger.info("n_type_i = %s.", n_type_i)
+            _logger.info("n_type_j = %s.", n_type_j)
+            raise NotImplementedError("Unimplemented combination of node types.")
+
+    for triple in graph.triples((None, NS_EPHEMERAL.witnesses, None)):
+        assert isinstance(triple[0], rdflib.term.IdentifiedNode)
+        assert isinstance(triple[2], rdflib.term.IdentifiedNode)
+        n_witness = triple[0]
+        n_terminus_instant = triple[2]
+        _add_time_edge(n_terminus_instant, n_witness, {triple})
+
+    if len(n_things_outside_window) > 0:
+        for x in list(time_edges.keys()):
+            if x[0] in n_things_outside_window or x[1] in n_things_outside_window:
+                del time_edges[x]
+
+    return time_edges
+
+
+def add_timestamp_time_edges(
+    graph: rdflib.Graph,
+    n_instants: typing.Set[rdflib.term.IdentifiedNode],
+    time_edges: EdgeSourcesType,
+) -> None:
+    """
+    Add to time_edges the ordering of n_instants by their time:inXSDDateTimeStamp values, each edge mapped to the two timestamp triples that imply it.
+    """
+    # Include in the sorting the granularity of the timestamp.  An
+    # Instant specified to the minute might or might not be before one
+    # specified to the same minute with seconds included.
+    n_instants_orderer: typing.DefaultDict[
+        int,
+        typing.DefaultDict[
+            str,
+            typing.Set[typing.Tuple[rdflib.term.IdentifiedNode, rdflib.Literal]],
+        ],
+    ] = collections.defaultdict(lambda: collections.defaultdict(set))
+    for n_instant in n_instants:
+        for l_datetimestamp in graph.objects(n_instant, NS_TIME.inXSDDateTimeStamp):
+            assert isinstance(l_datetimestamp, rdflib.Literal)
+            s_datetimestamp = str(l_datetimestamp)
+            if s_datetimestamp[-1] == "Z":
+                zulu_dts = s_datetimestamp[:-1]
+            elif s_datetimestamp[-3] == ":":
+                if s_datetimestamp[-5:] == "00:00":
+                    zulu_dts = s_datetimestamp[:-6] + "Z"
+                else:
+                    # TODO: Convert non-GMT timestamps to GMT.
+                    continue
+            n_instants_orderer[len(zulu_dts)][zulu_dts].add(
+                (n_instant, l_datetimestamp)
+            )
+    # _logger.debug("n_instants_orderer = %s.", pprint.pformat(n_instants_orderer))
+    for timestamp_length in sorted(n_instants_orderer.keys()):
+        # _logger.debug("  timestamp_length = %d.", timestamp_length)
+        n_prior_zulu_dts_instants: typing.Set[
+            typing.Tuple[rdflib.term.IdentifiedNode, rdflib.Literal]
+        ] = set()
+        for zulu_dts in sorted(n_instants_orderer[timestamp_length]):
+            # _logger.debug("    zulu_dts = %s.", zulu_dts)
+            # _logger.debug(
+            #     "      n_prior_zulu_dts_instants = %r.", n_prior_zulu_dts_instants
+            # )
+            n_current_zulu_dts_instants = n_instants_orderer[timestamp_length][zulu_dts]
+            # _logger.debug(
+            #     "      n_current_zulu_dts_instants = %r.", n_current_zulu_dts_instants
+            # )
+            for n_prior_zulu_dts_instant, l_prior in n_prior_zulu_dts_instants:
+                for (
+                    n_current_zulu_dts_instant,
+                    l_current,
+                ) in n_current_zulu_dts_instants:
+                    # _logger.debug(
+                    #     "        %r -> %r",
+                    #     n_prior_zulu_dts_instant,
+                    #     n_current_zulu_dts_instant,
+                    # )
+                    time_edges[
+                        (n_prior_zulu_dts_instant, n_current_zulu_dts_instant)
+                    ] |= {
+                        (n_prior_zulu_dts_instant, NS_TIME.inXSDDateTimeStamp, l_prior),
+                        (
+                            n_current_zulu_dts_instant,
+                            NS_TIME.inXSDDateTimeStamp,
+                            l_current,
+                        ),
+                    }
+            n_prior_zulu_dts_instants = n_current_zulu_dts_instants
+
+
+def get_graph_time_edges(
+    graph: rdflib.Graph,
+    ns_kb: rdflib.Namespace,
+    use_deterministic_uuids: bool,
+) -> EdgeSourcesType:
+    """
+    Get the temporal ordering edges `render_dot` computes over the whole graph, with the triples that imply each.  As with `render_dot`, the graph is augmented in place with the inferred time:Instants and time:Intervals of PROV things.
+    """
+    graph.bind("prov", NS_PROV)
+    graph.bind("time", NS_TIME)
+
+    n_activities: typing.Set[rdflib.term.IdentifiedNode] = set()
+    select_query_text = """\
+SELECT ?nActivity
+WHERE {
+  ?nActivity a/rdfs:subClassOf* prov:Activity .
+}
+"""
+    with query_execution.execute_query(
+        graph, select_query_text, init_ns={"prov": NS_PROV, "rdfs": NS_RDFS}
+    ) as results:
+        for result in results:
+            assert isinstance(result, rdflib.query.ResultRow)
+            assert isinstance(result[0], rdflib.term.IdentifiedNode)
+            n_activities.add(result[0])
+
+    expand_prov_activities_with_owl_time_indexed(graph, ns_kb, use_deterministic_uuids)
+
+    n_instants: typing.Set[rdflib.term.IdentifiedNode] = set()
+    n_intervals: typing.Set[rdflib.term.IdentifiedNode] = set()
+    for n_subject in graph.subjects(NS_RDF.type, NS_TIME.Instant):
+        assert isinstance(n_subject, rdflib.term.IdentifiedNode)
+        n_instants.add(n_subject)
+    for n_interval_type in {NS_TIME.Interval, NS_TIME.ProperInterval}:
+        for n_subject in graph.subjects(NS_RDF.type, n_interval_type):
+            assert isinstance(n_subject, rdflib.term.IdentifiedNode)
+            n_intervals.add(n_subject)
+
+    time_edges = get_time_edges(graph, n_intervals, n_activities, set())
+    add_timestamp_time_edges(graph, n_instants, time_edges)
+    return time_edges
+
+
+def get_kb_namespace(graph: rdflib.Graph, args: argparse.Namespace) -> rdflib.Namespace:
+    """
+    Determine the knowledge base namespace for new inherent nodes, from the --kb-prefix and --kb-iri options of `add_arguments`.
+    """
+    nsdict = {k: v for (k, v) in graph.namespace_manager.namespaces()}
+    if args.kb_prefix in nsdict:
+        return rdflib.Namespace(nsdict[args.kb_prefix])
+    return rdflib.Namespace(args.kb_iri)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the options of case_prov_dot, without its positional arguments, to an argument parser.
+    """
+    parser.add_argument("--debug", action="store_true")
     parser.add_argument("--debug-graph", type=argparse.FileType("x"))
     parser.add_argument(
         "--dash-unqualified",
@@ -859,7 +2216,39 @@ def main() -> None:
     parser.add_argument(
         "--entity-ancestry",
         help="Visualize the ancestry of the node with this IRI.  If absent, entire graph is returned.",
-    )  # TODO - Add inverse --entity-progeny as well.
+    )
+    parser.add_argument(
+        "--reachability-index",
+        help="Reachability index file written by case_prov reachability from the input graphs, used to find the ancestry of --entity-ancestry or --query-ancestry.  If absent, the indexes are built from the input graphs.",
+    )
+    parser.add_argument(
+        "--query-descendants",
+        help="Visualize the descendants of the nodes returned by the SPARQL query in this file: the Entities derived from them, and the Activities informed by them or using them.  Query must be a SELECT that returns non-blank nodes.",
+    )
+    parser.add_argument(
+        "--entity-descendants",
+        help="Visualize the descendants of the node with this IRI.  If absent, entire graph is returned.",
+    )
+    parser.add_argument(
+        "--descendants-depth",
+        type=int,
+        help="Number of derivation or communication steps to follow from the nodes selected by --entity-descendants or --query-descendants.  If absent, all descendants are returned.",
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime_argument,
+        help="Omit time:Instants timestamped before this ISO 8601 timestamp, and the time:Intervals (including prov:Activities) known to end before it.  A timestamp without a timezone is interpreted as UTC.",
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime_argument,
+        help="Omit time:Instants timestamped after this ISO 8601 timestamp, and the time:Intervals (including prov:Activities) known to begin after it.  A timestamp without a timezone is interpreted as UTC.",
+    )
+    parser.add_argument(
+        "--drop-time-cycle-edges",
+        action="store_true",
+        help="Omit the temporal ordering edges within each cycle of the ordering.  Cycles come from contradictory timestamps or time: relations, and are logged as warnings with the triples that produced them whether or not this flag is used.  Without this flag, the edges are kept and left to Graphviz to break.",
+    )
     parser.add_argument("--from-empty-set", action="store_true")
     parser.add_argument("--omit-empty-set", action="store_true")
     parser.add_argument(
@@ -887,17 +2276,20 @@ def main() -> None:
         action="store_true",
         help="Display Entity nodes and wasDerivedBy relationships.",
     )
-    parser.add_argument("out_dot")
-    parser.add_argument("in_graph", nargs="+")
-    args = parser.parse_args()
 
-    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
 
-    cdo_local_uuid.configure()
+def render_dot(
+    graph: rdflib.Graph,
+    args: argparse.Namespace,
+    n_focus_things: typing.Optional[typing.Set[rdflib.term.IdentifiedNode]] = None,
+) -> "pydot.Dot":
+    """
+    Render the graph as case_prov_dot writes to its output file.  args is a namespace of the options added by `add_arguments`.  The graph is augmented in place with the temporary triples used for rendering, so a graph to be rendered more than once should be copied first.
 
-    graph = rdflib.Graph()
-    for in_graph_filename in args.in_graph:
-        graph.parse(in_graph_filename)
+    If n_focus_things is given, the PROV things displayed are reduced to those things, as they are reduced to a chain of ancestry, and the ancestry and descendants options are ignored.
+    """
+    import prov.constants
+    import pydot
 
     graph.bind("case-investigation", NS_CASE_INVESTIGATION)
     graph.bind("prov", NS_PROV)
@@ -905,13 +2297,7 @@ def main() -> None:
 
     nsdict = {k: v for (k, v) in graph.namespace_manager.namespaces()}
 
-    # Determine knowledge base prefix for new inherent nodes.
-    if args.kb_prefix in nsdict:
-        NS_KB = rdflib.Namespace(nsdict[args.kb_prefix])
-    elif args.kb_iri in nsdict.values():
-        NS_KB = rdflib.Namespace(args.kb_iri)
-    else:
-        NS_KB = rdflib.Namespace(args.kb_iri)
+    NS_KB = get_kb_namespace(graph, args)
 
     use_deterministic_uuids = args.use_deterministic_uuids is True
 
@@ -953,14 +2339,14 @@ WHERE {
   ?nActivity a/rdfs:subClassOf* prov:Activity .
 }
 """
-    select_query_object = rdflib.plugins.sparql.processor.prepareQuery(
-        select_query_text, initNs=nsdict
-    )
-    for result in graph.query(select_query_object):
-        assert isinstance(result, rdflib.query.ResultRow)
-        assert isinstance(result[0], rdflib.term.IdentifiedNode)
-        n_activity = result[0]
-        n_activities.add(n_activity)
+    with query_execution.execute_query(
+        graph, select_query_text, init_ns=nsdict
+    ) as results:
+        for result in results:
+            assert isinstance(result, rdflib.query.ResultRow)
+            assert isinstance(result[0], rdflib.term.IdentifiedNode)
+            n_activity = result[0]
+            n_activities.add(n_activity)
     _logger.debug("len(n_activities) = %d.", len(n_activities))
 
     # Populate Agents.
@@ -970,14 +2356,14 @@ WHERE {
   ?nAgent a/rdfs:subClassOf* prov:Agent .
 }
 """
-    select_query_object = rdflib.plugins.sparql.processor.prepareQuery(
-        select_query_text, initNs=nsdict
-    )
-    for result in graph.query(select_query_object):
-        assert isinstance(result, rdflib.query.ResultRow)
-        assert isinstance(result[0], rdflib.term.IdentifiedNode)
-        n_agent = result[0]
-        n_agents.add(n_agent)
+    with query_execution.execute_query(
+        graph, select_query_text, init_ns=nsdict
+    ) as results:
+        for result in results:
+            assert isinstance(result, rdflib.query.ResultRow)
+            assert isinstance(result[0], rdflib.term.IdentifiedNode)
+            n_agent = result[0]
+            n_agents.add(n_agent)
     _logger.debug("len(n_agents) = %d.", len(n_agents))
 
     # Populate Collections.
@@ -987,14 +2373,14 @@ WHERE {
   ?nCollection a/rdfs:subClassOf* prov:Collection .
 }
 """
-    select_query_object = rdflib.plugins.sparql.processor.prepareQuery(
-        select_query_text, initNs=nsdict
-    )
-    for record in graph.query(select_query_object):
-        assert isinstance(record, rdflib.query.ResultRow)
-        assert isinstance(record[0], rdflib.term.IdentifiedNode)
-        n_collection = record[0]
-        n_collections.add(n_collection)
+    with query_execution.execute_query(
+        graph, select_query_text, init_ns=nsdict
+    ) as results:
+        for record in results:
+            assert isinstance(record, rdflib.query.ResultRow)
+            assert isinstance(record[0], rdflib.term.IdentifiedNode)
+            n_collection = record[0]
+            n_collections.add(n_collection)
     _logger.debug("len(n_collections) = %d.", len(n_collections))
 
     # Populate Entities.
@@ -1004,14 +2390,14 @@ WHERE {
   ?nEntity a/rdfs:subClassOf* prov:Entity .
 }
 """
-    select_query_object = rdflib.plugins.sparql.processor.prepareQuery(
-        select_query_text, initNs=nsdict
-    )
-    for record in graph.query(select_query_object):
-        assert isinstance(record, rdflib.query.ResultRow)
-        assert isinstance(record[0], rdflib.term.IdentifiedNode)
-        n_entity = record[0]
-        n_entities.add(n_entity)
+    with query_execution.execute_query(
+        graph, select_query_text, init_ns=nsdict
+    ) as results:
+        for record in results:
+            assert isinstance(record, rdflib.query.ResultRow)
+            assert isinstance(record[0], rdflib.term.IdentifiedNode)
+            n_entity = record[0]
+            n_entities.add(n_entity)
     _logger.debug("len(n_entities) = %d.", len(n_entities))
 
     n_prov_basis_things = n_activities | n_agents | n_entities
@@ -1022,7 +2408,7 @@ WHERE {
 
     # Expand the PROV things to also be TIME things.
     # Infer boundary Instants for time:Intervals.
-    expand_prov_activities_with_owl_time(
+    expand_prov_activities_with_owl_time_indexed(
         graph, NS_KB, use_deterministic_uuids, debug_graph_fh=args.debug_graph
     )
 
@@ -1064,6 +2450,43 @@ WHERE {
     _logger.debug("len(n_instants) = %d.", len(n_instants))
     _logger.debug("len(n_terminus_instants) = %d.", len(n_terminus_instants))
 
+    # S2.1.
+    # Remove the TIME Things known to fall outside of the requested time
+    # window.  Things without timestamps are kept, unless they are the
+    # beginning, end, or inside of an omitted time:Interval.
+    n_things_outside_window: typing.Set[rdflib.term.IdentifiedNode] = set()
+    if args.since is not None or args.until is not None:
+        since = None if args.since is None else args.since.timestamp()
+        until = None if args.until is None else args.until.timestamp()
+
+        instant_epoch_index = build_instant_epoch_index(graph, n_instants)
+        interval_epoch_index = build_interval_epoch_index(
+            graph, n_intervals, instant_epoch_index
+        )
+        n_things_outside_window |= set(instant_epoch_index[1]) - set(
+            query_instant_epoch_index(instant_epoch_index, since, until)
+        )
+        n_intervals_outside_window = set(interval_epoch_index[2]) - set(
+            query_interval_epoch_index(interval_epoch_index, since, until)
+        )
+        n_things_outside_window |= n_intervals_outside_window
+        for n_interval in n_intervals_outside_window:
+            n_things_outside_window |= get_beginnings(graph, n_interval)
+            n_things_outside_window |= get_ends(graph, n_interval)
+            for n_object in graph.objects(n_interval, NS_TIME.inside):
+                assert isinstance(n_object, rdflib.term.IdentifiedNode)
+                n_things_outside_window.add(n_object)
+
+        n_activities -= n_things_outside_window
+        n_instants -= n_things_outside_window
+        n_intervals -= n_things_outside_window
+        n_terminus_instants -= n_things_outside_window
+        n_prov_basis_things -= n_things_outside_window
+
+        _logger.debug(
+            "len(n_things_outside_window) = %d.", len(n_things_outside_window)
+        )
+
     # S3.
 
     # S3.1.
@@ -1191,6 +2614,7 @@ WHERE {
         for n_object in graph.objects(None, n_qualification_property):
             assert isinstance(n_object, rdflib.term.IdentifiedNode)
             n_instantaneous_events.add(n_object)
+    n_instantaneous_events -= n_things_outside_window
 
     # _logger.debug("n_instant_to_tooltips = %s." % pprint.pformat(n_instant_to_tooltips))
 
@@ -1200,18 +2624,23 @@ WHERE {
         kwargs: typing.Dict[str, str],
         supplemental_dict: typing.Optional[EdgesType] = None,
     ) -> None:
-        select_query_object = rdflib.plugins.sparql.processor.prepareQuery(
-            select_query_text, initNs=nsdict
-        )
-        for record in graph.query(select_query_object):
-            assert isinstance(record, rdflib.query.ResultRow)
-            assert isinstance(record[0], rdflib.term.IdentifiedNode)
-            assert isinstance(record[1], rdflib.term.IdentifiedNode)
-            n_thing_1 = record[0]
-            n_thing_2 = record[1]
-            edges[n_thing_1][n_thing_2][short_edge_label] = kwargs
-            if supplemental_dict is not None:
-                supplemental_dict[n_thing_1][n_thing_2][short_edge_label] = kwargs
+        with query_execution.execute_query(
+            graph, select_query_text, init_ns=nsdict, stacklevel=2
+        ) as results:
+            for record in results:
+                assert isinstance(record, rdflib.query.ResultRow)
+                assert isinstance(record[0], rdflib.term.IdentifiedNode)
+                assert isinstance(record[1], rdflib.term.IdentifiedNode)
+                n_thing_1 = record[0]
+                n_thing_2 = record[1]
+                if (
+                    n_thing_1 in n_things_outside_window
+                    or n_thing_2 in n_things_outside_window
+                ):
+                    continue
+                edges[n_thing_1][n_thing_2][short_edge_label] = kwargs
+                if supplemental_dict is not None:
+                    supplemental_dict[n_thing_1][n_thing_2][short_edge_label] = kwargs
 
     if include_agents:
         # Render actedOnBehalfOf.
@@ -1453,386 +2882,45 @@ WHERE {
     prov:qualifiedCommunication ?nCommunication ;
     .
   ?nCommunication
-    a prov:Communication ;
-    prov:activity ?nActivity2
-    .
-}
-"""
-            kwargs = clone_style(prov.constants.PROV_COMMUNICATION)
-            _render_edges(select_query_text, "wasInformedBy", kwargs)
-
-    _logger.debug("len(edges) = %d.", len(edges))
-
-    # S3.2.
-    # Stash display data for TIME Things.
-
-    # The set time_edge_node_pairs stores ordered pairs of
-    # `time:TemporalEntity`s that precede each other in logical sequence.
-    # I.e. (X,Y) being in the set means X sequentiallyPrecedes Y.  Here
-    # is how Instants and Intervals work with sequentiallyPrecedes:
-    # * An Instant sequentiallyPrecedes all Instants inside an Interval
-    #   after the Interval's beginning Instant.
-    # * All Instants inside an interval before the Interval's ending
-    #   Instant sequentiallyPrecede an Instant.
-    # * An Interval X sequentiallyPrecedes an Interval Y if and only if
-    #   one of the "Allen algebra" relations Before(X,Y), Meets(X,Y),
-    #   After(Y,X), or MetBy(Y,X) are true.
-    # This definition is similar to `time:before`, except for the
-    # boundary condition: Before(T_1,T_2) states "the end of T_1 is
-    # before the beginning of T_2".  SequentiallyPrecedes(T_1,T_2) (with
-    # T_1 and Instant, T_2 an Interval) lets T_1 potentially be equal to
-    # the beginning of T_2.
-    time_edge_node_pairs: typing.Set[
-        typing.Tuple[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode]
-    ] = set()
-
-    # These variables are "subscripted" i and j in keeping with Figure 2
-    # on the OWL-Time documentation page:
-    # https://www.w3.org/TR/2022/CRD-owl-time-20221115/#fig-thirteen-elementary-possible-relations-between-time-periods-af-97
-    # The further "subscripts" b and e are interval beginnings and
-    # endings.
-    n_instant_i_b: typing.Optional[rdflib.term.IdentifiedNode]
-    n_instant_i_e: typing.Optional[rdflib.term.IdentifiedNode]
-    n_instant_j_b: typing.Optional[rdflib.term.IdentifiedNode]
-    n_instant_j_e: typing.Optional[rdflib.term.IdentifiedNode]
-    n_interval_i: rdflib.term.IdentifiedNode
-    n_interval_j: rdflib.term.IdentifiedNode
-
-    # Sequence all Intervals with their boundary Instants.
-    for n_interval in n_intervals:
-        for n_object in graph.objects(n_interval, NS_TIME.hasBeginning):
-            assert isinstance(n_object, rdflib.term.IdentifiedNode)
-            time_edge_node_pairs.add((n_object, n_interval))
-        for n_object in graph.objects(n_interval, NS_TIME.hasEnd):
-            assert isinstance(n_object, rdflib.term.IdentifiedNode)
-            time_edge_node_pairs.add((n_interval, n_object))
-
-    # Add tooltips for instants of intervals that aren't PROV
-    # Activities.  (These tooltips are already kind-of provided by an
-    # above loop for Activities.)
-    for n_interval in n_intervals - n_activities:
-        # Add to tooltips of associated Instants.
-        for n_predicate, template in {
-            (NS_TIME.hasBeginning, "Beginning of %s"),
-            (NS_TIME.hasEnd, "End of %s"),
-        }:
-            for n_instant in graph.objects(n_interval, n_predicate):
-                assert isinstance(n_instant, rdflib.term.IdentifiedNode)
-                n_instant_to_tooltips[n_instant].add(template % n_interval)
-    # _logger.debug("n_instant_to_tooltips = %s." % pprint.pformat(n_instant_to_tooltips))
-    for triple in graph.triples((None, NS_EPHEMERAL.witnesses, None)):
-        assert isinstance(triple[0], rdflib.term.IdentifiedNode)
-        assert isinstance(triple[2], rdflib.term.IdentifiedNode)
-        n_witness = triple[0]
-        n_terminus_instant = triple[2]
-        for n_subject in graph.subjects(NS_TIME.inside, n_witness):
-            n_instant_to_tooltips[n_witness].add(
-                "Instant in %s known to follow %s." % (n_subject, n_terminus_instant)
-            )
-
-    # Loop through the thirteen Allen Algebra relations.  Using
-    # relationship-inverses, they break down into seven logic blocks.
-
-    for n_interval_i, n_interval_j in linked_temporal_entities(
-        graph, NS_TIME.intervalBefore, NS_TIME.intervalAfter
-    ):
-        n_instant_i_bs = get_beginnings(graph, n_interval_i)
-        n_instant_i_es = get_ends(graph, n_interval_i)
-        n_instant_j_bs = get_beginnings(graph, n_interval_j)
-        n_instant_j_es = get_ends(graph, n_interval_j)
-        for n_instant_i_b in n_instant_i_bs:
-            time_edge_node_pairs.add((n_instant_i_b, n_interval_i))
-        for n_instant_i_e in n_instant_i_es:
-            time_edge_node_pairs.add((n_interval_i, n_instant_i_e))
-        for n_instant_j_b in n_instant_j_bs:
-            time_edge_node_pairs.add((n_instant_j_b, n_interval_j))
-        for n_instant_j_e in n_instant_j_es:
-            time_edge_node_pairs.add((n_interval_j, n_instant_j_e))
-        for n_instant_i_e in n_instant_i_es:
-            for n_instant_j_b in n_instant_j_bs:
-                time_edge_node_pairs.add((n_instant_i_e, n_instant_j_b))
-
-    for n_interval_i, n_interval_j in linked_temporal_entities(
-        graph, NS_TIME.intervalMeets, NS_TIME.intervalMetBy
-    ):
-        n_instant_i_bs = get_beginnings(graph, n_interval_i)
-        n_instant_i_es = get_ends(graph, n_interval_i)
-        n_instant_j_bs = get_beginnings(graph, n_interval_j)
-        n_instant_j_es = get_ends(graph, n_interval_j)
-        for n_instant_i_b in n_instant_i_bs:
-            time_edge_node_pairs.add((n_instant_i_b, n_interval_i))
-        for n_instant_j_e in n_instant_j_es:
-            time_edge_node_pairs.add((n_interval_j, n_instant_j_e))
-        for n_instant_joint in n_instant_i_es | n_instant_j_bs:
-            time_edge_node_pairs.add((n_interval_i, n_instant_joint))
-            time_edge_node_pairs.add((n_instant_joint, n_interval_j))
-
-    for n_interval_i, n_interval_j in linked_temporal_entities(
-        graph, NS_TIME.intervalOverlaps, NS_TIME.intervalOverlappedBy
-    ):
-        n_instant_i_bs = get_beginnings(graph, n_interval_i)
-        n_instant_i_es = get_ends(graph, n_interval_i)
-        n_instant_j_bs = get_beginnings(graph, n_interval_j)
-        n_instant_j_es = get_ends(graph, n_interval_j)
-        for n_instant_i_b in n_instant_i_bs:
-            time_edge_node_pairs.add((n_instant_i_b, n_interval_i))
-        for n_instant_i_e in n_instant_i_es:
-            time_edge_node_pairs.add((n_interval_i, n_instant_i_e))
-        for n_instant_j_b in n_instant_j_bs:
-            time_edge_node_pairs.add((n_instant_j_b, n_interval_j))
-        for n_instant_j_e in n_instant_j_es:
-            time_edge_node_pairs.add((n_interval_j, n_instant_j_e))
-        for n_instant_j_b in n_instant_j_bs:
-            for n_instant_i_e in n_instant_i_es:
-                time_edge_node_pairs.add((n_instant_j_b, n_instant_i_e))
-
-    for n_interval_i, n_interval_j in linked_temporal_entities(
-        graph, NS_TIME.intervalStarts, NS_TIME.intervalStartedBy
-    ):
-        n_instant_i_bs = get_beginnings(graph, n_interval_i)
-        n_instant_i_es = get_ends(graph, n_interval_i)
-        n_instant_j_bs = get_beginnings(graph, n_interval_j)
-        n_instant_j_es = get_ends(graph, n_interval_j)
-        for n_instant_joint in n_instant_i_bs | n_instant_j_bs:
-            time_edge_node_pairs.add((n_instant_joint, n_interval_i))
-            time_edge_node_pairs.add((n_instant_joint, n_interval_j))
-        for n_instant_i_e in n_instant_i_es:
-            time_edge_node_pairs.add((n_interval_i, n_instant_i_e))
-        for n_instant_j_e in n_instant_j_es:
-            time_edge_node_pairs.add((n_interval_j, n_instant_j_e))
-        for n_instant_i_e in n_instant_i_es:
-            for n_instant_j_e in n_instant_j_es:
-                time_edge_node_pairs.add((n_instant_i_e, n_instant_j_e))
-
-    for n_interval_i, n_interval_j in linked_temporal_entities(
-        graph, NS_TIME.intervalDuring, NS_TIME.intervalContains
-    ):
-        n_instant_i_bs = get_beginnings(graph, n_interval_i)
-        n_instant_i_es = get_ends(graph, n_interval_i)
-        n_instant_j_bs = get_beginnings(graph, n_interval_j)
-        n_instant_j_es = get_ends(graph, n_interval_j)
-        for n_instant_i_b in n_instant_i_bs:
-            time_edge_node_pairs.add((n_instant_i_b, n_interval_i))
-        for n_instant_i_e in n_instant_i_es:
-            time_edge_node_pairs.add((n_interval_i, n_instant_i_e))
-        for n_instant_j_b in n_instant_j_bs:
-            time_edge_node_pairs.add((n_instant_j_b, n_interval_j))
-        for n_instant_j_e in n_instant_j_es:
-            time_edge_node_pairs.add((n_interval_j, n_instant_j_e))
-        for n_instant_j_b in n_instant_j_bs:
-            for n_instant_i_b in n_instant_i_bs:
-                time_edge_node_pairs.add((n_instant_j_b, n_instant_i_b))
-        for n_instant_i_e in n_instant_i_es:
-            for n_instant_j_e in n_instant_j_es:
-                time_edge_node_pairs.add((n_instant_i_e, n_instant_j_e))
-
-    for n_interval_i, n_interval_j in linked_temporal_entities(
-        graph, NS_TIME.intervalFinishes, NS_TIME.intervalFinishedBy
-    ):
-        n_instant_i_bs = get_beginnings(graph, n_interval_i)
-        n_instant_i_es = get_ends(graph, n_interval_i)
-        n_instant_j_bs = get_beginnings(graph, n_interval_j)
-        n_instant_j_es = get_ends(graph, n_interval_j)
-        for n_instant_i_b in n_instant_i_bs:
-            time_edge_node_pairs.add((n_instant_i_b, n_interval_i))
-        for n_instant_j_b in n_instant_j_bs:
-            time_edge_node_pairs.add((n_instant_j_b, n_interval_j))
-        for n_instant_joint in n_instant_i_es | n_instant_j_es:
-            time_edge_node_pairs.add((n_interval_i, n_instant_joint))
-            time_edge_node_pairs.add((n_interval_j, n_instant_joint))
-        for n_instant_j_b in n_instant_j_bs:
-            for n_instant_i_b in n_instant_i_bs:
-                time_edge_node_pairs.add((n_instant_j_b, n_instant_i_b))
-
-    for n_interval_i, n_interval_j in linked_temporal_entities(
-        graph, NS_TIME.intervalEquals
-    ):
-        n_instant_i_bs = get_beginnings(graph, n_interval_i)
-        n_instant_i_es = get_ends(graph, n_interval_i)
-        n_instant_j_bs = get_beginnings(graph, n_interval_j)
-        n_instant_j_es = get_ends(graph, n_interval_j)
-        for n_instant_joint in n_instant_i_bs | n_instant_j_bs:
-            time_edge_node_pairs.add((n_instant_joint, n_interval_i))
-            time_edge_node_pairs.add((n_instant_joint, n_interval_j))
-        for n_instant_joint in n_instant_i_es | n_instant_j_es:
-            time_edge_node_pairs.add((n_interval_i, n_instant_joint))
-            time_edge_node_pairs.add((n_interval_j, n_instant_joint))
-
-    # Consider PROV Entities to have a temporal sequencing related to
-    # their Generation and Invalidation events.
-    # Entities' Usages can also be related to their Generation and
-    # Invalidation events.
-
-    query = """\
-SELECT ?nEntity ?nGeneration ?nUsage
-WHERE {
-  ?nEntity
-    prov:qualifiedGeneration ?nGeneration ;
-    .
-  OPTIONAL {
-    ?nActivity
-      prov:qualifiedUsage ?nUsage ;
-      .
-    ?nUsage
-      prov:entity ?nEntity ;
-      .
-  }
-}
-"""
-    for result in graph.query(query):
-        assert isinstance(result, rdflib.query.ResultRow)
-        assert isinstance(result[0], rdflib.term.IdentifiedNode)
-        assert isinstance(result[1], rdflib.term.IdentifiedNode)
-        n_entity = result[0]
-        n_generation = result[1]
-        time_edge_node_pairs.add((n_generation, n_entity))
-        if result[2] is not None:
-            assert isinstance(result[2], rdflib.term.IdentifiedNode)
-            n_usage = result[2]
-            time_edge_node_pairs.add((n_generation, n_usage))
-
-    query = """\
-SELECT ?nEntity ?nInvalidation ?nUsage
-WHERE {
-  ?nEntity
-    prov:qualifiedInvalidation ?nInvalidation ;
-    .
-  OPTIONAL {
-    ?nActivity
-      prov:qualifiedUsage ?nUsage ;
-      .
-    ?nUsage
-      prov:entity ?nEntity ;
-      .
-  }
+    a prov:Communication ;
+    prov:activity ?nActivity2
+    .
 }
 """
-    for result in graph.query(query):
-        assert isinstance(result, rdflib.query.ResultRow)
-        assert isinstance(result[0], rdflib.term.IdentifiedNode)
-        assert isinstance(result[1], rdflib.term.IdentifiedNode)
-        n_entity = result[0]
-        n_invalidation = result[1]
-        time_edge_node_pairs.add((n_entity, n_invalidation))
-        if result[2] is not None:
-            assert isinstance(result[2], rdflib.term.IdentifiedNode)
-            n_usage = result[2]
-            time_edge_node_pairs.add((n_usage, n_invalidation))
-
-    # time:inside relates Intervals to Instants within them.  Note that
-    # Instant inside an Interval is defined in TIME as 'not
-    # intended to include beginnings and ends of intervals.'  If an
-    # Interval is already asserted to be a ProperInterval, this will
-    # induce a discrete order between the Interval's starting and ending
-    # Instants and the Instant inside the interval, if the Interval is
-    # also a PROV Activity:
-    #
-    # * The definition of `prov:Start` includes "Any usage, generation,
-    #   or invalidation involving an activity follows the activity's
-    #   start."  (And likewise for `prov:End`: those
-    #   `prov:InstantaneousEvent`s precede the `prov:End` Instant.)
-    for triple in graph.triples((None, NS_TIME.inside, None)):
-        assert isinstance(triple[0], rdflib.term.IdentifiedNode)
-        assert isinstance(triple[2], rdflib.term.IdentifiedNode)
-        n_interval = triple[0]
-        if n_interval not in n_activities:
-            continue
-        n_interval_bs = get_beginnings(graph, n_interval)
-        n_interval_es = get_ends(graph, n_interval)
-
-        n_instant = triple[2]
-
-        for n_interval_b in n_interval_bs:
-            time_edge_node_pairs.add((n_interval_b, n_instant))
-            time_edge_node_pairs.add((n_interval_b, n_interval))
-        for n_interval_e in n_interval_es:
-            time_edge_node_pairs.add((n_instant, n_interval_e))
-            time_edge_node_pairs.add((n_interval, n_interval_e))
-
-    # Sequence time:before and time:after, which will mean handling the
-    # mixes of `time:Instant`s and `time:Interval`s.
-    # _logger.debug(
-    #     "len(_linked_temporal_entities(NS_TIME.before, NS_TIME.after)) = %d.",
-    #     len(_linked_temporal_entities(NS_TIME.before, NS_TIME.after)),
-    # )
-    for n_entity_i, n_entity_j in linked_temporal_entities(
-        graph, NS_TIME.before, NS_TIME.after
-    ):
-        n_type_i: rdflib.URIRef
-        n_type_j: rdflib.URIRef
-
-        if (n_entity_i, NS_RDF.type, NS_TIME.Instant) in graph:
-            n_type_i = NS_TIME.Instant
-        elif (n_entity_i, NS_RDF.type, NS_TIME.ProperInterval) in graph:
-            n_type_i = NS_TIME.ProperInterval
-        elif (n_entity_i, NS_RDF.type, NS_TIME.Interval) in graph:
-            # Fall back to Interval after ProperInterval not found.
-            n_type_i = NS_TIME.Interval
-        else:
-            continue
+            kwargs = clone_style(prov.constants.PROV_COMMUNICATION)
+            _render_edges(select_query_text, "wasInformedBy", kwargs)
 
-        if (n_entity_j, NS_RDF.type, NS_TIME.Instant) in graph:
-            n_type_j = NS_TIME.Instant
-        elif (n_entity_j, NS_RDF.type, NS_TIME.ProperInterval) in graph:
-            n_type_j = NS_TIME.ProperInterval
-        elif (n_entity_j, NS_RDF.type, NS_TIME.Interval) in graph:
-            # Fall back to Interval after ProperInterval not found.
-            n_type_j = NS_TIME.Interval
-        else:
-            continue
+    _logger.debug("len(edges) = %d.", len(edges))
 
-        if n_type_i == NS_TIME.Instant and n_type_j == NS_TIME.Instant:
-            time_edge_node_pairs.add((n_entity_i, n_entity_j))
-        elif n_type_i == NS_TIME.Instant and n_type_j in (
-            NS_TIME.Interval,
-            NS_TIME.ProperInterval,
-        ):
-            n_instant = n_entity_i
-            n_interval = n_entity_j
-            n_interval_bs = get_beginnings(graph, n_interval)
-            for n_interval_b in n_interval_bs:
-                time_edge_node_pairs.add((n_instant, n_interval_b))
-                time_edge_node_pairs.add((n_interval_b, n_interval))
-        elif (
-            n_type_i in (NS_TIME.Interval, NS_TIME.ProperInterval)
-            and n_type_j == NS_TIME.Instant
-        ):
-            n_instant = n_entity_j
-            n_interval = n_entity_i
-            n_interval_es = get_ends(graph, n_interval)
-            for n_interval_e in n_interval_es:
-                time_edge_node_pairs.add((n_interval_e, n_instant))
-                time_edge_node_pairs.add((n_interval, n_interval_e))
-        elif n_type_i in (NS_TIME.Interval, NS_TIME.ProperInterval) and n_type_j in (
-            NS_TIME.Interval,
-            NS_TIME.ProperInterval,
-        ):
-            n_instant_i_bs = get_beginnings(graph, n_entity_i)
-            n_instant_i_es = get_ends(graph, n_entity_i)
-            n_instant_j_bs = get_beginnings(graph, n_entity_j)
-            n_instant_j_es = get_ends(graph, n_entity_j)
-            for n_instant_i_b in n_instant_i_bs:
-                time_edge_node_pairs.add((n_instant_i_b, n_entity_i))
-            for n_instant_i_e in n_instant_i_es:
-                time_edge_node_pairs.add((n_entity_i, n_instant_i_e))
-            for n_instant_j_b in n_instant_j_bs:
-                time_edge_node_pairs.add((n_instant_j_b, n_entity_j))
-            for n_instant_j_e in n_instant_j_es:
-                time_edge_node_pairs.add((n_entity_j, n_instant_j_e))
-            for n_instant_i_e in n_instant_i_es:
-                for n_instant_j_b in n_instant_j_bs:
-                    time_edge_node_pairs.add((n_instant_i_e, n_instant_j_b))
-        else:
-            _logger.info("n_type_i = %s.", n_type_i)
-            _logger.info("n_type_j = %s.", n_type_j)
-            raise NotImplementedError("Unimplemented combination of node types.")
+    # S3.2.
+    # Stash display data for TIME Things.
 
+    # Add tooltips for instants of intervals that aren't PROV
+    # Activities.  (These tooltips are already kind-of provided by an
+    # above loop for Activities.)
+    for n_interval in n_intervals - n_activities:
+        # Add to tooltips of associated Instants.
+        for n_predicate, template in {
+            (NS_TIME.hasBeginning, "Beginning of %s"),
+            (NS_TIME.hasEnd, "End of %s"),
+        }:
+            for n_instant in graph.objects(n_interval, n_predicate):
+                assert isinstance(n_instant, rdflib.term.IdentifiedNode)
+                n_instant_to_tooltips[n_instant].add(template % n_interval)
+    # _logger.debug("n_instant_to_tooltips = %s." % pprint.pformat(n_instant_to_tooltips))
     for triple in graph.triples((None, NS_EPHEMERAL.witnesses, None)):
         assert isinstance(triple[0], rdflib.term.IdentifiedNode)
         assert isinstance(triple[2], rdflib.term.IdentifiedNode)
         n_witness = triple[0]
         n_terminus_instant = triple[2]
-        time_edge_node_pairs.add((n_terminus_instant, n_witness))
+        for n_subject in graph.subjects(NS_TIME.inside, n_witness):
+            n_instant_to_tooltips[n_witness].add(
+                "Instant in %s known to follow %s." % (n_subject, n_terminus_instant)
+            )
+
+    time_edges = get_time_edges(
+        graph, n_intervals, n_activities, n_things_outside_window
+    )
 
     # S4.
     # Build the sets of Things to include in the display.
@@ -1855,7 +2943,14 @@ WHERE {
     n_time_things_to_display: typing.Set[rdflib.term.IdentifiedNode] = set()
 
     reduce_by_prov_chain_of_ancestry: bool = False
-    if args.entity_ancestry or args.query_ancestry or args.from_empty_set:
+    if (
+        n_focus_things is not None
+        or args.entity_ancestry
+        or args.query_ancestry
+        or args.entity_descendants
+        or args.query_descendants
+        or args.from_empty_set
+    ):
         reduce_by_prov_chain_of_ancestry = True
 
     reduce_by_prov_chain_of_influence: bool = False
@@ -1866,7 +2961,9 @@ WHERE {
     n_prov_things_in_chain_of_influence: typing.Set[rdflib.term.IdentifiedNode] = set()
 
     # Build chain of specific ancestry.
-    if args.from_empty_set:
+    if n_focus_things is not None:
+        n_prov_things_in_chain_of_ancestry = set(n_focus_things)
+    elif args.from_empty_set:
         n_prov_things_in_chain_of_ancestry.add(NS_PROV.EmptyCollection)
         select_query_actions_text = """\
 SELECT ?nDerivingAction
@@ -1904,14 +3001,17 @@ WHERE {
             ("entities", select_query_entities_text),
         ]:
             _logger.debug("Running %s filtering query.", select_query_label)
-            select_query_object = rdflib.plugins.sparql.processor.prepareQuery(
-                select_query_text, initNs=nsdict
-            )
-            for record in graph.query(select_query_object):
-                assert isinstance(record, rdflib.query.ResultRow)
-                assert isinstance(record[0], rdflib.term.IdentifiedNode)
-                n_include = record[0]
-                n_prov_things_in_chain_of_ancestry.add(n_include)
+            with query_execution.execute_query(
+                graph,
+                select_query_text,
+                label="ancestry of EmptyCollection: %s" % select_query_label,
+                init_ns=nsdict,
+            ) as results:
+                for record in results:
+                    assert isinstance(record, rdflib.query.ResultRow)
+                    assert isinstance(record[0], rdflib.term.IdentifiedNode)
+                    n_include = record[0]
+                    n_prov_things_in_chain_of_ancestry.add(n_include)
             _logger.debug(
                 "len(n_prov_things_in_chain_of_ancestry) = %d.",
                 len(n_prov_things_in_chain_of_ancestry),
@@ -1922,88 +3022,107 @@ WHERE {
             n_prov_things_in_chain_of_ancestry.add(rdflib.URIRef(args.entity_ancestry))
             n_terminal_things.add(rdflib.URIRef(args.entity_ancestry))
         elif args.query_ancestry:
-            query_ancestry_text: typing.Optional[str] = None
-            with open(args.query_ancestry, "r") as in_fh:
-                query_ancestry_text = in_fh.read(2**22)  # 4KiB
-            assert query_ancestry_text is not None
-            _logger.debug("query_ancestry_text = %r.", query_ancestry_text)
-            query_ancestry_object = rdflib.plugins.sparql.processor.prepareQuery(
-                query_ancestry_text, initNs=nsdict
-            )
-            for result in graph.query(query_ancestry_object):
-                assert isinstance(result, rdflib.query.ResultRow)
-                for result_member in result:
-                    if not isinstance(result_member, rdflib.URIRef):
-                        raise ValueError(
-                            "Query in file %r must return URIRefs."
-                            % args.query_ancestry
-                        )
-                    n_terminal_things.add(result_member)
+            n_terminal_things |= get_query_file_iris(graph, args.query_ancestry, nsdict)
         _logger.debug(
             "len(n_prov_things_in_chain_of_ancestry) = %d.",
             len(n_prov_things_in_chain_of_ancestry),
         )
         _logger.debug("len(n_terminal_things) = %d.", len(n_terminal_things))
 
-        select_query_actions_text = """\
-SELECT ?nDerivingAction
-WHERE {
-  # Identify action at end of path.
-  ?nTerminalThing
-    prov:wasGeneratedBy ?nEndAction ;
-    .
-
-  # Identify all actions in chain.
-  ?nEndAction prov:wasInformedBy* ?nDerivingAction .
-}
-"""
-        select_query_agents_text = """\
-SELECT ?nAgent
-WHERE {
-  # Identify action at end of path.
-  ?nTerminalThing
-    prov:wasGeneratedBy ?nEndAction ;
-    .
+        # Follow the closures of prov:wasInformedBy and
+        # prov:wasDerivedFrom through reachability indexes.
+        reachability_indexes: typing.Dict[
+            rdflib.URIRef, reachability.ReachabilityIndexType
+        ] = dict()
+        if args.reachability_index:
+            reachability_indexes = reachability.read_reachability_indexes(
+                args.reachability_index
+            )
+        for n_predicate in [NS_PROV.wasInformedBy, NS_PROV.wasDerivedFrom]:
+            if n_predicate in reachability_indexes:
+                reachability.check_reachability_index(
+                    reachability_indexes[n_predicate], graph
+                )
+            else:
+                reachability_indexes[n_predicate] = (
+                    reachability.build_reachability_index(graph, n_predicate)
+                )
 
-  # Identify all actions in chain.
-  ?nEndAction prov:wasInformedBy* ?nDerivingAction .
+        n_end_actions: typing.Set[rdflib.term.IdentifiedNode] = set()
+        for n_terminal_thing in n_terminal_things:
+            for n_object in graph.objects(n_terminal_thing, NS_PROV.wasGeneratedBy):
+                assert isinstance(n_object, rdflib.term.IdentifiedNode)
+                n_end_actions.add(n_object)
+        n_deriving_actions = reachability.get_reachable(
+            reachability_indexes[NS_PROV.wasInformedBy], n_end_actions
+        )
+        n_deriving_agents: typing.Set[rdflib.term.IdentifiedNode] = set()
+        for n_deriving_action in n_deriving_actions:
+            for n_object in graph.objects(n_deriving_action, NS_PROV.wasAssociatedWith):
+                assert isinstance(n_object, rdflib.term.IdentifiedNode)
+                n_deriving_agents.add(n_object)
+        n_ancestry_agents = get_closure(
+            build_adjacency(graph, NS_PROV.actedOnBehalfOf), n_deriving_agents
+        )
+        n_preceding_entities = reachability.get_reachable(
+            reachability_indexes[NS_PROV.wasDerivedFrom], n_terminal_things
+        )
+        n_prov_things_in_chain_of_ancestry |= (
+            n_deriving_actions | n_ancestry_agents | n_preceding_entities
+        )
+        _logger.debug(
+            "len(n_prov_things_in_chain_of_ancestry) = %d.",
+            len(n_prov_things_in_chain_of_ancestry),
+        )
+    elif args.entity_descendants or args.query_descendants:
+        # Descendants are stored in the chain-of-ancestry set, as they
+        # are the ancestry of the graph's leaves from the requested
+        # seeds.
+        n_seed_things: typing.Set[rdflib.term.IdentifiedNode] = set()
+        if args.entity_descendants:
+            n_seed_things.add(rdflib.URIRef(args.entity_descendants))
+        elif args.query_descendants:
+            n_seed_things |= get_query_file_iris(graph, args.query_descendants, nsdict)
+        _logger.debug("len(n_seed_things) = %d.", len(n_seed_things))
+
+        # Walk forward along the inverses of the predicates the ancestry
+        # queries walk backward.
+        n_descendant_entities = get_closure(
+            build_adjacency(graph, NS_PROV.wasDerivedFrom, inverse=True),
+            n_seed_things & n_entities,
+            args.descendants_depth,
+        )
 
-  # Get each agent involved in the chain.
-  ?nDerivingAction prov:wasAssociatedWith ?nAssociatedAgent .
-  ?nAssociatedAgent prov:actedOnBehalfOf* ?nAgent .
+        n_start_actions = n_seed_things & n_activities
+        for n_using_action, n_used_thing in graph.subject_objects(NS_PROV.used):
+            if n_used_thing in n_seed_things:
+                assert isinstance(n_using_action, rdflib.term.IdentifiedNode)
+                n_start_actions.add(n_using_action)
+        n_descendant_actions = get_closure(
+            build_adjacency(graph, NS_PROV.wasInformedBy, inverse=True),
+            n_start_actions,
+            args.descendants_depth,
+        )
 
-}
-"""
-        select_query_entities_text = """\
-SELECT ?nPrecedingEntity
-WHERE {
-  # Identify all objects in chain.
-  ?nTerminalThing prov:wasDerivedFrom* ?nPrecedingEntity .
-}
-"""
-        for select_query_label, select_query_text in [
-            ("activities", select_query_actions_text),
-            ("agents", select_query_agents_text),
-            ("entities", select_query_entities_text),
-        ]:
-            _logger.debug("Running %s filtering query.", select_query_label)
-            select_query_object = rdflib.plugins.sparql.processor.prepareQuery(
-                select_query_text, initNs=nsdict
-            )
+        association_adjacency = build_adjacency(graph, NS_PROV.wasAssociatedWith)
+        n_associated_agents: typing.Set[rdflib.term.IdentifiedNode] = set()
+        for n_descendant_action in n_descendant_actions:
+            if n_descendant_action in association_adjacency:
+                n_associated_agents |= association_adjacency[n_descendant_action]
+        n_descendant_agents = get_closure(
+            build_adjacency(graph, NS_PROV.actedOnBehalfOf), n_associated_agents
+        )
 
-            for n_terminal_thing in n_terminal_things:
-                for record in graph.query(
-                    select_query_object,
-                    initBindings={"nTerminalThing": n_terminal_thing},
-                ):
-                    assert isinstance(record, rdflib.query.ResultRow)
-                    assert isinstance(record[0], rdflib.term.IdentifiedNode)
-                    n_include = record[0]
-                    n_prov_things_in_chain_of_ancestry.add(n_include)
-            _logger.debug(
-                "len(n_prov_things_in_chain_of_ancestry) = %d.",
-                len(n_prov_things_in_chain_of_ancestry),
-            )
+        n_prov_things_in_chain_of_ancestry = (
+            n_seed_things
+            | n_descendant_entities
+            | n_descendant_actions
+            | n_descendant_agents
+        )
+        _logger.debug(
+            "len(n_prov_things_in_chain_of_ancestry) = %d.",
+            len(n_prov_things_in_chain_of_ancestry),
+        )
     else:
         # Ancestry reduction is a nop.
         n_prov_things_in_chain_of_ancestry = {x for x in n_prov_basis_things}
@@ -2033,6 +3152,7 @@ WHERE {
 
     if args.omit_empty_set:
         n_prov_things_to_display -= {NS_PROV.EmptyCollection}
+    n_prov_things_to_display -= n_things_outside_window
 
     _logger.debug("len(n_prov_things_to_display) = %d.", len(n_prov_things_to_display))
     # _logger.debug(
@@ -2113,53 +3233,27 @@ WHERE {
 
     # Sort Instants within the things-to-display set by their timestamp
     # value.
-    # Include in the sorting the granularity of the timestamp.  An
-    # Instant specified to the minute might or might not be before one
-    # specified to the same minute with seconds included.
-    n_instants_orderer: typing.DefaultDict[
-        int,
-        typing.DefaultDict[
-            str,
-            typing.Set[rdflib.term.IdentifiedNode],
-        ],
-    ] = collections.defaultdict(lambda: collections.defaultdict(set))
-    for n_instant in n_instants & n_time_things_to_display:
-        for l_datetimestamp in graph.objects(n_instant, NS_TIME.inXSDDateTimeStamp):
-            assert isinstance(l_datetimestamp, rdflib.Literal)
-            s_datetimestamp = str(l_datetimestamp)
-            if s_datetimestamp[-1] == "Z":
-                zulu_dts = s_datetimestamp[:-1]
-            elif s_datetimestamp[-3] == ":":
-                if s_datetimestamp[-5:] == "00:00":
-                    zulu_dts = s_datetimestamp[:-6] + "Z"
-                else:
-                    # TODO: Convert non-GMT timestamps to GMT.
-                    continue
-            n_instants_orderer[len(zulu_dts)][zulu_dts].add(n_instant)
-    # _logger.debug("n_instants_orderer = %s.", pprint.pformat(n_instants_orderer))
-    for timestamp_length in sorted(n_instants_orderer.keys()):
-        # _logger.debug("  timestamp_length = %d.", timestamp_length)
-        n_prior_zulu_dts_instants: typing.Set[rdflib.term.IdentifiedNode] = set()
-        for zulu_dts in sorted(n_instants_orderer[timestamp_length]):
-            # _logger.debug("    zulu_dts = %s.", zulu_dts)
-            # _logger.debug(
-            #     "      n_prior_zulu_dts_instants = %r.", n_prior_zulu_dts_instants
-            # )
-            n_current_zulu_dts_instants = n_instants_orderer[timestamp_length][zulu_dts]
-            # _logger.debug(
-            #     "      n_current_zulu_dts_instants = %r.", n_current_zulu_dts_instants
-            # )
-            for n_prior_zulu_dts_instant in n_prior_zulu_dts_instants:
-                for n_current_zulu_dts_instant in n_current_zulu_dts_instants:
-                    # _logger.debug(
-                    #     "        %r -> %r",
-                    #     n_prior_zulu_dts_instant,
-                    #     n_current_zulu_dts_instant,
-                    # )
-                    time_edge_node_pairs.add(
-                        (n_prior_zulu_dts_instant, n_current_zulu_dts_instant)
-                    )
-            n_prior_zulu_dts_instants = n_current_zulu_dts_instants
+    add_timestamp_time_edges(graph, n_instants & n_time_things_to_display, time_edges)
+
+    n_time_cycles = get_cycles(time_edges.keys())
+    for n_time_cycle in n_time_cycles:
+        _logger.warning(
+            "Temporal ordering cycle found:\n%s",
+            make_cycle_text(n_time_cycle, time_edges, graph.namespace_manager),
+        )
+    if args.drop_time_cycle_edges and len(n_time_cycles) > 0:
+        n_time_cycle_indices: typing.Dict[rdflib.term.IdentifiedNode, int] = {
+            n_node: cycle_index
+            for (cycle_index, n_time_cycle) in enumerate(n_time_cycles)
+            for n_node in n_time_cycle
+        }
+        for time_edge in list(time_edges.keys()):
+            if (
+                time_edge[0] in n_time_cycle_indices
+                and n_time_cycle_indices.get(time_edge[1])
+                == n_time_cycle_indices[time_edge[0]]
+            ):
+                del time_edges[time_edge]
 
     # S5.
     # Load the Things that will be displayed into a Pydot Graph.
@@ -2170,6 +3264,10 @@ WHERE {
     n_things_displayed: typing.Set[rdflib.term.IdentifiedNode] = set()
     display_time_intervals = args.display_time_intervals or args.display_time_links
 
+    # Retrieve all display texts in one pass over their predicates, so
+    # building each Pydot Node is a dictionary lookup.
+    node_texts = prefetch_display_texts(graph, n_things_to_display)
+
     # Build the PROV and Time Pydot Nodes.
     for thing_set, n_class_for_style in [
         (n_agents, prov.constants.PROV_AGENT),
@@ -2188,23 +3286,23 @@ WHERE {
             tooltip_parts: list[str] = []
             if n_class_for_style in {prov.constants.PROV_ACTIVITY, NS_TIME.Interval}:
                 maybe_interval_string = n_intervalic_perdurant_to_interval_string(
-                    n_thing, graph
+                    n_thing, graph, node_texts
                 )
                 if maybe_interval_string is not None:
                     early_label_parts.append(maybe_interval_string)
             elif n_class_for_style == NS_PROV.Collection:
                 l_exhibit_numbers: typing.Set[rdflib.Literal] = set()
-                for triple in graph.triples(
-                    (n_thing, NS_CASE_INVESTIGATION.exhibitNumber, None)
+                for l_value in get_objects(
+                    graph, n_thing, NS_CASE_INVESTIGATION.exhibitNumber, node_texts
                 ):
-                    assert isinstance(triple[2], rdflib.Literal)
-                    l_exhibit_numbers.add(triple[2])
+                    assert isinstance(l_value, rdflib.Literal)
+                    l_exhibit_numbers.add(l_value)
                 for l_exhibit_number in sorted(l_exhibit_numbers):
                     early_label_parts.append("Exhibit - " + l_exhibit_number.toPython())
             elif n_class_for_style in {NS_PROV.InstantaneousEvent, NS_TIME.Instant}:
                 if n_thing in n_instant_to_tooltips:
                     timestamp_string = n_instantaneous_perdurant_to_timestamp_string(
-                        n_thing, graph
+                        n_thing, graph, node_texts
                     )
                     if timestamp_string is not None:
                         tooltip_parts.append("")
@@ -2230,6 +3328,7 @@ WHERE {
                 n_class_for_style,
                 wrapper,
                 early_label_parts=early_label_parts,
+                node_texts=node_texts,
                 style=style,
                 tooltip_parts=tooltip_parts,
             )
@@ -2267,9 +3366,9 @@ WHERE {
     # e.g. a PROV Entity is display-sequenced after its Generation event.
     n_time_boundable_things = (n_intervals | n_entities) & n_things_displayed
 
-    # _logger.debug("len(time_edge_node_pairs) = %d.", len(time_edge_node_pairs))
-    # _logger.debug("time_edge_node_pairs = %s.", pprint.pformat(time_edge_node_pairs))
-    for time_edge_node_pair in sorted(time_edge_node_pairs):
+    # _logger.debug("len(time_edges) = %d.", len(time_edges))
+    # _logger.debug("time_edges = %s.", pprint.pformat(time_edges))
+    for time_edge_node_pair in sorted(time_edges):
         if time_edge_node_pair[0] not in n_things_displayed:
             continue
         if time_edge_node_pair[1] not in n_things_displayed:
@@ -2298,7 +3397,47 @@ WHERE {
         dot_edge = pydot.Edge(node_id_2, node_id_1, None, **relator_kwargs)
         dot_graph.add_edge(dot_edge)
 
-    dot_graph.write(args.out_dot)
+    return dot_graph
+
+
+def write_dot(dot_graph: "pydot.Dot", out_dot: str) -> None:
+    """
+    Write a Dot graph to a file, compressing it if its extension names a compression.
+    """
+    if compressed_io.get_compression(out_dot) is None:
+        dot_graph.write(out_dot)
+        return
+    with compressed_io.open_output(out_dot) as out_fh:
+        out_fh.write(dot_graph.to_string().encode("utf-8"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    parser.add_argument(
+        "--profile-queries",
+        action="store_true",
+        help="Write a report of the SPARQL queries run, most costly first, to stderr.",
+    )
+    parser.add_argument("out_dot")
+    parser.add_argument("in_graph", nargs="+")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    cdo_local_uuid.configure()
+
+    graph = rdflib.Graph()
+    for in_graph_filename in args.in_graph:
+        snapshot.parse_graph_file(graph, in_graph_filename)
+
+    with (
+        query_execution.profile_queries(sys.stderr)
+        if args.profile_queries
+        else contextlib.nullcontext()
+    ):
+        dot_graph = render_dot(graph, args)
+    write_dot(dot_graph, args.out_dot)
 
 
 if __name__ == "__main__":
@@ -21,15 +21,16 @@ This script executes CONSTRUCT queries and other data translation, returning a s
 __version__ = "0.5.0"
 
 import argparse
+import contextlib
 import importlib.resources
 import logging
 import os
+import sys
 import typing
 import uuid
 
-import case_utils.inherent_uuid
 import cdo_local_uuid
-import rdflib.plugins.sparql
+import rdflib
 from case_utils.namespace import (
     NS_CASE_INVESTIGATION,
     NS_RDF,
@@ -41,7 +42,7 @@ from cdo_local_uuid import local_uuid
 
 import case_prov
 
-from . import queries
+from . import compressed_io, queries, query_execution, serialization, snapshot
 
 _logger = logging.getLogger(os.path.basename(__file__))
 
@@ -67,8 +68,10 @@ TmpPersistableTriplesType = typing.Set[
 ]
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the options of case_prov_rdf, without its positional arguments, to an argument parser.
+    """
     parser.add_argument("-d", "--debug", action="store_true")
     parser.add_argument("--allow-empty-results", action="store_true")
     parser.add_argument(
@@ -86,20 +89,21 @@ def main() -> None:
         action="store_true",
         help="Use UUIDs computed using the case_utils.inherent_uuid module.",
     )
-    parser.add_argument("out_file")
-    parser.add_argument("in_graph", nargs="+")
-    args = parser.parse_args()
+    parser.add_argument(
+        "--entail-allen-relations",
+        action="store_true",
+        help="Also entail the time:interval* relations that follow from the time:interval* relations and shared boundary instants of the input and output graphs, with the case_prov.allen module.  Intervals whose relations are inconsistent are reported as warnings, and entail no relations.",
+    )
 
-    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
 
-    cdo_local_uuid.configure()
+def augment_graph(in_graph: rdflib.Graph, args: argparse.Namespace) -> rdflib.Graph:
+    """
+    Compute the supplemental PROV-O and OWL-Time graph of the input graph, as case_prov_rdf writes to its output file.  args is a namespace of the options added by `add_arguments`.  The input graph's namespace bindings are extended with the prefixes the output uses.
+    """
+    import case_utils.inherent_uuid
 
-    in_graph = rdflib.Graph()
     out_graph = rdflib.Graph()
 
-    for in_graph_filename in args.in_graph:
-        in_graph.parse(in_graph_filename)
-
     # Guarantee prov: and minimal CASE and UCO prefixes are in input and output contexts.
     in_graph.namespace_manager.bind("case-investigation", NS_CASE_INVESTIGATION)
     in_graph.namespace_manager.bind("prov", NS_PROV)
@@ -266,19 +270,24 @@ def main() -> None:
     for query_filename in query_filenames:
         _logger.debug("Running query in %r." % query_filename)
         construct_query_text = importlib.resources.read_text(queries, query_filename)
-        construct_query_object = rdflib.plugins.sparql.processor.prepareQuery(
-            construct_query_text, initNs=nsdict
-        )
         # https://rdfextras.readthedocs.io/en/latest/working_with.html
-        construct_query_result = in_graph.query(construct_query_object)
-        _logger.debug("len(construct_query_result) = %d." % len(construct_query_result))
-        for row_no, row in enumerate(construct_query_result):
-            if row_no == 0:
-                _logger.debug("row[0] = %r." % (row,))
-            case_entailment_tally = row_no + 1
-            # TODO: Handle type review with implementation to RDFLib Issue 2283.
-            # https://github.com/RDFLib/rdflib/issues/2283
-            out_graph.add(row)  # type: ignore
+        with query_execution.execute_query(
+            in_graph,
+            construct_query_text,
+            label=query_filename,
+            init_ns=nsdict,
+            target_graph=out_graph,
+        ) as construct_query_result:
+            _logger.debug(
+                "len(construct_query_result) = %d." % len(construct_query_result)
+            )
+            for row_no, row in enumerate(construct_query_result):
+                if row_no == 0:
+                    _logger.debug("row[0] = %r." % (row,))
+                case_entailment_tally = row_no + 1
+                # TODO: Handle type review with implementation to RDFLib Issue 2283.
+                # https://github.com/RDFLib/rdflib/issues/2283
+                out_graph.add(row)  # type: ignore
 
     # Run inherent qualification steps that are dependent on PROV-O
     # properties being present.
@@ -696,8 +705,10 @@ def main() -> None:
     # Generally order PROV Generations, Usages, and Invalidations.
     tmp_triples = set()
     tmp_graph = in_graph + out_graph
-    for query in [
-        """\
+    for query_label, query in [
+        (
+            "Generation before Usage",
+            """\
 PREFIX prov: <http://www.w3.org/ns/prov#>
 PREFIX time: <http://www.w3.org/2006/time#>
 CONSTRUCT {
@@ -709,7 +720,10 @@ WHERE {
     ?nUsage prov:entity ?nEntity .
 }
 """,
-        """\
+        ),
+        (
+            "Generation before Invalidation",
+            """\
 PREFIX prov: <http://www.w3.org/ns/prov#>
 PREFIX time: <http://www.w3.org/2006/time#>
 CONSTRUCT {
@@ -722,7 +736,10 @@ WHERE {
         .
 }
 """,
-        """\
+        ),
+        (
+            "Usage before Invalidation",
+            """\
 PREFIX prov: <http://www.w3.org/ns/prov#>
 PREFIX time: <http://www.w3.org/2006/time#>
 CONSTRUCT {
@@ -734,21 +751,43 @@ WHERE {
     ?nUsage prov:entity ?nEntity .
 }
 """,
+        ),
     ]:
-        for row in tmp_graph.query(query):
-            assert isinstance(row, tuple)
-            if not isinstance(row[0], rdflib.URIRef):
-                continue
-            assert isinstance(row[1], rdflib.URIRef)
-            if not isinstance(row[2], rdflib.URIRef):
-                continue
-            tmp_triples.add((row[0], row[1], row[2]))
+        with query_execution.execute_query(tmp_graph, query, label=query_label) as rows:
+            for row in rows:
+                assert isinstance(row, tuple)
+                if not isinstance(row[0], rdflib.URIRef):
+                    continue
+                assert isinstance(row[1], rdflib.URIRef)
+                if not isinstance(row[2], rdflib.URIRef):
+                    continue
+                tmp_triples.add((row[0], row[1], row[2]))
 
     for tmp_triple in tmp_triples:
         out_graph.add(tmp_triple)
     time_entailment_tally += len(tmp_triples)
     del tmp_triples
 
+    if args.entail_allen_relations:
+        from . import allen
+
+        tmp_graph = in_graph + out_graph
+        allen_graph, allen_inconsistencies = allen.entail_relations(tmp_graph)
+        for allen_inconsistency in allen_inconsistencies:
+            _logger.warning(
+                "Inconsistent time: relations:\n%s",
+                allen.make_inconsistency_text(
+                    allen_inconsistency, tmp_graph.namespace_manager
+                ),
+            )
+        for triple in allen_graph:
+            if not isinstance(triple[0], rdflib.URIRef):
+                continue
+            if not isinstance(triple[2], rdflib.URIRef):
+                continue
+            out_graph.add(triple)
+            time_entailment_tally += 1
+
     if (
         case_entailment_tally == 0
         and prov_existential_entailment_tally == 0
@@ -757,7 +796,58 @@ WHERE {
         if not args.allow_empty_results:
             raise ValueError("Failed to construct any results.")
 
-    out_graph.serialize(args.out_file)
+    return out_graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    parser.add_argument(
+        "--profile-queries",
+        action="store_true",
+        help="Write a report of the SPARQL queries run, most costly first, to stderr.",
+    )
+    parser.add_argument(
+        "--snapshot-out",
+        help="Also write the output graph to this file as a graph snapshot, which the case_prov scripts read faster than other graph formats.",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=serialization.OUTPUT_FORMATS,
+        default="turtle",
+        help="Format of the output file.  canonical-turtle is laid out as the rdf-toolkit normalizer lays out Turtle.  sorted-ntriples writes one triple per line, in code point order.  (Default: %(default)s.)",
+    )
+    parser.add_argument(
+        "--sort-memory-budget",
+        type=int,
+        default=serialization.DEFAULT_SORT_MEMORY_BUDGET >> 20,
+        metavar="MIB",
+        help="Memory, in MiB, used to sort sorted-ntriples output before sorting in temporary files.  (Default: %(default)s.)",
+    )
+    parser.add_argument("out_file")
+    parser.add_argument("in_graph", nargs="+")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    cdo_local_uuid.configure()
+
+    in_graph = rdflib.Graph()
+    for in_graph_filename in args.in_graph:
+        snapshot.parse_graph_file(in_graph, in_graph_filename)
+
+    with (
+        query_execution.profile_queries(sys.stderr)
+        if args.profile_queries
+        else contextlib.nullcontext()
+    ):
+        out_graph = augment_graph(in_graph, args)
+    serialization.write_graph_file(
+        out_graph, args.out_file, args.output_format, args.sort_memory_budget << 20
+    )
+    if args.snapshot_out is not None:
+        with compressed_io.open_output(args.snapshot_out) as out_fh:
+            snapshot.write_snapshot(out_graph, out_fh)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module opens compressed files for the case_prov scripts, selecting gzip, bz2, xz, or zstd compression by file extension.  Files without one of those extensions are opened as they are.
+
+Compressed input is decompressed in a background thread, which reads ahead of the parser by a bounded number of chunks.  The decompressors release the GIL, so decompression overlaps with parsing.  zstd support requires the zstandard package.
+"""
+
+__version__ = "0.1.0"
+
+import bz2
+import gzip
+import io
+import logging
+import lzma
+import os
+import pathlib
+import queue
+import threading
+import typing
+
+import rdflib
+import rdflib.util
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+# Compression name of each file extension.
+COMPRESSION_EXTENSIONS: typing.Dict[str, str] = {
+    ".bz2": "bz2",
+    ".gz": "gzip",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+
+# Bytes decompressed at a time by the background thread.
+CHUNK_SIZE = 1 << 20
+
+# Decompressed chunks the background thread may read ahead.
+READ_AHEAD_CHUNKS = 8
+
+
+def get_compression(path: str) -> typing.Optional[str]:
+    """
+    Get the compression of a file from its extension, or None if it is not compressed.
+
+    >>> get_compression("case.jsonld.gz")
+    'gzip'
+    >>> get_compression("case.ttl") is None
+    True
+    """
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def strip_compression_extension(path: str) -> str:
+    """
+    Remove the compression extension of a file path, leaving the extension of the file's format.
+
+    >>> strip_compression_extension("case.ttl.zst")
+    'case.ttl'
+    >>> strip_compression_extension("case.ttl")
+    'case.ttl'
+    """
+    if get_compression(path) is None:
+        return path
+    return os.path.splitext(path)[0]
+
+
+def _import_zstandard() -> typing.Any:
+    try:
+        import zstandard  # type: ignore
+    except ImportError as e:
+        raise ValueError(
+            "The zstandard package is required to read or write .zst files."
+        ) from e
+    return zstandard
+
+
+def _open_decompressor(path: str, compression: str) -> typing.BinaryIO:
+    if compression == "bz2":
+        return typing.cast(typing.BinaryIO, bz2.open(path, "rb"))
+    elif compression == "gzip":
+        return typing.cast(typing.BinaryIO, gzip.open(path, "rb"))
+    elif compression == "xz":
+        return typing.cast(typing.BinaryIO, lzma.open(path, "rb"))
+    elif compression == "zstd":
+        zstandard = _import_zstandard()
+        return typing.cast(
+            typing.BinaryIO,
+            zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True),
+        )
+    raise ValueError("Unsupported compression %r." % compression)
+
+
+class BackgroundReader(io.RawIOBase):
+    """
+    Raw stream of the data of a binary file object, which a background thread reads ahead in chunks.  Errors of the background thread are raised by the next read.
+    """
+
+    def __init__(self, in_fh: typing.BinaryIO) -> None:
+        super().__init__()
+        self._in_fh = in_fh
+        self._chunks: "queue.Queue[typing.Union[bytes, BaseException]]" = queue.Queue(
+            READ_AHEAD_CHUNKS
+        )
+        self._chunk = b""
+        self._chunk_offset = 0
+        self._at_eof = False
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._read_chunks, daemon=True)
+        self._thread.start()
+
+    def _put(self, item: typing.Union[bytes, BaseException]) -> bool:
+        while not self._stopping.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read_chunks(self) -> None:
+        try:
+            while True:
+                chunk = self._in_fh.read(CHUNK_SIZE)
+                if not self._put(chunk) or chunk == b"":
+                    return
+        except BaseException as e:
+            self._put(e)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: typing.Any) -> int:
+        if self._chunk_offset == len(self._chunk):
+            if self._at_eof:
+                return 0
+            item = self._chunks.get()
+            if isinstance(item, BaseException):
+                self._at_eof = True
+                raise item
+            if item == b"":
+                self._at_eof = True
+                return 0
+            self._chunk = item
+            self._chunk_offset = 0
+        length = min(len(buffer), len(self._chunk) - self._chunk_offset)
+        buffer[:length] = self._chunk[self._chunk_offset : self._chunk_offset + length]
+        self._chunk_offset += length
+        return length
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stopping.set()
+            self._thread.join()
+            self._in_fh.close()
+        super().close()
+
+
+def open_input(path: str) -> typing.BinaryIO:
+    """
+    Open a file for reading as binary, decompressing it in a background thread if its extension names a compression.
+    """
+    compression = get_compression(path)
+    if compression is None:
+        return open(path, "rb")
+    _logger.debug("Reading %r with %s decompression.", path, compression)
+    return typing.cast(
+        typing.BinaryIO,
+        io.BufferedReader(
+            BackgroundReader(_open_decompressor(path, compression)), CHUNK_SIZE
+        ),
+    )
+
+
+def open_output(path: str) -> typing.BinaryIO:
+    """
+    Open a file for writing as binary, compressing it if its extension names a compression.
+    """
+    compression = get_compression(path)
+    if compression is None:
+        return open(path, "wb")
+    _logger.debug("Writing %r with %s compression.", path, compression)
+    if compression == "bz2":
+        return typing.cast(typing.BinaryIO, bz2.open(path, "wb"))
+    elif compression == "gzip":
+        return typing.cast(typing.BinaryIO, gzip.open(path, "wb"))
+    elif compression == "xz":
+        return typing.cast(typing.BinaryIO, lzma.open(path, "wb"))
+    zstandard = _import_zstandard()
+    return typing.cast(
+        typing.BinaryIO,
+        zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True),
+    )
+
+
+def parse_rdf_file(
+    graph: rdflib.Graph, path: str, format: typing.Optional[str] = None
+) -> None:
+    """
+    Parse a graph file with rdflib, decompressing it if its extension names a compression.  Unless given, the format is guessed from the extension that precedes the compression extension.
+    """
+    if get_compression(path) is None:
+        graph.parse(path, format=format)
+        return
+    if format is None:
+        format = rdflib.util.guess_format(strip_compression_extension(path))
+    with open_input(path) as in_fh:
+        graph.parse(
+            in_fh, format=format, publicID=pathlib.Path(path).absolute().as_uri()
+        )
+
+
+def serialize_rdf_file(graph: rdflib.Graph, path: str) -> None:
+    """
+    Serialize a graph to a file as Turtle, compressing it if its extension names a compression.
+    """
+    if get_compression(path) is None:
+        graph.serialize(path)
+        return
+    with open_output(path) as out_fh:
+        graph.serialize(out_fh)
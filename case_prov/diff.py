@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script reports the provenance changes between two graphs, such as the outputs of two case_prov_rdf runs.
+
+Nodes are matched first by IRI.  The nodes case_prov_rdf infers, such as qualified Influences and interval termini, are named with random UUIDs unless --use-deterministic-uuids is used, so nodes left unmatched are then matched by their inherence key.  The key of an inferred node is the node it is linked from by a qualifying property (e.g. prov:qualifiedGeneration or time:hasBeginning), that property, and the nodes it links to by prov:activity, prov:agent, prov:entity and prov:hadActivity, with inferred nodes among those themselves given by their keys.  This is the structure `case_utils.inherent_uuid` and case_prov_rdf derive deterministic UUIDs from.  Blank nodes are not matched by identifier, and are matched by their structural key: their predicates and objects, with blank and inferred objects themselves given by their keys.  A key shared by exactly one unmatched node of each graph matches the nodes.
+
+A key shared by more than one node of a graph, such as that of copies of a SHACL constraint shared by results, is extended with the node's subjects and predicates.  A changed blank node changes the keys of the blank nodes it is nested in, so blank nodes still unmatched are then matched through their neighbors: an unmatched blank node of each graph that is the only one with a predicate to or from the same matched node, IRI or literal matches the other, repeated until no more are matched.
+
+Nodes can still be left unmatched, and their triples reported as changes, when neither their keys nor their neighbors tell them apart: an inferred node linked from more than one node, and blank nodes in cycles of blank nodes or with the same predicates, objects and subjects as another blank node of the same graph.
+
+The triples of the old graph are then renamed to the nodes of the new graph, and the two triple sets are compared.  Each added or removed triple is categorized by the PROV relation it states or describes, and a removed and an added literal of the same subject and predicate are reported together as a changed value, such as a shifted timestamp.  Key matching and comparison take time linear in the numbers of triples, apart from sorting the members of keys, and each round of matching through neighbors is linear in the triples of the unmatched blank nodes.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import collections
+import logging
+import os
+import sys
+import typing
+
+import rdflib
+
+from . import snapshot
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+NS_PROV = rdflib.PROV
+NS_RDF = rdflib.RDF
+NS_TIME = rdflib.TIME
+
+# Predicates linking a node to the inferred nodes that inhere in it.
+QUALIFYING_PREDICATES: typing.Set[rdflib.URIRef] = {
+    NS_PROV.qualifiedAssociation,
+    NS_PROV.qualifiedAttribution,
+    NS_PROV.qualifiedCommunication,
+    NS_PROV.qualifiedDelegation,
+    NS_PROV.qualifiedDerivation,
+    NS_PROV.qualifiedEnd,
+    NS_PROV.qualifiedGeneration,
+    NS_PROV.qualifiedInvalidation,
+    NS_PROV.qualifiedStart,
+    NS_PROV.qualifiedUsage,
+    NS_TIME.hasBeginning,
+    NS_TIME.hasEnd,
+}
+
+# Predicates linking an inferred node to the other nodes its inherence
+# key includes.
+INHERENCE_OBJECT_PREDICATES: typing.List[rdflib.URIRef] = [
+    NS_PROV.activity,
+    NS_PROV.agent,
+    NS_PROV.entity,
+    NS_PROV.hadActivity,
+]
+
+# PROV relation -> classes and predicates that state or describe it.
+RELATION_TERMS: typing.Dict[str, typing.List[rdflib.URIRef]] = {
+    "Association": [
+        NS_PROV.Association,
+        NS_PROV.qualifiedAssociation,
+        NS_PROV.wasAssociatedWith,
+    ],
+    "Attribution": [
+        NS_PROV.Attribution,
+        NS_PROV.qualifiedAttribution,
+        NS_PROV.wasAttributedTo,
+    ],
+    "Communication": [
+        NS_PROV.Communication,
+        NS_PROV.qualifiedCommunication,
+        NS_PROV.wasInformedBy,
+    ],
+    "Delegation": [
+        NS_PROV.Delegation,
+        NS_PROV.actedOnBehalfOf,
+        NS_PROV.qualifiedDelegation,
+    ],
+    "Derivation": [
+        NS_PROV.Derivation,
+        NS_PROV.qualifiedDerivation,
+        NS_PROV.wasDerivedFrom,
+    ],
+    "End": [NS_PROV.End, NS_PROV.endedAtTime, NS_PROV.qualifiedEnd],
+    "Generation": [
+        NS_PROV.Generation,
+        NS_PROV.generated,
+        NS_PROV.generatedAtTime,
+        NS_PROV.qualifiedGeneration,
+        NS_PROV.wasGeneratedBy,
+    ],
+    "Invalidation": [
+        NS_PROV.Invalidation,
+        NS_PROV.invalidated,
+        NS_PROV.invalidatedAtTime,
+        NS_PROV.qualifiedInvalidation,
+        NS_PROV.wasInvalidatedBy,
+    ],
+    "Membership": [NS_PROV.hadMember],
+    "Start": [NS_PROV.Start, NS_PROV.qualifiedStart, NS_PROV.startedAtTime],
+    "Usage": [NS_PROV.Usage, NS_PROV.qualifiedUsage, NS_PROV.used],
+}
+
+# Class or predicate -> PROV relation.
+TERM_RELATIONS: typing.Dict[rdflib.URIRef, str] = {
+    n_term: relation
+    for (relation, n_terms) in RELATION_TERMS.items()
+    for n_term in n_terms
+}
+
+# Inherence key of an inferred node: (key or IRI of the node it inheres
+# in, qualifying predicate, sorted (predicate, key or IRI) pairs of the
+# other nodes it links to).  The structural key of a blank node is
+# (BLANK_NODE_KEY_TAG, sorted (predicate, key, IRI or literal) pairs of
+# its objects).
+InherenceKeyType = typing.Tuple[typing.Any, ...]
+
+# First member of the structural key of a blank node, which no
+# inherence key begins with.
+BLANK_NODE_KEY_TAG = "_:"
+
+# (Relation, subject, predicate, old object, new object) of a changed
+# statement.  The old object is None for an added triple, and the new
+# object is None for a removed triple.  The subject and objects are
+# nodes of the new graph where matched.
+ChangeType = typing.Tuple[
+    str,
+    rdflib.term.Node,
+    rdflib.term.Node,
+    typing.Optional[rdflib.term.Node],
+    typing.Optional[rdflib.term.Node],
+]
+
+
+def get_inherence_keys(
+    graph: rdflib.Graph,
+) -> typing.Dict[rdflib.term.IdentifiedNode, InherenceKeyType]:
+    """
+    Get the inherence key of each node linked to by a qualifying predicate from exactly one node, and the structural key of each other blank node: its predicates, other than qualifying predicates, with their objects, and with blank and inferred objects given by their keys.  Nodes whose keys would depend on themselves, such as blank nodes in cycles of blank nodes, are given none.
+    """
+    keys: typing.Dict[rdflib.term.IdentifiedNode, InherenceKeyType] = dict()
+    # Node -> (node inhered in, qualifying predicate).
+    n_parents: typing.Dict[
+        rdflib.term.IdentifiedNode,
+        typing.Optional[typing.Tuple[rdflib.term.IdentifiedNode, rdflib.URIRef]],
+    ] = dict()
+    for n_predicate in sorted(QUALIFYING_PREDICATES):
+        for n_subject, n_object in graph.subject_objects(n_predicate):
+            if not isinstance(n_subject, rdflib.term.IdentifiedNode):
+                continue
+            if not isinstance(n_object, rdflib.term.IdentifiedNode):
+                continue
+            if n_object in n_parents:
+                # A node linked from more than one node, rather than by
+                # more than one predicate (e.g. a prov:Start that is also
+                # the time:hasBeginning of its activity), has no key.
+                parent = n_parents[n_object]
+                if parent is None or parent[0] != n_subject:
+                    n_parents[n_object] = None
+            else:
+                n_parents[n_object] = (n_subject, n_predicate)
+
+    n_in_progress: typing.Set[rdflib.term.IdentifiedNode] = set()
+    # Nodes found to have no key.  Whether a node's key depends on itself
+    # does not depend on the node the search started from, so this is
+    # recorded as keys are.
+    n_keyless: typing.Set[rdflib.term.IdentifiedNode] = set()
+
+    def _get_key_or_node(n_node: rdflib.term.Node) -> typing.Any:
+        """
+        Get a node's key if it is an inferred node or a blank node, else the node.  Returns None if the node has no key.
+        """
+        if not isinstance(n_node, rdflib.term.IdentifiedNode):
+            return n_node
+        if n_node not in n_parents and not isinstance(n_node, rdflib.BNode):
+            return n_node
+        if n_node in keys:
+            return keys[n_node]
+        if n_node in n_keyless or n_node in n_in_progress:
+            return None
+        key = (
+            _get_inherence_key(n_node)
+            if n_node in n_parents
+            else _get_blank_node_key(n_node)
+        )
+        if key is None:
+            n_keyless.add(n_node)
+        else:
+            keys[n_node] = key
+        return key
+
+    def _get_blank_node_key(
+        n_node: rdflib.term.IdentifiedNode,
+    ) -> typing.Optional[InherenceKeyType]:
+        n_in_progress.add(n_node)
+        object_keys = []
+        for n_predicate, n_object in graph.predicate_objects(n_node):
+            # Inferred nodes linked by qualifying predicates are keyed by
+            # this node, so they are left out of its key.
+            if n_predicate in QUALIFYING_PREDICATES:
+                continue
+            object_keys.append((str(n_predicate), _get_key_or_node(n_object)))
+        n_in_progress.remove(n_node)
+        if any(x[1] is None for x in object_keys):
+            return None
+        return (BLANK_NODE_KEY_TAG, tuple(sorted(object_keys, key=repr)))
+
+    def _get_inherence_key(
+        n_node: rdflib.term.IdentifiedNode,
+    ) -> typing.Optional[InherenceKeyType]:
+        parent = n_parents[n_node]
+        if parent is None:
+            return None
+        n_in_progress.add(n_node)
+        parent_key = _get_key_or_node(parent[0])
+        related_keys = []
+        for n_related_predicate in INHERENCE_OBJECT_PREDICATES:
+            for n_related in graph.objects(n_node, n_related_predicate):
+                related_keys.append(
+                    (str(n_related_predicate), _get_key_or_node(n_related))
+                )
+        n_in_progress.remove(n_node)
+        if parent_key is None or any(x[1] is None for x in related_keys):
+            return None
+        return (parent_key, parent[1], tuple(sorted(related_keys, key=repr)))
+
+    for n_node in n_parents:
+        _get_key_or_node(n_node)
+    for n_subject in graph.subjects(unique=True):
+        if isinstance(n_subject, rdflib.BNode):
+            _get_key_or_node(n_subject)
+    return keys
+
+
+def _get_nodes(graph: rdflib.Graph) -> typing.Set[rdflib.term.IdentifiedNode]:
+    n_nodes: typing.Set[rdflib.term.IdentifiedNode] = set()
+    for triple in graph:
+        for n_term in (triple[0], triple[2]):
+            if isinstance(n_term, rdflib.term.IdentifiedNode):
+                n_nodes.add(n_term)
+    return n_nodes
+
+
+def match_nodes(
+    old_graph: rdflib.Graph,
+    new_graph: rdflib.Graph,
+) -> typing.Dict[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode]:
+    """
+    Match the nodes of the old graph absent from the new graph, and its blank nodes, to such nodes of the new graph, by their inherence or structural keys, and then blank nodes by their matched neighbors.
+
+    :returns: Old node -> new node.
+    """
+    n_old_nodes = _get_nodes(old_graph)
+    n_new_nodes = _get_nodes(new_graph)
+    # Blank nodes are never matched by identifier.
+    n_old_unmatched = {
+        x for x in n_old_nodes if isinstance(x, rdflib.BNode) or x not in n_new_nodes
+    }
+    n_new_unmatched = {
+        x for x in n_new_nodes if isinstance(x, rdflib.BNode) or x not in n_old_nodes
+    }
+
+    old_keys = {
+        x: y for (x, y) in get_inherence_keys(old_graph).items() if x in n_old_unmatched
+    }
+    new_keys = {
+        x: y for (x, y) in get_inherence_keys(new_graph).items() if x in n_new_unmatched
+    }
+    key_counts = collections.Counter(old_keys.values())
+    ambiguous_keys = {x for (x, y) in key_counts.items() if y > 1}
+    key_counts = collections.Counter(new_keys.values())
+    ambiguous_keys |= {x for (x, y) in key_counts.items() if y > 1}
+
+    def _index_keys(
+        graph: rdflib.Graph,
+        keys: typing.Dict[rdflib.term.IdentifiedNode, InherenceKeyType],
+    ) -> typing.Dict[InherenceKeyType, typing.Optional[rdflib.term.IdentifiedNode]]:
+        """
+        Index the unmatched nodes by key.  A key shared by nodes of either graph is extended with the predicates and keys or IRIs of the node's subjects, such as the results sharing copies of a SHACL constraint.  A key of more than one node indexes None.
+        """
+        index: typing.Dict[
+            InherenceKeyType, typing.Optional[rdflib.term.IdentifiedNode]
+        ] = dict()
+        for n_node, key in keys.items():
+            if key in ambiguous_keys:
+                key = (
+                    key,
+                    tuple(
+                        sorted(
+                            (
+                                (str(n_predicate), keys.get(n_subject, n_subject))  # type: ignore[call-overload]
+                                for (
+                                    n_subject,
+                                    n_predicate,
+                                ) in graph.subject_predicates(n_node)
+                            ),
+                            key=repr,
+                        )
+                    ),
+                )
+            index[key] = None if key in index else n_node
+        return index
+
+    old_index = _index_keys(old_graph, old_keys)
+    new_index = _index_keys(new_graph, new_keys)
+    node_map: typing.Dict[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode] = (
+        dict()
+    )
+    for key, n_old_node in old_index.items():
+        if n_old_node is None:
+            continue
+        n_new_node = new_index.get(key)
+        if n_new_node is None:
+            continue
+        node_map[n_old_node] = n_new_node
+
+    # A change to a blank node changes the keys of the blank nodes it is
+    # nested in, so blank nodes left unmatched are then matched through
+    # their neighbors, until no more are matched.
+    n_old_blank: typing.Set[rdflib.term.IdentifiedNode] = {
+        x for x in n_old_unmatched if isinstance(x, rdflib.BNode) and x not in node_map
+    }
+    n_new_matched = set(node_map.values())
+    n_new_blank: typing.Set[rdflib.term.IdentifiedNode] = {
+        x
+        for x in n_new_unmatched
+        if isinstance(x, rdflib.BNode) and x not in n_new_matched
+    }
+    while len(n_old_blank) > 0 and len(n_new_blank) > 0:
+        old_anchors = _index_anchors(
+            old_graph,
+            n_old_blank,
+            lambda x: node_map.get(x) if x in n_old_unmatched else x,  # type: ignore
+        )
+        new_anchors = _index_anchors(
+            new_graph,
+            n_new_blank,
+            lambda x: None if x in n_new_blank else x,
+        )
+        # Old node -> new nodes it is matched to, and the converse.
+        n_old_matches: typing.DefaultDict[
+            rdflib.term.IdentifiedNode, typing.Set[rdflib.term.IdentifiedNode]
+        ] = collections.defaultdict(set)
+        n_new_matches: typing.DefaultDict[
+            rdflib.term.IdentifiedNode, typing.Set[rdflib.term.IdentifiedNode]
+        ] = collections.defaultdict(set)
+        for anchor, n_old_node in old_anchors.items():
+            n_new_node = new_anchors.get(anchor)
+            if n_old_node is None or n_new_node is None:
+                continue
+            n_old_matches[n_old_node].add(n_new_node)
+            n_new_matches[n_new_node].add(n_old_node)
+        n_matched = 0
+        for n_old_node, n_new_nodes in n_old_matches.items():
+            if len(n_new_nodes) != 1:
+                continue
+            n_new_node = next(iter(n_new_nodes))
+            if len(n_new_matches[n_new_node]) != 1:
+                continue
+            node_map[n_old_node] = n_new_node
+            n_old_blank.remove(n_old_node)
+            n_new_blank.remove(n_new_node)
+            n_matched += 1
+        if n_matched == 0:
+            break
+    _logger.debug("len(node_map) = %d.", len(node_map))
+    return node_map
+
+
+def _index_anchors(
+    graph: rdflib.Graph,
+    n_nodes: typing.Set[rdflib.term.IdentifiedNode],
+    get_neighbor: typing.Callable[
+        [rdflib.term.Node], typing.Optional[rdflib.term.Node]
+    ],
+) -> typing.Dict[
+    typing.Tuple[typing.Any, ...], typing.Optional[rdflib.term.IdentifiedNode]
+]:
+    """
+    Index nodes by their anchors: their predicates and objects, and their subjects and predicates, where `get_neighbor` gives the object or subject as a node of the new graph.  Neighbors it gives None for are not anchors.  An anchor of more than one node indexes None.
+    """
+    index: typing.Dict[
+        typing.Tuple[typing.Any, ...], typing.Optional[rdflib.term.IdentifiedNode]
+    ] = dict()
+    for n_node in n_nodes:
+        anchors = set()
+        for n_predicate, n_object in graph.predicate_objects(n_node):
+            n_neighbor = get_neighbor(n_object)
+            if n_neighbor is not None:
+                anchors.add(("object", n_predicate, n_neighbor))
+        for n_subject, n_predicate in graph.subject_predicates(n_node):
+            n_neighbor = get_neighbor(n_subject)
+            if n_neighbor is not None:
+                anchors.add(("subject", n_predicate, n_neighbor))
+        for anchor in anchors:
+            index[anchor] = None if anchor in index else n_node
+    return index
+
+
+def get_relation(
+    triple: typing.Tuple[rdflib.term.Node, rdflib.term.Node, rdflib.term.Node],
+    n_subject_relations: typing.Dict[rdflib.term.Node, str],
+) -> str:
+    """
+    Get the PROV relation a triple states or describes: that of its predicate, else that of its rdf:type object, else that of its subject's class.  Other time: triples are in the relation "Time", and the rest in "Other".
+
+    >>> get_relation((rdflib.URIRef("urn:example:x"), NS_PROV.wasDerivedFrom, rdflib.URIRef("urn:example:y")), dict())
+    'Derivation'
+    """
+    if isinstance(triple[1], rdflib.URIRef) and triple[1] in TERM_RELATIONS:
+        return TERM_RELATIONS[triple[1]]
+    if triple[1] == NS_RDF.type and isinstance(triple[2], rdflib.URIRef):
+        if triple[2] in TERM_RELATIONS:
+            return TERM_RELATIONS[triple[2]]
+    if triple[0] in n_subject_relations:
+        return n_subject_relations[triple[0]]
+    if isinstance(triple[1], rdflib.URIRef) and triple[1].startswith(str(NS_TIME)):
+        return "Time"
+    return "Other"
+
+
+def diff_graphs(
+    old_graph: rdflib.Graph,
+    new_graph: rdflib.Graph,
+    node_map: typing.Optional[
+        typing.Dict[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode]
+    ] = None,
+) -> typing.List[ChangeType]:
+    """
+    Compare two graphs after renaming the old graph's nodes by node_map, which defaults to the result of `match_nodes`.
+
+    :returns: The changes, sorted.
+    """
+    if node_map is None:
+        node_map = match_nodes(old_graph, new_graph)
+
+    old_triples = {
+        (
+            node_map.get(triple[0], triple[0]),  # type: ignore[call-overload]
+            triple[1],
+            node_map.get(triple[2], triple[2]),  # type: ignore[call-overload]
+        )
+        for triple in old_graph
+    }
+    new_triples = set(new_graph)
+    removed_triples = old_triples - new_triples
+    added_triples = new_triples - old_triples
+
+    # Node -> PROV relation of the node's class, for qualified Influences
+    # and instantaneous events.
+    n_subject_relations: typing.Dict[rdflib.term.Node, str] = dict()
+    for triple in old_triples | new_triples:
+        if triple[1] == NS_RDF.type and triple[2] in TERM_RELATIONS:
+            assert isinstance(triple[2], rdflib.URIRef)
+            n_subject_relations[triple[0]] = TERM_RELATIONS[triple[2]]
+
+    # (Subject, predicate) -> removed and added objects.
+    statement_objects: typing.DefaultDict[
+        typing.Tuple[rdflib.term.Node, rdflib.term.Node],
+        typing.Tuple[typing.List[rdflib.term.Node], typing.List[rdflib.term.Node]],
+    ] = collections.defaultdict(lambda: ([], []))
+    for triple in removed_triples:
+        statement_objects[(triple[0], triple[1])][0].append(triple[2])
+    for triple in added_triples:
+        statement_objects[(triple[0], triple[1])][1].append(triple[2])
+
+    changes: typing.List[ChangeType] = []
+    for (n_subject, n_predicate), (
+        n_removed_objects,
+        n_added_objects,
+    ) in statement_objects.items():
+        relation = get_relation(
+            (n_subject, n_predicate, (n_removed_objects + n_added_objects)[0]),
+            n_subject_relations,
+        )
+        if (
+            len(n_removed_objects) == 1
+            and len(n_added_objects) == 1
+            and isinstance(n_removed_objects[0], rdflib.Literal)
+            and isinstance(n_added_objects[0], rdflib.Literal)
+        ):
+            changes.append(
+                (
+                    relation,
+                    n_subject,
+                    n_predicate,
+                    n_removed_objects[0],
+                    n_added_objects[0],
+                )
+            )
+            continue
+        for n_object in n_removed_objects:
+            changes.append((relation, n_subject, n_predicate, n_object, None))
+        for n_object in n_added_objects:
+            changes.append((relation, n_subject, n_predicate, None, n_object))
+    return sorted(changes, key=lambda x: (x[0], x[1], x[2], str(x[3]), str(x[4])))
+
+
+def make_diff_report_text(
+    changes: typing.List[ChangeType],
+    node_map: typing.Dict[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode],
+    namespace_manager: rdflib.namespace.NamespaceManager,
+) -> str:
+    """
+    Report changes from `diff_graphs`, grouped by PROV relation.  Added triples are marked "+", removed triples "-", and changed values "~".
+    """
+    report_text = "Provenance Diff\n"
+    report_text += "Nodes matched by key: %d\n" % len(node_map)
+    report_text += "Changes: %d\n" % len(changes)
+
+    relation_changes: typing.DefaultDict[str, typing.List[ChangeType]] = (
+        collections.defaultdict(list)
+    )
+    for change in changes:
+        relation_changes[change[0]].append(change)
+    for relation in sorted(relation_changes):
+        n_added = sum(1 for x in relation_changes[relation] if x[3] is None)
+        n_removed = sum(1 for x in relation_changes[relation] if x[4] is None)
+        n_changed = len(relation_changes[relation]) - n_added - n_removed
+        report_text += "%s: %d added, %d removed, %d changed\n" % (
+            relation,
+            n_added,
+            n_removed,
+            n_changed,
+        )
+        for _, n_subject, n_predicate, n_old_object, n_new_object in relation_changes[
+            relation
+        ]:
+            statement_text = "%s %s" % (
+                n_subject.n3(namespace_manager),
+                n_predicate.n3(namespace_manager),
+            )
+            if n_old_object is None:
+                assert n_new_object is not None
+                report_text += "\t+ %s %s .\n" % (
+                    statement_text,
+                    n_new_object.n3(namespace_manager),
+                )
+            elif n_new_object is None:
+                report_text += "\t- %s %s .\n" % (
+                    statement_text,
+                    n_old_object.n3(namespace_manager),
+                )
+            else:
+                report_text += "\t~ %s %s -> %s\n" % (
+                    statement_text,
+                    n_old_object.n3(namespace_manager),
+                    n_new_object.n3(namespace_manager),
+                )
+    return report_text
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="case_prov diff",
+        description="Report the provenance changes from one graph to another, such as the outputs of two case_prov_rdf runs.  Exit status is 1 if there are changes.",
+    )
+    parser.add_argument("-d", "--debug", action="store_true")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=argparse.FileType("x"),
+        default=sys.stdout,
+        help="File to write the report to.  (Default: stdout.)",
+    )
+    parser.add_argument("old_graph")
+    parser.add_argument("new_graph")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    old_graph = rdflib.Graph()
+    snapshot.parse_graph_file(old_graph, args.old_graph)
+    new_graph = rdflib.Graph()
+    snapshot.parse_graph_file(new_graph, args.new_graph)
+
+    node_map = match_nodes(old_graph, new_graph)
+    changes = diff_graphs(old_graph, new_graph, node_map)
+    args.output.write(
+        make_diff_report_text(changes, node_map, new_graph.namespace_manager)
+    )
+    args.output.flush()
+    sys.exit(0 if len(changes) == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
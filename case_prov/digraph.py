@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module provides the directed graph types and algorithms shared by the case_prov modules: adjacency indexes, the source triples of derived edges, strongly connected components, and cycles.
+"""
+
+__version__ = "0.1.0"
+
+import collections
+import typing
+
+import rdflib
+
+TripleType = typing.Tuple[rdflib.term.Node, rdflib.term.Node, rdflib.term.Node]
+
+# Node -> nodes it links to.
+AdjacencyType = typing.DefaultDict[
+    rdflib.term.IdentifiedNode, typing.Set[rdflib.term.IdentifiedNode]
+]
+
+# (Earlier node, later node) of an ordering edge -> triples of the graph
+# that imply the edge.
+EdgeSourcesType = typing.DefaultDict[
+    typing.Tuple[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode],
+    typing.Set[TripleType],
+]
+
+
+def get_strongly_connected_components(
+    n_nodes: typing.Iterable[rdflib.term.IdentifiedNode],
+    adjacency: AdjacencyType,
+) -> typing.List[typing.List[rdflib.term.IdentifiedNode]]:
+    """
+    Get the strongly connected components of a directed graph with Tarjan's algorithm, without recursion.  Components are returned in reverse topological order, so every component follows the components reachable from it.  Edges to nodes outside n_nodes are ignored.
+
+    >>> adjacency: AdjacencyType = collections.defaultdict(set)
+    >>> a, b, c = (rdflib.URIRef("urn:example:%s" % x) for x in "abc")
+    >>> adjacency[a] |= {b}
+    >>> adjacency[b] |= {a, c}
+    >>> [sorted(x) for x in get_strongly_connected_components([a, b, c], adjacency)]
+    [[rdflib.term.URIRef('urn:example:c')], [rdflib.term.URIRef('urn:example:a'), rdflib.term.URIRef('urn:example:b')]]
+    """
+    n_node_set = set(n_nodes)
+    index: typing.Dict[rdflib.term.IdentifiedNode, int] = dict()
+    lowlink: typing.Dict[rdflib.term.IdentifiedNode, int] = dict()
+    n_stack: typing.List[rdflib.term.IdentifiedNode] = []
+    n_on_stack: typing.Set[rdflib.term.IdentifiedNode] = set()
+    components: typing.List[typing.List[rdflib.term.IdentifiedNode]] = []
+
+    for n_root in sorted(n_node_set):
+        if n_root in index:
+            continue
+        # Each frame is a node and an iterator over its remaining
+        # successors.
+        frames: typing.List[
+            typing.Tuple[
+                rdflib.term.IdentifiedNode, typing.Iterator[rdflib.term.IdentifiedNode]
+            ]
+        ] = []
+        index[n_root] = lowlink[n_root] = len(index)
+        n_stack.append(n_root)
+        n_on_stack.add(n_root)
+        frames.append((n_root, iter(sorted(adjacency.get(n_root, set())))))
+        while len(frames) > 0:
+            n_node, n_successors = frames[-1]
+            for n_successor in n_successors:
+                if n_successor not in n_node_set:
+                    continue
+                if n_successor not in index:
+                    index[n_successor] = lowlink[n_successor] = len(index)
+                    n_stack.append(n_successor)
+                    n_on_stack.add(n_successor)
+                    frames.append(
+                        (n_successor, iter(sorted(adjacency.get(n_successor, set()))))
+                    )
+                    break
+                if n_successor in n_on_stack:
+                    lowlink[n_node] = min(lowlink[n_node], index[n_successor])
+            else:
+                frames.pop()
+                if len(frames) > 0:
+                    n_parent = frames[-1][0]
+                    lowlink[n_parent] = min(lowlink[n_parent], lowlink[n_node])
+                if lowlink[n_node] == index[n_node]:
+                    component: typing.List[rdflib.term.IdentifiedNode] = []
+                    while True:
+                        n_member = n_stack.pop()
+                        n_on_stack.remove(n_member)
+                        component.append(n_member)
+                        if n_member == n_node:
+                            break
+                    components.append(sorted(component))
+    return components
+
+
+def get_cycles(
+    n_edges: typing.Iterable[
+        typing.Tuple[rdflib.term.IdentifiedNode, rdflib.term.IdentifiedNode]
+    ],
+) -> typing.List[typing.List[rdflib.term.IdentifiedNode]]:
+    """
+    Get the cycles of a directed graph, as the members of each strongly connected component that has more than one node or an edge to itself.  This is linear in the number of edges, apart from sorting for stable output.
+
+    >>> a, b, c, d = (rdflib.URIRef("urn:example:%s" % x) for x in "abcd")
+    >>> get_cycles([(a, b), (b, a), (b, c), (d, d)])
+    [[rdflib.term.URIRef('urn:example:a'), rdflib.term.URIRef('urn:example:b')], [rdflib.term.URIRef('urn:example:d')]]
+    """
+    adjacency: AdjacencyType = collections.defaultdict(set)
+    for n_earlier, n_later in n_edges:
+        adjacency[n_earlier].add(n_later)
+    n_nodes = set(adjacency.keys())
+    for n_successors in adjacency.values():
+        n_nodes |= n_successors
+    return sorted(
+        component
+        for component in get_strongly_connected_components(n_nodes, adjacency)
+        if len(component) > 1 or component[0] in adjacency[component[0]]
+    )
+
+
+def make_cycle_text(
+    n_cycle: typing.List[rdflib.term.IdentifiedNode],
+    edge_sources: EdgeSourcesType,
+    namespace_manager: rdflib.namespace.NamespaceManager,
+) -> str:
+    """
+    Describe a cycle found by `get_cycles` with its edges, each followed by the source triples that produced it.
+    """
+    cycle_text = "\tCycle of %d nodes:\n" % len(n_cycle)
+    for n_earlier in n_cycle:
+        for n_later in n_cycle:
+            if (n_earlier, n_later) not in edge_sources:
+                continue
+            cycle_text += "\t\t%s -> %s\n" % (
+                n_earlier.n3(namespace_manager),
+                n_later.n3(namespace_manager),
+            )
+            for triple in sorted(edge_sources[(n_earlier, n_later)]):
+                cycle_text += "\t\t\t%s .\n" % " ".join(
+                    x.n3(namespace_manager) for x in triple
+                )
+    return cycle_text
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module loads CASE JSON-LD files without rdflib's general JSON-LD processor.
+
+CASE and UCO graphs are written as one JSON object with an inline @context of prefixes and typed term definitions, and a @graph array of node objects.  For that shape, the context is expanded once, and cached for later files with the same context, and triples are built directly from each node object.  The @graph array is read one member at a time with an incremental JSON reader, so the document is never held in memory as a whole.
+
+Documents using JSON-LD features beyond that shape, such as remote or embedded contexts, containers, @reverse, @list, named graphs, relative IRIs, or compact IRIs with prefixes whose IRIs do not end with a gen-delim character, are parsed with rdflib instead.  The fast path builds the same triples and namespace bindings that rdflib's parser would.
+"""
+
+__version__ = "0.1.0"
+
+import io
+import json
+import logging
+import os
+import typing
+
+import rdflib
+
+from . import compressed_io, snapshot
+from .digraph import TripleType
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+NS_RDF = rdflib.RDF
+NS_XSD = rdflib.XSD
+
+# Characters to read from a file at a time.
+CHUNK_SIZE = 1 << 20
+
+# Namespaces ending with one of these are bound as prefixes, as rdflib's
+# parser binds them.
+VOCAB_DELIMITERS = ("#", "/", ":")
+
+# A term is used as the prefix of a compact IRI only if its IRI ends
+# with one of these URI gen-delim characters, per the JSON-LD 1.1 prefix
+# flag rule.
+GEN_DELIMS = (":", "/", "?", "#", "[", "]", "@")
+
+# Type coercion of a term definition: Neither, "@id", "@vocab", or a
+# datatype IRI.
+CoercionType = typing.Optional[str]
+
+# Context-level keys understood by the fast path.  @version only
+# selects JSON-LD 1.1 processing.
+_SUPPORTED_CONTEXT_KEYWORDS = {"@version", "@vocab"}
+
+# Term definition keys understood by the fast path.
+_SUPPORTED_DEFINITION_KEYWORDS = {"@id", "@type"}
+
+
+class UnsupportedDocumentError(ValueError):
+    """
+    Raised when a document uses JSON-LD features that the fast path does not implement.  parse_json_ld catches this and parses the document with rdflib.
+    """
+
+
+class CompiledContext:
+    """
+    A JSON-LD context expanded for building triples.  Expansions of IRIs, properties, and literals are memoized, as a CASE graph repeats them many times.
+    """
+
+    def __init__(self, context: typing.Any) -> None:
+        if not isinstance(context, dict):
+            raise UnsupportedDocumentError(
+                "Only an inline @context object is supported."
+            )
+        for key in context:
+            if key.startswith("@") and key not in _SUPPORTED_CONTEXT_KEYWORDS:
+                raise UnsupportedDocumentError("Unsupported context keyword %r." % key)
+
+        self.vocab: typing.Optional[str] = context.get("@vocab")
+        if self.vocab is not None and not isinstance(self.vocab, str):
+            raise UnsupportedDocumentError("Unsupported @vocab %r." % self.vocab)
+
+        # Term definitions, as (IRI as written, type coercion as written).
+        definitions: typing.Dict[str, typing.Tuple[str, CoercionType]] = dict()
+        for term, definition in context.items():
+            if term.startswith("@"):
+                continue
+            if isinstance(definition, str):
+                definitions[term] = (definition, None)
+            elif isinstance(definition, dict):
+                if not set(definition) <= _SUPPORTED_DEFINITION_KEYWORDS:
+                    raise UnsupportedDocumentError(
+                        "Unsupported definition of term %r." % term
+                    )
+                iri = definition.get("@id", term)
+                coercion = definition.get("@type")
+                if not isinstance(iri, str) or (
+                    coercion is not None and not isinstance(coercion, str)
+                ):
+                    raise UnsupportedDocumentError(
+                        "Unsupported definition of term %r." % term
+                    )
+                definitions[term] = (iri, coercion)
+            else:
+                raise UnsupportedDocumentError(
+                    "Unsupported definition of term %r." % term
+                )
+            if definitions[term][0].startswith("@"):
+                # Keyword aliases.
+                raise UnsupportedDocumentError(
+                    "Unsupported definition of term %r." % term
+                )
+
+        # Term IRIs are expanded through the prefixes of other terms.
+        self.terms: typing.Dict[str, str] = dict()
+        for term, (iri, _) in definitions.items():
+            expanded_iri = self._expand_prefixed(iri, definitions, term)
+            if expanded_iri is None:
+                raise UnsupportedDocumentError(
+                    "Unable to expand the IRI of term %r." % term
+                )
+            self.terms[term] = expanded_iri
+
+        self.coercions: typing.Dict[str, CoercionType] = dict()
+        for term, (_, coercion) in definitions.items():
+            if coercion is None or coercion in ("@id", "@vocab"):
+                self.coercions[term] = coercion
+            elif coercion.startswith("@"):
+                raise UnsupportedDocumentError(
+                    "Unsupported type coercion of term %r." % term
+                )
+            else:
+                self.coercions[term] = self.expand_vocab_iri(coercion)
+
+        # Memoized expansions.  Nodes and literals are only kept while
+        # a document is read.
+        self._document_nodes: typing.Dict[str, rdflib.term.Identifier] = dict()
+        self._vocab_nodes: typing.Dict[str, rdflib.URIRef] = dict()
+        self._properties: typing.Dict[
+            str, typing.Tuple[typing.Optional[rdflib.URIRef], CoercionType]
+        ] = dict()
+        self._literals: typing.Dict[
+            typing.Tuple[str, typing.Optional[str], typing.Optional[str]],
+            rdflib.Literal,
+        ] = dict()
+
+    def clear_document_memos(self) -> None:
+        self._document_nodes.clear()
+        self._literals.clear()
+
+    @staticmethod
+    def _expand_prefixed(
+        iri: str,
+        definitions: typing.Mapping[str, typing.Tuple[str, CoercionType]],
+        term: typing.Optional[str] = None,
+    ) -> typing.Optional[str]:
+        """
+        Expand a compact IRI through the term definitions, or return an absolute IRI as is.  Returns None for anything else, such as a relative IRI, or a compact IRI whose prefix's IRI does not end with a gen-delim character.
+        """
+        (prefix, colon, suffix) = iri.partition(":")
+        if colon == "":
+            return None
+        if prefix == "_" or suffix.startswith("//"):
+            return iri
+        if prefix in definitions and prefix != term:
+            prefix_iri = definitions[prefix][0]
+            (prefix_prefix, prefix_colon, prefix_suffix) = prefix_iri.partition(":")
+            if prefix_colon == "" or (
+                prefix_prefix in definitions and not prefix_suffix.startswith("//")
+            ):
+                # Relative, or compact in turn.
+                return None
+            if not prefix_iri.endswith(GEN_DELIMS):
+                return None
+            return prefix_iri + suffix
+        return iri
+
+    def expand_iri(self, iri: str) -> str:
+        """
+        Expand a compact or absolute IRI, as used for @id values.
+        """
+        (prefix, colon, suffix) = iri.partition(":")
+        if colon == "":
+            raise UnsupportedDocumentError("Relative IRI %r is not supported." % iri)
+        if suffix.startswith("//"):
+            return iri
+        if prefix in self.terms:
+            if not self.terms[prefix].endswith(GEN_DELIMS):
+                # rdflib leaves such an IRI unexpanded in some positions
+                # and expands it in others.
+                raise UnsupportedDocumentError(
+                    "Term %r, used as the prefix of %r, does not end with a gen-delim character."
+                    % (prefix, iri)
+                )
+            return self.terms[prefix] + suffix
+        return iri
+
+    def expand_vocab_iri(self, iri: str) -> str:
+        """
+        Expand a term, compact IRI, or absolute IRI, as used for @type values and properties.
+        """
+        if iri in self.terms:
+            return self.terms[iri]
+        if ":" not in iri:
+            if self.vocab is None:
+                raise UnsupportedDocumentError(
+                    "Relative IRI %r is not supported." % iri
+                )
+            return self.vocab + iri
+        return self.expand_iri(iri)
+
+    def get_node(self, iri: str) -> rdflib.term.Identifier:
+        """
+        Get the node of an @id value.
+        """
+        node = self._document_nodes.get(iri)
+        if node is None:
+            if iri.startswith("_:"):
+                if len(iri) == 2:
+                    raise UnsupportedDocumentError("Empty blank node identifier.")
+                node = rdflib.BNode(iri[2:])
+            else:
+                node = rdflib.URIRef(self.expand_iri(iri))
+            self._document_nodes[iri] = node
+        return node
+
+    def get_vocab_node(self, iri: str) -> rdflib.URIRef:
+        """
+        Get the IRI node of an @type value.
+        """
+        node = self._vocab_nodes.get(iri)
+        if node is None:
+            if iri.startswith("_:"):
+                raise UnsupportedDocumentError("Blank node type %r." % iri)
+            node = rdflib.URIRef(self.expand_vocab_iri(iri))
+            self._vocab_nodes[iri] = node
+        return node
+
+    def get_property(
+        self, key: str
+    ) -> typing.Tuple[typing.Optional[rdflib.URIRef], CoercionType]:
+        """
+        Get the predicate and type coercion of a node object key.  The predicate is None for keys that expand to no IRI, which JSON-LD drops.
+        """
+        retval = self._properties.get(key)
+        if retval is None:
+            if key.startswith("_:"):
+                raise UnsupportedDocumentError("Blank node predicate %r." % key)
+            n_predicate: typing.Optional[rdflib.URIRef]
+            if key in self.terms or ":" in key or self.vocab is not None:
+                n_predicate = rdflib.URIRef(self.expand_vocab_iri(key))
+            else:
+                n_predicate = None
+            retval = (n_predicate, self.coercions.get(key))
+            self._properties[key] = retval
+        return retval
+
+    def get_literal(
+        self,
+        value: str,
+        datatype: typing.Optional[str] = None,
+        language: typing.Optional[str] = None,
+    ) -> rdflib.Literal:
+        """
+        Get the literal of a string value with an expanded datatype IRI or a language tag.
+        """
+        key = (value, datatype, language)
+        literal = self._literals.get(key)
+        if literal is None:
+            if language is not None:
+                literal = rdflib.Literal(value, lang=language)
+            elif datatype is not None:
+                literal = rdflib.Literal(value, datatype=rdflib.URIRef(datatype))
+            else:
+                literal = rdflib.Literal(value)
+            self._literals[key] = literal
+        return literal
+
+
+# Compiled contexts, keyed by their JSON serialization.
+_compiled_contexts: typing.Dict[str, CompiledContext] = dict()
+
+
+def compile_context(context: typing.Any) -> CompiledContext:
+    """
+    Expand a context, reusing the expansion of an earlier call with an equal context.
+    """
+    key = json.dumps(context, sort_keys=True)
+    compiled_context = _compiled_contexts.get(key)
+    if compiled_context is None:
+        compiled_context = CompiledContext(context)
+        _compiled_contexts[key] = compiled_context
+    return compiled_context
+
+
+def add_node_triples(
+    context: CompiledContext,
+    node_object: typing.Dict[str, typing.Any],
+    triples: typing.List[TripleType],
+) -> rdflib.term.Identifier:
+    """
+    Append the triples of a node object, and of the node objects nested in it, to triples.  Returns the node.
+    """
+    n_subject: rdflib.term.Identifier
+    node_id = node_object.get("@id")
+    if node_id is None:
+        n_subject = rdflib.BNode()
+    elif isinstance(node_id, str):
+        n_subject = context.get_node(node_id)
+    else:
+        raise UnsupportedDocumentError("Unsupported @id %r." % node_id)
+
+    for key, values in node_object.items():
+        if key.startswith("@"):
+            if key == "@id":
+                continue
+            elif key == "@type":
+                for value in values if isinstance(values, list) else [values]:
+                    if not isinstance(value, str):
+                        raise UnsupportedDocumentError("Unsupported @type %r." % value)
+                    triples.append(
+                        (n_subject, NS_RDF.type, context.get_vocab_node(value))
+                    )
+                continue
+            raise UnsupportedDocumentError("Unsupported node keyword %r." % key)
+
+        (n_predicate, coercion) = context.get_property(key)
+        if n_predicate is None:
+            continue
+        for value in values if isinstance(values, list) else [values]:
+            n_object = _get_object(context, value, coercion, triples)
+            if n_object is not None:
+                triples.append((n_subject, n_predicate, n_object))
+    return n_subject
+
+
+def _get_object(
+    context: CompiledContext,
+    value: typing.Any,
+    coercion: CoercionType,
+    triples: typing.List[TripleType],
+) -> typing.Optional[rdflib.term.Node]:
+    """
+    Get the object node of one property value.  Nested node objects have their triples appended to triples.  Returns None for null values, which JSON-LD drops.
+    """
+    if isinstance(value, str):
+        if coercion is None:
+            return context.get_literal(value)
+        elif coercion == "@id":
+            return context.get_node(value)
+        elif coercion == "@vocab":
+            return context.get_vocab_node(value)
+        return context.get_literal(value, coercion)
+    elif isinstance(value, dict):
+        if "@value" in value:
+            if not set(value) <= {"@value", "@type", "@language"}:
+                raise UnsupportedDocumentError("Unsupported value object %r." % value)
+            lexical_form = value["@value"]
+            datatype = value.get("@type")
+            language = value.get("@language")
+            if (
+                not isinstance(lexical_form, str)
+                or (datatype is not None and not isinstance(datatype, str))
+                or (language is not None and not isinstance(language, str))
+                or (datatype is not None and language is not None)
+            ):
+                raise UnsupportedDocumentError("Unsupported value object %r." % value)
+            if datatype is not None:
+                if datatype.startswith("@"):
+                    raise UnsupportedDocumentError(
+                        "Unsupported value object %r." % value
+                    )
+                return context.get_literal(
+                    lexical_form, context.expand_vocab_iri(datatype)
+                )
+            return context.get_literal(lexical_form, language=language)
+        return add_node_triples(context, value, triples)
+    elif value is None:
+        return None
+    elif coercion is not None:
+        raise UnsupportedDocumentError(
+            "Type coercion of native value %r is not supported." % value
+        )
+    elif isinstance(value, bool):
+        return context.get_literal("true" if value else "false", str(NS_XSD.boolean))
+    elif isinstance(value, int):
+        return context.get_literal(str(value), str(NS_XSD.integer))
+    raise UnsupportedDocumentError("Unsupported value %r." % value)
+
+
+class _JSONStreamReader:
+    """
+    Incremental reader of the tokens of a JSON document's top-level object.  Values are decoded whole with the json module, reading more of the file until a value is complete.
+    """
+
+    def __init__(self, in_fh: typing.TextIO) -> None:
+        self.in_fh = in_fh
+        self.buffer = ""
+        self.position = 0
+        self.at_eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _read(self, size: int = CHUNK_SIZE) -> bool:
+        """
+        Read more of the file, dropping the consumed part of the buffer.  Returns False at the end of the file.
+        """
+        if self.at_eof:
+            return False
+        chunk = self.in_fh.read(size)
+        if chunk == "":
+            self.at_eof = True
+            return False
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skip whitespace, and return the next character, or "" at the end of the file.
+        """
+        while True:
+            buffer = self.buffer
+            position = self.position
+            length = len(buffer)
+            while position < length and buffer[position] in " \t\n\r":
+                position += 1
+            self.position = position
+            if position < length:
+                return buffer[position]
+            if not self._read():
+                return ""
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if character == "" or character not in characters:
+            raise ValueError(
+                "Expected one of %r in JSON document, found %r."
+                % (characters, character)
+            )
+        self.position += 1
+        return character
+
+    def decode(self) -> typing.Any:
+        """
+        Decode the next value.
+        """
+        self.peek()
+        read_size = CHUNK_SIZE
+        while True:
+            try:
+                (value, end) = self.decoder.raw_decode(self.buffer, self.position)
+                # A number at the end of the buffer may continue in
+                # the file.
+                if end < len(self.buffer) or self.at_eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.at_eof:
+                    raise
+            # Reads grow, so a large value is not re-decoded many times.
+            self._read(read_size)
+            read_size *= 2
+
+
+def iter_document(
+    in_fh: typing.TextIO,
+) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+    """
+    Iterate over the members of a JSON document's top-level object, as (key, value) pairs.  The members of a @graph array are yielded one at a time as ("@graph", member), and other values are yielded whole.
+    """
+    reader = _JSONStreamReader(in_fh)
+    if reader.peek() != "{":
+        raise UnsupportedDocumentError("Only a top-level JSON object is supported.")
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+        return
+    while True:
+        key = reader.decode()
+        if not isinstance(key, str):
+            raise ValueError("Expected a key string in JSON document.")
+        reader.expect(":")
+        if key == "@graph" and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    yield (key, reader.decode())
+                    if reader.expect(",]") == "]":
+                        break
+        else:
+            yield (key, reader.decode())
+        if reader.expect(",}") == "}":
+            break
+    if reader.peek() != "":
+        raise ValueError("Extra data after JSON document.")
+
+
+def load_triples(
+    in_fh: typing.TextIO,
+) -> typing.Tuple[CompiledContext, typing.List[TripleType]]:
+    """
+    Read a CASE JSON-LD document, returning its context and triples.
+
+    :raises UnsupportedDocumentError: If the document uses JSON-LD features the fast path does not implement.
+    """
+    context: typing.Optional[CompiledContext] = None
+    triples: typing.List[TripleType] = []
+    has_graph = False
+    # @graph members seen before @context, and other top-level members.
+    deferred_members: typing.List[typing.Dict[str, typing.Any]] = []
+    top_level_node: typing.Dict[str, typing.Any] = dict()
+
+    try:
+        for key, value in iter_document(in_fh):
+            if key == "@context":
+                if context is not None:
+                    raise ValueError("Duplicate @context in JSON document.")
+                context = compile_context(value)
+            elif key == "@graph":
+                has_graph = True
+                members = value if isinstance(value, list) else [value]
+                for member in members:
+                    if not isinstance(member, dict):
+                        raise UnsupportedDocumentError("Unsupported @graph member.")
+                    if context is None:
+                        deferred_members.append(member)
+                    else:
+                        add_node_triples(context, member, triples)
+            else:
+                top_level_node[key] = value
+
+        if context is None:
+            raise UnsupportedDocumentError("Document has no @context.")
+        if has_graph:
+            if len(top_level_node) > 0:
+                # The document is a named graph, or has other members that
+                # rdflib would interpret.
+                raise UnsupportedDocumentError(
+                    "Top-level members beside @context and @graph are not supported."
+                )
+            for member in deferred_members:
+                add_node_triples(context, member, triples)
+        elif len(top_level_node) > 0:
+            add_node_triples(context, top_level_node, triples)
+        return (context, triples)
+    finally:
+        if context is not None:
+            context.clear_document_memos()
+
+
+def parse_json_ld(
+    graph: rdflib.Graph, path: str, data: typing.Optional[bytes] = None
+) -> bool:
+    """
+    Add the triples and prefixes of a JSON-LD file to a graph.  If data is given, it is read as the contents of the file at path, already decompressed.  Returns True if the fast path read the file, and False if it was parsed with rdflib.
+    """
+    try:
+        in_fh: typing.TextIO
+        if data is None:
+            in_fh = io.TextIOWrapper(compressed_io.open_input(path), encoding="utf-8")
+        else:
+            in_fh = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+        with in_fh:
+            (context, triples) = load_triples(in_fh)
+    except UnsupportedDocumentError as e:
+        _logger.debug("Parsing %r with rdflib: %s", path, e)
+        if data is None:
+            compressed_io.parse_rdf_file(graph, path, format="json-ld")
+        else:
+            graph.parse(data=data, format="json-ld")
+        return False
+
+    if context.vocab is not None:
+        graph.bind(None, context.vocab)
+    for term, iri in context.terms.items():
+        if iri.endswith(VOCAB_DELIMITERS):
+            graph.bind(term, iri)
+    snapshot.add_triples(graph, triples)
+    return True
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script serves lineage queries over a PROV-O graph, such as the output of case_prov_rdf, on a local HTTP port or Unix socket.
+
+The graph is loaded and expanded with OWL-Time once, as case_prov_dot expands it, and forward and reverse adjacency indexes of the PROV relations and of the temporal ordering are kept in memory.  Each query then only walks the part of the indexes it returns.  These GET requests are served:
+
+* `/ancestry?iri=...` - The nodes case_prov_dot --entity-ancestry displays for the IRIs.
+* `/descendants?iri=...[&depth=N]` - The nodes case_prov_dot --entity-descendants displays for the IRIs.
+* `/time?iri=...[&depth=N]` - The time:TemporalEntitys ordered before and after the IRIs (or their Generations and Invalidations) within N ordering steps, 1 by default.
+* `/dot?iri=...[&closure=ancestry|descendants][&depth=N]` - A Dot render of the IRIs, with their ancestry or descendants if requested.
+
+The iri parameter can be given more than once.  Query results are JSON objects, and errors are JSON objects with an "error" member.  Requests are served one at a time.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import collections
+import functools
+import http.server
+import json
+import logging
+import os
+import shlex
+import socketserver
+import stat
+import time
+import typing
+import urllib.parse
+
+import cdo_local_uuid
+import rdflib
+from case_utils.namespace import NS_RDFS
+
+from . import case_prov_dot, pipeline, query_execution, snapshot
+from .case_prov_dot import build_adjacency, get_closure
+from .digraph import AdjacencyType
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+NS_PROV = rdflib.PROV
+
+# PROV predicates indexed in both directions.
+INDEXED_PREDICATES: typing.List[rdflib.URIRef] = [
+    NS_PROV.actedOnBehalfOf,
+    NS_PROV.qualifiedGeneration,
+    NS_PROV.qualifiedInvalidation,
+    NS_PROV.used,
+    NS_PROV.wasAssociatedWith,
+    NS_PROV.wasAttributedTo,
+    NS_PROV.wasDerivedFrom,
+    NS_PROV.wasGeneratedBy,
+    NS_PROV.wasInformedBy,
+]
+
+# Predicates linking PROV things to the time:TemporalEntitys that place
+# them in time.
+TIME_LINK_PREDICATES: typing.Set[rdflib.URIRef] = {
+    NS_PROV.qualifiedEnd,
+    NS_PROV.qualifiedGeneration,
+    NS_PROV.qualifiedInvalidation,
+    NS_PROV.qualifiedStart,
+    NS_PROV.qualifiedUsage,
+    rdflib.TIME.hasBeginning,
+    rdflib.TIME.hasEnd,
+}
+
+# Keys:
+# * "graph" - The graph, expanded with OWL-Time.
+# * "dot_args" - case_prov_dot options for expansion and renders.
+# * "forward" - Predicate -> subject -> objects.
+# * "reverse" - Predicate -> object -> subjects.
+# * "preceding" - time:TemporalEntity -> the entities ordered
+#   immediately before it.
+# * "following" - time:TemporalEntity -> the entities ordered
+#   immediately after it.
+# * "n_activities", "n_agents", "n_entities" - The prov:Activities,
+#   prov:Agents and prov:Entitys of the graph.
+LineageIndexType = typing.Dict[str, typing.Any]
+
+# (HTTP status, content type, body) of a response.
+ResponseType = typing.Tuple[int, str, bytes]
+
+
+def build_lineage_index(
+    graph: rdflib.Graph, dot_args: argparse.Namespace
+) -> LineageIndexType:
+    """
+    Index a graph for lineage queries.  The graph is augmented in place with the inferred time:Instants and time:Intervals of PROV things, as `case_prov_dot.render_dot` augments it.
+    """
+    time_edges = case_prov_dot.get_graph_time_edges(
+        graph,
+        case_prov_dot.get_kb_namespace(graph, dot_args),
+        dot_args.use_deterministic_uuids is True,
+    )
+
+    preceding: AdjacencyType = collections.defaultdict(set)
+    following: AdjacencyType = collections.defaultdict(set)
+    for n_earlier, n_later in time_edges:
+        preceding[n_later].add(n_earlier)
+        following[n_earlier].add(n_later)
+
+    n_class_instances: typing.Dict[
+        rdflib.URIRef, typing.Set[rdflib.term.IdentifiedNode]
+    ] = collections.defaultdict(set)
+    for n_class in [NS_PROV.Activity, NS_PROV.Agent, NS_PROV.Entity]:
+        with query_execution.execute_query(
+            graph,
+            "SELECT ?nThing WHERE { ?nThing a/rdfs:subClassOf* ?nClass . }",
+            label="lineage index: %s" % n_class.fragment,
+            init_ns={"rdfs": NS_RDFS},
+            init_bindings={"nClass": n_class},
+        ) as results:
+            for result in results:
+                assert isinstance(result, rdflib.query.ResultRow)
+                assert isinstance(result[0], rdflib.term.IdentifiedNode)
+                n_class_instances[n_class].add(result[0])
+
+    lineage_index: LineageIndexType = {
+        "graph": graph,
+        "dot_args": dot_args,
+        "forward": {x: build_adjacency(graph, x) for x in INDEXED_PREDICATES},
+        "reverse": {
+            x: build_adjacency(graph, x, inverse=True) for x in INDEXED_PREDICATES
+        },
+        "preceding": preceding,
+        "following": following,
+        "n_activities": n_class_instances[NS_PROV.Activity],
+        "n_agents": n_class_instances[NS_PROV.Agent],
+        "n_entities": n_class_instances[NS_PROV.Entity],
+    }
+    _logger.debug("len(time_edges) = %d.", len(time_edges))
+    return lineage_index
+
+
+def _get_neighbors(
+    adjacency: AdjacencyType, n_nodes: typing.Iterable[rdflib.term.IdentifiedNode]
+) -> typing.Set[rdflib.term.IdentifiedNode]:
+    """
+    Get the nodes one step from any of the nodes, without adding keys to the adjacency index.
+    """
+    n_neighbors: typing.Set[rdflib.term.IdentifiedNode] = set()
+    for n_node in n_nodes:
+        n_neighbors |= adjacency.get(n_node, set())
+    return n_neighbors
+
+
+def get_ancestry(
+    lineage_index: LineageIndexType,
+    n_terminal_things: typing.Set[rdflib.term.IdentifiedNode],
+) -> typing.Set[rdflib.term.IdentifiedNode]:
+    """
+    Get the chain of ancestry case_prov_dot --entity-ancestry or --query-ancestry displays for the terminal things: the things, the Entities they were derived from, the Activities informing the Activities that generated them, and the Agents those Activities were associated with, and the Agents those acted on behalf of.
+    """
+    forward = lineage_index["forward"]
+    n_entities = get_closure(forward[NS_PROV.wasDerivedFrom], n_terminal_things)
+    n_activities = get_closure(
+        forward[NS_PROV.wasInformedBy],
+        _get_neighbors(forward[NS_PROV.wasGeneratedBy], n_terminal_things),
+    )
+    n_agents = get_closure(
+        forward[NS_PROV.actedOnBehalfOf],
+        _get_neighbors(forward[NS_PROV.wasAssociatedWith], n_activities),
+    )
+    return n_terminal_things | n_entities | n_activities | n_agents
+
+
+def get_descendants(
+    lineage_index: LineageIndexType,
+    n_seed_things: typing.Set[rdflib.term.IdentifiedNode],
+    max_depth: typing.Optional[int] = None,
+) -> typing.Set[rdflib.term.IdentifiedNode]:
+    """
+    Get the descendants case_prov_dot --entity-descendants or --query-descendants displays for the seed things, within max_depth derivation or communication steps if given.
+    """
+    forward = lineage_index["forward"]
+    reverse = lineage_index["reverse"]
+    n_descendant_entities = get_closure(
+        reverse[NS_PROV.wasDerivedFrom],
+        n_seed_things & lineage_index["n_entities"],
+        max_depth,
+    )
+    n_start_actions = (n_seed_things & lineage_index["n_activities"]) | _get_neighbors(
+        reverse[NS_PROV.used], n_seed_things
+    )
+    n_descendant_actions = get_closure(
+        reverse[NS_PROV.wasInformedBy], n_start_actions, max_depth
+    )
+    n_descendant_agents = get_closure(
+        forward[NS_PROV.actedOnBehalfOf],
+        _get_neighbors(forward[NS_PROV.wasAssociatedWith], n_descendant_actions),
+    )
+    return (
+        n_seed_things
+        | n_descendant_entities
+        | n_descendant_actions
+        | n_descendant_agents
+    )
+
+
+def get_temporal_neighborhood(
+    lineage_index: LineageIndexType,
+    n_things: typing.Set[rdflib.term.IdentifiedNode],
+    max_depth: int = 1,
+) -> typing.Tuple[
+    typing.Set[rdflib.term.IdentifiedNode], typing.Set[rdflib.term.IdentifiedNode]
+]:
+    """
+    Get the time:TemporalEntitys ordered before, and after, the things within max_depth ordering steps.  The Generations and Invalidations of Entities stand in for the Entities.
+
+    :returns: (Entities before, entities after.)
+    """
+    forward = lineage_index["forward"]
+    n_seeds = (
+        n_things
+        | _get_neighbors(forward[NS_PROV.qualifiedGeneration], n_things)
+        | _get_neighbors(forward[NS_PROV.qualifiedInvalidation], n_things)
+    )
+    n_before = get_closure(lineage_index["preceding"], n_seeds, max_depth) - n_seeds
+    n_after = get_closure(lineage_index["following"], n_seeds, max_depth) - n_seeds
+    return (n_before, n_after)
+
+
+def get_focus_graph(
+    lineage_index: LineageIndexType,
+    n_focus_things: typing.Set[rdflib.term.IdentifiedNode],
+) -> rdflib.Graph:
+    """
+    Extract the statements about the focus things from the indexed graph: each thing's triples, and the triples of the nodes they reach other than other PROV things, such as their qualified Influences and time:Instants.  Other PROV things reached contribute only their time links (e.g. the time:hasBeginning of the Activity generating a focus Entity), which case_prov_dot uses to place the focus things in time.  The class hierarchy is included so the things are recognized as PROV things.
+    """
+    graph = lineage_index["graph"]
+    n_prov_basis_things = (
+        lineage_index["n_activities"]
+        | lineage_index["n_agents"]
+        | lineage_index["n_entities"]
+    )
+    focus_graph = rdflib.Graph()
+    for prefix, namespace in graph.namespace_manager.namespaces():
+        focus_graph.bind(prefix, namespace)
+    focus_graph += graph.triples((None, NS_RDFS.subClassOf, None))
+
+    n_visited: typing.Set[rdflib.term.IdentifiedNode] = set()
+    n_stack = sorted(n_focus_things)
+    while len(n_stack) > 0:
+        n_node = n_stack.pop()
+        if n_node in n_visited:
+            continue
+        n_visited.add(n_node)
+        is_focus_thing = n_node in n_focus_things or n_node not in n_prov_basis_things
+        for n_predicate, n_object in graph.predicate_objects(n_node):
+            focus_graph.add((n_node, n_predicate, n_object))
+            if not isinstance(n_object, rdflib.term.IdentifiedNode):
+                continue
+            if is_focus_thing or n_predicate in TIME_LINK_PREDICATES:
+                n_stack.append(n_object)
+    return focus_graph
+
+
+def render_focus_dot(
+    lineage_index: LineageIndexType,
+    n_focus_things: typing.Set[rdflib.term.IdentifiedNode],
+) -> str:
+    """
+    Render the focus things as case_prov_dot would, with the index's case_prov_dot options.
+    """
+    dot_graph = case_prov_dot.render_dot(
+        get_focus_graph(lineage_index, n_focus_things),
+        lineage_index["dot_args"],
+        n_focus_things,
+    )
+    return str(dot_graph.to_string())
+
+
+def _make_json_response(status: int, data: typing.Any) -> ResponseType:
+    return (
+        status,
+        "application/json",
+        (json.dumps(data, indent=2, sort_keys=True) + "\n").encode("utf-8"),
+    )
+
+
+def _sorted_iris(n_nodes: typing.Set[rdflib.term.IdentifiedNode]) -> typing.List[str]:
+    return sorted(str(x) for x in n_nodes if isinstance(x, rdflib.URIRef))
+
+
+def handle_request(lineage_index: LineageIndexType, path: str) -> ResponseType:
+    """
+    Answer a GET request for a path, with its query string, as described in this module's documentation.
+    """
+    url = urllib.parse.urlsplit(path)
+    parameters = urllib.parse.parse_qs(url.query)
+    if url.path not in {"/ancestry", "/descendants", "/dot", "/time"}:
+        return _make_json_response(404, {"error": "Unknown path %r." % url.path})
+
+    graph = lineage_index["graph"]
+    n_things: typing.Set[rdflib.term.IdentifiedNode] = set()
+    for iri in parameters.get("iri", []):
+        n_thing = rdflib.URIRef(iri)
+        if (n_thing, None, None) not in graph and (None, None, n_thing) not in graph:
+            return _make_json_response(404, {"error": "IRI %r not in graph." % iri})
+        n_things.add(n_thing)
+    if len(n_things) == 0:
+        return _make_json_response(400, {"error": "No iri parameter given."})
+
+    max_depth: typing.Optional[int] = None
+    if "depth" in parameters:
+        try:
+            max_depth = int(parameters["depth"][-1])
+        except ValueError:
+            return _make_json_response(400, {"error": "depth must be an integer."})
+
+    if url.path == "/ancestry":
+        return _make_json_response(
+            200, {"iris": _sorted_iris(get_ancestry(lineage_index, n_things))}
+        )
+    elif url.path == "/descendants":
+        return _make_json_response(
+            200,
+            {"iris": _sorted_iris(get_descendants(lineage_index, n_things, max_depth))},
+        )
+    elif url.path == "/time":
+        n_before, n_after = get_temporal_neighborhood(
+            lineage_index, n_things, 1 if max_depth is None else max_depth
+        )
+        return _make_json_response(
+            200, {"before": _sorted_iris(n_before), "after": _sorted_iris(n_after)}
+        )
+
+    closure = parameters.get("closure", [""])[-1]
+    if closure == "ancestry":
+        n_things = get_ancestry(lineage_index, n_things)
+    elif closure == "descendants":
+        n_things = get_descendants(lineage_index, n_things, max_depth)
+    elif closure != "":
+        return _make_json_response(400, {"error": "Unknown closure %r." % closure})
+    return (
+        200,
+        "text/vnd.graphviz",
+        render_focus_dot(lineage_index, n_things).encode("utf-8"),
+    )
+
+
+class LineageRequestHandler(http.server.BaseHTTPRequestHandler):
+    def __init__(
+        self, lineage_index: LineageIndexType, *args: typing.Any, **kwargs: typing.Any
+    ) -> None:
+        self.lineage_index = lineage_index
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        time_start = time.perf_counter()
+        status, content_type, body = handle_request(self.lineage_index, self.path)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        _logger.debug(
+            "%s answered in %.3f ms.",
+            self.path,
+            1000 * (time.perf_counter() - time_start),
+        )
+
+    def log_message(self, format: str, *args: typing.Any) -> None:
+        # Unix socket clients have no address for the default log format.
+        _logger.debug(format, *args)
+
+
+class UnixHTTPServer(socketserver.UnixStreamServer):
+    pass
+
+
+def make_server(
+    lineage_index: LineageIndexType,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    socket_path: typing.Optional[str] = None,
+) -> socketserver.BaseServer:
+    """
+    Make a server answering lineage queries, on a Unix socket if socket_path is given, else on an HTTP host and port.
+    """
+    handler = functools.partial(LineageRequestHandler, lineage_index)
+    if socket_path is not None:
+        return UnixHTTPServer(socket_path, handler)
+    return http.server.HTTPServer((host, port), handler)
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="case_prov serve",
+        description="Serve ancestry, descendant, temporal-neighborhood and Dot render queries over a PROV-O graph loaded once.",
+    )
+    parser.add_argument("-d", "--debug", action="store_true")
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Host to serve HTTP on.  (Default: %(default)s.)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="Port to serve HTTP on.  (Default: %(default)s.)",
+    )
+    parser.add_argument(
+        "--socket",
+        help="Serve on a Unix socket at this path, instead of on an HTTP port.",
+    )
+    parser.add_argument(
+        "--dot-arguments",
+        default="",
+        help="case_prov_dot options for the OWL-Time expansion and for Dot renders, as one shell-quoted string.  Use the --dot-arguments=... form if the string starts with a hyphen.",
+    )
+    parser.add_argument("in_graph", nargs="+")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    cdo_local_uuid.configure()
+
+    dot_args = pipeline.parse_step_arguments(
+        case_prov_dot.add_arguments,
+        shlex.split(args.dot_arguments),
+        "case_prov_dot",
+    )
+
+    graph = rdflib.Graph()
+    for in_graph_filename in args.in_graph:
+        snapshot.parse_graph_file(graph, in_graph_filename)
+    time_start = time.perf_counter()
+    lineage_index = build_lineage_index(graph, dot_args)
+    _logger.info(
+        "Indexed %d triples in %.2f seconds.",
+        len(graph),
+        time.perf_counter() - time_start,
+    )
+
+    # Remove a socket left by a server that was killed.
+    if args.socket is not None and os.path.exists(args.socket):
+        if not stat.S_ISSOCK(os.stat(args.socket).st_mode):
+            raise ValueError("Path %r exists and is not a socket." % args.socket)
+        os.unlink(args.socket)
+
+    server = make_server(lineage_index, args.host, args.port, args.socket)
+    if args.socket is None:
+        _logger.info("Serving on http://%s:%d/.", args.host, args.port)
+    else:
+        _logger.info("Serving on %s.", args.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket is not None:
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script runs case_prov_rdf, case_prov_check, and case_prov_dot in one process, following the flow of the examples' example.mk.  The PROV-O graph from case_prov_rdf is passed to the later steps in memory, so it is neither serialized nor re-parsed between steps.  Files are written for the requested renders, and for the PROV-O graph and validation report only when requested.
+
+Each step is configured with the same options as its script.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import contextlib
+import logging
+import os
+import shlex
+import sys
+import typing
+
+import cdo_local_uuid
+import rdflib
+
+from . import (
+    case_prov_check,
+    case_prov_dot,
+    case_prov_rdf,
+    compressed_io,
+    query_execution,
+    serialization,
+    snapshot,
+)
+
+if typing.TYPE_CHECKING:
+    import pydot
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+# (Dot file, case_prov_dot options) of a render.
+ViewType = typing.Tuple[str, typing.Sequence[str]]
+
+# (PROV-O graph from case_prov_rdf, validation result from
+# case_prov_check or None if validation was skipped, Dot graph of each
+# render.)
+PipelineResultType = typing.Tuple[
+    rdflib.Graph,
+    typing.Optional[
+        typing.Tuple[bool, typing.Union[Exception, bytes, str, rdflib.Graph], str]
+    ],
+    typing.List["pydot.Dot"],
+]
+
+
+def parse_step_arguments(
+    add_arguments: typing.Callable[[argparse.ArgumentParser], None],
+    arguments: typing.Sequence[str],
+    prog: str,
+) -> argparse.Namespace:
+    """
+    Parse the options of one step with the step's own argument definitions.
+    """
+    parser = argparse.ArgumentParser(prog=prog)
+    add_arguments(parser)
+    return parser.parse_args(list(arguments))
+
+
+def copy_graph(graph: rdflib.Graph) -> rdflib.Graph:
+    """
+    Copy a graph with its namespace bindings.
+
+    >>> graph = rdflib.Graph()
+    >>> graph.bind("kb", "http://example.org/kb/")
+    >>> _ = graph.add((rdflib.URIRef("http://example.org/kb/x"), rdflib.RDF.type, rdflib.PROV.Entity))
+    >>> copied_graph = copy_graph(graph)
+    >>> len(copied_graph)
+    1
+    >>> copied_graph.namespace_manager.store.namespace("kb")
+    rdflib.term.URIRef('http://example.org/kb/')
+    """
+    copied_graph = rdflib.Graph()
+    for prefix, namespace in graph.namespace_manager.namespaces():
+        copied_graph.namespace_manager.bind(prefix, namespace, override=True)
+    copied_graph += graph
+    return copied_graph
+
+
+def run_pipeline(
+    in_graph: rdflib.Graph,
+    *,
+    rdf_arguments: typing.Sequence[str] = (),
+    check_arguments: typing.Optional[typing.Sequence[str]] = (),
+    views: typing.Sequence[ViewType] = (),
+    out_rdf: typing.Optional[str] = None,
+    out_snapshot: typing.Optional[str] = None,
+    out_rdf_format: str = "turtle",
+    merge_input: bool = False,
+) -> PipelineResultType:
+    """
+    Augment the input graph with case_prov_rdf, validate the result with case_prov_check, and render each view with case_prov_dot.
+
+    Every step's options are parsed before any step runs, so an option error stops the pipeline before any work is done.
+
+    :param rdf_arguments: case_prov_rdf options.
+    :param check_arguments: case_prov_check options.  The report is written to the --output given there, as case_prov_check would write it.  None skips validation.
+    :param views: Dot file and case_prov_dot options of each render.
+    :param out_rdf: If given, the PROV-O graph is also written to this file.
+    :param out_snapshot: If given, the PROV-O graph is also written to this file as a graph snapshot.
+    :param out_rdf_format: Format of out_rdf, one of `serialization.OUTPUT_FORMATS`.
+    :param merge_input: Validate and render the input graph merged with the PROV-O graph.  Otherwise, as in example.mk, only the PROV-O graph is validated and rendered.
+    """
+    rdf_args = parse_step_arguments(
+        case_prov_rdf.add_arguments, rdf_arguments, "case_prov_rdf"
+    )
+    check_args: typing.Optional[argparse.Namespace] = None
+    if check_arguments is not None:
+        check_args = parse_step_arguments(
+            case_prov_check.add_arguments, check_arguments, "case_prov_check"
+        )
+    view_args = [
+        (
+            view[0],
+            parse_step_arguments(case_prov_dot.add_arguments, view[1], "case_prov_dot"),
+        )
+        for view in views
+    ]
+
+    _logger.debug("Running case_prov_rdf.")
+    prov_graph = case_prov_rdf.augment_graph(in_graph, rdf_args)
+    if out_rdf is not None:
+        serialization.write_graph_file(prov_graph, out_rdf, out_rdf_format)
+    if out_snapshot is not None:
+        with compressed_io.open_output(out_snapshot) as out_fh:
+            snapshot.write_snapshot(prov_graph, out_fh)
+
+    step_graph = prov_graph
+    if merge_input:
+        step_graph = copy_graph(in_graph)
+        step_graph += prov_graph
+
+    validate_result: typing.Optional[
+        typing.Tuple[bool, typing.Union[Exception, bytes, str, rdflib.Graph], str]
+    ] = None
+    if check_args is not None:
+        _logger.debug("Running case_prov_check.")
+        validate_result = case_prov_check.check_graph(check_args, data_graph=step_graph)
+        case_prov_check.write_report(check_args, validate_result)
+
+    dot_graphs: typing.List["pydot.Dot"] = []
+    for out_dot, dot_args in view_args:
+        _logger.debug("Running case_prov_dot for %r.", out_dot)
+        # case_prov_dot augments the graph it renders, so each render
+        # gets its own copy.
+        dot_graph = case_prov_dot.render_dot(copy_graph(step_graph), dot_args)
+        case_prov_dot.write_dot(dot_graph, out_dot)
+        dot_graphs.append(dot_graph)
+
+    return prov_graph, validate_result, dot_graphs
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="case_prov pipeline",
+        description="Run case_prov_rdf, case_prov_check, and case_prov_dot in one process, passing the PROV-O graph between them in memory.",
+    )
+    parser.add_argument("-d", "--debug", action="store_true")
+    parser.add_argument(
+        "--rdf-arguments",
+        default="",
+        help="case_prov_rdf options, as one shell-quoted string.  Use the --rdf-arguments=... form if the string starts with a hyphen.",
+    )
+    parser.add_argument(
+        "--out-rdf",
+        help="Write the PROV-O graph from case_prov_rdf to this file.  If absent, the graph is only kept in memory.",
+    )
+    parser.add_argument(
+        "--out-rdf-format",
+        choices=serialization.OUTPUT_FORMATS,
+        default="turtle",
+        help="Format of the --out-rdf file.  (Default: %(default)s.)",
+    )
+    parser.add_argument(
+        "--snapshot-out",
+        help="Write the PROV-O graph from case_prov_rdf to this file as a graph snapshot, which the case_prov scripts read faster than other graph formats.",
+    )
+    parser.add_argument(
+        "--check-arguments",
+        default="",
+        help="case_prov_check options, as one shell-quoted string.  Use the --check-arguments=... form if the string starts with a hyphen.  The report is written to case_prov_check's --output, which defaults to stdout.",
+    )
+    parser.add_argument(
+        "--no-check",
+        action="store_true",
+        help="Skip validation with case_prov_check.",
+    )
+    parser.add_argument(
+        "--merge-input",
+        action="store_true",
+        help="Validate and render the input graph merged with the PROV-O graph.  Without this flag, only the PROV-O graph is validated and rendered, as in example.mk.",
+    )
+    parser.add_argument(
+        "--view",
+        action="append",
+        default=[],
+        metavar="'OUT_DOT [OPTIONS]'",
+        help="Dot file to render, followed by its case_prov_dot options, as one shell-quoted string.  Can be given multiple times.",
+    )
+    parser.add_argument(
+        "--profile-queries",
+        action="store_true",
+        help="Write a report of the SPARQL queries run in all steps, most costly first, to stderr.",
+    )
+    parser.add_argument("in_graph", nargs="+")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    views: typing.List[ViewType] = []
+    for view in args.view:
+        view_tokens = shlex.split(view)
+        if len(view_tokens) == 0:
+            parser.error("--view requires a Dot file.")
+        views.append((view_tokens[0], view_tokens[1:]))
+
+    cdo_local_uuid.configure()
+
+    in_graph = rdflib.Graph()
+    for in_graph_filename in args.in_graph:
+        snapshot.parse_graph_file(in_graph, in_graph_filename)
+
+    with (
+        query_execution.profile_queries(sys.stderr)
+        if args.profile_queries
+        else contextlib.nullcontext()
+    ):
+        _, validate_result, _ = run_pipeline(
+            in_graph,
+            rdf_arguments=shlex.split(args.rdf_arguments),
+            check_arguments=(
+                None if args.no_check else shlex.split(args.check_arguments)
+            ),
+            views=views,
+            out_rdf=args.out_rdf,
+            out_snapshot=args.snapshot_out,
+            out_rdf_format=args.out_rdf_format,
+            merge_input=args.merge_input,
+        )
+
+    sys.exit(0 if validate_result is None or validate_result[0] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module runs the SPARQL queries of the case_prov scripts, and reports each query execution to registered observers.
+
+A query execution is reported as a record of the query's label, the seconds spent preparing the query, the seconds spent executing the query and reading its results, the number of result rows, and the number of triples added to a target graph while the results were in use.  Unless a label is given, a query is labeled with the file and line that ran it.
+
+QueryProfile is an observer that tallies records by label, for the --profile-queries report of the scripts.
+"""
+
+__version__ = "0.1.0"
+
+import contextlib
+import logging
+import os
+import sys
+import time
+import types
+import typing
+
+import rdflib.query
+
+# rdflib.plugins.sparql, which builds the SPARQL parser, is imported
+# when the first query is prepared.
+if typing.TYPE_CHECKING:
+    import rdflib.plugins.sparql.sparql
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+# (Label, preparation seconds, execution seconds, result rows, triples
+# added.)
+QueryRecordType = typing.Tuple[str, float, float, int, int]
+
+QueryObserverType = typing.Callable[[QueryRecordType], None]
+
+# A result of a CONSTRUCT, ASK, or SELECT query.
+QueryRowType = typing.Union[
+    typing.Tuple[rdflib.term.Node, rdflib.term.Node, rdflib.term.Node],
+    bool,
+    rdflib.query.ResultRow,
+]
+
+# (Label, executions, preparation seconds, execution seconds, result
+# rows, triples added.)
+QuerySummaryType = typing.Tuple[str, int, float, float, int, int]
+
+_observers: typing.List[QueryObserverType] = []
+
+# Prepared queries, keyed by query text and sorted namespace bindings.
+_prepared_queries: typing.Dict[
+    typing.Tuple[str, typing.Tuple[typing.Tuple[str, str], ...]],
+    "rdflib.plugins.sparql.sparql.Query",
+] = dict()
+
+
+def add_observer(observer: QueryObserverType) -> None:
+    _observers.append(observer)
+
+
+def remove_observer(observer: QueryObserverType) -> None:
+    _observers.remove(observer)
+
+
+def prepare_query(
+    query_text: str, init_ns: typing.Optional[typing.Mapping[str, typing.Any]] = None
+) -> "rdflib.plugins.sparql.sparql.Query":
+    """
+    Prepare a query, reusing the preparation of an earlier call with the same query text and namespace bindings.
+    """
+    import rdflib.plugins.sparql
+
+    key = (
+        query_text,
+        tuple(sorted((k, str(v)) for (k, v) in (init_ns or dict()).items())),
+    )
+    if key not in _prepared_queries:
+        _prepared_queries[key] = rdflib.plugins.sparql.prepareQuery(
+            query_text, initNs=init_ns
+        )
+    return _prepared_queries[key]
+
+
+class QueryExecution:
+    """
+    Context manager running one query.  Entering the context returns the result rows.  Exiting the context reports the execution to the observers.
+    """
+
+    def __init__(
+        self,
+        graph: rdflib.Graph,
+        query_text: str,
+        label: str,
+        *,
+        init_ns: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+        init_bindings: typing.Optional[
+            typing.Mapping[str, rdflib.term.Identifier]
+        ] = None,
+        target_graph: typing.Optional[rdflib.Graph] = None,
+    ) -> None:
+        self.graph = graph
+        self.query_text = query_text
+        self.label = label
+        self.init_ns = init_ns
+        self.init_bindings = init_bindings
+        self.target_graph = target_graph
+        self.preparation_seconds = 0.0
+        self.execution_seconds = 0.0
+        self.rows: typing.List[QueryRowType] = []
+        self.target_graph_length = 0
+
+    def __enter__(self) -> typing.List[QueryRowType]:
+        # Like rdflib.Graph.query, default to the graph's namespace
+        # bindings.
+        init_ns = self.init_ns
+        if init_ns is None:
+            init_ns = {k: v for (k, v) in self.graph.namespace_manager.namespaces()}
+
+        time_start = time.perf_counter()
+        query_object = prepare_query(self.query_text, init_ns)
+        time_prepared = time.perf_counter()
+        self.rows = list(
+            self.graph.query(query_object, initBindings=self.init_bindings)
+        )
+        time_executed = time.perf_counter()
+
+        self.preparation_seconds = time_prepared - time_start
+        self.execution_seconds = time_executed - time_prepared
+        _logger.debug("%s: len(rows) = %d.", self.label, len(self.rows))
+        if self.target_graph is not None and len(_observers) > 0:
+            self.target_graph_length = len(self.target_graph)
+        return self.rows
+
+    def __exit__(
+        self,
+        exc_type: typing.Optional[typing.Type[BaseException]],
+        exc_value: typing.Optional[BaseException],
+        traceback: typing.Optional[types.TracebackType],
+    ) -> None:
+        if len(_observers) == 0:
+            return
+        triples_added = 0
+        if self.target_graph is not None:
+            triples_added = len(self.target_graph) - self.target_graph_length
+        record: QueryRecordType = (
+            self.label,
+            self.preparation_seconds,
+            self.execution_seconds,
+            len(self.rows),
+            triples_added,
+        )
+        for observer in _observers:
+            observer(record)
+
+
+def execute_query(
+    graph: rdflib.Graph,
+    query_text: str,
+    *,
+    label: typing.Optional[str] = None,
+    init_ns: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+    init_bindings: typing.Optional[typing.Mapping[str, rdflib.term.Identifier]] = None,
+    target_graph: typing.Optional[rdflib.Graph] = None,
+    stacklevel: int = 1,
+) -> QueryExecution:
+    """
+    Run a query on graph, as a context manager returning the result rows.
+
+    :param init_ns: Namespace bindings of the query.  Defaults to the bindings of graph.
+    :param target_graph: Graph that is counted for triples added while the context is open.
+    :param stacklevel: As with logging, the stack frame that runs the query, used for the default label.  Helper functions that run queries given by their callers should pass 2.
+
+    >>> graph = rdflib.Graph()
+    >>> _ = graph.add((rdflib.URIRef("urn:example:a"), rdflib.RDF.type, rdflib.PROV.Entity))
+    >>> profile = QueryProfile()
+    >>> add_observer(profile)
+    >>> with execute_query(
+    ...     graph,
+    ...     "CONSTRUCT { ?x a prov:Thing . } WHERE { ?x a prov:Entity . }",
+    ...     label="example",
+    ...     target_graph=graph,
+    ... ) as rows:
+    ...     for row in rows:
+    ...         _ = graph.add(row)
+    >>> remove_observer(profile)
+    >>> [(summary[0], summary[1], summary[4], summary[5]) for summary in profile.get_summaries()]
+    [('example', 1, 1, 1)]
+    """
+    if label is None:
+        frame = sys._getframe(stacklevel)
+        label = "%s:%d" % (
+            os.path.basename(frame.f_code.co_filename),
+            frame.f_lineno,
+        )
+    return QueryExecution(
+        graph,
+        query_text,
+        label,
+        init_ns=init_ns,
+        init_bindings=init_bindings,
+        target_graph=target_graph,
+    )
+
+
+class QueryProfile:
+    """
+    Observer tallying query executions by label.
+    """
+
+    def __init__(self) -> None:
+        self.records: typing.List[QueryRecordType] = []
+
+    def __call__(self, record: QueryRecordType) -> None:
+        self.records.append(record)
+
+    def get_summaries(self) -> typing.List[QuerySummaryType]:
+        """
+        Tally records by label, most costly label first.
+        """
+        tallies: typing.Dict[str, typing.List[typing.Any]] = dict()
+        for record in self.records:
+            if record[0] not in tallies:
+                tallies[record[0]] = [0, 0.0, 0.0, 0, 0]
+            tally = tallies[record[0]]
+            tally[0] += 1
+            for index in range(1, 5):
+                tally[index] += record[index]
+        summaries: typing.List[QuerySummaryType] = [
+            (label, tally[0], tally[1], tally[2], tally[3], tally[4])
+            for (label, tally) in tallies.items()
+        ]
+        return sorted(summaries, key=lambda x: (-(x[2] + x[3]), x[0]))
+
+    def write_report(self, out_fh: typing.TextIO) -> None:
+        """
+        Write tab-separated summaries, most costly label first, and their totals.
+        """
+        summaries = self.get_summaries()
+        out_fh.write(
+            "Label\tExecutions\tPreparation seconds\tExecution seconds\tRows\tTriples added\n"
+        )
+        for summary in summaries + [
+            (
+                "Total",
+                sum(x[1] for x in summaries),
+                sum(x[2] for x in summaries),
+                sum(x[3] for x in summaries),
+                sum(x[4] for x in summaries),
+                sum(x[5] for x in summaries),
+            )
+        ]:
+            out_fh.write("%s\t%d\t%.6f\t%.6f\t%d\t%d\n" % summary)
+        out_fh.flush()
+
+
+@contextlib.contextmanager
+def profile_queries(out_fh: typing.TextIO) -> typing.Iterator[QueryProfile]:
+    """
+    Observe the queries run in the context, and write their report to out_fh when the context exits.
+    """
+    profile = QueryProfile()
+    add_observer(profile)
+    try:
+        yield profile
+    finally:
+        remove_observer(profile)
+        profile.write_report(out_fh)
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module builds reachability indexes over the closures of PROV predicates, such as prov:wasDerivedFrom* and prov:wasInformedBy*, to answer whether one node is in the lineage of another in logarithmic time.  This script writes the indexes of graph files to a file, which case_prov_dot reads with --reachability-index.
+
+An index is an interval labeling of the predicate's graph, after condensing each strongly connected component (each cycle, which PROV constraints forbid but data can contain) into one node.  The components are numbered in the post-order of a depth-first search forest, so each component's search subtree is the interval of numbers from its first descendant to itself.  A component's label is its subtree interval merged with the labels of its successors, which keeps the reachability through edges outside the forest as further intervals.  A node reaches another if the other's component number is in one of the node's component's intervals, which is found by a binary search.  The whole label of a component is the set of components it reaches, so the nodes reachable from a node are read off its intervals.  Nodes are looked up by their terms, so an index written to a file finds blank nodes only in graphs that keep their identifiers, such as graph snapshots, and not in graphs parsed again from RDF syntax.
+
+A reachability index file is laid out as follows.  Integers are little-endian, and each section starts on an 8-byte boundary.
+
+* Header: MAGIC, format version (uint32), 4 reserved bytes, then the length of the metadata section in bytes (uint64).
+* Metadata: JSON object.  Its "indexes" member is an array with an object per index, with its predicate IRI, the number of the predicate's triples it was built from, its nodes ordered by component number (blank nodes prefixed with "_:"), and its numbers of components and intervals.
+* For each index, four uint32 arrays: the offsets of each component's nodes in the node list, and of each component's intervals in the interval arrays (each component count + 1 long), and the interval beginnings and ends (each interval count long).
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import array
+import bisect
+import collections
+import json
+import logging
+import os
+import struct
+import sys
+import typing
+
+import rdflib
+
+from . import compressed_io, snapshot
+from .digraph import AdjacencyType, get_strongly_connected_components
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+NS_PROV = rdflib.PROV
+
+MAGIC = b"CPREACH\x00"
+
+REACHABILITY_FORMAT_VERSION = 1
+
+# Magic, format version, reserved, metadata length.
+HEADER_STRUCT = struct.Struct("<8sIIQ")
+
+DEFAULT_PREDICATES: typing.List[rdflib.URIRef] = [
+    NS_PROV.wasDerivedFrom,
+    NS_PROV.wasInformedBy,
+]
+
+# Keys:
+# * "predicate" - The predicate whose closure is indexed.
+# * "edge_count" - The number of the predicate's triples the index was
+#   built from.
+# * "nodes" - The nodes, ordered by component number.
+# * "components" - Node -> component number.
+# * "node_offsets" - Component number -> offset of its nodes in
+#   "nodes", with the node count appended.
+# * "interval_offsets" - Component number -> offset of its intervals in
+#   "interval_starts" and "interval_ends", with the interval count
+#   appended.
+# * "interval_starts", "interval_ends" - The first and last component
+#   numbers of each interval.  A component's intervals are sorted and
+#   disjoint.
+ReachabilityIndexType = typing.Dict[str, typing.Any]
+
+
+def _merge_intervals(
+    intervals: typing.List[typing.Tuple[int, int]],
+) -> typing.List[typing.Tuple[int, int]]:
+    """
+    Merge overlapping and adjacent integer intervals.
+
+    >>> _merge_intervals([(4, 6), (0, 1), (2, 2), (5, 9), (11, 11)])
+    [(0, 2), (4, 9), (11, 11)]
+    """
+    merged: typing.List[typing.Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if len(merged) > 0 and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def build_reachability_index(
+    graph: rdflib.Graph, n_predicate: rdflib.URIRef
+) -> ReachabilityIndexType:
+    """
+    Build the reachability index of a predicate's closure, from subjects to objects.
+
+    >>> graph = rdflib.Graph()
+    >>> a, b, c, d = (rdflib.URIRef("urn:example:%s" % x) for x in "abcd")
+    >>> for n_subject, n_object in [(a, b), (b, c), (c, b), (d, c)]:
+    ...     _ = graph.add((n_subject, NS_PROV.wasDerivedFrom, n_object))
+    >>> index = build_reachability_index(graph, NS_PROV.wasDerivedFrom)
+    >>> [is_reachable(index, a, x) for x in [a, b, c, d]]
+    [True, True, True, False]
+    >>> sorted(get_reachable(index, {d}))
+    [rdflib.term.URIRef('urn:example:b'), rdflib.term.URIRef('urn:example:c'), rdflib.term.URIRef('urn:example:d')]
+    """
+    adjacency: AdjacencyType = collections.defaultdict(set)
+    n_nodes: typing.Set[rdflib.term.IdentifiedNode] = set()
+    edge_count = 0
+    for n_subject, n_object in graph.subject_objects(n_predicate):
+        edge_count += 1
+        if not isinstance(n_subject, rdflib.term.IdentifiedNode):
+            continue
+        if not isinstance(n_object, rdflib.term.IdentifiedNode):
+            continue
+        adjacency[n_subject].add(n_object)
+        n_nodes.add(n_subject)
+        n_nodes.add(n_object)
+
+    # Condense the components, then number them in the post-order of a
+    # depth-first search over the condensation, recording the first
+    # number of each component's subtree.  The components are in
+    # reverse topological order, so the search is rooted at the
+    # components nothing reaches first.
+    components = get_strongly_connected_components(n_nodes, adjacency)
+    component_indices: typing.Dict[rdflib.term.IdentifiedNode, int] = {
+        n_node: component_index
+        for (component_index, component) in enumerate(components)
+        for n_node in component
+    }
+    successors: typing.List[typing.Set[int]] = [set() for _ in components]
+    for component_index, component in enumerate(components):
+        for n_node in component:
+            for n_successor in adjacency.get(n_node, set()):
+                if component_indices[n_successor] != component_index:
+                    successors[component_index].add(component_indices[n_successor])
+
+    post_numbers: typing.List[int] = [-1] * len(components)
+    subtree_starts: typing.List[int] = [-1] * len(components)
+    post_number = 0
+    for root_index in reversed(range(len(components))):
+        if subtree_starts[root_index] != -1:
+            continue
+        subtree_starts[root_index] = post_number
+        frames: typing.List[typing.Tuple[int, typing.Iterator[int]]] = [
+            (root_index, iter(sorted(successors[root_index])))
+        ]
+        while len(frames) > 0:
+            component_index, successor_iterator = frames[-1]
+            for successor_index in successor_iterator:
+                if subtree_starts[successor_index] == -1:
+                    subtree_starts[successor_index] = post_number
+                    frames.append(
+                        (successor_index, iter(sorted(successors[successor_index])))
+                    )
+                    break
+            else:
+                frames.pop()
+                post_numbers[component_index] = post_number
+                post_number += 1
+
+    # Label the components in post-order, so each component's
+    # successors are labeled before it.
+    components_by_number: typing.List[int] = [-1] * len(components)
+    for component_index, component_number in enumerate(post_numbers):
+        components_by_number[component_number] = component_index
+    labels: typing.List[typing.List[typing.Tuple[int, int]]] = []
+    for component_number, component_index in enumerate(components_by_number):
+        intervals = [(subtree_starts[component_index], component_number)]
+        for successor_index in successors[component_index]:
+            intervals.extend(labels[post_numbers[successor_index]])
+        labels.append(_merge_intervals(intervals))
+
+    nodes: typing.List[rdflib.term.IdentifiedNode] = []
+    node_offsets = array.array("I", [0])
+    interval_offsets = array.array("I", [0])
+    interval_starts = array.array("I")
+    interval_ends = array.array("I")
+    for component_number, component_index in enumerate(components_by_number):
+        nodes.extend(sorted(components[component_index]))
+        node_offsets.append(len(nodes))
+        for start, end in labels[component_number]:
+            interval_starts.append(start)
+            interval_ends.append(end)
+        interval_offsets.append(len(interval_starts))
+    _logger.debug(
+        "%s: %d nodes, %d components, %d intervals.",
+        n_predicate,
+        len(nodes),
+        len(components),
+        len(interval_starts),
+    )
+    return _make_index(
+        n_predicate,
+        edge_count,
+        nodes,
+        node_offsets,
+        interval_offsets,
+        interval_starts,
+        interval_ends,
+    )
+
+
+def _make_index(
+    n_predicate: rdflib.URIRef,
+    edge_count: int,
+    nodes: typing.List[rdflib.term.IdentifiedNode],
+    node_offsets: "array.array[int]",
+    interval_offsets: "array.array[int]",
+    interval_starts: "array.array[int]",
+    interval_ends: "array.array[int]",
+) -> ReachabilityIndexType:
+    components: typing.Dict[rdflib.term.IdentifiedNode, int] = dict()
+    for component_number in range(len(node_offsets) - 1):
+        for node_offset in range(
+            node_offsets[component_number], node_offsets[component_number + 1]
+        ):
+            components[nodes[node_offset]] = component_number
+    return {
+        "predicate": n_predicate,
+        "edge_count": edge_count,
+        "nodes": nodes,
+        "components": components,
+        "node_offsets": node_offsets,
+        "interval_offsets": interval_offsets,
+        "interval_starts": interval_starts,
+        "interval_ends": interval_ends,
+    }
+
+
+def is_reachable(
+    index: ReachabilityIndexType,
+    n_from: rdflib.term.IdentifiedNode,
+    n_to: rdflib.term.IdentifiedNode,
+) -> bool:
+    """
+    Report whether n_to is in the closure of the index's predicate from n_from, including n_from itself.  This takes time logarithmic in the number of the intervals of n_from's component.
+    """
+    if n_from == n_to:
+        return True
+    component_from = index["components"].get(n_from)
+    component_to = index["components"].get(n_to)
+    if component_from is None or component_to is None:
+        return False
+    interval_starts = index["interval_starts"]
+    interval_offset = (
+        bisect.bisect_right(
+            interval_starts,
+            component_to,
+            index["interval_offsets"][component_from],
+            index["interval_offsets"][component_from + 1],
+        )
+        - 1
+    )
+    if interval_offset < index["interval_offsets"][component_from]:
+        return False
+    return bool(index["interval_ends"][interval_offset] >= component_to)
+
+
+def get_reachable(
+    index: ReachabilityIndexType,
+    n_seeds: typing.Iterable[rdflib.term.IdentifiedNode],
+) -> typing.Set[rdflib.term.IdentifiedNode]:
+    """
+    Get the seeds and all nodes in the closure of the index's predicate from them, as the SPARQL path `?nSeed predicate* ?nNode` binds ?nNode.  This takes time linear in the number of nodes and intervals read.
+    """
+    n_reachable: typing.Set[rdflib.term.IdentifiedNode] = set(n_seeds)
+    component_numbers = {
+        index["components"][x] for x in n_reachable if x in index["components"]
+    }
+    intervals = []
+    for component_number in component_numbers:
+        for interval_offset in range(
+            index["interval_offsets"][component_number],
+            index["interval_offsets"][component_number + 1],
+        ):
+            intervals.append(
+                (
+                    index["interval_starts"][interval_offset],
+                    index["interval_ends"][interval_offset],
+                )
+            )
+    nodes = index["nodes"]
+    node_offsets = index["node_offsets"]
+    for start, end in _merge_intervals(intervals):
+        n_reachable.update(nodes[node_offsets[start] : node_offsets[end + 1]])
+    return n_reachable
+
+
+def get_edge_count(graph: rdflib.Graph, n_predicate: rdflib.URIRef) -> int:
+    return sum(1 for _ in graph.subject_objects(n_predicate))
+
+
+def check_reachability_index(index: ReachabilityIndexType, graph: rdflib.Graph) -> None:
+    """
+    Check that an index read from a file can describe the graph, by the number of the indexed predicate's triples.  This does not detect a changed triple.
+
+    :raises ValueError: If the graph has a different number of the predicate's triples.
+    """
+    edge_count = get_edge_count(graph, index["predicate"])
+    if edge_count != index["edge_count"]:
+        raise ValueError(
+            "Reachability index of %s was built from %d triples, but the graph has %d."
+            % (index["predicate"], index["edge_count"], edge_count)
+        )
+
+
+def _pad(length: int) -> int:
+    return -length % 8
+
+
+def _node_to_text(n_node: rdflib.term.IdentifiedNode) -> str:
+    if isinstance(n_node, rdflib.BNode):
+        return "_:" + str(n_node)
+    return str(n_node)
+
+
+def _text_to_node(text: str) -> rdflib.term.IdentifiedNode:
+    if text.startswith("_:"):
+        return rdflib.BNode(text[2:])
+    return rdflib.URIRef(text)
+
+
+def write_reachability_indexes(
+    indexes: typing.Sequence[ReachabilityIndexType], out_fh: typing.BinaryIO
+) -> None:
+    """
+    Write reachability indexes in the file layout of this module's documentation.
+
+    >>> import io
+    >>> graph = rdflib.Graph()
+    >>> a, b = (rdflib.URIRef("urn:example:%s" % x) for x in "ab")
+    >>> _ = graph.add((a, NS_PROV.wasInformedBy, b))
+    >>> out_fh = io.BytesIO()
+    >>> write_reachability_indexes([build_reachability_index(graph, NS_PROV.wasInformedBy)], out_fh)
+    >>> [index] = parse_reachability_indexes(out_fh.getvalue())
+    >>> (is_reachable(index, a, b), is_reachable(index, b, a))
+    (True, False)
+    """
+    metadata = {
+        "indexes": [
+            {
+                "predicate": str(index["predicate"]),
+                "edge_count": index["edge_count"],
+                "nodes": [_node_to_text(x) for x in index["nodes"]],
+                "component_count": len(index["node_offsets"]) - 1,
+                "interval_count": len(index["interval_starts"]),
+            }
+            for index in indexes
+        ]
+    }
+    metadata_bytes = json.dumps(metadata).encode("utf-8")
+    out_fh.write(
+        HEADER_STRUCT.pack(MAGIC, REACHABILITY_FORMAT_VERSION, 0, len(metadata_bytes))
+    )
+    out_fh.write(metadata_bytes)
+    out_fh.write(b"\x00" * _pad(len(metadata_bytes)))
+    for index in indexes:
+        for key in [
+            "node_offsets",
+            "interval_offsets",
+            "interval_starts",
+            "interval_ends",
+        ]:
+            section = array.array("I", index[key])
+            if sys.byteorder != "little":
+                section.byteswap()
+            section_bytes = section.tobytes()
+            out_fh.write(section_bytes)
+            out_fh.write(b"\x00" * _pad(len(section_bytes)))
+
+
+def parse_reachability_indexes(
+    data: typing.Union[bytes, memoryview],
+) -> typing.List[ReachabilityIndexType]:
+    """
+    Read the reachability indexes written by `write_reachability_indexes`.
+
+    :raises ValueError: If the data is not a reachability index file of this format version.
+    """
+    if len(data) < HEADER_STRUCT.size:
+        raise ValueError("Reachability index data is too short.")
+    magic, format_version, _, metadata_length = HEADER_STRUCT.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Data is not a reachability index.")
+    if format_version != REACHABILITY_FORMAT_VERSION:
+        raise ValueError(
+            "Unsupported reachability index format version %d." % format_version
+        )
+    offset = HEADER_STRUCT.size
+    metadata = json.loads(bytes(data[offset : offset + metadata_length]))
+    offset += metadata_length + _pad(metadata_length)
+
+    def _read_section(length: int) -> "array.array[int]":
+        nonlocal offset
+        section = array.array("I")
+        section_length = length * section.itemsize
+        if offset + section_length > len(data):
+            raise ValueError("Reachability index data is truncated.")
+        section.frombytes(bytes(data[offset : offset + section_length]))
+        if sys.byteorder != "little":
+            section.byteswap()
+        offset += section_length + _pad(section_length)
+        return section
+
+    indexes: typing.List[ReachabilityIndexType] = []
+    for index_metadata in metadata["indexes"]:
+        node_offsets = _read_section(index_metadata["component_count"] + 1)
+        interval_offsets = _read_section(index_metadata["component_count"] + 1)
+        interval_starts = _read_section(index_metadata["interval_count"])
+        interval_ends = _read_section(index_metadata["interval_count"])
+        indexes.append(
+            _make_index(
+                rdflib.URIRef(index_metadata["predicate"]),
+                index_metadata["edge_count"],
+                [_text_to_node(x) for x in index_metadata["nodes"]],
+                node_offsets,
+                interval_offsets,
+                interval_starts,
+                interval_ends,
+            )
+        )
+    return indexes
+
+
+def read_reachability_indexes(
+    path: str,
+) -> typing.Dict[rdflib.URIRef, ReachabilityIndexType]:
+    """
+    Read a reachability index file, decompressing it if its extension names a compression.
+
+    :returns: Predicate -> index.
+    """
+    with compressed_io.open_input(path) as in_fh:
+        data = in_fh.read()
+    return {x["predicate"]: x for x in parse_reachability_indexes(data)}
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="case_prov reachability",
+        description="Write the reachability indexes of the closures of PROV predicates over graph files, for case_prov_dot --reachability-index.",
+    )
+    parser.add_argument("-d", "--debug", action="store_true")
+    parser.add_argument(
+        "--predicate",
+        action="append",
+        help="IRI of a predicate to index the closure of.  Can be given multiple times.  (Default: %s.)"
+        % ", ".join(str(x) for x in DEFAULT_PREDICATES),
+    )
+    parser.add_argument("out_index")
+    parser.add_argument("in_graph", nargs="+")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    graph = rdflib.Graph()
+    for in_graph_filename in args.in_graph:
+        snapshot.parse_graph_file(graph, in_graph_filename)
+
+    n_predicates = (
+        DEFAULT_PREDICATES
+        if args.predicate is None
+        else [rdflib.URIRef(x) for x in args.predicate]
+    )
+    indexes = [build_reachability_index(graph, x) for x in n_predicates]
+    with compressed_io.open_output(args.out_index) as out_fh:
+        write_reachability_indexes(indexes, out_fh)
+
+
+if __name__ == "__main__":
+    main()
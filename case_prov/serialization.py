@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module writes graphs in deterministic serializations, so a graph's output file does not change between runs unless the graph does.
+
+Sorted N-Triples output has one triple per line, in code point order, without duplicates.  Triples are sorted in memory up to a memory budget, and beyond it are sorted in runs spilled to temporary files and merged.
+
+Canonical Turtle output follows the layout of the rdf-toolkit normalizer with blank nodes inlined, which the repository's committed Turtle files use: subjects in IRI order, one predicate per line with rdf:type first, tab indentation, and a copy of a blank node at each triple it is the object of.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import heapq
+import logging
+import os
+import re
+import tempfile
+import typing
+
+import rdflib
+import rdflib.compare
+from rdflib import OWL, RDF, RDFS, XSD
+from rdflib.plugins.serializers.nt import _nt_row
+
+from . import compressed_io, snapshot
+from .digraph import get_cycles
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+# Output formats of `write_graph_file`.
+OUTPUT_FORMATS = ["turtle", "canonical-turtle", "sorted-ntriples"]
+
+# Default memory budget of sorted N-Triples output, in bytes.
+DEFAULT_SORT_MEMORY_BUDGET = 256 << 20
+
+# Estimated memory overhead of one N-Triples line held for sorting,
+# beyond the line's encoded length.
+LINE_OVERHEAD = 64
+
+# Namespaces whose prefixes the canonical Turtle output always declares,
+# when the graph binds them, as rdf-toolkit does.
+STANDARD_NAMESPACES = {str(OWL), str(RDF), str(RDFS), str(XSD)}
+
+# Local names that can follow a prefix in Turtle output.  This is a
+# conservative subset of the Turtle PN_LOCAL production.
+_LOCAL_NAME = re.compile(r"([A-Za-z0-9_]([A-Za-z0-9_.-]*[A-Za-z0-9_-])?)?")
+
+
+def _iter_ntriples_lines(graph: rdflib.Graph) -> typing.Iterator[bytes]:
+    """
+    Yield the N-Triples line of each triple of a graph, encoded as UTF-8.  Triples without blank nodes are yielded as they are read.  Triples with blank nodes are held in memory until the graph is read, and their blank nodes are then relabeled canonically, so their labels do not depend on the order the graph was built in.
+    """
+    blank_graph = rdflib.Graph()
+    for triple in graph:
+        if isinstance(triple[0], rdflib.BNode) or isinstance(triple[2], rdflib.BNode):
+            blank_graph.add(triple)
+            continue
+        yield _nt_row(triple).encode("utf-8")
+    if len(blank_graph) == 0:
+        return
+    for triple in rdflib.compare.to_canonical_graph(blank_graph):
+        yield _nt_row(triple).encode("utf-8")
+
+
+def _write_run(lines: typing.List[bytes], temporary_directory: str) -> str:
+    with tempfile.NamedTemporaryFile(
+        "wb", dir=temporary_directory, suffix=".nt", delete=False
+    ) as run_fh:
+        run_fh.writelines(lines)
+        return run_fh.name
+
+
+def write_sorted_ntriples(
+    graph: rdflib.Graph,
+    out_fh: typing.BinaryIO,
+    memory_budget: int = DEFAULT_SORT_MEMORY_BUDGET,
+) -> int:
+    """
+    Write a graph as N-Triples sorted by code point, without duplicate lines.  Lines beyond the memory budget, in bytes, are sorted in runs in temporary files, which are then merged.  Returns the number of lines written.
+    """
+    lines: typing.List[bytes] = []
+    lines_size = 0
+    with tempfile.TemporaryDirectory(prefix="case_prov_sort_") as temporary_directory:
+        run_paths: typing.List[str] = []
+        for line in _iter_ntriples_lines(graph):
+            lines.append(line)
+            lines_size += len(line) + LINE_OVERHEAD
+            if lines_size >= memory_budget:
+                lines.sort()
+                run_paths.append(_write_run(lines, temporary_directory))
+                lines = []
+                lines_size = 0
+        lines.sort()
+        if len(run_paths) > 0:
+            _logger.debug("Merging %d sorted runs.", len(run_paths) + 1)
+
+        run_fhs = [open(run_path, "rb") for run_path in run_paths]
+        try:
+            n_lines = 0
+            previous_line = None
+            for line in heapq.merge(lines, *run_fhs):
+                if line == previous_line:
+                    continue
+                out_fh.write(line)
+                previous_line = line
+                n_lines += 1
+        finally:
+            for run_fh in run_fhs:
+                run_fh.close()
+    return n_lines
+
+
+def _quote_string(value: str) -> str:
+    """
+    >>> print(_quote_string('A "quoted" string'))
+    "A \\"quoted\\" string"
+    >>> print(_quote_string('Two\\n"lines"'))
+    '''Two
+    "lines"'''
+    """
+    value = value.replace("\\", "\\\\").replace("\r", "\\r")
+    if "\n" not in value:
+        return '"' + value.replace('"', '\\"') + '"'
+    if '"' not in value:
+        return '"""' + value + '"""'
+    return "'''" + value.replace("'", "\\'") + "'''"
+
+
+class _TurtleWriter:
+    """
+    Renders the nodes of a graph as canonical Turtle, recording the prefixes it uses.
+    """
+
+    def __init__(self, graph: rdflib.Graph, namespaces: rdflib.Graph) -> None:
+        self.graph = graph
+        # Longer namespaces are tried first, so the most specific prefix
+        # is used.
+        self.namespaces: typing.List[typing.Tuple[str, str]] = sorted(
+            (
+                (str(namespace), prefix)
+                for (prefix, namespace) in namespaces.namespaces()
+            ),
+            key=lambda x: (-len(x[0]), x[1]),
+        )
+        self.used_prefixes: typing.Dict[str, str] = dict()
+        self._iri_texts: typing.Dict[str, str] = dict()
+        self.inline_nodes: typing.Set[rdflib.BNode] = set()
+
+    def iri_text(self, iri: str) -> str:
+        if iri not in self._iri_texts:
+            text = "<" + iri.replace("\\", "\\u005C").replace(">", "\\u003E") + ">"
+            for namespace, prefix in self.namespaces:
+                if iri.startswith(namespace) and _LOCAL_NAME.fullmatch(
+                    iri[len(namespace) :]
+                ):
+                    self.used_prefixes[prefix] = namespace
+                    text = prefix + ":" + iri[len(namespace) :]
+                    break
+            self._iri_texts[iri] = text
+        return self._iri_texts[iri]
+
+    def literal_text(self, literal: rdflib.Literal) -> str:
+        text = _quote_string(str(literal))
+        if literal.language is not None:
+            return text + "@" + literal.language
+        if literal.datatype is None or literal.datatype == XSD.string:
+            return text
+        return text + "^^" + self.iri_text(str(literal.datatype))
+
+    def object_text(self, node: rdflib.term.Node, indent: int) -> str:
+        """
+        Render an object, whose opening line is indented by `indent` tabs if it is an inline blank node.
+        """
+        if isinstance(node, rdflib.Literal):
+            return self.literal_text(node)
+        if isinstance(node, rdflib.BNode):
+            if node not in self.inline_nodes:
+                return "_:" + str(node)
+            predicate_lines = self.predicate_lines(node, indent + 1)
+            if predicate_lines == "":
+                return "[]"
+            return "[\n" + predicate_lines + "\t" * indent + "]"
+        return self.iri_text(str(node))
+
+    def predicate_lines(self, subject: rdflib.term.Node, indent: int) -> str:
+        """
+        Render the predicates and objects of a subject, one predicate to a line indented by `indent` tabs.
+        """
+        predicate_objects: typing.Dict[
+            rdflib.term.Node, typing.List[rdflib.term.Node]
+        ] = dict()
+        for predicate, object_ in self.graph.predicate_objects(subject):
+            predicate_objects.setdefault(predicate, []).append(object_)
+
+        lines: typing.List[str] = []
+        for predicate in sorted(
+            predicate_objects, key=lambda x: (x != RDF.type, str(x))
+        ):
+            predicate_text = (
+                "a" if predicate == RDF.type else self.iri_text(str(predicate))
+            )
+            objects = predicate_objects[predicate]
+            if len(objects) == 1:
+                lines.append(
+                    "\t" * indent
+                    + predicate_text
+                    + " "
+                    + self.object_text(objects[0], indent)
+                    + " ;\n"
+                )
+                continue
+            object_texts = sorted(
+                (
+                    (
+                        (
+                            2
+                            if isinstance(object_, rdflib.Literal)
+                            else 1 if isinstance(object_, rdflib.BNode) else 0
+                        ),
+                        str(object_),
+                        self.object_text(object_, indent + 1),
+                    )
+                    for object_ in objects
+                ),
+                key=lambda x: (x[0], x[1]) if x[0] == 0 else (x[0], x[2]),
+            )
+            lines.append("\t" * indent + predicate_text + "\n")
+            lines.append(
+                " ,\n".join("\t" * (indent + 1) + x[2] for x in object_texts) + "\n"
+            )
+            lines.append("\t" * (indent + 1) + ";\n")
+        return "".join(lines)
+
+
+def write_canonical_turtle(graph: rdflib.Graph, out_fh: typing.BinaryIO) -> None:
+    """
+    Write a graph as canonical Turtle.  Blank nodes are written inline at each triple they are the object of, so a blank node that is the object of several triples is copied at each, as rdf-toolkit copies it, and is read back as one blank node per copy.  Blank nodes in cycles of blank nodes can not be inlined, and are labeled canonically, so their labels do not depend on the order the graph was built in.
+    """
+
+    def _find_inline_nodes(
+        source_graph: rdflib.Graph,
+    ) -> typing.Tuple[typing.Set[rdflib.BNode], typing.Set[rdflib.BNode]]:
+        """
+        :returns: The blank nodes that are objects and are written inline, and those that are objects and are labeled.
+        """
+        object_nodes: typing.Set[rdflib.BNode] = set()
+        blank_edges: typing.Set[typing.Tuple[rdflib.BNode, rdflib.BNode]] = set()
+        for subject, object_ in source_graph.subject_objects():
+            if isinstance(object_, rdflib.BNode):
+                object_nodes.add(object_)
+                if isinstance(subject, rdflib.BNode):
+                    blank_edges.add((subject, object_))
+        cyclic_nodes: typing.Set[rdflib.BNode] = set()
+        for cycle in get_cycles(blank_edges):
+            for node in cycle:
+                assert isinstance(node, rdflib.BNode)
+                cyclic_nodes.add(node)
+        return (object_nodes - cyclic_nodes, object_nodes & cyclic_nodes)
+
+    inline_nodes, labeled_nodes = _find_inline_nodes(graph)
+    source_graph: rdflib.Graph = graph
+    if len(labeled_nodes) > 0:
+        _logger.debug("Labeling blank nodes canonically.")
+        source_graph = rdflib.compare.to_canonical_graph(graph)
+        inline_nodes, labeled_nodes = _find_inline_nodes(source_graph)
+    blank_subjects = {
+        subject
+        for subject in source_graph.subjects(unique=True)
+        if isinstance(subject, rdflib.BNode)
+    }
+
+    writer = _TurtleWriter(source_graph, graph)
+    writer.inline_nodes = inline_nodes
+
+    iri_subjects: typing.Set[rdflib.term.Node] = set()
+    for subject in source_graph.subjects(unique=True):
+        if not isinstance(subject, rdflib.BNode):
+            iri_subjects.add(subject)
+    blocks: typing.List[str] = []
+    for subject in sorted(iri_subjects, key=str):
+        blocks.append(
+            writer.iri_text(str(subject))
+            + "\n"
+            + writer.predicate_lines(subject, 1)
+            + "\t.\n"
+        )
+    for subject in sorted(labeled_nodes, key=str):
+        blocks.append(
+            "_:" + str(subject) + "\n" + writer.predicate_lines(subject, 1) + "\t.\n"
+        )
+    blocks.extend(
+        sorted(
+            "[]\n" + writer.predicate_lines(subject, 1) + "\t.\n"
+            for subject in blank_subjects
+            if subject not in inline_nodes and subject not in labeled_nodes
+        )
+    )
+
+    # Declare the standard prefixes the graph binds, as rdf-toolkit does.
+    for namespace, prefix in writer.namespaces:
+        if namespace in STANDARD_NAMESPACES and namespace not in set(
+            writer.used_prefixes.values()
+        ):
+            writer.used_prefixes[prefix] = namespace
+
+    header_lines: typing.List[str] = []
+    for ontology in sorted(source_graph.subjects(RDF.type, OWL.Ontology), key=str):
+        for imported_iri in sorted(
+            source_graph.objects(ontology, OWL.imports), key=str
+        ):
+            header_lines.append("# imports: " + str(imported_iri) + "\n")
+    if len(header_lines) > 0:
+        header_lines.append("\n")
+    for prefix in sorted(writer.used_prefixes):
+        header_lines.append(
+            "@prefix %s: %s .\n"
+            % (
+                prefix,
+                "<" + writer.used_prefixes[prefix] + ">",
+            )
+        )
+    if len(blocks) > 0 and len(writer.used_prefixes) > 0:
+        header_lines.append("\n")
+
+    out_fh.write("".join(header_lines).encode("utf-8"))
+    out_fh.write("".join(block + "\n" for block in blocks).encode("utf-8"))
+
+
+def write_graph_file(
+    graph: rdflib.Graph,
+    path: str,
+    output_format: str = "turtle",
+    memory_budget: int = DEFAULT_SORT_MEMORY_BUDGET,
+) -> None:
+    """
+    Write a graph to a file in one of `OUTPUT_FORMATS`, compressing it if its extension names a compression.  The memory budget, in bytes, applies to sorted N-Triples output.
+    """
+    if output_format == "turtle":
+        compressed_io.serialize_rdf_file(graph, path)
+    elif output_format == "canonical-turtle":
+        with compressed_io.open_output(path) as out_fh:
+            write_canonical_turtle(graph, out_fh)
+    elif output_format == "sorted-ntriples":
+        with compressed_io.open_output(path) as out_fh:
+            write_sorted_ntriples(graph, out_fh, memory_budget)
+    else:
+        raise ValueError("Unsupported output format %r." % output_format)
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="case_prov normalize",
+        description="Write graph files as one graph, in a deterministic serialization.",
+    )
+    parser.add_argument("-d", "--debug", action="store_true")
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS[1:],
+        default="canonical-turtle",
+        help="(Default: %(default)s.)",
+    )
+    parser.add_argument(
+        "--sort-memory-budget",
+        type=int,
+        default=DEFAULT_SORT_MEMORY_BUDGET >> 20,
+        metavar="MIB",
+        help="Memory, in MiB, used to sort sorted-ntriples output before sorting in temporary files.  (Default: %(default)s.)",
+    )
+    parser.add_argument("out_file")
+    parser.add_argument("in_graph", nargs="+")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    graph = rdflib.Graph()
+    for in_graph_filename in args.in_graph:
+        snapshot.parse_graph_file(graph, in_graph_filename)
+
+    write_graph_file(
+        graph, args.out_file, args.output_format, args.sort_memory_budget << 20
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This module reads and writes graph snapshots, a binary graph format that loads without tokenizing RDF syntax.  A snapshot is an interned table of the graph's terms and three integer arrays of the triples' subject, predicate and object term indices, with the graph's namespace bindings.  Snapshot files are read through a memory map.
+
+The case_prov scripts read a snapshot wherever they read an input graph file, recognizing it by its leading magic bytes rather than by its file extension.  case_prov_rdf and case_prov pipeline write their PROV-O graph as a snapshot with --snapshot-out.  This script converts graph files of any format rdflib reads into a snapshot.
+
+A snapshot file is laid out as follows.  Integers are little-endian, and each section starts on an 8-byte boundary.
+
+* Header: MAGIC, format version (uint32), 4 reserved bytes, then as uint64s the lengths of the namespaces section and term text in bytes, and the numbers of terms and triples.
+* Namespaces: JSON array of [prefix, namespace IRI] pairs.
+* Term kinds: One byte per term, a TERM_KIND_* value.
+* Term extras: One int32 per term.  For a literal, the index of its datatype IRI term, or -1.  For a language-tagged literal, the index of its language tag string.  Otherwise -1.
+* Term offsets: Term count + 1 uint64s, the character offsets of each term's text within the term text.
+* Term text: The UTF-8 text of every term, concatenated.
+* Triples: Three arrays of triple count uint32s, of the subject, predicate and object term indices.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import array
+import gc
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import typing
+
+import rdflib
+import rdflib.util
+
+from . import compressed_io
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+MAGIC = b"CPSNAP\x00\x00"
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Magic, format version, reserved, namespaces length, term count, term
+# text length, triple count.
+HEADER_STRUCT = struct.Struct("<8sIIQQQQ")
+
+TERM_KIND_IRI = 0
+TERM_KIND_BLANK_NODE = 1
+TERM_KIND_LITERAL = 2
+TERM_KIND_LANGUAGE_LITERAL = 3
+# A language tag, only referenced by language-tagged literals.
+TERM_KIND_STRING = 4
+
+# The rdflib versions, as the least supported and least unsupported
+# (major, minor) versions, whose Memory store keeps the private indices
+# add_triples fills directly.  Other versions' stores are loaded with
+# Graph.addN.
+MEMORY_STORE_RDFLIB_VERSIONS = ((7, 0), (8, 0))
+
+# (Kind, extra, text) of a term in the term table.
+TermEntryType = typing.Tuple[int, int, str]
+
+
+def _pad(length: int) -> int:
+    return -length % 8
+
+
+def _as_array(typecode: str, buffer: typing.Any) -> typing.Any:
+    """
+    View a little-endian section as an array.  The view shares the buffer's memory on little-endian hosts.
+    """
+    if sys.byteorder == "little":
+        return memoryview(buffer).cast(typecode)  # type: ignore
+    retval = array.array(typecode)
+    retval.frombytes(buffer)
+    retval.byteswap()
+    return retval
+
+
+def write_snapshot(graph: rdflib.Graph, out_fh: typing.BinaryIO) -> int:
+    """
+    Write a graph as a snapshot, returning the number of triples written.
+
+    >>> import io
+    >>> graph = rdflib.Graph()
+    >>> graph.bind("ex", "http://example.org/")
+    >>> n_thing = rdflib.URIRef("http://example.org/thing")
+    >>> _ = graph.add((n_thing, rdflib.RDFS.label, rdflib.Literal("Thing", lang="en")))
+    >>> _ = graph.add((n_thing, rdflib.RDFS.comment, rdflib.Literal(1)))
+    >>> _ = graph.add((n_thing, rdflib.RDFS.seeAlso, rdflib.BNode("b0")))
+    >>> out_fh = io.BytesIO()
+    >>> write_snapshot(graph, out_fh)
+    3
+    >>> loaded_graph = rdflib.Graph()
+    >>> parse_snapshot(loaded_graph, out_fh.getvalue())
+    3
+    >>> set(loaded_graph) == set(graph)
+    True
+    >>> loaded_graph.namespace_manager.store.namespace("ex")
+    rdflib.term.URIRef('http://example.org/')
+    """
+    term_indices: typing.Dict[typing.Any, int] = dict()
+    term_entries: typing.List[TermEntryType] = []
+
+    def _intern(term: rdflib.term.Node) -> int:
+        index = term_indices.get(term)
+        if index is not None:
+            return index
+        entry: TermEntryType
+        if isinstance(term, rdflib.URIRef):
+            entry = (TERM_KIND_IRI, -1, str(term))
+        elif isinstance(term, rdflib.BNode):
+            entry = (TERM_KIND_BLANK_NODE, -1, str(term))
+        elif isinstance(term, rdflib.Literal):
+            if term.language is not None:
+                entry = (
+                    TERM_KIND_LANGUAGE_LITERAL,
+                    _intern_string(term.language),
+                    str(term),
+                )
+            elif term.datatype is not None:
+                entry = (TERM_KIND_LITERAL, _intern(term.datatype), str(term))
+            else:
+                entry = (TERM_KIND_LITERAL, -1, str(term))
+        else:
+            raise TypeError("Unsupported term type: %r." % type(term))
+        index = len(term_entries)
+        term_entries.append(entry)
+        term_indices[term] = index
+        return index
+
+    def _intern_string(text: str) -> int:
+        # Strings are keyed apart from terms, as a Literal can equal a
+        # str.
+        key = (TERM_KIND_STRING, text)
+        index = term_indices.get(key)
+        if index is None:
+            index = len(term_entries)
+            term_entries.append((TERM_KIND_STRING, -1, text))
+            term_indices[key] = index
+        return index
+
+    subjects = array.array("I")
+    predicates = array.array("I")
+    objects = array.array("I")
+    for triple in graph.triples((None, None, None)):
+        subjects.append(_intern(triple[0]))
+        predicates.append(_intern(triple[1]))
+        objects.append(_intern(triple[2]))
+        if len(term_entries) > 2**32 - 1:
+            raise ValueError("Too many terms for a snapshot.")
+
+    kinds = bytes(entry[0] for entry in term_entries)
+    extras = array.array("i", (entry[1] for entry in term_entries))
+    offsets = array.array("Q", [0])
+    offset = 0
+    for entry in term_entries:
+        offset += len(entry[2])
+        offsets.append(offset)
+    text = "".join(entry[2] for entry in term_entries).encode("utf-8")
+    namespaces = json.dumps(
+        [[prefix, str(namespace)] for (prefix, namespace) in graph.namespaces()]
+    ).encode("utf-8")
+
+    if sys.byteorder != "little":
+        for array_section in (extras, offsets, subjects, predicates, objects):
+            array_section.byteswap()
+
+    out_fh.write(
+        HEADER_STRUCT.pack(
+            MAGIC,
+            SNAPSHOT_FORMAT_VERSION,
+            0,
+            len(namespaces),
+            len(term_entries),
+            len(text),
+            len(subjects),
+        )
+    )
+    sections: typing.List[bytes] = [
+        namespaces,
+        kinds,
+        extras.tobytes(),
+        offsets.tobytes(),
+        text,
+        subjects.tobytes() + predicates.tobytes() + objects.tobytes(),
+    ]
+    for section in sections:
+        out_fh.write(section)
+        out_fh.write(b"\x00" * _pad(len(section)))
+    return len(subjects)
+
+
+def is_snapshot(data: typing.Union[bytes, memoryview]) -> bool:
+    """
+    Determine whether data, or the leading bytes of a file, are a snapshot.
+    """
+    return bytes(data[: len(MAGIC)]) == MAGIC
+
+
+def is_snapshot_file(path: str) -> bool:
+    try:
+        with compressed_io.open_input(path) as in_fh:
+            return is_snapshot(in_fh.read(len(MAGIC)))
+    except OSError:
+        return False
+
+
+def is_memory_store_version_supported(version: str) -> bool:
+    """
+    Determine whether add_triples can fill the indices of the Memory store of this rdflib version directly.
+
+    >>> is_memory_store_version_supported("7.6.0")
+    True
+    >>> is_memory_store_version_supported("8.0.0a1")
+    False
+    >>> is_memory_store_version_supported("unknown")
+    False
+    """
+    try:
+        major_minor = tuple(int(x) for x in version.split(".")[:2])
+    except ValueError:
+        return False
+    return (
+        MEMORY_STORE_RDFLIB_VERSIONS[0] <= major_minor < MEMORY_STORE_RDFLIB_VERSIONS[1]
+    )
+
+
+def _add_triples_to_graph(
+    graph: rdflib.Graph,
+    triples: typing.Iterable[
+        typing.Tuple[rdflib.term.Node, rdflib.term.Node, rdflib.term.Node]
+    ],
+) -> None:
+    if type(graph) is rdflib.Graph:
+        graph.addN((s, p, o, graph) for (s, p, o) in triples)
+    else:
+        for triple in triples:
+            graph.add(triple)
+
+
+def add_triples(
+    graph: rdflib.Graph,
+    triples: typing.Iterable[
+        typing.Tuple[rdflib.term.Node, rdflib.term.Node, rdflib.term.Node]
+    ],
+) -> None:
+    """
+    Add triples to a graph.  If the graph is a plain rdflib Graph with rdflib's Memory store and no event subscribers, and the installed rdflib is within MEMORY_STORE_RDFLIB_VERSIONS, the store's indices are filled directly, skipping the per-triple event dispatch and context bookkeeping of Store.add, which are most of the cost of loading a large graph.  Otherwise, the triples are added with Graph.addN, or Graph.add for other kinds of graphs.
+    """
+    import rdflib.plugins.stores.memory
+
+    store = graph.store
+    triples_iterator = iter(triples)
+    if (
+        type(graph) is not rdflib.Graph
+        or type(store) is not rdflib.plugins.stores.memory.Memory
+        or not is_memory_store_version_supported(rdflib.__version__)
+        or store.dispatcher.get_map()  # type: ignore
+        or not hasattr(store, "_Memory__spo")
+    ):
+        _add_triples_to_graph(graph, triples_iterator)
+        return
+
+    # The first triple is added normally, to initialize the store's
+    # context records for the graph.
+    for triple in triples_iterator:
+        graph.add(triple)
+        break
+    else:
+        return
+    context_key = store._Memory__ctx_to_str(graph)  # type: ignore
+    if store._Memory__defaultContexts != {context_key: False, None: False}:  # type: ignore
+        # The store holds triples of other contexts.
+        _add_triples_to_graph(graph, triples_iterator)
+        return
+
+    spo = store._Memory__spo
+    pos = store._Memory__pos  # type: ignore
+    osp = store._Memory__osp  # type: ignore
+    new_triples: typing.List[
+        typing.Tuple[rdflib.term.Node, rdflib.term.Node, rdflib.term.Node]
+    ] = []
+    for triple in triples_iterator:
+        (n_subject, n_predicate, n_object) = triple
+        po = spo.get(n_subject)
+        if po is None:
+            po = spo[n_subject] = dict()
+        o = po.get(n_predicate)
+        if o is None:
+            o = po[n_predicate] = {n_object: 1}
+        elif n_object in o:
+            continue
+        else:
+            o[n_object] = 1
+        os_ = pos.get(n_predicate)
+        if os_ is None:
+            os_ = pos[n_predicate] = dict()
+        s = os_.get(n_object)
+        if s is None:
+            os_[n_object] = {n_subject: 1}
+        else:
+            s[n_subject] = 1
+        sp = osp.get(n_object)
+        if sp is None:
+            osp[n_object] = {n_subject: {n_predicate: 1}}
+        else:
+            p = sp.get(n_subject)
+            if p is None:
+                sp[n_subject] = {n_predicate: 1}
+            else:
+                p[n_predicate] = 1
+        new_triples.append(triple)
+
+    # Updating a set from another set reuses the hashes of its members,
+    # so each new triple is hashed once.
+    context_triples = store._Memory__contextTriples[context_key]  # type: ignore
+    new_triples_set = set(new_triples)
+    del new_triples
+    context_triples |= new_triples_set
+    store._Memory__contextTriples[None] |= new_triples_set  # type: ignore
+
+
+def parse_snapshot(graph: rdflib.Graph, data: typing.Any) -> int:
+    """
+    Add the triples and namespace bindings of a snapshot to a graph, returning the number of triples read.  data is the snapshot, as bytes or another buffer, such as a memory map.
+    """
+    # The cyclic garbage collector is paused while the graph's indices
+    # are built, as the many new dicts would otherwise trigger repeated
+    # collections that find no garbage.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    buffer = memoryview(data)
+    try:
+        return _parse_snapshot_buffer(graph, buffer)
+    finally:
+        buffer.release()
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _parse_snapshot_buffer(graph: rdflib.Graph, buffer: memoryview) -> int:
+    if len(buffer) < HEADER_STRUCT.size or not is_snapshot(buffer):
+        raise ValueError("Data is not a case_prov graph snapshot.")
+    (
+        _,
+        format_version,
+        _,
+        namespaces_length,
+        term_count,
+        text_length,
+        triple_count,
+    ) = HEADER_STRUCT.unpack_from(buffer)
+    if format_version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            "Unsupported snapshot format version %d.  Version %d is supported."
+            % (format_version, SNAPSHOT_FORMAT_VERSION)
+        )
+
+    sections: typing.List[memoryview] = []
+    offset = HEADER_STRUCT.size
+    for length in (
+        namespaces_length,
+        term_count,
+        term_count * 4,
+        (term_count + 1) * 8,
+        text_length,
+        triple_count * 12,
+    ):
+        if offset + length > len(buffer):
+            raise ValueError("Snapshot is truncated.")
+        sections.append(buffer[offset : offset + length])
+        offset += length + _pad(length)
+
+    for prefix, namespace in json.loads(bytes(sections[0]).decode("utf-8")):
+        graph.bind(prefix, namespace)
+
+    kinds = bytes(sections[1])
+    extras = _as_array("i", sections[2])
+    offsets = _as_array("Q", sections[3])
+    text = str(sections[4], "utf-8")
+    texts = [text[offsets[index] : offsets[index + 1]] for index in range(term_count)]
+    del text
+
+    # IRIs are constructed first, as literals refer to their datatypes.
+    # Literals are not normalized again, so they keep the lexical forms
+    # of the graph that was written.
+    terms: typing.List[typing.Any] = [None] * term_count
+    for index in range(term_count):
+        kind = kinds[index]
+        if kind == TERM_KIND_IRI:
+            terms[index] = rdflib.URIRef(texts[index])
+        elif kind == TERM_KIND_BLANK_NODE:
+            terms[index] = rdflib.BNode(texts[index])
+        elif kind == TERM_KIND_STRING:
+            terms[index] = texts[index]
+    for index in range(term_count):
+        kind = kinds[index]
+        if kind == TERM_KIND_LITERAL:
+            extra = extras[index]
+            terms[index] = rdflib.Literal(
+                texts[index],
+                datatype=None if extra < 0 else terms[extra],
+                normalize=False,
+            )
+        elif kind == TERM_KIND_LANGUAGE_LITERAL:
+            terms[index] = rdflib.Literal(
+                texts[index], lang=terms[extras[index]], normalize=False
+            )
+    del texts
+
+    triple_indices = _as_array("I", sections[5])
+    subjects = triple_indices[:triple_count]
+    predicates = triple_indices[triple_count : 2 * triple_count]
+    objects = triple_indices[2 * triple_count :]
+    add_triples(
+        graph,
+        zip(
+            map(terms.__getitem__, subjects),
+            map(terms.__getitem__, predicates),
+            map(terms.__getitem__, objects),
+        ),
+    )
+
+    for view in (subjects, predicates, objects, triple_indices, extras, offsets):
+        if isinstance(view, memoryview):
+            view.release()
+    for section in sections:
+        section.release()
+    return int(triple_count)
+
+
+def read_snapshot(graph: rdflib.Graph, path: str) -> int:
+    """
+    Add the triples and namespace bindings of a snapshot file to a graph, returning the number of triples read.  A compressed snapshot is decompressed into memory, as it cannot be memory-mapped.
+    """
+    if compressed_io.get_compression(path) is not None:
+        with compressed_io.open_input(path) as in_fh:
+            return parse_snapshot(graph, in_fh.read())
+    with open(path, "rb") as in_fh:
+        if os.fstat(in_fh.fileno()).st_size == 0:
+            raise ValueError("Snapshot file %r is empty." % path)
+        with mmap.mmap(in_fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return parse_snapshot(graph, mapped)
+
+
+def parse_graph_file(graph: rdflib.Graph, path: str) -> None:
+    """
+    Add the contents of a graph file to a graph, reading the file as a snapshot if it is one, reading JSON-LD with case_prov.jsonld, and otherwise parsing it with rdflib.  Compressed files are decompressed as they are read.
+    """
+    if is_snapshot_file(path):
+        _logger.debug("Reading snapshot %r.", path)
+        read_snapshot(graph, path)
+    elif (
+        rdflib.util.guess_format(compressed_io.strip_compression_extension(path))
+        == "json-ld"
+    ):
+        from . import jsonld
+
+        jsonld.parse_json_ld(graph, path)
+    else:
+        compressed_io.parse_rdf_file(graph, path)
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="case_prov snapshot",
+        description="Convert graph files into one graph snapshot.",
+    )
+    parser.add_argument("-d", "--debug", action="store_true")
+    parser.add_argument("out_snapshot")
+    parser.add_argument("in_graph", nargs="+")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    graph = rdflib.Graph()
+    for in_graph_filename in args.in_graph:
+        parse_graph_file(graph, in_graph_filename)
+
+    with compressed_io.open_output(args.out_snapshot) as out_fh:
+        triple_tally = write_snapshot(graph, out_fh)
+    _logger.debug("triple_tally = %d.", triple_tally)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script generates synthetic CASE graphs of InvestigativeActions, for exercising the case_prov tools at scale.
+
+Actions are generated in chains.  The first action of each chain has no inputs, and each later action uses the ProvenanceRecord and Files of the action before it, plus those of randomly chosen earlier actions for fan-in.  Each action results in a number of Files for fan-out, collected in its ProvenanceRecord, and uses a number of Tools as instruments.
+
+Output is written one node at a time, and each node's identifiers are computed from the seed and the node's position rather than stored, so graph size is not bounded by memory.  The same arguments and seed always produce the same output.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import random
+import sys
+import typing
+import uuid
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+PREFIXES: typing.Dict[str, str] = {
+    "case-investigation": "https://ontology.caseontology.org/case/investigation/",
+    "kb": "http://example.org/kb/",
+    "uco-action": "https://ontology.unifiedcyberontology.org/uco/action/",
+    "uco-core": "https://ontology.unifiedcyberontology.org/uco/core/",
+    "uco-observable": "https://ontology.unifiedcyberontology.org/uco/observable/",
+    "uco-tool": "https://ontology.unifiedcyberontology.org/uco/tool/",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+}
+
+# Predicates whose values are node identifiers.
+ID_PREDICATES: typing.Set[str] = {
+    "uco-action:instrument",
+    "uco-action:object",
+    "uco-action:result",
+    "uco-core:object",
+}
+
+# Predicates whose values are literals of a datatype.
+DATATYPE_PREDICATES: typing.Dict[str, str] = {
+    "uco-action:endTime": "xsd:dateTime",
+    "uco-action:startTime": "xsd:dateTime",
+}
+
+# (Node identifier, types, (predicate, values) pairs) of a generated
+# node.  Identifiers are CURIEs, or blank node labels starting with
+# "_:".  Values are identifiers for ID_PREDICATES, and lexical forms
+# otherwise.
+NodeType = typing.Tuple[
+    str, typing.List[str], typing.List[typing.Tuple[str, typing.List[str]]]
+]
+
+# Timestamp of the first action.  Each later action starts
+# TIMESTAMP_STEP after the one before it.
+TIMESTAMP_BASE = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+TIMESTAMP_STEP = datetime.timedelta(seconds=60)
+
+
+def make_iri(seed: int, kind: str, *indices: int) -> str:
+    """
+    Make the CURIE of a generated node from its kind and position, with a UUID that depends only on those and the seed.
+
+    >>> make_iri(0, "InvestigativeAction", 1) == make_iri(0, "InvestigativeAction", 1)
+    True
+    >>> make_iri(0, "InvestigativeAction", 1) == make_iri(1, "InvestigativeAction", 1)
+    False
+    >>> make_iri(0, "InvestigativeAction", 1).startswith("kb:InvestigativeAction-")
+    True
+    """
+    name = "-".join([str(seed), kind] + [str(x) for x in indices])
+    return "kb:%s-%s" % (kind, uuid.uuid5(uuid.NAMESPACE_URL, name))
+
+
+def make_file_node(
+    seed: int, blank_node_ratio: float, action_index: int, file_index: int
+) -> str:
+    """
+    Make the identifier of a File resulting from an action.  Whether the File is a blank node is decided by its UUID rather than by the random number generator, so later actions can refer to the File without stored state.
+
+    >>> make_file_node(0, 0.0, 1, 2).startswith("kb:File-")
+    True
+    >>> make_file_node(0, 1.0, 1, 2)
+    '_:file-1-2'
+    """
+    n_file = make_iri(seed, "File", action_index, file_index)
+    if uuid.UUID(n_file[-36:]).int < blank_node_ratio * 2**128:
+        return "_:file-%d-%d" % (action_index, file_index)
+    return n_file
+
+
+def iter_nodes(
+    *,
+    actions: int = 100,
+    chain_depth: int = 10,
+    fan_in: int = 1,
+    fan_out: int = 2,
+    instruments: int = 1,
+    tools: int = 8,
+    timestamp_density: float = 1.0,
+    blank_node_ratio: float = 0.0,
+    seed: int = 0,
+) -> typing.Iterator[NodeType]:
+    """
+    Generate the nodes of a synthetic CASE graph.
+
+    :param actions: Number of InvestigativeActions.
+    :param chain_depth: Number of actions in each chain.  The last chain may be shorter.
+    :param fan_in: Number of earlier actions' ProvenanceRecords and Files each action after the first of its chain uses, if that many earlier actions exist.
+    :param fan_out: Number of Files each action results in.
+    :param instruments: Number of Tools each action uses, if that many Tools exist.
+    :param tools: Number of Tools available as instruments.
+    :param timestamp_density: Probability of an action having start and end times.
+    :param blank_node_ratio: Probability of a File being a blank node.
+
+    >>> nodes = list(iter_nodes(actions=2, chain_depth=2, fan_out=1, tools=1))
+    >>> [x[1] for x in nodes]
+    [['uco-tool:Tool'], ['case-investigation:InvestigativeAction'], ['uco-observable:File'], ['case-investigation:ProvenanceRecord'], ['case-investigation:InvestigativeAction'], ['uco-observable:File'], ['case-investigation:ProvenanceRecord']]
+    >>> dict(nodes[4][2])["uco-action:object"] == [nodes[3][0], nodes[2][0]]
+    True
+    """
+    if chain_depth < 1:
+        raise ValueError("chain_depth must be at least 1.")
+    rng = random.Random(seed)
+
+    n_tools = [make_iri(seed, "Tool", x) for x in range(tools)]
+    for x, n_tool in enumerate(n_tools):
+        yield n_tool, ["uco-tool:Tool"], [("uco-core:name", ["Tool %d" % x])]
+
+    for action_index in range(actions):
+        n_action = make_iri(seed, "InvestigativeAction", action_index)
+        n_provenance_record = make_iri(seed, "ProvenanceRecord", action_index)
+
+        properties: typing.List[typing.Tuple[str, typing.List[str]]] = [
+            ("uco-core:description", ["Synthetic action %d" % action_index]),
+        ]
+
+        if rng.random() < timestamp_density:
+            start_time = TIMESTAMP_BASE + TIMESTAMP_STEP * action_index
+            end_time = start_time + TIMESTAMP_STEP / 2
+            properties.append(
+                ("uco-action:endTime", [end_time.isoformat().replace("+00:00", "Z")])
+            )
+            properties.append(
+                (
+                    "uco-action:startTime",
+                    [start_time.isoformat().replace("+00:00", "Z")],
+                )
+            )
+
+        if len(n_tools) > 0 and instruments > 0:
+            properties.append(
+                (
+                    "uco-action:instrument",
+                    sorted(rng.sample(n_tools, min(instruments, len(n_tools)))),
+                )
+            )
+
+        # Only actions after the first of their chain have inputs.
+        if action_index % chain_depth > 0 and fan_in > 0:
+            input_indices = {action_index - 1}
+            extra_inputs = min(fan_in, action_index) - 1
+            while len(input_indices) < extra_inputs + 1:
+                input_indices.add(rng.randrange(action_index))
+            # As in CASE, the objects include the ProvenanceRecords and
+            # their members.
+            n_inputs: typing.List[str] = []
+            for input_index in sorted(input_indices):
+                n_inputs.append(make_iri(seed, "ProvenanceRecord", input_index))
+                for file_index in range(fan_out):
+                    n_inputs.append(
+                        make_file_node(seed, blank_node_ratio, input_index, file_index)
+                    )
+            properties.append(("uco-action:object", n_inputs))
+
+        n_files = [
+            make_file_node(seed, blank_node_ratio, action_index, x)
+            for x in range(fan_out)
+        ]
+        properties.append(("uco-action:result", n_files + [n_provenance_record]))
+
+        yield n_action, ["case-investigation:InvestigativeAction"], properties
+
+        for file_index, n_file in enumerate(n_files):
+            yield n_file, ["uco-observable:File"], [
+                ("uco-core:name", ["file-%d-%d" % (action_index, file_index)])
+            ]
+
+        provenance_record_properties: typing.List[
+            typing.Tuple[str, typing.List[str]]
+        ] = []
+        if len(n_files) > 0:
+            provenance_record_properties.append(("uco-core:object", n_files))
+        yield (
+            n_provenance_record,
+            ["case-investigation:ProvenanceRecord"],
+            provenance_record_properties,
+        )
+
+
+def _turtle_string(value: str) -> str:
+    return '"%s"' % value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def write_turtle(out_fh: typing.TextIO, nodes: typing.Iterable[NodeType]) -> int:
+    """
+    Write nodes as Turtle, returning the number of triples written.
+    """
+    for prefix in sorted(PREFIXES):
+        out_fh.write("@prefix %s: <%s> .\n" % (prefix, PREFIXES[prefix]))
+
+    triple_tally = 0
+    for n_node, n_types, properties in nodes:
+        statements: typing.List[str] = []
+        if len(n_types) > 0:
+            statements.append("a %s" % " , ".join(n_types))
+            triple_tally += len(n_types)
+        for predicate, values in properties:
+            if predicate in ID_PREDICATES:
+                objects = values
+            elif predicate in DATATYPE_PREDICATES:
+                objects = [
+                    "%s^^%s" % (_turtle_string(x), DATATYPE_PREDICATES[predicate])
+                    for x in values
+                ]
+            else:
+                objects = [_turtle_string(x) for x in values]
+            statements.append("%s %s" % (predicate, " , ".join(objects)))
+            triple_tally += len(objects)
+        if len(statements) == 0:
+            continue
+        out_fh.write("\n%s\n\t%s ;\n\t.\n" % (n_node, " ;\n\t".join(statements)))
+    return triple_tally
+
+
+def write_json_ld(out_fh: typing.TextIO, nodes: typing.Iterable[NodeType]) -> int:
+    """
+    Write nodes as JSON-LD, with one member of @graph per line, returning the number of triples written.
+    """
+    context: typing.Dict[str, typing.Any] = dict(PREFIXES)
+    for predicate in ID_PREDICATES:
+        context[predicate] = {"@type": "@id"}
+    for predicate, datatype in DATATYPE_PREDICATES.items():
+        context[predicate] = {"@type": datatype}
+    out_fh.write(
+        '{\n"@context": %s,\n"@graph": [' % json.dumps(context, sort_keys=True)
+    )
+
+    triple_tally = 0
+    separator = "\n"
+    for n_node, n_types, properties in nodes:
+        node_object: typing.Dict[str, typing.Any] = {"@id": n_node}
+        if len(n_types) > 0:
+            node_object["@type"] = n_types
+            triple_tally += len(n_types)
+        for predicate, values in properties:
+            node_object[predicate] = values
+            triple_tally += len(values)
+        out_fh.write(separator + json.dumps(node_object, sort_keys=True))
+        separator = ",\n"
+    out_fh.write("\n]\n}\n")
+    return triple_tally
+
+
+def write_graph(
+    out_fh: typing.TextIO,
+    output_format: str = "turtle",
+    **kwargs: typing.Any,
+) -> int:
+    """
+    Write a synthetic graph in the requested format ("turtle" or "json-ld"), returning the number of triples written.  Other keyword arguments are passed to `iter_nodes`.
+    """
+    nodes = iter_nodes(**kwargs)
+    if output_format == "turtle":
+        return write_turtle(out_fh, nodes)
+    elif output_format == "json-ld":
+        return write_json_ld(out_fh, nodes)
+    raise ValueError("Unsupported output format: %r." % output_format)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the options of `iter_nodes` to a parser.  `get_generator_kwargs` reads them back.
+    """
+    parser.add_argument("--actions", type=int, default=100)
+    parser.add_argument(
+        "--chain-depth",
+        type=int,
+        default=10,
+        help="Number of actions in each chain.  Default is 10.",
+    )
+    parser.add_argument(
+        "--fan-in",
+        type=int,
+        default=1,
+        help="Number of earlier actions' ProvenanceRecords and Files each action after the first of its chain uses.  Default is 1.",
+    )
+    parser.add_argument(
+        "--fan-out",
+        type=int,
+        default=2,
+        help="Number of Files each action results in.  Default is 2.",
+    )
+    parser.add_argument(
+        "--instruments",
+        type=int,
+        default=1,
+        help="Number of Tools each action uses.  Default is 1.",
+    )
+    parser.add_argument(
+        "--tools",
+        type=int,
+        default=8,
+        help="Number of Tools available as instruments.  Default is 8.",
+    )
+    parser.add_argument(
+        "--timestamp-density",
+        type=float,
+        default=1.0,
+        help="Probability of an action having start and end times.  Default is 1.0.",
+    )
+    parser.add_argument(
+        "--blank-node-ratio",
+        type=float,
+        default=0.0,
+        help="Probability of a File being a blank node.  Default is 0.0.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def get_generator_kwargs(args: argparse.Namespace) -> typing.Dict[str, typing.Any]:
+    """
+    Get the `iter_nodes` arguments from a namespace of the options added by `add_arguments`.
+    """
+    return {
+        "actions": args.actions,
+        "chain_depth": args.chain_depth,
+        "fan_in": args.fan_in,
+        "fan_out": args.fan_out,
+        "instruments": args.instruments,
+        "tools": args.tools,
+        "timestamp_density": args.timestamp_density,
+        "blank_node_ratio": args.blank_node_ratio,
+        "seed": args.seed,
+    }
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="case_prov generate",
+        description="Generate a synthetic CASE graph of InvestigativeAction chains.",
+    )
+    parser.add_argument("-d", "--debug", action="store_true")
+    add_arguments(parser)
+    parser.add_argument(
+        "--format",
+        choices=("turtle", "json-ld"),
+        help="Output format.  Default is json-ld if out_file ends with .json or .jsonld, and turtle otherwise.",
+    )
+    parser.add_argument("out_file", help="Output file, or - for stdout.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    output_format = args.format
+    if output_format is None:
+        if os.path.splitext(args.out_file)[1] in (".json", ".jsonld"):
+            output_format = "json-ld"
+        else:
+            output_format = "turtle"
+
+    kwargs = get_generator_kwargs(args)
+    if args.out_file == "-":
+        triple_tally = write_graph(sys.stdout, output_format, **kwargs)
+    else:
+        with open(args.out_file, "w") as out_fh:
+            triple_tally = write_graph(out_fh, output_format, **kwargs)
+    _logger.debug("triple_tally = %d.", triple_tally)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,8 +22,6 @@ subjectdir_basename := $(shell basename $$PWD)
 
 example_srcdir := $(top_srcdir)/dependencies/casework.github.io/examples/$(subjectdir_basename)
 
-rdf_toolkit_jar := $(top_srcdir)/dependencies/casework.github.io/dependencies/CASE-develop/dependencies/UCO/lib/rdf-toolkit.jar
-
 subject_json := $(example_srcdir)/$(subjectdir_basename).json
 
 check_shape_files := $(wildcard $(top_srcdir)/case_prov/shapes/*.ttl)
@@ -70,18 +68,12 @@ $(subjectdir_basename)-prov.ttl: \
 	export CDO_DEMO_NONRANDOM_UUID_BASE="$(top_srcdir)" \
 	  && source $(tests_srcdir)/venv/bin/activate \
 	    && case_prov_rdf \
+	      --output-format canonical-turtle \
 	      --allow-empty-results \
 	      --debug \
 	      --use-deterministic-uuids \
-	      __$@ \
+	      _$@ \
 	      $<
-	java -jar $(rdf_toolkit_jar) \
-	  --inline-blank-nodes \
-	  --source __$@ \
-	  --source-format turtle \
-	  --target _$@ \
-	  --target-format turtle
-	rm __$@
 	mv _$@ $@
 
 $(subjectdir_basename)-prov-activities.dot: \
@@ -309,12 +301,10 @@ case_prov_check.ttl: \
 	    $(case_prov_check_strict_flag) \
 	    $(subjectdir_basename)-prov.ttl \
 	    > __$@
-	java -jar $(rdf_toolkit_jar) \
-	  --inline-blank-nodes \
-	  --source __$@ \
-	  --source-format turtle \
-	  --target _$@ \
-	  --target-format turtle
+	source $(tests_srcdir)/venv/bin/activate \
+	  && case_prov normalize \
+	    _$@ \
+	    __$@
 	rm __$@
 	mv _$@ $@
 
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import argparse
+import collections
+import random
+import typing
+
+import pytest
+import rdflib
+
+from case_prov import allen, case_prov_rdf
+
+NS_KB = rdflib.Namespace("http://example.org/kb/")
+NS_TIME = rdflib.TIME
+
+SINGLE_MASKS = [1 << x for x in range(len(allen.RELATION_PREDICATES))]
+
+
+def test_composition_table() -> None:
+    for mask_12 in SINGLE_MASKS:
+        assert allen.inverse(allen.inverse(mask_12)) == mask_12
+        assert allen.compose(mask_12, allen.EQUALS) == mask_12
+        assert allen.compose(allen.EQUALS, mask_12) == mask_12
+        for mask_23 in SINGLE_MASKS:
+            mask_13 = allen.compose(mask_12, mask_23)
+            assert mask_13 != 0
+            assert allen.inverse(mask_13) == allen.compose(
+                allen.inverse(mask_23), allen.inverse(mask_12)
+            )
+    # Allen's table has 409 relations among its 169 entries.
+    assert (
+        sum(
+            bin(allen.compose(x, y)).count("1")
+            for x in SINGLE_MASKS
+            for y in SINGLE_MASKS
+        )
+        == 409
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_propagate_sound(seed: int) -> None:
+    """
+    Propagating relations of intervals with known endpoints, widened at random, keeps every true relation.
+    """
+    rng = random.Random(seed)
+    n_intervals: typing.List[rdflib.term.IdentifiedNode] = [
+        rdflib.URIRef("urn:example:interval-%d" % x) for x in range(30)
+    ]
+    endpoints = {}
+    for n_interval in n_intervals:
+        beginning = rng.randrange(20)
+        endpoints[n_interval] = (beginning, beginning + 1 + rng.randrange(5))
+
+    network: allen.NetworkType = collections.defaultdict(dict)
+    for _ in range(60):
+        n_interval_1, n_interval_2 = rng.sample(n_intervals, 2)
+        mask = allen._get_endpoint_relation(
+            endpoints[n_interval_1], endpoints[n_interval_2]
+        ) | rng.randrange(allen.ALL_RELATIONS + 1) & rng.randrange(
+            allen.ALL_RELATIONS + 1
+        )
+        network[n_interval_1][n_interval_2] = mask
+        network[n_interval_2][n_interval_1] = allen.inverse(mask)
+
+    for n_component in allen.get_components(network):
+        assert allen.propagate(network, n_component) is None
+    for n_interval_1 in network:
+        for n_interval_2, mask in network[n_interval_1].items():
+            assert mask & allen._get_endpoint_relation(
+                endpoints[n_interval_1], endpoints[n_interval_2]
+            )
+            assert network[n_interval_2][n_interval_1] == allen.inverse(mask)
+
+
+def test_entail_relations() -> None:
+    graph = rdflib.Graph()
+    graph.bind("kb", NS_KB)
+    # a meets b, b meets c, and c and d share their beginning.
+    graph.add((NS_KB.a, NS_TIME.intervalMeets, NS_KB.b))
+    graph.add((NS_KB.c, NS_TIME.intervalMetBy, NS_KB.b))
+    graph.add((NS_KB.c, NS_TIME.hasBeginning, NS_KB["instant-1"]))
+    graph.add((NS_KB.d, NS_TIME.hasBeginning, NS_KB["instant-1"]))
+    # f and g are related to none of the others.
+    graph.add((NS_KB.f, NS_TIME.intervalEquals, NS_KB.g))
+
+    out_graph, inconsistencies = allen.entail_relations(graph)
+    assert inconsistencies == []
+    assert set(out_graph) == {
+        (NS_KB.a, NS_TIME.intervalBefore, NS_KB.c),
+        (NS_KB.b, NS_TIME.intervalMeets, NS_KB.d),
+        (NS_KB.a, NS_TIME.intervalBefore, NS_KB.d),
+    }
+
+    graph.add((NS_KB.c, NS_TIME.intervalBefore, NS_KB.a))
+    out_graph, inconsistencies = allen.entail_relations(graph)
+    assert len(out_graph) == 0
+    assert len(inconsistencies) == 1
+    inconsistency_text = allen.make_inconsistency_text(
+        inconsistencies[0], graph.namespace_manager
+    )
+    assert "kb:c time:intervalBefore kb:a .\n" in inconsistency_text
+    assert "kb:f" not in inconsistency_text
+
+
+def test_case_prov_rdf() -> None:
+    in_graph = rdflib.Graph()
+    for n_activity in [NS_KB.a, NS_KB.b, NS_KB.c]:
+        in_graph.add((n_activity, rdflib.RDF.type, rdflib.PROV.Activity))
+    in_graph.add((NS_KB.a, NS_TIME.intervalBefore, NS_KB.b))
+    in_graph.add((NS_KB.b, NS_TIME.intervalContains, NS_KB.c))
+
+    parser = argparse.ArgumentParser()
+    case_prov_rdf.add_arguments(parser)
+    out_graph = case_prov_rdf.augment_graph(
+        in_graph,
+        parser.parse_args(["--use-deterministic-uuids", "--entail-allen-relations"]),
+    )
+    assert (NS_KB.a, NS_TIME.intervalBefore, NS_KB.c) in out_graph
+
+    out_graph = case_prov_rdf.augment_graph(
+        in_graph, parser.parse_args(["--use-deterministic-uuids"])
+    )
+    assert (NS_KB.a, NS_TIME.intervalBefore, NS_KB.c) not in out_graph
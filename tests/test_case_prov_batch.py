@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import io
+import json
+import pathlib
+import typing
+
+import pytest
+import rdflib
+
+from case_prov import batch
+from case_prov.pipeline import run_pipeline
+
+srcdir = pathlib.Path(__file__).parent
+
+VIEW_ARGUMENTS = ["--activity-informing", "--use-deterministic-uuids"]
+
+
+def _write_manifest(
+    tmp_path: pathlib.Path, manifest: typing.Dict[str, typing.Any]
+) -> str:
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest))
+    return str(manifest_path)
+
+
+def test_batch(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "broken.ttl").write_text("<urn:example:a> a .")
+    manifest_path = _write_manifest(
+        tmp_path,
+        {
+            "defaults": {
+                "rdf_arguments": ["--use-deterministic-uuids"],
+                "check_arguments": ["--engine", "native"],
+                "views": [
+                    {"name": "activities", "arguments": VIEW_ARGUMENTS},
+                    {"name": "all", "arguments": ["--use-deterministic-uuids"]},
+                ],
+            },
+            "cases": [
+                {
+                    "name": "example",
+                    "inputs": [str(srcdir / "Issue-88" / "example.ttl")],
+                },
+                {"name": "broken", "inputs": ["broken.ttl"], "check_arguments": None},
+            ],
+        },
+    )
+    cases = batch.read_manifest(manifest_path)
+    assert cases[1]["inputs"] == [str(tmp_path / "broken.ttl")]
+
+    output_dir = tmp_path / "out"
+    cache_dir = str(tmp_path / "cache")
+    results = batch.run_batch(cases, str(output_dir), cores=2, cache_dir=cache_dir)
+    assert [(x["name"], x["status"]) for x in results] == [
+        ("example", "ran"),
+        ("example-activities", "ran"),
+        ("example-all", "ran"),
+        ("broken", "failed"),
+        ("broken-activities", "skipped"),
+        ("broken-all", "skipped"),
+    ]
+    assert results[0]["conforms"] is True
+
+    # The outputs match the pipeline's.
+    in_graph = rdflib.Graph()
+    in_graph.parse(srcdir / "Issue-88" / "example.ttl")
+    run_pipeline(
+        in_graph,
+        rdf_arguments=["--use-deterministic-uuids"],
+        check_arguments=None,
+        views=[(str(tmp_path / "expected.dot"), VIEW_ARGUMENTS)],
+        out_rdf=str(tmp_path / "expected.ttl"),
+    )
+    case_dir = output_dir / "example"
+    assert (case_dir / "example-activities.dot").read_text() == (
+        tmp_path / "expected.dot"
+    ).read_text()
+    assert (case_dir / "example-prov.ttl").read_text() == (
+        tmp_path / "expected.ttl"
+    ).read_text()
+    assert (case_dir / "example-check.txt").exists()
+    assert not (output_dir / "broken").exists()
+
+    # A second run copies every output of the first from the cache.
+    for output_path in case_dir.iterdir():
+        output_path.unlink()
+    results = batch.run_batch(cases, str(output_dir), cores=2, cache_dir=cache_dir)
+    assert [x["status"] for x in results[:3]] == ["cached"] * 3
+    assert results[0]["conforms"] is True
+    assert (case_dir / "example-activities.dot").read_text() == (
+        tmp_path / "expected.dot"
+    ).read_text()
+
+    report_fh = io.StringIO()
+    batch.write_timing_report(results, report_fh)
+    report_lines = report_fh.getvalue().splitlines()
+    assert len(report_lines) == len(results) + 2
+    assert report_lines[1].split("\t")[:4] == ["example", "prov", "cached", "true"]
+
+
+def test_batch_file_option_keys(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Files named by step options are found from the manifest's directory, and their contents are hashed into the cache keys.
+    """
+    (tmp_path / "ontology.ttl").write_text("")
+    (tmp_path / "query.sparql").write_text("SELECT ?nEntity WHERE { ?nEntity a ?x . }")
+    manifest_path = _write_manifest(
+        tmp_path,
+        {
+            "cases": [
+                {
+                    "name": "example",
+                    "inputs": [str(srcdir / "Issue-88" / "example.ttl")],
+                    "check_arguments": ["--ontology-graph=ontology.ttl"],
+                    "views": [
+                        {
+                            "name": "ancestry",
+                            "arguments": ["--query-ancestry", "query.sparql"],
+                        }
+                    ],
+                }
+            ]
+        },
+    )
+    monkeypatch.chdir(srcdir)
+    cases = batch.read_manifest(manifest_path)
+    assert cases[0]["check_arguments"] == [
+        "--ontology-graph=" + str(tmp_path / "ontology.ttl")
+    ]
+    assert cases[0]["views"][0]["arguments"] == [
+        "--query-ancestry",
+        str(tmp_path / "query.sparql"),
+    ]
+
+    keys = [x["key"] for x in batch.make_jobs(cases, str(tmp_path), "")]
+    (tmp_path / "query.sparql").write_text("SELECT ?nEntity WHERE { ?nEntity ?p ?x . }")
+    changed_query_keys = [x["key"] for x in batch.make_jobs(cases, str(tmp_path), "")]
+    assert changed_query_keys[0] == keys[0]
+    assert changed_query_keys[1] != keys[1]
+    (tmp_path / "ontology.ttl").write_text("# Changed.\n")
+    changed_ontology_keys = [
+        x["key"] for x in batch.make_jobs(cases, str(tmp_path), "")
+    ]
+    assert changed_ontology_keys[0] != changed_query_keys[0]
+    assert changed_ontology_keys[1] != changed_query_keys[1]
+
+
+@pytest.mark.parametrize(
+    "manifest",
+    [
+        {"cases": [{"name": "a/b", "inputs": ["in.ttl"]}]},
+        {"cases": [{"name": "a", "inputs": []}]},
+        {
+            "cases": [
+                {"name": "a", "inputs": ["in.ttl"]},
+                {"name": "a", "inputs": ["in.ttl"]},
+            ]
+        },
+        {"cases": [{"name": "a", "inputs": ["in.ttl"], "rdf_format": "xml"}]},
+        {"cases": [{"name": "a", "inputs": ["in.ttl"], "views": [{"name": ""}]}]},
+    ],
+)
+def test_manifest_errors(
+    tmp_path: pathlib.Path, manifest: typing.Dict[str, typing.Any]
+) -> None:
+    with pytest.raises(ValueError):
+        batch.read_manifest(_write_manifest(tmp_path, manifest))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import copy
+import pathlib
+
+import pytest
+
+from case_prov.benchmark import (
+    BENCHMARK_FORMAT_VERSION,
+    STAGES,
+    compare_results,
+    run_benchmarks,
+)
+
+
+def test_run_benchmarks(tmp_path: pathlib.Path) -> None:
+    results = run_benchmarks(
+        str(tmp_path), sizes=[3], generator_kwargs={"chain_depth": 2}
+    )
+
+    assert results["version"] == BENCHMARK_FORMAT_VERSION
+    assert [x["stage"] for x in results["results"]] == list(STAGES)
+    for record in results["results"]:
+        assert record["actions"] == 3
+        assert record["input_triples"] > 0
+        assert record["wall_seconds"] > 0
+        assert record["peak_rss_bytes"] > 0
+    # The PROV-O graph extends the synthetic graph's triples.
+    assert results["results"][2]["input_triples"] > (
+        results["results"][1]["input_triples"]
+    )
+
+    # Results compare clean against themselves.
+    assert not any(x[4] for x in compare_results(results, results))
+
+    # A doubled time is flagged, but not if it is within noise.
+    slowed_results = copy.deepcopy(results)
+    slowed_results["results"][1]["wall_seconds"] = (
+        results["results"][1]["wall_seconds"] * 2 + 1
+    )
+    regressions = [x for x in compare_results(results, slowed_results) if x[4]]
+    assert [(x[0], x[1]) for x in regressions] == [
+        ("actions=3 case_prov_rdf", "wall_seconds")
+    ]
+    assert not any(
+        x[4] for x in compare_results(results, slowed_results, min_seconds=float("inf"))
+    )
+
+
+def test_compare_results_version() -> None:
+    with pytest.raises(ValueError):
+        compare_results({"version": 0, "results": []}, {"version": 1, "results": []})
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import importlib.resources
+import pathlib
+import typing
+
+import pyshacl
+import pytest
+import rdflib
+import rdflib.compare
+
+from case_prov import shapes
+from case_prov.case_prov_check import (
+    NS_PROV,
+    NS_RDF,
+    NS_TIME,
+    get_chain_breaks,
+    get_shape_dependency,
+    get_targeted_entailments,
+    load_graph,
+    merge_validation_reports,
+    rebase_focus_node_reports,
+    split_validation_report,
+    validate_in_parallel,
+    validate_incrementally,
+    validate_natively,
+)
+
+tests_srcdir = pathlib.Path(__file__).parent
+
+graph_files: typing.List[pathlib.Path] = sorted(
+    tests_srcdir.glob("casework.github.io/examples/*/*-prov.ttl")
+)
+
+SUPPLEMENTAL_SHAPES = """\
+@prefix ex: <http://example.org/ontology/ex/> .
+@prefix prov: <http://www.w3.org/ns/prov#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+
+ex:label-shape
+    a sh:NodeShape ;
+    sh:property [
+        sh:minCount 1 ;
+        sh:path rdfs:label ;
+        sh:severity sh:Info ;
+    ] ;
+    sh:targetClass prov:Entity ;
+    .
+"""
+
+
+def _load_shapes_graph() -> rdflib.Graph:
+    graph = rdflib.Graph()
+    for resource_filename in importlib.resources.contents(shapes):
+        if resource_filename.endswith(".ttl"):
+            graph.parse(
+                data=importlib.resources.read_text(shapes, resource_filename),
+                format="turtle",
+            )
+    return graph
+
+
+@pytest.mark.parametrize("graph_file", graph_files, ids=[x.name for x in graph_files])
+@pytest.mark.parametrize("use_supplemental_shapes", [False, True])
+@pytest.mark.parametrize("allow_warnings", [False, True])
+def test_validate_natively(
+    graph_file: pathlib.Path, use_supplemental_shapes: bool, allow_warnings: bool
+) -> None:
+    """
+    Confirm the native engine reports the same results as pySHACL.
+    """
+    data_graph = rdflib.Graph()
+    data_graph.parse(graph_file)
+
+    shapes_graph = _load_shapes_graph()
+    supplemental_shapes_graph: typing.Optional[rdflib.Graph] = None
+    if use_supplemental_shapes:
+        supplemental_shapes_graph = rdflib.Graph()
+        supplemental_shapes_graph.parse(data=SUPPLEMENTAL_SHAPES, format="turtle")
+        shapes_graph.parse(data=SUPPLEMENTAL_SHAPES, format="turtle")
+
+    expected = pyshacl.validate(
+        data_graph,
+        shacl_graph=shapes_graph,
+        ont_graph=shapes_graph,
+        allow_warnings=allow_warnings,
+    )
+    computed = validate_natively(
+        data_graph,
+        shacl_graph=shapes_graph,
+        supplemental_shacl_graph=supplemental_shapes_graph,
+        allow_warnings=allow_warnings,
+    )
+
+    assert expected[0] == computed[0]
+    assert expected[2] == computed[2]
+    assert isinstance(expected[1], rdflib.Graph)
+    assert isinstance(computed[1], rdflib.Graph)
+    assert rdflib.compare.isomorphic(expected[1], computed[1])
+
+
+@pytest.mark.parametrize("graph_file", graph_files, ids=[x.name for x in graph_files])
+@pytest.mark.parametrize("jobs", [2, 3])
+def test_validate_in_parallel(graph_file: pathlib.Path, jobs: int) -> None:
+    """
+    Confirm parallel validation reports the same results as serial validation.
+    """
+    data_graph = rdflib.Graph()
+    data_graph.parse(graph_file)
+
+    shapes_graph = _load_shapes_graph()
+    shapes_graph.parse(data=SUPPLEMENTAL_SHAPES, format="turtle")
+
+    expected = pyshacl.validate(
+        data_graph,
+        shacl_graph=shapes_graph,
+        ont_graph=shapes_graph,
+    )
+    computed = validate_in_parallel(
+        data_graph,
+        shacl_graph=shapes_graph,
+        ont_graph=shapes_graph,
+        jobs=jobs,
+    )
+
+    assert expected[0] == computed[0]
+    assert expected[2] == computed[2]
+    assert isinstance(expected[1], rdflib.Graph)
+    assert isinstance(computed[1], rdflib.Graph)
+    assert rdflib.compare.isomorphic(expected[1], computed[1])
+
+
+def _edit_data_graph(data_graph: rdflib.Graph) -> rdflib.Graph:
+    """
+    Copy the data graph with a few edits that change validation results.
+    """
+    edited_graph = rdflib.Graph()
+    for prefix, namespace in data_graph.namespace_manager.namespaces():
+        edited_graph.namespace_manager.bind(prefix, namespace)
+    edited_graph += data_graph
+
+    n_activities = sorted(
+        x
+        for x in edited_graph.subjects(NS_RDF.type, NS_PROV.Activity)
+        if isinstance(x, rdflib.URIRef)
+    )
+    n_entities = sorted(
+        x
+        for x in edited_graph.subjects(NS_RDF.type, NS_PROV.Entity)
+        if isinstance(x, rdflib.URIRef)
+    )
+    # Break a chain of communication.
+    if len(n_activities) > 0:
+        edited_graph.remove((n_activities[0], NS_PROV.wasInformedBy, None))
+        edited_graph.remove((n_activities[0], NS_PROV.used, NS_PROV.EmptyCollection))
+    # Repair a chain of derivation.
+    if len(n_entities) > 0:
+        edited_graph.add(
+            (n_entities[-1], NS_PROV.wasDerivedFrom, NS_PROV.EmptyCollection)
+        )
+    # Add a new node that is both an activity and an entity.
+    n_new = rdflib.URIRef("http://example.org/kb/new-node")
+    edited_graph.add((n_new, NS_RDF.type, NS_PROV.Activity))
+    edited_graph.add((n_new, NS_RDF.type, NS_PROV.Entity))
+    # Edit a triple no shape reads.
+    edited_graph.add((n_new, rdflib.RDFS.comment, rdflib.Literal("New.")))
+    return edited_graph
+
+
+@pytest.mark.parametrize("graph_file", graph_files, ids=[x.name for x in graph_files])
+@pytest.mark.parametrize("use_supplemental_shapes", [False, True])
+def test_validate_incrementally(
+    graph_file: pathlib.Path, use_supplemental_shapes: bool
+) -> None:
+    """
+    Confirm patching the per-focus-node reports of a graph after edits gives the same report as validating the edited graph.
+    """
+    previous_data_graph = rdflib.Graph()
+    previous_data_graph.parse(graph_file)
+    data_graph = _edit_data_graph(previous_data_graph)
+
+    shapes_graph = _load_shapes_graph()
+    if use_supplemental_shapes:
+        shapes_graph.parse(data=SUPPLEMENTAL_SHAPES, format="turtle")
+
+    previous_validate_result = pyshacl.validate(
+        previous_data_graph,
+        shacl_graph=shapes_graph,
+        ont_graph=shapes_graph,
+    )
+    assert isinstance(previous_validate_result[1], rdflib.Graph)
+    previous_focus_node_reports = split_validation_report(
+        (
+            previous_validate_result[0],
+            previous_validate_result[1],
+            previous_validate_result[2],
+        ),
+        (previous_data_graph.namespace_manager, shapes_graph.namespace_manager),
+    )
+    assert previous_focus_node_reports is not None
+
+    # Revalidate against a new parse of the shapes, as a later run would.
+    shapes_graph = _load_shapes_graph()
+    if use_supplemental_shapes:
+        shapes_graph.parse(data=SUPPLEMENTAL_SHAPES, format="turtle")
+    previous_focus_node_reports = rebase_focus_node_reports(
+        previous_focus_node_reports, shapes_graph
+    )
+    assert previous_focus_node_reports is not None
+
+    focus_node_reports = validate_incrementally(
+        previous_data_graph,
+        previous_focus_node_reports,
+        data_graph,
+        shacl_graph=shapes_graph,
+    )
+    assert focus_node_reports is not None
+    computed = merge_validation_reports(
+        [focus_node_reports[x] for x in sorted(focus_node_reports)], shapes_graph
+    )
+
+    expected = pyshacl.validate(
+        data_graph,
+        shacl_graph=shapes_graph,
+        ont_graph=shapes_graph,
+    )
+
+    assert expected[0] == computed[0]
+    assert expected[2] == computed[2]
+    assert isinstance(expected[1], rdflib.Graph)
+    assert rdflib.compare.isomorphic(expected[1], computed[1])
+
+
+def test_get_shape_dependency() -> None:
+    """
+    Confirm the data read by the supplemental shape is bounded by its path.
+    """
+    shapes_graph = rdflib.Graph()
+    shapes_graph.parse(data=SUPPLEMENTAL_SHAPES, format="turtle")
+    shape_dependency = get_shape_dependency(
+        shapes_graph, rdflib.URIRef("http://example.org/ontology/ex/label-shape")
+    )
+    assert shape_dependency == (1, {NS_RDF.type, rdflib.RDFS.label})
+
+
+def test_get_chain_breaks() -> None:
+    """
+    Confirm break points are the stranded nodes and cycles with nothing stranded upstream, and that stranded nodes downstream of several break points are counted for each.
+    """
+    ns_kb = rdflib.Namespace("http://example.org/kb/")
+    data_graph = rdflib.Graph()
+    for triple in [
+        # Grounded chain.
+        (ns_kb.a1, NS_PROV.used, NS_PROV.EmptyCollection),
+        (ns_kb.a2, NS_PROV.wasInformedBy, ns_kb.a1),
+        # Chain broken at e1.
+        (ns_kb.e1, NS_RDF.type, NS_PROV.Entity),
+        (ns_kb.e2, NS_PROV.wasDerivedFrom, ns_kb.e1),
+        (ns_kb.a3, NS_PROV.used, ns_kb.e2),
+        # Chain broken at a cycle.
+        (ns_kb.c1, NS_PROV.wasDerivedFrom, ns_kb.c2),
+        (ns_kb.c2, NS_PROV.wasDerivedFrom, ns_kb.c1),
+        (ns_kb.c3, NS_PROV.wasDerivedFrom, ns_kb.c1),
+        # Downstream of both breaks.
+        (ns_kb.d, NS_PROV.wasDerivedFrom, ns_kb.e1),
+        (ns_kb.d, NS_PROV.wasDerivedFrom, ns_kb.c1),
+        # Downstream of a break, but also grounded.
+        (ns_kb.g, NS_PROV.wasDerivedFrom, ns_kb.e1),
+        (ns_kb.g, NS_PROV.wasDerivedFrom, NS_PROV.EmptyCollection),
+    ]:
+        data_graph.add(triple)
+
+    n_grounded, n_stranded, chain_breaks = get_chain_breaks(data_graph, rdflib.Graph())
+    assert n_grounded == {ns_kb.a1, ns_kb.a2, ns_kb.g}
+    assert n_stranded == {
+        ns_kb.a3,
+        ns_kb.c1,
+        ns_kb.c2,
+        ns_kb.c3,
+        ns_kb.d,
+        ns_kb.e1,
+        ns_kb.e2,
+    }
+    assert chain_breaks == [
+        ([ns_kb.c1, ns_kb.c2], 4),
+        ([ns_kb.e1], 4),
+    ]
+
+
+TARGETED_INFERENCE_DATA = """\
+@prefix ex: <http://example.org/ontology/ex/> .
+@prefix kb: <http://example.org/kb/> .
+@prefix prov: <http://www.w3.org/ns/prov#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+
+ex:Action rdfs:subClassOf ex:Process , prov:Activity .
+ex:Thing rdfs:subClassOf prov:Entity .
+ex:usedThing rdfs:subPropertyOf prov:used .
+ex:wasCopiedFrom rdfs:subPropertyOf prov:wasDerivedFrom .
+ex:copiedBy rdfs:domain ex:Thing .
+
+kb:action-1 a ex:Action ;
+    ex:usedThing prov:EmptyCollection .
+kb:action-2 a ex:Action .
+kb:thing-1 a ex:Thing ;
+    ex:wasCopiedFrom prov:EmptyCollection .
+kb:thing-2 ex:copiedBy kb:action-1 .
+"""
+
+
+def test_get_targeted_entailments() -> None:
+    """
+    Only entailments the shapes can observe are made, and validating with them matches validating with RDFS inferencing.
+    """
+    ns_kb = rdflib.Namespace("http://example.org/kb/")
+    shapes_graph = _load_shapes_graph()
+    data_graph = rdflib.Graph()
+    data_graph.parse(data=TARGETED_INFERENCE_DATA, format="turtle")
+
+    entailments = get_targeted_entailments(data_graph, shapes_graph, shapes_graph)
+    assert entailments == {
+        (ns_kb["action-1"], NS_PROV.used, NS_PROV.EmptyCollection),
+        (ns_kb["action-1"], NS_RDF.type, NS_PROV.Activity),
+        (ns_kb["action-2"], NS_RDF.type, NS_PROV.Activity),
+        (ns_kb["thing-1"], NS_PROV.wasDerivedFrom, NS_PROV.EmptyCollection),
+        (ns_kb["thing-1"], NS_RDF.type, NS_PROV.Entity),
+        (ns_kb["thing-2"], NS_RDF.type, NS_PROV.Entity),
+    }
+
+    # time:Interval is observable by a supplemental shape.
+    supplemental_shapes_graph = _load_shapes_graph()
+    supplemental_shapes_graph.parse(
+        data=SUPPLEMENTAL_SHAPES.replace("prov:Entity", "time:Interval").replace(
+            "@prefix sh:",
+            "@prefix time: <http://www.w3.org/2006/time#> .\n@prefix sh:",
+        ),
+        format="turtle",
+    )
+    assert (ns_kb["action-2"], NS_RDF.type, NS_TIME.Interval) in (
+        get_targeted_entailments(
+            data_graph, supplemental_shapes_graph, supplemental_shapes_graph
+        )
+    )
+
+    expected_result = pyshacl.validate(
+        data_graph,
+        shacl_graph=shapes_graph,
+        ont_graph=shapes_graph,
+        inference="rdfs",
+    )
+    for entailment in entailments:
+        data_graph.add(entailment)
+    computed_result = pyshacl.validate(
+        data_graph,
+        shacl_graph=shapes_graph,
+        ont_graph=shapes_graph,
+    )
+    assert computed_result[0] == expected_result[0]
+    assert computed_result[2] == expected_result[2]
+
+
+def test_load_graph_cached(tmp_path: pathlib.Path) -> None:
+    """
+    Confirm a cached graph is written once per set of source contents, and loads as the graph that was parsed.
+    """
+    sources = [("supplemental.ttl", SUPPLEMENTAL_SHAPES.encode(), "turtle")]
+    expected = load_graph(sources)
+
+    computed_miss = load_graph(sources, str(tmp_path))
+    assert len(list(tmp_path.glob("*.pickle"))) == 1
+    computed_hit = load_graph(sources, str(tmp_path))
+    assert len(list(tmp_path.glob("*.pickle"))) == 1
+
+    assert rdflib.compare.isomorphic(expected, computed_miss)
+    assert rdflib.compare.isomorphic(expected, computed_hit)
+
+    load_graph(sources + [("empty.ttl", b"", "turtle")], str(tmp_path))
+    assert len(list(tmp_path.glob("*.pickle"))) == 2
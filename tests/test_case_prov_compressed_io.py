@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import gzip
+import pathlib
+
+import pytest
+import rdflib
+import rdflib.compare
+
+from case_prov import compressed_io, snapshot, synthetic
+from case_prov.case_prov_check import load_graph
+from case_prov.pipeline import run_pipeline
+
+srcdir = pathlib.Path(__file__).parent
+
+
+@pytest.mark.parametrize("extension", [".bz2", ".gz", ".xz"])
+def test_round_trip(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, extension: str
+) -> None:
+    # Small chunks exercise the background reader's queue.
+    monkeypatch.setattr(compressed_io, "CHUNK_SIZE", 1024)
+
+    expected_graph = rdflib.Graph()
+    for format_extension in [".jsonld", ".ttl"]:
+        plain_path = str(tmp_path / ("case" + format_extension))
+        with open(plain_path, "w") as out_fh:
+            synthetic.write_graph(
+                out_fh,
+                "json-ld" if format_extension == ".jsonld" else "turtle",
+                actions=30,
+                seed=3,
+            )
+        with open(plain_path, "rb") as in_fh:
+            plain_data = in_fh.read()
+        compressed_path = plain_path + extension
+        with compressed_io.open_output(compressed_path) as out_fh:
+            out_fh.write(plain_data)
+        with open(compressed_path, "rb") as in_fh:
+            assert in_fh.read() != plain_data
+        with compressed_io.open_input(compressed_path) as in_fh:
+            assert in_fh.read() == plain_data
+
+        expected_graph = rdflib.Graph()
+        expected_graph.parse(plain_path)
+        computed_graph = rdflib.Graph()
+        snapshot.parse_graph_file(computed_graph, compressed_path)
+        assert rdflib.compare.isomorphic(expected_graph, computed_graph)
+
+        with compressed_io.open_input(compressed_path) as in_fh:
+            checked_graph = load_graph([(compressed_path, in_fh.read(), None)])
+        assert rdflib.compare.isomorphic(expected_graph, checked_graph)
+
+    snapshot_path = str(tmp_path / ("case.snap" + extension))
+    with compressed_io.open_output(snapshot_path) as out_fh:
+        snapshot.write_snapshot(expected_graph, out_fh)
+    assert snapshot.is_snapshot_file(snapshot_path)
+    computed_graph = rdflib.Graph()
+    snapshot.parse_graph_file(computed_graph, snapshot_path)
+    assert set(computed_graph) == set(expected_graph)
+
+
+def test_pipeline_outputs(tmp_path: pathlib.Path) -> None:
+    in_graph = rdflib.Graph()
+    in_graph.parse(srcdir / "Issue-88" / "example.ttl")
+    run_pipeline(
+        in_graph,
+        rdf_arguments=["--use-deterministic-uuids"],
+        check_arguments=None,
+        views=[
+            (str(tmp_path / "out.dot"), ["--use-deterministic-uuids"]),
+            (str(tmp_path / "out.dot.gz"), ["--use-deterministic-uuids"]),
+        ],
+        out_rdf=str(tmp_path / "prov.ttl.gz"),
+    )
+    with gzip.open(tmp_path / "out.dot.gz", "rt") as in_fh:
+        assert in_fh.read() == (tmp_path / "out.dot").read_text()
+    prov_graph = rdflib.Graph()
+    prov_graph.parse(
+        data=gzip.decompress((tmp_path / "prov.ttl.gz").read_bytes()), format="turtle"
+    )
+    assert len(prov_graph) > 0
+
+
+def test_corrupt_input(tmp_path: pathlib.Path) -> None:
+    corrupt_path = tmp_path / "corrupt.ttl.gz"
+    corrupt_path.write_bytes(gzip.compress(b"<urn:example:a> a <urn:example:B> .")[:-8])
+    with pytest.raises(EOFError):
+        with compressed_io.open_input(str(corrupt_path)) as in_fh:
+            in_fh.read()
+
+
+def test_early_close(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Closing a stream before its end stops the background thread.
+    """
+    monkeypatch.setattr(compressed_io, "CHUNK_SIZE", 16)
+    monkeypatch.setattr(compressed_io, "READ_AHEAD_CHUNKS", 1)
+    in_path = tmp_path / "large.gz"
+    with gzip.open(in_path, "wb") as out_fh:
+        out_fh.write(b"x" * 4096)
+    in_fh = compressed_io.open_input(str(in_path))
+    assert in_fh.read(4) == b"xxxx"
+    in_fh.close()
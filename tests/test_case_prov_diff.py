@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import argparse
+import io
+import pathlib
+import typing
+
+import pytest
+import rdflib
+
+from case_prov import case_prov_rdf, diff, synthetic
+
+srcdir = pathlib.Path(__file__).parent
+
+NS_KB = rdflib.Namespace("http://example.org/kb/")
+NS_UCO_ACTION = rdflib.Namespace(
+    "https://ontology.unifiedcyberontology.org/uco/action/"
+)
+
+N_BUILD_ACTION = NS_KB["Action-0048fa2e-6805-4e90-8ccd-a7ea6f488c69"]
+N_USE_ACTION = NS_KB["Action-1102f1f3-65a2-4e1a-8fa1-87ac6fe6ede0"]
+N_TOOL = NS_KB["Tool-12263638-4202-4a95-ac7b-27c041611853"]
+
+
+def _augment(in_graph: rdflib.Graph, *arguments: str) -> rdflib.Graph:
+    parser = argparse.ArgumentParser()
+    case_prov_rdf.add_arguments(parser)
+    return case_prov_rdf.augment_graph(in_graph, parser.parse_args(arguments))
+
+
+def _in_graph(start_time: str) -> rdflib.Graph:
+    in_graph = rdflib.Graph()
+    in_graph.parse(srcdir / "Issue-88" / "example.ttl")
+    in_graph.add(
+        (
+            N_USE_ACTION,
+            NS_UCO_ACTION.startTime,
+            rdflib.Literal(start_time, datatype=rdflib.XSD.dateTime),
+        )
+    )
+    return in_graph
+
+
+def _changes_by_kind(
+    changes: typing.List[diff.ChangeType],
+) -> typing.Set[typing.Tuple[str, str, str]]:
+    return {
+        (
+            x[0],
+            "+" if x[3] is None else "-" if x[4] is None else "~",
+            str(x[2]),
+        )
+        for x in changes
+    }
+
+
+def test_diff_unchanged() -> None:
+    """
+    Two runs without deterministic UUIDs name their inferred nodes differently, and differ in nothing else.
+    """
+    in_graph = _in_graph("2020-01-02T03:04:05Z")
+    old_graph = _augment(in_graph)
+    new_graph = _augment(in_graph)
+
+    node_map = diff.match_nodes(old_graph, new_graph)
+    assert len(node_map) > 0
+    assert all(x != y for (x, y) in node_map.items())
+    assert diff.diff_graphs(old_graph, new_graph, node_map) == []
+
+    deterministic_graph = _augment(in_graph, "--use-deterministic-uuids")
+    assert diff.diff_graphs(deterministic_graph, new_graph) == []
+
+
+def _blank_node_graph() -> rdflib.Graph:
+    """
+    Parse a synthetic graph with blank nodes, which are named anew each time it is parsed.
+    """
+    out_fh = io.StringIO()
+    synthetic.write_graph(out_fh, actions=12, blank_node_ratio=0.3, seed=5)
+    in_graph = rdflib.Graph()
+    in_graph.parse(data=out_fh.getvalue(), format="turtle")
+    return in_graph
+
+
+def test_diff_blank_nodes() -> None:
+    """
+    Blank nodes, and the nodes inferred from them, are matched by structure.
+    """
+    old_graph = _augment(_blank_node_graph(), "--use-deterministic-uuids")
+    new_in_graph = _blank_node_graph()
+    new_graph = _augment(new_in_graph, "--use-deterministic-uuids")
+    assert any(isinstance(x, rdflib.BNode) for x in new_graph.subjects())
+
+    node_map = diff.match_nodes(old_graph, new_graph)
+    assert any(isinstance(x, rdflib.BNode) for x in node_map)
+    assert diff.diff_graphs(old_graph, new_graph, node_map) == []
+    assert diff.diff_graphs(old_graph, _augment(new_in_graph)) == []
+
+    # A SHACL report's results are blank nodes, with copies of shared
+    # constraints nested.
+    report_path = (
+        srcdir
+        / "casework.github.io"
+        / "examples"
+        / "crossover_heist"
+        / "case_prov_check.ttl"
+    )
+    old_graph = rdflib.Graph()
+    old_graph.parse(report_path)
+    new_graph = rdflib.Graph()
+    new_graph.parse(report_path)
+    assert diff.diff_graphs(old_graph, new_graph) == []
+
+    # Only the changed triple is reported, though the keys of the result
+    # and the report it is nested in change.
+    n_result = sorted(new_graph.objects(None, rdflib.SH.result), key=str)[0]
+    assert isinstance(n_result, rdflib.BNode)
+    n_old_severity = new_graph.value(n_result, rdflib.SH.resultSeverity)
+    new_graph.set((n_result, rdflib.SH.resultSeverity, rdflib.SH.Info))
+    assert diff.diff_graphs(old_graph, new_graph) == [
+        ("Other", n_result, rdflib.SH.resultSeverity, None, rdflib.SH.Info),
+        ("Other", n_result, rdflib.SH.resultSeverity, n_old_severity, None),
+    ]
+
+
+def test_diff_changed() -> None:
+    old_graph = _augment(_in_graph("2020-01-02T03:04:05Z"))
+    new_in_graph = _in_graph("2020-01-02T03:04:06Z")
+    new_in_graph.remove((N_USE_ACTION, NS_UCO_ACTION.instrument, N_TOOL))
+    new_graph = _augment(new_in_graph)
+
+    changes = diff.diff_graphs(old_graph, new_graph)
+    changes_by_kind = _changes_by_kind(changes)
+    # The start time shifted.
+    assert ("Start", "~", str(rdflib.PROV.startedAtTime)) in changes_by_kind
+    # The tool no longer performs the use action.
+    assert ("Association", "-", str(rdflib.PROV.wasAssociatedWith)) in changes_by_kind
+    assert ("Association", "-", str(rdflib.PROV.agent)) in changes_by_kind
+    assert not any(x[0] == "Derivation" for x in changes)
+    assert all(x[3] is None or x[4] is None or x[0] != "Other" for x in changes)
+
+    report_text = diff.make_diff_report_text(
+        changes, diff.match_nodes(old_graph, new_graph), new_graph.namespace_manager
+    )
+    # prov:startedAtTime of the action, and prov:atTime and
+    # time:inXSDDateTimeStamp of its prov:Start.
+    assert "\nStart: 0 added, 0 removed, 3 changed\n" in report_text
+    assert '"2020-01-02T03:04:06+00:00"^^xsd:dateTime\n' in report_text
+
+
+def test_diff_main(tmp_path: pathlib.Path) -> None:
+    in_graph = _in_graph("2020-01-02T03:04:05Z")
+    _augment(in_graph).serialize(tmp_path / "old.ttl")
+    _augment(in_graph).serialize(tmp_path / "new.ttl")
+    with pytest.raises(SystemExit) as exc_info:
+        diff.main(
+            [
+                "--output",
+                str(tmp_path / "report.txt"),
+                str(tmp_path / "old.ttl"),
+                str(tmp_path / "new.ttl"),
+            ]
+        )
+    assert exc_info.value.code == 0
+    assert "\nChanges: 0\n" in (tmp_path / "report.txt").read_text()
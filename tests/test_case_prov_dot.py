@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import argparse
+import pathlib
+import subprocess
+import sys
+import textwrap
+import typing
+
+import pytest
+import rdflib
+import rdflib.compare
+
+from case_prov import reachability
+from case_prov.case_prov_check import make_time_cycle_report_text
+from case_prov.case_prov_dot import (
+    NS_PROV,
+    NS_TIME,
+    add_arguments,
+    build_adjacency,
+    build_instant_epoch_index,
+    build_interval_epoch_index,
+    datetime_argument,
+    expand_prov_activities_with_owl_time,
+    expand_prov_activities_with_owl_time_indexed,
+    get_closure,
+    get_graph_time_edges,
+    iri_to_gv_node_id,
+    n_instantaneous_perdurant_to_timestamp_string,
+    n_intervalic_perdurant_to_interval_string,
+    n_thing_to_pydot_node_kwargs,
+    prefetch_display_texts,
+    query_instant_epoch_index,
+    query_interval_epoch_index,
+    render_dot,
+)
+from case_prov.digraph import get_cycles
+
+tests_srcdir = pathlib.Path(__file__).parent
+top_srcdir = tests_srcdir.parent
+
+NS_KB = rdflib.Namespace("http://example.org/kb/")
+
+# Each member is a list of files parsed together into one graph.
+graph_file_lists: typing.List[typing.List[pathlib.Path]] = [
+    [x] for x in sorted(tests_srcdir.glob("casework.github.io/examples/*/*-prov.ttl"))
+]
+graph_file_lists += [[x] for x in sorted(top_srcdir.glob("figures/readme-*.ttl"))]
+graph_file_lists.append(
+    [
+        tests_srcdir / "Issue-88" / "example.ttl",
+        tests_srcdir / "Issue-88" / "example_prov.ttl",
+    ]
+)
+
+
+def _load_graph(graph_files: typing.List[pathlib.Path]) -> rdflib.Graph:
+    graph = rdflib.Graph()
+    for graph_file in graph_files:
+        graph.parse(graph_file)
+    graph.bind("prov", NS_PROV)
+    graph.bind("time", NS_TIME)
+    return graph
+
+
+@pytest.mark.parametrize(
+    "graph_files", graph_file_lists, ids=[x[-1].name for x in graph_file_lists]
+)
+def test_expand_prov_activities_with_owl_time_indexed(
+    graph_files: typing.List[pathlib.Path],
+) -> None:
+    """
+    Confirm the indexed OWL-Time expansion matches the SPARQL-based expansion.
+    """
+    expected = _load_graph(graph_files)
+    expand_prov_activities_with_owl_time(expected, NS_KB, True)
+
+    computed = _load_graph(graph_files)
+    expand_prov_activities_with_owl_time_indexed(computed, NS_KB, True)
+
+    assert rdflib.compare.isomorphic(expected, computed)
+
+
+def test_epoch_indexes() -> None:
+    """
+    Confirm the time-window indexes select the expected Instants and Activities.
+    """
+    graph = _load_graph(
+        [top_srcdir / "figures" / "readme-actions-ordered-by-timestamp-expanded.ttl"]
+    )
+    expand_prov_activities_with_owl_time_indexed(graph, NS_KB, True)
+    n_instants: typing.Set[rdflib.term.IdentifiedNode] = set()
+    for n_instant in graph.subjects(rdflib.RDF.type, NS_TIME.Instant):
+        assert isinstance(n_instant, rdflib.term.IdentifiedNode)
+        n_instants.add(n_instant)
+    n_activities: typing.Set[rdflib.term.IdentifiedNode] = set()
+    for n_activity in graph.subjects(rdflib.RDF.type, NS_PROV.Activity):
+        assert isinstance(n_activity, rdflib.term.IdentifiedNode)
+        n_activities.add(n_activity)
+
+    instant_epoch_index = build_instant_epoch_index(graph, n_instants)
+    interval_epoch_index = build_interval_epoch_index(
+        graph, n_activities, instant_epoch_index
+    )
+    assert instant_epoch_index[0] == sorted(instant_epoch_index[0])
+    assert interval_epoch_index[0] == sorted(interval_epoch_index[0])
+    assert interval_epoch_index[3] == sorted(interval_epoch_index[3])
+
+    until = datetime_argument("2020-01-02T03:30:00Z").timestamp()
+    assert len(query_instant_epoch_index(instant_epoch_index, until=until)) > 0
+    assert set(query_interval_epoch_index(interval_epoch_index, until=until)) == {
+        rdflib.URIRef("urn:example:Action-e9f1edc9-4e0c-43c3-a1c4-891143e3fa86")
+    }
+
+    since = datetime_argument("2020-01-02T07:00:00").timestamp()
+    assert set(query_interval_epoch_index(interval_epoch_index, since=since)) == {
+        rdflib.URIRef("urn:example:Action-417af923-6ff4-48da-b7a7-177cb5f3d6f3"),
+        rdflib.URIRef("urn:example:Action-60dddd50-07ac-4177-930d-7954c56f49b9"),
+    }
+
+    # Both orderings select what a scan of every span selects.
+    spans = list(
+        zip(interval_epoch_index[0], interval_epoch_index[1], interval_epoch_index[2])
+    )
+    epochs = sorted(set(interval_epoch_index[0] + interval_epoch_index[3]))
+    for window_since in [None] + epochs:
+        for window_until in [None] + epochs:
+            assert set(
+                query_interval_epoch_index(
+                    interval_epoch_index, window_since, window_until
+                )
+            ) == {
+                x[2]
+                for x in spans
+                if (window_since is None or x[1] >= window_since)
+                and (window_until is None or x[0] <= window_until)
+            }
+
+
+@pytest.mark.parametrize(
+    "graph_files", graph_file_lists, ids=[x[-1].name for x in graph_file_lists]
+)
+def test_get_closure(graph_files: typing.List[pathlib.Path]) -> None:
+    """
+    Confirm the indexed descendant closure matches the SPARQL property path it replaces.
+    """
+    graph = _load_graph(graph_files)
+    adjacency = build_adjacency(graph, NS_PROV.wasDerivedFrom, inverse=True)
+    query = """\
+SELECT ?nDescendant
+WHERE {
+  ?nDescendant prov:wasDerivedFrom* ?nSeed .
+}
+"""
+    for n_seed in sorted(adjacency):
+        expected = set()
+        for result in graph.query(query, initBindings={"nSeed": n_seed}):
+            assert isinstance(result, rdflib.query.ResultRow)
+            expected.add(result[0])
+        computed = get_closure(adjacency, {n_seed})
+        assert expected == computed
+
+
+@pytest.mark.parametrize(
+    "graph_files", graph_file_lists, ids=[x[-1].name for x in graph_file_lists]
+)
+def test_prefetch_display_texts(graph_files: typing.List[pathlib.Path]) -> None:
+    """
+    Confirm the prefetched display texts render each node as the per-node graph lookups they replace.
+    """
+    graph = _load_graph(graph_files)
+    n_things: typing.Set[rdflib.term.IdentifiedNode] = {
+        x for x in graph.subjects() if isinstance(x, rdflib.term.IdentifiedNode)
+    }
+    node_texts = prefetch_display_texts(graph, n_things)
+    wrapper = textwrap.TextWrapper(
+        break_long_words=True,
+        drop_whitespace=False,
+        replace_whitespace=False,
+        width=30,
+    )
+    for n_thing in sorted(n_things):
+        assert n_intervalic_perdurant_to_interval_string(
+            n_thing, graph, node_texts
+        ) == n_intervalic_perdurant_to_interval_string(n_thing, graph)
+        assert n_instantaneous_perdurant_to_timestamp_string(
+            n_thing, graph, node_texts
+        ) == n_instantaneous_perdurant_to_timestamp_string(n_thing, graph)
+        for n_class_for_style in [NS_PROV.Collection, NS_TIME.Instant]:
+            assert n_thing_to_pydot_node_kwargs(
+                n_thing, graph, n_class_for_style, wrapper, node_texts=node_texts
+            ) == n_thing_to_pydot_node_kwargs(
+                n_thing, graph, n_class_for_style, wrapper
+            )
+
+
+# instant-2 is asserted before instant-1, contradicting their timestamps.
+CONTRADICTORY_TIME_DATA = """\
+@prefix kb: <http://example.org/kb/> .
+@prefix time: <http://www.w3.org/2006/time#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+kb:instant-1
+    a time:Instant ;
+    time:inXSDDateTimeStamp "2020-01-01T00:00:00Z"^^xsd:dateTimeStamp ;
+    .
+
+kb:instant-2
+    a time:Instant ;
+    time:before kb:instant-1 ;
+    time:inXSDDateTimeStamp "2020-01-02T00:00:00Z"^^xsd:dateTimeStamp ;
+    .
+
+kb:instant-3
+    a time:Instant ;
+    time:after kb:instant-2 ;
+    .
+"""
+
+
+@pytest.mark.parametrize(
+    "graph_files", graph_file_lists, ids=[x[-1].name for x in graph_file_lists]
+)
+def test_time_edges_acyclic(graph_files: typing.List[pathlib.Path]) -> None:
+    graph = _load_graph(graph_files)
+    assert get_cycles(get_graph_time_edges(graph, NS_KB, True).keys()) == []
+
+
+def test_time_cycles() -> None:
+    graph = rdflib.Graph()
+    graph.parse(data=CONTRADICTORY_TIME_DATA, format="turtle")
+    n_instant_1, n_instant_2, n_instant_3 = (NS_KB["instant-%d" % x] for x in [1, 2, 3])
+
+    time_edges = get_graph_time_edges(graph, NS_KB, True)
+    assert get_cycles(time_edges.keys()) == [[n_instant_1, n_instant_2]]
+    assert time_edges[(n_instant_2, n_instant_1)] == {
+        (n_instant_2, NS_TIME.before, n_instant_1)
+    }
+    assert {x[1] for x in time_edges[(n_instant_1, n_instant_2)]} == {
+        NS_TIME.inXSDDateTimeStamp
+    }
+
+    graph = rdflib.Graph()
+    graph.parse(data=CONTRADICTORY_TIME_DATA, format="turtle")
+    time_acyclic, report_text = make_time_cycle_report_text(graph)
+    assert not time_acyclic
+    assert "Cycles: 1\n" in report_text
+    assert "kb:instant-2 time:before kb:instant-1 ." in report_text
+
+    # Only the edges within the cycle are dropped.
+    edge_id_pairs: typing.List[typing.Set[typing.Tuple[typing.Any, typing.Any]]] = []
+    for dot_arguments in [[], ["--drop-time-cycle-edges"]]:
+        graph = rdflib.Graph()
+        graph.parse(data=CONTRADICTORY_TIME_DATA, format="turtle")
+        parser = argparse.ArgumentParser()
+        add_arguments(parser)
+        dot_graph = render_dot(graph, parser.parse_args(dot_arguments))
+        edge_id_pairs.append(
+            {(x.get_source(), x.get_destination()) for x in dot_graph.get_edges()}
+        )
+    dropped_id_pairs = {
+        (iri_to_gv_node_id(x), iri_to_gv_node_id(y))
+        for (x, y) in [(n_instant_1, n_instant_2), (n_instant_2, n_instant_1)]
+    }
+    assert edge_id_pairs[0] - edge_id_pairs[1] == dropped_id_pairs
+    # Dot edges point from later to earlier nodes.
+    assert (
+        iri_to_gv_node_id(n_instant_3),
+        iri_to_gv_node_id(n_instant_2),
+    ) in edge_id_pairs[1]
+
+
+N_BUILD_ACTION = NS_KB["Action-0048fa2e-6805-4e90-8ccd-a7ea6f488c69"]
+N_USE_ACTION = NS_KB["Action-1102f1f3-65a2-4e1a-8fa1-87ac6fe6ede0"]
+N_TOOL = NS_KB["Tool-12263638-4202-4a95-ac7b-27c041611853"]
+N_USED_RECORD = NS_KB["ProvenanceRecord-017983af-c8ed-43e3-8b54-01838c3cb728"]
+N_RESULT_RECORD = NS_KB["ProvenanceRecord-131bd792-a0dc-4f14-aafd-0343b4a19537"]
+
+
+def _run_case_prov_dot(
+    tmp_path: pathlib.Path, *arguments: str
+) -> subprocess.CompletedProcess[str]:
+    """
+    Run the case_prov_dot script on the Issue-88 PROV-O graph, writing tmp_path/out.dot.
+    """
+    return subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "case_prov.case_prov_dot",
+            "--use-deterministic-uuids",
+            *arguments,
+            str(tmp_path / "out.dot"),
+            str(tests_srcdir / "Issue-88" / "example_prov.ttl"),
+        ],
+        cwd=top_srcdir,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+
+def _rendered_things(dot_path: pathlib.Path) -> typing.Set[rdflib.URIRef]:
+    """
+    Get which of the Issue-88 example's PROV things a Dot file displays.
+    """
+    dot_text = dot_path.read_text()
+    return {
+        x
+        for x in [N_BUILD_ACTION, N_USE_ACTION, N_TOOL, N_USED_RECORD, N_RESULT_RECORD]
+        if "\n%s [" % iri_to_gv_node_id(x) in "\n" + dot_text
+    }
+
+
+def test_case_prov_dot_descendants_cli(tmp_path: pathlib.Path) -> None:
+    completed_process = _run_case_prov_dot(
+        tmp_path, "--entity-descendants", str(N_USED_RECORD)
+    )
+    assert completed_process.returncode == 0, completed_process.stderr
+    assert _rendered_things(tmp_path / "out.dot") == {
+        N_RESULT_RECORD,
+        N_TOOL,
+        N_USE_ACTION,
+        N_USED_RECORD,
+    }
+    entity_dot_text = (tmp_path / "out.dot").read_text()
+
+    # A query selecting the same seed renders the same graph.
+    query_path = tmp_path / "select-used-record.sparql"
+    query_path.write_text(
+        "SELECT ?nThing\nWHERE {\n  BIND(<%s> AS ?nThing)\n}\n" % N_USED_RECORD
+    )
+    completed_process = _run_case_prov_dot(
+        tmp_path, "--query-descendants", str(query_path)
+    )
+    assert completed_process.returncode == 0, completed_process.stderr
+    assert (tmp_path / "out.dot").read_text() == entity_dot_text
+
+    # No derivation or communication steps are followed at depth 0.
+    completed_process = _run_case_prov_dot(
+        tmp_path,
+        "--entity-descendants",
+        str(N_USED_RECORD),
+        "--descendants-depth",
+        "0",
+    )
+    assert completed_process.returncode == 0, completed_process.stderr
+    assert _rendered_things(tmp_path / "out.dot") == {
+        N_TOOL,
+        N_USE_ACTION,
+        N_USED_RECORD,
+    }
+
+    # Query results must be IRIs.
+    query_path.write_text('SELECT ?nThing\nWHERE {\n  BIND("x" AS ?nThing)\n}\n')
+    completed_process = _run_case_prov_dot(
+        tmp_path, "--query-descendants", str(query_path)
+    )
+    assert completed_process.returncode != 0
+    assert "must return URIRefs" in completed_process.stderr
+
+
+ANCESTRY_AGENTS_GRAPH_TEXT = """\
+@prefix kb: <http://example.org/kb/> .
+@prefix prov: <http://www.w3.org/ns/prov#> .
+
+kb:entity-1 a prov:Entity .
+kb:entity-2
+    a prov:Entity ;
+    prov:wasDerivedFrom kb:entity-1 ;
+    prov:wasGeneratedBy kb:activity-1 ;
+    .
+kb:activity-1
+    a prov:Activity ;
+    prov:wasAssociatedWith
+        kb:agent-typed ,
+        kb:agent-untyped
+        ;
+    .
+kb:agent-typed
+    a prov:Agent ;
+    prov:actedOnBehalfOf kb:agent-delegator ;
+    .
+kb:agent-delegator a prov:Agent .
+kb:agent-unassociated a prov:Agent .
+"""
+
+# The ancestry of the nodes an --entity-ancestry or --query-ancestry
+# query binds to ?nTerminalThing, as case_prov_dot found it with SPARQL
+# property paths before the reachability indexes.
+SELECT_ANCESTRY_QUERY_TEXT = """\
+SELECT ?nThing
+WHERE {
+  {
+    ?nTerminalThing prov:wasGeneratedBy/prov:wasInformedBy* ?nThing .
+  }
+  UNION
+  {
+    ?nTerminalThing
+      prov:wasGeneratedBy/prov:wasInformedBy*/prov:wasAssociatedWith/prov:actedOnBehalfOf*
+      ?nThing .
+  }
+  UNION
+  {
+    ?nTerminalThing prov:wasDerivedFrom* ?nThing .
+  }
+}
+"""
+
+
+def _dot_node_lines(dot_text: str) -> typing.Dict[str, str]:
+    """
+    Get the node statements of a Dot graph, keyed by node ID.
+    """
+    node_lines: typing.Dict[str, str] = dict()
+    for line in dot_text.splitlines():
+        if " [" in line and " -> " not in line:
+            node_lines[line.split(" [")[0]] = line
+    return node_lines
+
+
+@pytest.mark.parametrize("use_index_file", [False, True])
+@pytest.mark.parametrize(
+    "n_terminal_thing",
+    [NS_KB["entity-2"], NS_KB["agent-typed"], NS_KB["agent-unassociated"]],
+)
+def test_ancestry_agents(
+    tmp_path: pathlib.Path, n_terminal_thing: rdflib.URIRef, use_index_file: bool
+) -> None:
+    """
+    The ancestry found through reachability indexes renders the nodes the SPARQL ancestry queries find, each as the whole graph renders it, so an untyped associated agent is not rendered as a prov:Agent, and an Agent with no associations is rendered.
+    """
+    graph = rdflib.Graph()
+    graph.parse(data=ANCESTRY_AGENTS_GRAPH_TEXT, format="turtle")
+    # Nodes case_prov_dot adds to the graph, such as the instants of
+    # activities, are not compared.
+    graph_node_ids = {
+        iri_to_gv_node_id(x)
+        for triple in graph
+        for x in triple
+        if isinstance(x, rdflib.URIRef) and x.startswith(str(NS_KB))
+    }
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    full_node_lines = _dot_node_lines(
+        render_dot(graph, parser.parse_args(["--use-deterministic-uuids"])).to_string()
+    )
+
+    n_expected_things: typing.Set[rdflib.term.IdentifiedNode] = {n_terminal_thing}
+    for result in graph.query(
+        SELECT_ANCESTRY_QUERY_TEXT,
+        initNs={"prov": NS_PROV},
+        initBindings={"nTerminalThing": n_terminal_thing},
+    ):
+        assert isinstance(result, rdflib.query.ResultRow)
+        assert isinstance(result[0], rdflib.term.IdentifiedNode)
+        n_expected_things.add(result[0])
+    expected_node_ids = (
+        {iri_to_gv_node_id(x) for x in n_expected_things}
+        & set(full_node_lines)
+        & graph_node_ids
+    )
+    assert iri_to_gv_node_id(NS_KB["agent-untyped"]) not in full_node_lines
+
+    query_path = tmp_path / "select-terminal-thing.sparql"
+    query_path.write_text(
+        "SELECT ?nThing\nWHERE {\n  BIND(<%s> AS ?nThing)\n}\n" % n_terminal_thing
+    )
+    index_arguments: typing.List[str] = []
+    if use_index_file:
+        index_path = tmp_path / "graph.reach"
+        with open(index_path, "wb") as out_fh:
+            reachability.write_reachability_indexes(
+                [
+                    reachability.build_reachability_index(graph, x)
+                    for x in reachability.DEFAULT_PREDICATES
+                ],
+                out_fh,
+            )
+        index_arguments = ["--reachability-index", str(index_path)]
+    for ancestry_arguments in [
+        ["--entity-ancestry", str(n_terminal_thing)],
+        ["--query-ancestry", str(query_path)],
+    ]:
+        node_lines = _dot_node_lines(
+            render_dot(
+                graph,
+                parser.parse_args(
+                    ["--use-deterministic-uuids"] + ancestry_arguments + index_arguments
+                ),
+            ).to_string()
+        )
+        assert set(node_lines) & graph_node_ids == expected_node_ids
+        for node_id, node_line in node_lines.items():
+            assert node_line == full_node_lines[node_id]
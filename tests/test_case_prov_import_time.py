@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+These tests check the start-up cost of the console scripts with `python -X importtime`.  rdflib is imported first, so each budget covers only the package's own modules and what they import beyond rdflib.  Budgets include time to compile the package's modules if their bytecode is not cached.
+"""
+
+import subprocess
+import sys
+import typing
+
+import pytest
+
+# Modules that are only imported on the code paths that use them.
+DEFERRED_MODULES: typing.Set[str] = {
+    "case_utils.inherent_uuid",
+    "networkx",
+    "prov.dot",
+    "pydot",
+    "pyshacl",
+    "rdflib.plugins.sparql",
+}
+
+# Microseconds of cumulative import time, beyond rdflib.
+IMPORT_TIME_BUDGETS: typing.Dict[str, int] = {
+    "case_prov.__main__": 30_000,
+    "case_prov.case_prov_check": 120_000,
+    "case_prov.case_prov_dot": 120_000,
+    "case_prov.case_prov_rdf": 60_000,
+    "case_prov.pipeline": 250_000,
+}
+
+
+def get_import_times(module_name: str) -> typing.Dict[str, int]:
+    """
+    Import module_name after rdflib in a new interpreter, returning the cumulative import time of each imported module.
+    """
+    completed_process = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import rdflib; import %s" % module_name,
+        ],
+        stderr=subprocess.PIPE,
+        check=True,
+        text=True,
+    )
+    import_times: typing.Dict[str, int] = dict()
+    for line in completed_process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if not fields[1].strip().isdigit():
+            # Header line.
+            continue
+        import_times[fields[2].strip()] = int(fields[1])
+    return import_times
+
+
+@pytest.mark.parametrize("module_name", sorted(IMPORT_TIME_BUDGETS))
+def test_import_time(module_name: str) -> None:
+    import_times = get_import_times(module_name)
+    assert DEFERRED_MODULES & set(import_times) == set()
+    assert import_times[module_name] <= IMPORT_TIME_BUDGETS[module_name]
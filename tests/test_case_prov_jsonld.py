@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import io
+import json
+import pathlib
+import typing
+
+import pytest
+import rdflib
+import rdflib.compare
+
+from case_prov import jsonld, snapshot, synthetic
+
+CONTEXT: typing.Dict[str, typing.Any] = {
+    "case-investigation": "https://ontology.caseontology.org/case/investigation/",
+    "kb": "http://example.org/kb/",
+    "uco-action": "https://ontology.unifiedcyberontology.org/uco/action/",
+    "uco-core": "https://ontology.unifiedcyberontology.org/uco/core/",
+    "uco-observable": "https://ontology.unifiedcyberontology.org/uco/observable/",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+    "uco-action:result": {"@type": "@id"},
+    "uco-core:tag": {"@type": "@vocab"},
+    "name": {"@id": "uco-core:name"},
+    "start": {"@id": "uco-action:startTime", "@type": "xsd:dateTime"},
+}
+
+GRAPH: typing.List[typing.Dict[str, typing.Any]] = [
+    {
+        "@id": "kb:action-1",
+        "@type": "case-investigation:InvestigativeAction",
+        "name": "Action 1",
+        "start": "2020-01-01T00:00:00Z",
+        "uco-action:endTime": {
+            "@type": "xsd:dateTime",
+            "@value": "2020-01-01T01:00:00Z",
+        },
+        "uco-action:result": ["kb:file-1", "_:b1"],
+        "uco-core:description": [
+            {"@value": "Description", "@language": "en"},
+            "Plain description",
+            None,
+        ],
+        "uco-core:tag": "uco-core:Tag",
+        "uco-core:hasFacet": {
+            "@type": "uco-observable:FileFacet",
+            "uco-observable:sizeInBytes": 12,
+            "uco-observable:isDirectory": False,
+        },
+        "ignored": "No IRI expansion",
+    },
+    {
+        "@id": "_:b1",
+        "@type": ["uco-observable:File", "uco-core:Item"],
+        "uco-core:name": "",
+    },
+    {
+        "@id": "kb:file-1",
+        "https://ontology.unifiedcyberontology.org/uco/core/name": "file-1",
+        "uco-core:description": "Ünïcödé ✓",
+    },
+]
+
+
+def _assert_fast_load(document_text: str) -> rdflib.Graph:
+    """
+    Load a document with the fast path and with rdflib, and confirm the graphs match.
+    """
+    expected_graph = rdflib.Graph()
+    expected_graph.parse(data=document_text, format="json-ld")
+    computed_graph = rdflib.Graph()
+    assert jsonld.parse_json_ld(
+        computed_graph, "document.jsonld", document_text.encode("utf-8")
+    )
+    assert rdflib.compare.isomorphic(expected_graph, computed_graph)
+    assert set(computed_graph.namespaces()) == set(expected_graph.namespaces())
+    return computed_graph
+
+
+def test_fast_load() -> None:
+    graph = _assert_fast_load(json.dumps({"@context": CONTEXT, "@graph": GRAPH}))
+    assert (
+        rdflib.URIRef("http://example.org/kb/action-1"),
+        rdflib.URIRef("https://ontology.unifiedcyberontology.org/uco/action/result"),
+        rdflib.BNode("b1"),
+    ) in graph
+
+
+def test_fast_load_graph_before_context() -> None:
+    _assert_fast_load(json.dumps({"@graph": GRAPH, "@context": CONTEXT}))
+
+
+def test_fast_load_single_node() -> None:
+    document = dict(GRAPH[0])
+    document["@context"] = CONTEXT
+    _assert_fast_load(json.dumps(document))
+
+
+def test_fast_load_streaming(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Read a synthetic graph in small chunks, so @graph members and numbers span reads.
+    """
+    monkeypatch.setattr(jsonld, "CHUNK_SIZE", 7)
+    out_fh = io.StringIO()
+    synthetic.write_graph(out_fh, "json-ld", actions=20, seed=2)
+    _assert_fast_load(out_fh.getvalue())
+
+    numbers_text = json.dumps(
+        {
+            "@context": CONTEXT,
+            "@graph": [
+                {"@id": "kb:n-%d" % x, "uco-observable:sizeInBytes": 10**x}
+                for x in range(12)
+            ],
+        },
+        indent=1,
+    )
+    _assert_fast_load(numbers_text)
+
+
+def test_fast_load_gen_delim_prefixes() -> None:
+    """
+    Terms whose IRIs end with any gen-delim character expand compact IRIs, and a suffix beginning with one slash is appended as is.
+    """
+    context = dict(CONTEXT)
+    for prefix, prefix_iri in [
+        ("ex-slash", "http://example.org/ex/"),
+        ("ex-hash", "http://example.org/ex#"),
+        ("ex-at", "http://example.org/ex@"),
+        ("ex-colon", "urn:example:"),
+    ]:
+        context[prefix] = prefix_iri
+    document = {
+        "@context": context,
+        "@graph": [
+            {"@id": "%s:a" % x, "%s:/p" % x: "A", "%s:q" % x: "B"}
+            for x in ["ex-slash", "ex-hash", "ex-at", "ex-colon"]
+        ],
+    }
+    graph = _assert_fast_load(json.dumps(document))
+    assert (
+        rdflib.URIRef("http://example.org/ex/a"),
+        rdflib.URIRef("http://example.org/ex//p"),
+        rdflib.Literal("A"),
+    ) in graph
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        # List values.
+        {
+            "@context": CONTEXT,
+            "@id": "kb:a",
+            "uco-core:tag": {"@list": ["uco-core:A", "uco-core:B"]},
+        },
+        # Named graph.
+        {"@context": CONTEXT, "@id": "kb:g", "@graph": GRAPH},
+        # Container term definition.
+        {
+            "@context": dict(
+                CONTEXT, tags={"@id": "uco-core:tag", "@container": "@set"}
+            ),
+            "@graph": GRAPH,
+        },
+        # Default language.
+        {"@context": dict(CONTEXT, **{"@language": "en"}), "@graph": GRAPH},
+        # Native value with type coercion.
+        {"@context": CONTEXT, "@id": "kb:a", "start": 1},
+        # Relative IRI.
+        {"@context": CONTEXT, "@id": "a", "name": "A"},
+        # Prefixes whose IRIs do not end with a gen-delim character.
+        {
+            "@context": dict(CONTEXT, kb="http://example.org/kb"),
+            "@id": "kb:a",
+            "name": "A",
+        },
+        {
+            "@context": dict(CONTEXT, ex="http://example.org/ex"),
+            "@id": "kb:a",
+            "ex:/p": "A",
+        },
+        {
+            "@context": dict(CONTEXT, ex="http://example.org/ex", p="ex:p"),
+            "@id": "kb:a",
+            "p": "A",
+        },
+    ],
+)
+def test_fallback(document: typing.Dict[str, typing.Any]) -> None:
+    document_text = json.dumps(document)
+    expected_graph = rdflib.Graph()
+    expected_graph.parse(data=document_text, format="json-ld")
+    computed_graph = rdflib.Graph()
+    assert not jsonld.parse_json_ld(
+        computed_graph, "document.jsonld", document_text.encode("utf-8")
+    )
+    assert rdflib.compare.isomorphic(expected_graph, computed_graph)
+
+
+def test_parse_graph_file(tmp_path: pathlib.Path) -> None:
+    in_path = tmp_path / "in.json"
+    in_path.write_text(json.dumps({"@context": CONTEXT, "@graph": GRAPH}))
+    graph = rdflib.Graph()
+    snapshot.parse_graph_file(graph, str(in_path))
+    expected_graph = rdflib.Graph()
+    expected_graph.parse(in_path)
+    assert rdflib.compare.isomorphic(expected_graph, graph)
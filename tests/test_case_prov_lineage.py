@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import contextlib
+import http.client
+import http.server
+import json
+import pathlib
+import socket
+import threading
+import typing
+
+import pytest
+import rdflib
+
+from case_prov import case_prov_dot, lineage, pipeline
+
+srcdir = pathlib.Path(__file__).parent
+
+NS_KB = rdflib.Namespace("http://example.org/kb/")
+
+N_BUILD_ACTION = NS_KB["Action-0048fa2e-6805-4e90-8ccd-a7ea6f488c69"]
+N_USE_ACTION = NS_KB["Action-1102f1f3-65a2-4e1a-8fa1-87ac6fe6ede0"]
+N_TOOL = NS_KB["Tool-12263638-4202-4a95-ac7b-27c041611853"]
+N_USED_RECORD = NS_KB["ProvenanceRecord-017983af-c8ed-43e3-8b54-01838c3cb728"]
+N_RESULT_RECORD = NS_KB["ProvenanceRecord-131bd792-a0dc-4f14-aafd-0343b4a19537"]
+
+DOT_ARGUMENTS = ["--use-deterministic-uuids"]
+
+
+def _load_graph() -> rdflib.Graph:
+    graph = rdflib.Graph()
+    graph.parse(srcdir / "Issue-88" / "example_prov.ttl")
+    return graph
+
+
+@pytest.fixture(scope="module")
+def lineage_index() -> lineage.LineageIndexType:
+    return lineage.build_lineage_index(
+        _load_graph(),
+        pipeline.parse_step_arguments(
+            case_prov_dot.add_arguments, DOT_ARGUMENTS, "case_prov_dot"
+        ),
+    )
+
+
+def _dot_ids(dot_text: str) -> typing.Tuple[typing.Set[str], typing.Set[str]]:
+    """
+    Get the node IDs and edge endpoint pairs of a Dot render.
+    """
+    import pydot
+
+    dot_graphs = pydot.graph_from_dot_data(dot_text)
+    assert dot_graphs is not None
+    return (
+        {x.get_name() for x in dot_graphs[0].get_nodes()},
+        {
+            "%s -> %s" % (x.get_source(), x.get_destination())
+            for x in dot_graphs[0].get_edges()
+        },
+    )
+
+
+@pytest.mark.parametrize("option", ["--entity-ancestry", "--entity-descendants"])
+def test_lineage_matches_case_prov_dot(
+    lineage_index: lineage.LineageIndexType, option: str
+) -> None:
+    """
+    The service renders each thing's ancestry or descendants as case_prov_dot does from the whole graph.
+    """
+    for n_thing in [N_BUILD_ACTION, N_USE_ACTION, N_USED_RECORD, N_RESULT_RECORD]:
+        expected_dot = case_prov_dot.render_dot(
+            _load_graph(),
+            pipeline.parse_step_arguments(
+                case_prov_dot.add_arguments,
+                DOT_ARGUMENTS + [option, str(n_thing)],
+                "case_prov_dot",
+            ),
+        )
+        closure = "ancestry" if option == "--entity-ancestry" else "descendants"
+        status, content_type, body = lineage.handle_request(
+            lineage_index, "/dot?iri=%s&closure=%s" % (n_thing, closure)
+        )
+        assert (status, content_type) == (200, "text/vnd.graphviz")
+        assert _dot_ids(body.decode("utf-8")) == _dot_ids(expected_dot.to_string())
+
+
+def test_handle_request(lineage_index: lineage.LineageIndexType) -> None:
+    def _get(path: str) -> typing.Tuple[int, typing.Any]:
+        status, content_type, body = lineage.handle_request(lineage_index, path)
+        assert content_type == "application/json"
+        return (status, json.loads(body))
+
+    assert _get("/ancestry?iri=%s" % N_RESULT_RECORD) == (
+        200,
+        {
+            "iris": sorted(
+                str(x)
+                for x in [
+                    N_BUILD_ACTION,
+                    N_RESULT_RECORD,
+                    N_TOOL,
+                    N_USE_ACTION,
+                    N_USED_RECORD,
+                    rdflib.PROV.EmptyCollection,
+                ]
+            )
+        },
+    )
+    assert _get("/descendants?iri=%s&depth=0" % N_USED_RECORD) == (
+        200,
+        {"iris": sorted(str(x) for x in [N_TOOL, N_USE_ACTION, N_USED_RECORD])},
+    )
+
+    # The use action begins after the build action ends, and the result
+    # record is generated within the use action.
+    status, neighborhood = _get("/time?iri=%s&depth=2" % N_USE_ACTION)
+    assert status == 200
+    n_build_ends = set(
+        lineage_index["graph"].objects(N_BUILD_ACTION, rdflib.TIME.hasEnd)
+    )
+    assert {str(x) for x in n_build_ends} <= set(neighborhood["before"])
+    assert str(N_USE_ACTION) not in neighborhood["before"] + neighborhood["after"]
+
+    assert _get("/ancestry")[0] == 400
+    assert _get("/ancestry?iri=urn:example:absent")[0] == 404
+    assert _get("/descendants?iri=%s&depth=x" % N_USED_RECORD)[0] == 400
+    assert _get("/dot?iri=%s&closure=x" % N_USED_RECORD)[0] == 400
+    assert _get("/absent?iri=%s" % N_USED_RECORD)[0] == 404
+
+
+def test_servers(
+    lineage_index: lineage.LineageIndexType, tmp_path: pathlib.Path
+) -> None:
+    @contextlib.contextmanager
+    def _serve(server: typing.Any) -> typing.Iterator[None]:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            yield
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+    path = "/ancestry?iri=%s" % N_USED_RECORD
+    expected_body = lineage.handle_request(lineage_index, path)[2]
+
+    server = lineage.make_server(lineage_index, port=0)
+    with _serve(server):
+        assert isinstance(server, http.server.HTTPServer)
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+        connection.request("GET", path)
+        response = connection.getresponse()
+        assert response.status == 200
+        assert response.read() == expected_body
+        connection.close()
+
+    socket_path = str(tmp_path / "lineage.sock")
+    server = lineage.make_server(lineage_index, socket_path=socket_path)
+    with _serve(server):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+            client_socket.connect(socket_path)
+            client_socket.sendall(("GET %s HTTP/1.0\r\n\r\n" % path).encode("ascii"))
+            response_data = b""
+            while True:
+                data = client_socket.recv(65536)
+                if len(data) == 0:
+                    break
+                response_data += data
+        assert response_data.startswith(b"HTTP/1.0 200 ")
+        assert response_data.endswith(b"\r\n\r\n" + expected_body)
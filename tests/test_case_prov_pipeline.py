@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import argparse
+import pathlib
+import typing
+
+import cdo_local_uuid
+import pytest
+import rdflib
+import rdflib.compare
+
+from case_prov import case_prov_check, case_prov_dot, case_prov_rdf
+from case_prov.pipeline import run_pipeline
+
+tests_srcdir = pathlib.Path(__file__).parent
+top_srcdir = tests_srcdir.parent
+
+
+def _parse_args(
+    add_arguments: typing.Callable[[argparse.ArgumentParser], None],
+    arguments: typing.List[str],
+) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    return parser.parse_args(arguments)
+
+
+@pytest.mark.parametrize("merge_input", [False, True])
+def test_run_pipeline(
+    merge_input: bool, monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> None:
+    """
+    The pipeline's outputs match those of the steps run separately, with the PROV-O graph passed between them in a file.
+    """
+    monkeypatch.setenv("CDO_DEMO_NONRANDOM_UUID_BASE", str(top_srcdir))
+    cdo_local_uuid.configure()
+
+    in_graph = rdflib.Graph()
+    in_graph.parse(tests_srcdir / "Issue-88" / "example.ttl")
+
+    rdf_arguments = ["--use-deterministic-uuids"]
+    view_arguments = [
+        ["--use-deterministic-uuids"],
+        ["--activity-informing", "--dash-unqualified", "--use-deterministic-uuids"],
+    ]
+
+    # Run the steps separately.
+    expected_prov_file = tmp_path / "expected-prov.ttl"
+    case_prov_rdf.augment_graph(
+        in_graph, _parse_args(case_prov_rdf.add_arguments, rdf_arguments)
+    ).serialize(expected_prov_file)
+    step_graph = rdflib.Graph()
+    if merge_input:
+        step_graph.parse(tests_srcdir / "Issue-88" / "example.ttl")
+    step_graph.parse(expected_prov_file)
+    expected_check_file = tmp_path / "expected-check.txt"
+    case_prov_check.write_report(
+        _parse_args(case_prov_check.add_arguments, ["-o", str(expected_check_file)]),
+        case_prov_check.check_graph(
+            _parse_args(case_prov_check.add_arguments, []),
+            data_graph=step_graph,
+        ),
+    )
+    expected_dot_texts: typing.List[str] = []
+    for x, dot_arguments in enumerate(view_arguments):
+        view_graph = rdflib.Graph()
+        if merge_input:
+            view_graph.parse(tests_srcdir / "Issue-88" / "example.ttl")
+        view_graph.parse(expected_prov_file)
+        expected_dot_file = tmp_path / ("expected-%d.dot" % x)
+        case_prov_dot.render_dot(
+            view_graph, _parse_args(case_prov_dot.add_arguments, dot_arguments)
+        ).write(str(expected_dot_file))
+        expected_dot_texts.append(expected_dot_file.read_text())
+
+    # Run the pipeline.
+    computed_prov_file = tmp_path / "computed-prov.ttl"
+    computed_check_file = tmp_path / "computed-check.txt"
+    (computed_prov_graph, validate_result, _) = run_pipeline(
+        in_graph,
+        rdf_arguments=rdf_arguments,
+        check_arguments=["-o", str(computed_check_file)],
+        views=[
+            (str(tmp_path / ("computed-%d.dot" % x)), dot_arguments)
+            for (x, dot_arguments) in enumerate(view_arguments)
+        ],
+        out_rdf=str(computed_prov_file),
+        merge_input=merge_input,
+    )
+
+    assert validate_result is not None
+    assert validate_result[0]
+    assert rdflib.compare.isomorphic(
+        computed_prov_graph, rdflib.Graph().parse(expected_prov_file)
+    )
+    assert rdflib.compare.isomorphic(
+        rdflib.Graph().parse(computed_prov_file),
+        rdflib.Graph().parse(expected_prov_file),
+    )
+    assert computed_check_file.read_text() == expected_check_file.read_text()
+    for x, expected_dot_text in enumerate(expected_dot_texts):
+        assert (tmp_path / ("computed-%d.dot" % x)).read_text() == expected_dot_text
+
+
+def test_run_pipeline_without_check(tmp_path: pathlib.Path) -> None:
+    in_graph = rdflib.Graph()
+    in_graph.parse(tests_srcdir / "Issue-88" / "example.ttl")
+
+    (prov_graph, validate_result, dot_graphs) = run_pipeline(
+        in_graph,
+        rdf_arguments=["--use-deterministic-uuids"],
+        check_arguments=None,
+    )
+
+    assert validate_result is None
+    assert dot_graphs == []
+    assert len(prov_graph) > 0
+    assert list(tmp_path.iterdir()) == []
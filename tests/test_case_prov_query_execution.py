@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import io
+import pathlib
+
+import rdflib
+
+from case_prov.pipeline import run_pipeline
+from case_prov.query_execution import execute_query, profile_queries
+
+srcdir = pathlib.Path(__file__).parent
+
+
+def test_execute_query_default_label() -> None:
+    graph = rdflib.Graph()
+    graph.add((rdflib.URIRef("urn:example:a"), rdflib.RDF.type, rdflib.PROV.Entity))
+
+    def _run(query: str) -> None:
+        with execute_query(graph, query, stacklevel=2) as rows:
+            assert len(rows) == 1
+
+    out_fh = io.StringIO()
+    with profile_queries(out_fh) as profile:
+        _run("SELECT ?x WHERE { ?x a prov:Entity . }")
+        _run("ASK { ?x a prov:Entity . }")
+    labels = {record[0] for record in profile.records}
+    assert len(labels) == 2
+    for label in labels:
+        assert label.startswith("test_case_prov_query_execution.py:")
+    assert out_fh.getvalue().splitlines()[-1].startswith("Total\t2\t")
+
+
+def test_profile_queries_pipeline(tmp_path: pathlib.Path) -> None:
+    in_graph = rdflib.Graph()
+    in_graph.parse(srcdir / "Issue-88" / "example.ttl")
+
+    out_fh = io.StringIO()
+    with profile_queries(out_fh) as profile:
+        prov_graph, _, _ = run_pipeline(
+            in_graph,
+            rdf_arguments=["--allow-empty-results", "--use-deterministic-uuids"],
+            check_arguments=None,
+            views=[(str(tmp_path / "out.dot"), [])],
+        )
+
+    summaries = profile.get_summaries()
+    labels = {summary[0] for summary in summaries}
+    assert any(label.startswith("construct-") for label in labels)
+    assert any(label.startswith("case_prov_dot.py:") for label in labels)
+
+    # Triples added by case_prov_rdf's CONSTRUCT queries are in its
+    # output graph.
+    construct_triples = sum(
+        summary[5] for summary in summaries if summary[0].startswith("construct-")
+    )
+    assert 0 < construct_triples <= len(prov_graph)
+
+    # The report is sorted by cost.
+    costs = [summary[2] + summary[3] for summary in summaries]
+    assert costs == sorted(costs, reverse=True)
+    assert len(out_fh.getvalue().splitlines()) == len(summaries) + 2
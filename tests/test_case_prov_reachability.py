@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import pathlib
+import random
+import typing
+
+import pytest
+import rdflib
+
+from case_prov import case_prov_dot, compressed_io, pipeline, reachability, snapshot
+
+srcdir = pathlib.Path(__file__).parent
+
+NS_PROV = rdflib.PROV
+
+N_RESULT_RECORD = rdflib.URIRef(
+    "http://example.org/kb/ProvenanceRecord-131bd792-a0dc-4f14-aafd-0343b4a19537"
+)
+
+
+def _random_graph(seed: int) -> rdflib.Graph:
+    """
+    Build a graph of prov:wasDerivedFrom triples, mostly from later to earlier nodes, with a few edges back forming cycles.
+    """
+    rng = random.Random(seed)
+    graph = rdflib.Graph()
+    nodes = [rdflib.URIRef("urn:example:node-%d" % x) for x in range(60)]
+    for _ in range(90):
+        x, y = sorted(rng.sample(range(len(nodes)), 2))
+        if rng.random() < 0.05:
+            x, y = y, x
+        graph.add((nodes[y], NS_PROV.wasDerivedFrom, nodes[x]))
+    graph.add((rdflib.BNode(), NS_PROV.wasDerivedFrom, nodes[0]))
+    return graph
+
+
+def _brute_force_reachable(
+    graph: rdflib.Graph, n_seed: rdflib.term.IdentifiedNode
+) -> typing.Set[rdflib.term.IdentifiedNode]:
+    n_reachable: typing.Set[rdflib.term.IdentifiedNode] = {n_seed}
+    n_frontier = [n_seed]
+    while len(n_frontier) > 0:
+        n_node = n_frontier.pop()
+        for n_object in graph.objects(n_node, NS_PROV.wasDerivedFrom):
+            assert isinstance(n_object, rdflib.term.IdentifiedNode)
+            if n_object not in n_reachable:
+                n_reachable.add(n_object)
+                n_frontier.append(n_object)
+    return n_reachable
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_reachability_matches_brute_force(seed: int) -> None:
+    graph = _random_graph(seed)
+    index = reachability.build_reachability_index(graph, NS_PROV.wasDerivedFrom)
+    n_nodes = {
+        x
+        for x in graph.all_nodes()
+        if isinstance(x, rdflib.term.IdentifiedNode) and x != NS_PROV.wasDerivedFrom
+    }
+    for n_from in n_nodes:
+        n_expected = _brute_force_reachable(graph, n_from)
+        assert reachability.get_reachable(index, {n_from}) == n_expected
+        for n_to in n_nodes:
+            assert reachability.is_reachable(index, n_from, n_to) == (
+                n_to in n_expected
+            )
+    n_absent = rdflib.URIRef("urn:example:absent")
+    assert reachability.get_reachable(index, {n_absent}) == {n_absent}
+    assert not reachability.is_reachable(index, n_absent, next(iter(n_nodes)))
+
+
+def test_reachability_file(tmp_path: pathlib.Path) -> None:
+    # A graph snapshot keeps the identifier of the graph's blank node.
+    graph = _random_graph(0)
+    graph_path = tmp_path / "graph.snap"
+    with compressed_io.open_output(str(graph_path)) as out_fh:
+        snapshot.write_snapshot(graph, out_fh)
+    index_path = tmp_path / "graph.reach.gz"
+    reachability.main([str(index_path), str(graph_path)])
+
+    indexes = reachability.read_reachability_indexes(str(index_path))
+    assert set(indexes.keys()) == set(reachability.DEFAULT_PREDICATES)
+    expected_index = reachability.build_reachability_index(
+        graph, NS_PROV.wasDerivedFrom
+    )
+    read_index = indexes[NS_PROV.wasDerivedFrom]
+    for key in expected_index.keys():
+        assert read_index[key] == expected_index[key], key
+    assert indexes[NS_PROV.wasInformedBy]["nodes"] == []
+
+    reachability.check_reachability_index(read_index, graph)
+    graph.add(
+        (
+            rdflib.URIRef("urn:example:node-1"),
+            NS_PROV.wasDerivedFrom,
+            rdflib.URIRef("urn:example:node-2"),
+        )
+    )
+    with pytest.raises(ValueError):
+        reachability.check_reachability_index(read_index, graph)
+
+    with pytest.raises(ValueError):
+        reachability.parse_reachability_indexes(b"CPSNAP\x00\x00" + b"\x00" * 16)
+
+
+def test_reachability_dot_ancestry(tmp_path: pathlib.Path) -> None:
+    """
+    case_prov_dot finds the same ancestry with a reachability index file.
+    """
+    graph_path = srcdir / "Issue-88" / "example_prov.ttl"
+    index_path = tmp_path / "example_prov.reach"
+    reachability.main([str(index_path), str(graph_path)])
+
+    dot_texts = []
+    for extra_arguments in [[], ["--reachability-index", str(index_path)]]:
+        graph = rdflib.Graph()
+        graph.parse(graph_path)
+        dot_texts.append(
+            case_prov_dot.render_dot(
+                graph,
+                pipeline.parse_step_arguments(
+                    case_prov_dot.add_arguments,
+                    [
+                        "--use-deterministic-uuids",
+                        "--entity-ancestry",
+                        str(N_RESULT_RECORD),
+                    ]
+                    + extra_arguments,
+                    "case_prov_dot",
+                ),
+            ).to_string()
+        )
+    assert dot_texts[0] == dot_texts[1]
+    assert N_RESULT_RECORD.split("/")[-1] in dot_texts[0]
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import io
+import pathlib
+
+import pytest
+import rdflib
+import rdflib.compare
+
+from case_prov import serialization, synthetic
+from case_prov.pipeline import run_pipeline
+
+srcdir = pathlib.Path(__file__).parent
+top_srcdir = srcdir.parent
+
+NS_EX = rdflib.Namespace("http://example.org/")
+
+
+@pytest.mark.parametrize(
+    "normalized_path",
+    [
+        top_srcdir / "case_prov" / "shapes" / "case-prov.ttl",
+        top_srcdir / "case_prov" / "shapes" / "prov-shapes.ttl",
+        top_srcdir / "figures" / "readme-two-files-validation.ttl",
+        srcdir / "Issue-88" / "example_prov.ttl",
+        srcdir / "casework.github.io" / "examples" / "asgard" / "asgard-prov.ttl",
+    ]
+    # SHACL reports share blank nodes, such as sh:sourceConstraint
+    # objects, between results.
+    + [
+        srcdir / "casework.github.io" / "examples" / example / "case_prov_check.ttl"
+        for example in [
+            "crossover_heist",
+            "crossover_wmd",
+            "hardware_duplicator",
+            "owl_trafficking",
+        ]
+    ],
+)
+def test_canonical_turtle_matches_rdf_toolkit(normalized_path: pathlib.Path) -> None:
+    """
+    Files normalized by rdf-toolkit are written back unchanged.
+    """
+    graph = rdflib.Graph()
+    graph.parse(normalized_path)
+    out_fh = io.BytesIO()
+    serialization.write_canonical_turtle(graph, out_fh)
+    assert out_fh.getvalue().decode("utf-8") == normalized_path.read_text()
+
+
+def _make_graph(reverse: bool) -> rdflib.Graph:
+    """
+    Build a graph with a shared blank node and a cycle of blank nodes, adding triples in either order.
+    """
+    n_shared = rdflib.BNode()
+    n_cycle_1 = rdflib.BNode()
+    n_cycle_2 = rdflib.BNode()
+    triples = [
+        (NS_EX.a, NS_EX.part, n_shared),
+        (NS_EX.b, NS_EX.part, n_shared),
+        (n_shared, rdflib.RDFS.label, rdflib.Literal("Shared")),
+        (n_cycle_1, NS_EX.next, n_cycle_2),
+        (n_cycle_2, NS_EX.next, n_cycle_1),
+        (NS_EX.a, rdflib.RDFS.comment, rdflib.Literal('Two\n"lines"')),
+        (NS_EX.a, NS_EX.part, rdflib.Literal(1)),
+    ]
+    graph = rdflib.Graph()
+    graph.bind("ex", NS_EX)
+    for triple in reversed(triples) if reverse else triples:
+        graph.add(triple)
+    return graph
+
+
+def test_canonical_turtle_labeled_blank_nodes() -> None:
+    # The shared blank node is copied at each use, as rdf-toolkit copies
+    # it, so it is read back as two blank nodes.
+    expected_graph = _make_graph(False)
+    n_shared = expected_graph.value(NS_EX.b, NS_EX.part)
+    n_copy = rdflib.BNode()
+    expected_graph.remove((NS_EX.b, NS_EX.part, n_shared))
+    expected_graph.add((NS_EX.b, NS_EX.part, n_copy))
+    expected_graph.add((n_copy, rdflib.RDFS.label, rdflib.Literal("Shared")))
+
+    texts = []
+    for reverse in [False, True]:
+        graph = _make_graph(reverse)
+        out_fh = io.BytesIO()
+        serialization.write_canonical_turtle(graph, out_fh)
+        texts.append(out_fh.getvalue())
+        parsed_graph = rdflib.Graph()
+        parsed_graph.parse(data=out_fh.getvalue(), format="turtle")
+        assert rdflib.compare.isomorphic(expected_graph, parsed_graph)
+    assert texts[0] == texts[1]
+
+    # Only the cycle's blank nodes are labeled.
+    assert texts[0].decode("utf-8").count("\n_:") == 2
+
+
+def test_sorted_ntriples_blank_nodes() -> None:
+    """
+    Blank nodes are labeled as they are when the whole graph is canonicalized, whatever order the graph was built in.
+    """
+    outputs = []
+    for reverse in [False, True]:
+        graph = _make_graph(reverse)
+        out_fh = io.BytesIO()
+        serialization.write_sorted_ntriples(graph, out_fh)
+        outputs.append(out_fh.getvalue())
+    assert outputs[0] == outputs[1]
+
+    canonical_graph = rdflib.compare.to_canonical_graph(_make_graph(False))
+    assert outputs[0] == b"".join(
+        sorted(
+            x.encode("utf-8")
+            for x in canonical_graph.serialize(format="nt").splitlines(keepends=True)
+            if x.strip()
+        )
+    )
+
+
+def test_sorted_ntriples(tmp_path: pathlib.Path) -> None:
+    out_fh = io.StringIO()
+    synthetic.write_graph(out_fh, "turtle", actions=30, seed=4)
+    graph = rdflib.Graph()
+    graph.parse(data=out_fh.getvalue(), format="turtle")
+
+    outputs = []
+    # The smaller budget spills sorted runs to temporary files.
+    for memory_budget in [serialization.DEFAULT_SORT_MEMORY_BUDGET, 4096]:
+        out_path = tmp_path / ("out-%d.nt" % memory_budget)
+        with open(out_path, "wb") as out_bfh:
+            assert serialization.write_sorted_ntriples(
+                graph, out_bfh, memory_budget
+            ) == len(graph)
+        outputs.append(out_path.read_bytes())
+    assert outputs[0] == outputs[1]
+
+    lines = outputs[0].splitlines()
+    assert lines == sorted(set(lines))
+    parsed_graph = rdflib.Graph()
+    parsed_graph.parse(data=outputs[0], format="nt")
+    assert rdflib.compare.isomorphic(graph, parsed_graph)
+
+
+def test_pipeline_canonical_turtle(tmp_path: pathlib.Path) -> None:
+    """
+    The pipeline's canonical Turtle matches the normalized output committed with the Issue-88 example, after its prefix declarations.  The committed file was written when rdflib bound the XSD namespace to the "xs" prefix.
+    """
+    in_graph = rdflib.Graph()
+    in_graph.parse(srcdir / "Issue-88" / "example.ttl")
+    run_pipeline(
+        in_graph,
+        rdf_arguments=["--use-deterministic-uuids"],
+        check_arguments=None,
+        out_rdf=str(tmp_path / "prov.ttl"),
+        out_rdf_format="canonical-turtle",
+    )
+    computed_text = (tmp_path / "prov.ttl").read_text()
+    expected_text = (srcdir / "Issue-88" / "example_prov.ttl").read_text()
+    assert computed_text.split("\n\n", 1)[1] == expected_text.split("\n\n", 1)[1]
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import argparse
+import io
+import itertools
+import pathlib
+import typing
+
+import pytest
+import rdflib
+
+from case_prov import case_prov_dot, snapshot
+from case_prov.case_prov_check import load_graph
+from case_prov.pipeline import run_pipeline
+
+srcdir = pathlib.Path(__file__).parent
+
+NS_EX = rdflib.Namespace("http://example.org/")
+
+
+def _make_graph() -> rdflib.Graph:
+    graph = rdflib.Graph()
+    graph.bind("ex", NS_EX)
+    n_blank = rdflib.BNode()
+    graph.add((NS_EX.thing, rdflib.RDF.type, NS_EX.Thing))
+    graph.add((NS_EX.thing, rdflib.RDFS.label, rdflib.Literal("Thing")))
+    graph.add((NS_EX.thing, rdflib.RDFS.label, rdflib.Literal("Chose", lang="fr")))
+    graph.add((NS_EX.thing, rdflib.RDFS.comment, rdflib.Literal("Ünïcödé ✓")))
+    graph.add((NS_EX.thing, NS_EX.quantity, rdflib.Literal(3)))
+    graph.add(
+        (
+            NS_EX.thing,
+            NS_EX.time,
+            rdflib.Literal("2020-01-02T03:04:05Z", datatype=rdflib.XSD.dateTime),
+        )
+    )
+    # A lexical form that rdflib would normalize if it were re-parsed.
+    graph.add(
+        (
+            NS_EX.thing,
+            NS_EX.flag,
+            rdflib.Literal("1", datatype=rdflib.XSD.boolean, normalize=False),
+        )
+    )
+    graph.add((NS_EX.thing, NS_EX.part, n_blank))
+    graph.add((n_blank, rdflib.RDFS.label, rdflib.Literal("")))
+    return graph
+
+
+def test_snapshot_round_trip() -> None:
+    graph = _make_graph()
+    out_fh = io.BytesIO()
+    assert snapshot.write_snapshot(graph, out_fh) == len(graph)
+    data = out_fh.getvalue()
+    assert snapshot.is_snapshot(data)
+
+    loaded_graph = rdflib.Graph()
+    assert snapshot.parse_snapshot(loaded_graph, data) == len(graph)
+    assert set(loaded_graph) == set(graph)
+    assert len(loaded_graph) == len(graph)
+    assert {str(literal) for literal in loaded_graph.objects(None, NS_EX.flag)} == {"1"}
+    assert ("ex", rdflib.URIRef(str(NS_EX))) in set(loaded_graph.namespaces())
+
+    # The loaded graph's indices serve every triple pattern.
+    assert set(loaded_graph.subjects(rdflib.RDFS.label, None)) == set(
+        graph.subjects(rdflib.RDFS.label, None)
+    )
+    assert set(loaded_graph.predicates(None, rdflib.Literal(3))) == {NS_EX.quantity}
+    loaded_graph.remove((NS_EX.thing, None, None))
+    assert len(loaded_graph) == 1
+
+
+def _store_state(graph: rdflib.Graph) -> typing.Dict[str, typing.Any]:
+    """
+    Get what a graph's store answers for every triple pattern of every triple of the graph, with the contexts of each triple.
+    """
+    state: typing.Dict[str, typing.Any] = {"len": len(graph)}
+    for triple in sorted(graph):
+        for mask in itertools.product([False, True], repeat=3):
+            pattern = tuple(x if keep else None for (x, keep) in zip(triple, mask))
+            state[repr(pattern)] = sorted(
+                x for (x, _) in graph.store.triples(pattern, graph)  # type: ignore
+            )
+        state[repr(triple)] = sorted(x.identifier for x in graph.store.contexts(triple))
+    return state
+
+
+def test_snapshot_store_behavior() -> None:
+    """
+    A graph loaded through the Memory store's indices answers triple patterns, removals, and context queries as a graph loaded with Graph.addN does.
+    """
+    graph = _make_graph()
+    out_fh = io.BytesIO()
+    snapshot.write_snapshot(graph, out_fh)
+
+    loaded_graph = rdflib.Graph(identifier=NS_EX.graph)
+    snapshot.parse_snapshot(loaded_graph, out_fh.getvalue())
+    expected_graph = rdflib.Graph(identifier=NS_EX.graph)
+    expected_graph.addN((s, p, o, expected_graph) for (s, p, o) in graph)
+    assert _store_state(loaded_graph) == _store_state(expected_graph)
+
+    for _graph in [loaded_graph, expected_graph]:
+        _graph.remove((NS_EX.thing, rdflib.RDFS.label, None))
+        _graph.add((NS_EX.thing, rdflib.RDF.type, NS_EX.Thing))
+        _graph.add((NS_EX.other, rdflib.RDF.type, NS_EX.Thing))
+    assert _store_state(loaded_graph) == _store_state(expected_graph)
+    assert [x.identifier for x in loaded_graph.store.contexts()] == [NS_EX.graph]
+
+
+def test_snapshot_unsupported_rdflib(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Outside the supported rdflib versions, snapshots are loaded with Graph.addN.
+    """
+    graph = _make_graph()
+    out_fh = io.BytesIO()
+    snapshot.write_snapshot(graph, out_fh)
+
+    added_quad_counts: typing.List[int] = []
+    add_n = rdflib.Graph.addN
+
+    def _add_n(self: rdflib.Graph, quads: typing.Any) -> rdflib.Graph:
+        quads = list(quads)
+        added_quad_counts.append(len(quads))
+        return add_n(self, quads)
+
+    monkeypatch.setattr(rdflib, "__version__", "8.0.0")
+    monkeypatch.setattr(rdflib.Graph, "addN", _add_n)
+    loaded_graph = rdflib.Graph()
+    snapshot.parse_snapshot(loaded_graph, out_fh.getvalue())
+    assert added_quad_counts == [len(graph)]
+    assert set(loaded_graph) == set(graph)
+
+
+def test_snapshot_into_nonempty_graph() -> None:
+    graph = _make_graph()
+    out_fh = io.BytesIO()
+    snapshot.write_snapshot(graph, out_fh)
+
+    loaded_graph = rdflib.Graph()
+    n_other = rdflib.URIRef("http://example.org/other")
+    loaded_graph.add((n_other, rdflib.RDF.type, NS_EX.Thing))
+    loaded_graph.add((NS_EX.thing, rdflib.RDF.type, NS_EX.Thing))
+    snapshot.parse_snapshot(loaded_graph, out_fh.getvalue())
+    assert set(loaded_graph) == set(graph) | {(n_other, rdflib.RDF.type, NS_EX.Thing)}
+    assert len(loaded_graph) == len(graph) + 1
+
+
+def test_snapshot_rejects_other_data() -> None:
+    with pytest.raises(ValueError):
+        snapshot.parse_snapshot(rdflib.Graph(), b"@prefix ex: <http://example.org/> .")
+    out_fh = io.BytesIO()
+    snapshot.write_snapshot(_make_graph(), out_fh)
+    with pytest.raises(ValueError):
+        snapshot.parse_snapshot(rdflib.Graph(), out_fh.getvalue()[:-16])
+
+
+def test_snapshot_render(tmp_path: pathlib.Path) -> None:
+    """
+    Render the pipeline's PROV-O graph from Turtle and from a snapshot, and confirm the renders match.
+    """
+    in_graph = rdflib.Graph()
+    in_graph.parse(srcdir / "Issue-88" / "example.ttl")
+    run_pipeline(
+        in_graph,
+        rdf_arguments=["--use-deterministic-uuids"],
+        check_arguments=None,
+        out_rdf=str(tmp_path / "prov.ttl"),
+        out_snapshot=str(tmp_path / "prov.snap"),
+    )
+    assert snapshot.is_snapshot_file(str(tmp_path / "prov.snap"))
+    assert not snapshot.is_snapshot_file(str(tmp_path / "prov.ttl"))
+
+    graph_from_turtle = rdflib.Graph()
+    graph_from_turtle.parse(tmp_path / "prov.ttl")
+
+    renders = []
+    for filename in ["prov.ttl", "prov.snap"]:
+        graph = rdflib.Graph()
+        snapshot.parse_graph_file(graph, str(tmp_path / filename))
+        parser = argparse.ArgumentParser()
+        case_prov_dot.add_arguments(parser)
+        dot_graph = case_prov_dot.render_dot(
+            graph, parser.parse_args(["--use-deterministic-uuids"])
+        )
+        renders.append(dot_graph.to_string())
+    assert renders[0] == renders[1]
+
+    with open(tmp_path / "prov.snap", "rb") as in_fh:
+        checked_graph = load_graph([("prov.snap", in_fh.read(), None)])
+    assert len(checked_graph) == len(graph_from_turtle)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+# Portions of this file contributed by NIST are governed by the
+# following statement:
+#
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to Title 17 Section 105 of the
+# United States Code, this software is not subject to copyright
+# protection within the United States. NIST assumes no responsibility
+# whatsoever for its use by other parties, and makes no guarantees,
+# expressed or implied, about its quality, reliability, or any other
+# characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import argparse
+import io
+import typing
+
+import pytest
+import rdflib
+import rdflib.compare
+
+from case_prov import case_prov_check, case_prov_rdf
+from case_prov.synthetic import write_graph
+
+NS_CASE_INVESTIGATION = rdflib.Namespace(
+    "https://ontology.caseontology.org/case/investigation/"
+)
+
+GENERATOR_KWARGS: typing.Dict[str, typing.Any] = {
+    "actions": 30,
+    "chain_depth": 4,
+    "fan_in": 2,
+    "fan_out": 3,
+    "instruments": 2,
+    "tools": 3,
+    "timestamp_density": 0.5,
+    "blank_node_ratio": 0.25,
+    "seed": 7,
+}
+
+
+def _generate(output_format: str, **kwargs: typing.Any) -> typing.Tuple[str, int]:
+    out_fh = io.StringIO()
+    triple_tally = write_graph(out_fh, output_format, **kwargs)
+    return out_fh.getvalue(), triple_tally
+
+
+@pytest.mark.parametrize("output_format", ["turtle", "json-ld"])
+def test_write_graph(output_format: str) -> None:
+    text, triple_tally = _generate(output_format, **GENERATOR_KWARGS)
+    assert _generate(output_format, **GENERATOR_KWARGS)[0] == text
+    assert _generate(output_format, **dict(GENERATOR_KWARGS, seed=8))[0] != text
+
+    graph = rdflib.Graph()
+    graph.parse(data=text, format=output_format)
+    assert len(graph) == triple_tally
+    assert (
+        len(
+            set(
+                graph.subjects(
+                    rdflib.RDF.type, NS_CASE_INVESTIGATION.InvestigativeAction
+                )
+            )
+        )
+        == GENERATOR_KWARGS["actions"]
+    )
+    assert any(isinstance(x, rdflib.BNode) for x in graph.subjects())
+
+
+def test_write_graph_formats_agree() -> None:
+    turtle_graph = rdflib.Graph()
+    turtle_graph.parse(data=_generate("turtle", **GENERATOR_KWARGS)[0], format="turtle")
+    json_ld_graph = rdflib.Graph()
+    json_ld_graph.parse(
+        data=_generate("json-ld", **GENERATOR_KWARGS)[0], format="json-ld"
+    )
+    assert rdflib.compare.isomorphic(turtle_graph, json_ld_graph)
+
+
+def test_write_graph_chains() -> None:
+    """
+    Every generated chain links back to an action without inputs, so no activity is stranded.
+    """
+    in_graph = rdflib.Graph()
+    in_graph.parse(data=_generate("turtle", **GENERATOR_KWARGS)[0], format="turtle")
+
+    parser = argparse.ArgumentParser()
+    case_prov_rdf.add_arguments(parser)
+    prov_graph = case_prov_rdf.augment_graph(
+        in_graph, parser.parse_args(["--use-deterministic-uuids"])
+    )
+
+    n_activities = set(prov_graph.subjects(rdflib.RDF.type, rdflib.PROV.Activity))
+    assert len(n_activities) == GENERATOR_KWARGS["actions"]
+    n_grounded, n_stranded, _ = case_prov_check.get_chain_breaks(
+        prov_graph, rdflib.Graph()
+    )
+    assert n_activities <= n_grounded
+    # Each action after the first of its chain is informed by another.
+    n_informed = set(prov_graph.subjects(rdflib.PROV.wasInformedBy, None))
+    assert len(n_informed) == GENERATOR_KWARGS["actions"] - (
+        -(-GENERATOR_KWARGS["actions"] // GENERATOR_KWARGS["chain_depth"])
+    )
+    assert len(n_stranded) == 0